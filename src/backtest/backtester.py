@@ -0,0 +1,159 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+import numpy as np
+from binance_adapter.binance_adapter import BinanceAdapter
+from bot.bot_settings import BotSettings
+from bot.performance_tracker import PerformanceTracker
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    """
+    Summary of a single backtest run for one settings variant.
+    """
+
+    INTERVAL: str
+    TP_RATIO: float
+    SL_RATIO: float
+    LEVERAGE: int
+    trades: int
+    wins: int
+    losses: int
+    win_rate: str
+    total_return: float
+    max_drawdown: float
+    avg_trade_return: float
+
+
+class Backtester:
+    """
+    Replays the position state machine over a historical candle series.
+
+    Entries follow a precomputed LONG/SHORT signal per candle, exactly one
+    position is open at a time, and exits use the same TP/SL prices and
+    strict price comparisons as the active position states. When both levels
+    are touched within the same candle the stop-loss is assumed to fill first.
+    """
+
+    def __init__(
+        self,
+        settings: BotSettings,
+        market_data: np.ndarray,
+        fee_rate: float = 0.0,
+        search_window: int = 256,
+    ) -> None:
+        """
+        Initialize the Backtester.
+
+        Args:
+            settings (BotSettings): Settings variant providing TP_RATIO, SL_RATIO and LEVERAGE.
+            market_data (np.ndarray): Matrix of shape (n, 4) with high, low, close
+                and signal columns. Signal is 1.0 for LONG, 0.0 for SHORT and NaN
+                where no prediction is available (e.g. indicator warm-up).
+            fee_rate (float, optional): Fee per side as a fraction of notional. Defaults to 0.0.
+            search_window (int, optional): Initial number of candles scanned per
+                vectorized exit search. Defaults to 256.
+        """
+        self.settings: BotSettings = settings
+        self.high: np.ndarray = market_data[:, 0]
+        self.low: np.ndarray = market_data[:, 1]
+        self.close: np.ndarray = market_data[:, 2]
+        self.signal: np.ndarray = market_data[:, 3]
+        self.fee_rate: float = fee_rate
+        self.search_window: int = search_window
+
+    def _find_exit(
+        self, entry_index: int, is_long: bool, tp_price: float, sl_price: float
+    ) -> Optional[Tuple[int, bool]]:
+        """
+        Find the first candle after the entry that reaches the TP or SL level.
+
+        The forward search is vectorized over a window that doubles until a
+        hit is found or the series ends.
+
+        Args:
+            entry_index (int): Index of the entry candle.
+            is_long (bool): True for a LONG position, False for SHORT.
+            tp_price (float): Take-profit price.
+            sl_price (float): Stop-loss price.
+
+        Returns:
+            Optional[Tuple[int, bool]]: (exit_index, is_tp), or None if the
+                position is still open at the end of the series.
+        """
+        size: int = len(self.close)
+        start: int = entry_index + 1
+        window: int = self.search_window
+        while start < size:
+            end: int = min(start + window, size)
+            high = self.high[start:end]
+            low = self.low[start:end]
+            if is_long:
+                tp_hit = high > tp_price
+                sl_hit = low < sl_price
+            else:
+                tp_hit = low < tp_price
+                sl_hit = high > sl_price
+            hit = tp_hit | sl_hit
+            if hit.any():
+                offset: int = int(np.argmax(hit))
+                return start + offset, bool(tp_hit[offset] and not sl_hit[offset])
+            start = end
+            window *= 2
+        return None
+
+    def run(self) -> BacktestResult:
+        """
+        Run the backtest over the full series.
+
+        Returns:
+            BacktestResult: Trade counts, win rate and PnL metrics.
+        """
+        tracker = PerformanceTracker()
+        leverage: float = float(self.settings.LEVERAGE)
+        fee: float = 2 * self.fee_rate * leverage
+        win_return: float = self.settings.TP_RATIO * leverage - fee
+        loss_return: float = -self.settings.SL_RATIO * leverage - fee
+
+        valid = np.flatnonzero(~np.isnan(self.signal))
+        returns = []
+        index: int = int(valid[0]) if len(valid) else len(self.close)
+        while index < len(self.close) - 1:
+            if np.isnan(self.signal[index]):
+                index += 1
+                continue
+            is_long: bool = bool(self.signal[index] >= 0.5)
+            tp_price, sl_price = BinanceAdapter.calculate_target_prices(
+                "LONG" if is_long else "SHORT",
+                float(self.close[index]),
+                tp_ratio=self.settings.TP_RATIO,
+                sl_ratio=self.settings.SL_RATIO,
+            )
+            exit_info = self._find_exit(index, is_long, tp_price, sl_price)
+            if exit_info is None:
+                break
+            index, is_tp = exit_info
+            if is_tp:
+                tracker.increase_win()
+                returns.append(win_return)
+            else:
+                tracker.increase_loss()
+                returns.append(loss_return)
+
+        equity = np.cumprod(1.0 + np.asarray(returns, dtype=np.float64))
+        peaks = np.maximum.accumulate(np.concatenate(([1.0], equity)))[1:]
+        drawdown = float(np.max(1.0 - equity / peaks)) if len(equity) else 0.0
+
+        return BacktestResult(
+            INTERVAL=self.settings.INTERVAL,
+            TP_RATIO=self.settings.TP_RATIO,
+            SL_RATIO=self.settings.SL_RATIO,
+            LEVERAGE=self.settings.LEVERAGE,
+            trades=len(returns),
+            wins=tracker.win_count,
+            losses=tracker.loss_count,
+            win_rate=tracker.calculate_win_rate(),
+            total_return=float(equity[-1] - 1.0) if len(equity) else 0.0,
+            max_drawdown=max(drawdown, 0.0),
+            avg_trade_return=float(np.mean(returns)) if returns else 0.0,
+        )
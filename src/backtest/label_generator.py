@@ -0,0 +1,281 @@
+import argparse
+from pathlib import Path
+from time import perf_counter
+from typing import Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from binance.client import Client
+from bot.bot_settings import SETTINGS
+from data.bar_builder import BarBuilder
+from data.indicator_registry import IndicatorRegistry
+from data.kline_history import KlineHistory
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from utils.date_utils import DateUtils
+from utils.file_utils import FileUtils
+from utils.logger import Logger
+
+
+class LabelGenerator:
+    """
+    Generates training rows for the model from raw kline history.
+
+    For every candle the snapshot features are computed and the row is
+    labelled with the side (LONG or SHORT) whose take-profit would have been
+    reached before its stop-loss within a forward horizon. Candles where
+    neither side resolves are dropped. The forward search is vectorized over
+    chunks of candles with a sliding window view, so no Python loop runs per
+    candle.
+    """
+
+    def __init__(
+        self,
+        tp_ratio: float,
+        sl_ratio: float,
+        horizon: int = 96,
+        chunk_size: int = 65536,
+    ) -> None:
+        """
+        Initialize the LabelGenerator.
+
+        Args:
+            tp_ratio (float): Take-profit distance relative to entry.
+            sl_ratio (float): Stop-loss distance relative to entry.
+            horizon (int, optional): Number of future candles searched. Defaults to 96.
+            chunk_size (int, optional): Candles processed per vectorized chunk. Defaults to 65536.
+        """
+        self.tp_ratio: float = tp_ratio
+        self.sl_ratio: float = sl_ratio
+        self.horizon: int = horizon
+        self.chunk_size: int = chunk_size
+
+    @staticmethod
+    def _first_true(mask: np.ndarray) -> np.ndarray:
+        """
+        Return the column index of the first True value per row.
+
+        Args:
+            mask (np.ndarray): Boolean matrix.
+
+        Returns:
+            np.ndarray: First True index per row, or the column count when none.
+        """
+        return np.where(mask.any(axis=1), mask.argmax(axis=1), mask.shape[1])
+
+    def label(self, history: KlineHistory) -> np.ndarray:
+        """
+        Label every candle of the history.
+
+        Args:
+            history (KlineHistory): Candle series.
+
+        Returns:
+            np.ndarray: Int8 array with 1 for LONG, 0 for SHORT and -1 for unresolved.
+        """
+        size: int = len(history)
+        labels = np.full(size, -1, dtype=np.int8)
+        if size < 2:
+            return labels
+
+        padding = np.full(self.horizon, np.nan)
+        high_windows = sliding_window_view(
+            np.concatenate((history.high, padding)), self.horizon
+        )
+        low_windows = sliding_window_view(
+            np.concatenate((history.low, padding)), self.horizon
+        )
+        precision: int = SETTINGS.COIN_PRECISION
+
+        for start in range(0, size, self.chunk_size):
+            end: int = min(start + self.chunk_size, size)
+            entry = history.close[start:end, None]
+            high = high_windows[start + 1 : end + 1]
+            low = low_windows[start + 1 : end + 1]
+
+            up_tp = np.round(entry * (1 + self.tp_ratio), precision)
+            up_sl = np.round(entry * (1 + self.sl_ratio), precision)
+            down_tp = np.round(entry * (1 - self.tp_ratio), precision)
+            down_sl = np.round(entry * (1 - self.sl_ratio), precision)
+
+            long_tp = self._first_true(high > up_tp)
+            long_sl = self._first_true(low < down_sl)
+            short_tp = self._first_true(low < down_tp)
+            short_sl = self._first_true(high > up_sl)
+
+            long_wins = long_tp < long_sl
+            short_wins = short_tp < short_sl
+            chunk = labels[start:end]
+            chunk[short_wins] = 0
+            chunk[long_wins & (~short_wins | (long_tp <= short_tp))] = 1
+
+        return labels
+
+    def generate(self, history: KlineHistory) -> pd.DataFrame:
+        """
+        Build labelled rows in the results CSV schema.
+
+        Every kline feature of the snapshot is evaluated in one pass over the
+        indicator graph. The extra features follow the results columns; they
+        are NaN where the history lacks their inputs. Order book features
+        cannot be derived from candles and are left out. Dates are the candle
+        open times in local time, as the bot records them, so that the
+        journal parses them back to the same timestamps.
+
+        Args:
+            history (KlineHistory): Candle series.
+
+        Returns:
+            pd.DataFrame: Rows with the `FileUtils.HEADER` columns followed by
+                the extra feature columns.
+        """
+        matrix = IndicatorRegistry.default().matrix(
+            history, MarketSnapshot.KLINE_FEATURES
+        )
+        width = len(MarketSnapshot.FEATURES)
+        labels = self.label(history)
+        keep = (labels >= 0) & ~np.isnan(matrix[:, :width]).any(axis=1)
+
+        dates = DateUtils.format_dates(history.open_time[keep] / 1000.0)
+        sides = np.where(labels[keep] == 1, "LONG", "SHORT")
+
+        columns = FileUtils.HEADER
+        frame = pd.DataFrame(
+            matrix[keep], columns=columns[3:] + list(MarketSnapshot.EXTRA_FEATURES)
+        )
+        frame.insert(0, columns[0], dates)
+        frame.insert(1, columns[1], sides)
+        frame.insert(2, columns[2], sides)
+        return frame
+
+    @staticmethod
+    def write_npz(frame: pd.DataFrame, path: Union[str, Path]) -> None:
+        """
+        Write generated rows to an uncompressed NumPy archive.
+
+        This is much faster than CSV for millions of rows. Features are stored
+        as a float32 matrix in the results column order and labels as int8
+        (1 for LONG, 0 for SHORT).
+
+        Args:
+            frame (pd.DataFrame): Generated rows.
+            path (Union[str, Path]): Destination `.npz` file.
+        """
+        FileUtils.ensure_parent(path)
+        np.savez(
+            path,
+            date=frame["date"].to_numpy(dtype=str),
+            features=frame[FileUtils.HEADER[3:]].to_numpy(dtype=np.float32),
+            result=(frame["result"].to_numpy() == "LONG").astype(np.int8),
+        )
+
+    @staticmethod
+    def read_npz(path: Union[str, Path]) -> pd.DataFrame:
+        """
+        Read rows written by `write_npz` back into the results CSV schema.
+
+        Args:
+            path (Union[str, Path]): Source `.npz` file.
+
+        Returns:
+            pd.DataFrame: Rows with the `FileUtils.HEADER` columns.
+        """
+        with np.load(path) as archive:
+            columns = FileUtils.HEADER
+            frame = pd.DataFrame(
+                archive["features"].astype(np.float64), columns=columns[3:]
+            )
+            sides = np.where(archive["result"] == 1, "LONG", "SHORT")
+            frame.insert(0, columns[0], archive["date"])
+        frame.insert(1, columns[1], sides)
+        frame.insert(2, columns[2], sides)
+        return frame
+
+    @staticmethod
+    def write_csv(frame: pd.DataFrame, path: Union[str, Path], append: bool) -> None:
+        """
+        Write generated rows to a CSV file in the results schema.
+
+        Only the `FileUtils.HEADER` columns are written, so the file stays
+        compatible with the results CSV the bot appends to.
+
+        Args:
+            frame (pd.DataFrame): Generated rows.
+            path (Union[str, Path]): Destination CSV file.
+            append (bool): Append to an existing file instead of overwriting it.
+        """
+        FileUtils.ensure_parent(path)
+        write_header = not append or FileUtils.is_empty_file(path)
+        frame[FileUtils.HEADER].to_csv(
+            path, mode="a" if append else "w", header=write_header, index=False
+        )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Command-line entry point of the offline label generator.
+
+    Rows go to `labels.db` next to the results database unless `--output`
+    names another file, so the live journal is only written on request.
+
+    Args:
+        argv (Optional[Sequence[str]], optional): Arguments. Defaults to sys.argv.
+
+    Returns:
+        pd.DataFrame: Generated rows.
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate labelled training rows from historical klines."
+    )
+    parser.add_argument("--klines", type=Path, default=None)
+    parser.add_argument("--agg-trades", type=Path, nargs="+", default=None)
+    parser.add_argument("--bar-type", default=SETTINGS.BAR_TYPE)
+    parser.add_argument("--bar-threshold", type=float, default=SETTINGS.BAR_THRESHOLD)
+    parser.add_argument("--max-bars", type=int, default=1_000_000)
+    parser.add_argument("--start", default="1 year ago UTC")
+    parser.add_argument("--interval", default=SETTINGS.INTERVAL)
+    parser.add_argument("--tp", type=float, default=SETTINGS.TP_RATIO)
+    parser.add_argument("--sl", type=float, default=SETTINGS.SL_RATIO)
+    parser.add_argument("--horizon", type=int, default=96)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path(SETTINGS.OUTPUT_DB_PATH).with_name("labels.db"),
+    )
+    parser.add_argument("--overwrite", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.agg_trades is not None:
+        builder = BarBuilder(args.bar_type, args.bar_threshold, args.max_bars)
+        for path in args.agg_trades:
+            builder.add_agg_trades(path)
+        history = builder.history()
+    elif args.klines is not None:
+        history = KlineHistory.from_csv(args.klines)
+    else:
+        client = Client(SETTINGS.API_PUBLIC_KEY, SETTINGS.API_SECRET_KEY)
+        history = KlineHistory.download(
+            client, SETTINGS.SYMBOL, args.interval, args.start
+        )
+
+    started = perf_counter()
+    generator = LabelGenerator(args.tp, args.sl, horizon=args.horizon)
+    frame = generator.generate(history)
+    if args.output.suffix == ".npz":
+        LabelGenerator.write_npz(frame, args.output)
+    elif args.output.suffix == ".db":
+        with TradeJournal(args.output) as journal:
+            journal.insert_frame(frame)
+    else:
+        LabelGenerator.write_csv(frame, args.output, append=not args.overwrite)
+    elapsed = perf_counter() - started
+
+    Logger.log_info(
+        f"Wrote {len(frame)} labelled rows from {len(history)} bars "
+        f"to {args.output} in {elapsed:.2f}s"
+    )
+    return frame
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import argparse
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, replace
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from binance.client import Client
+from backtest.backtester import Backtester, BacktestResult
+from bot.bot_settings import SETTINGS, BotSettings
+from data.indicator_registry import IndicatorRegistry
+from data.kline_history import KlineHistory
+from data.market_snapshot import MarketSnapshot
+from utils.logger import Logger
+from utils.shared_array import SharedArray, SharedArrayHandle
+
+
+def _run_variant(
+    handle: SharedArrayHandle, settings: BotSettings, fee_rate: float
+) -> BacktestResult:
+    """
+    Worker entry point: attach to the shared market data and backtest one variant.
+
+    Args:
+        handle (SharedArrayHandle): Shared market data of the variant's interval.
+        settings (BotSettings): Settings variant to evaluate.
+        fee_rate (float): Fee per side as a fraction of notional.
+
+    Returns:
+        BacktestResult: Result of the backtest.
+    """
+    market_data = SharedArray.attach(handle).array
+    return Backtester(settings, market_data, fee_rate=fee_rate).run()
+
+
+class ParameterSweep:
+    """
+    Backtests many `BotSettings` variants concurrently on a process pool.
+
+    Market data for each interval is placed once in shared memory; workers
+    attach to it read-only, so only the small settings objects are pickled
+    per task.
+    """
+
+    def __init__(
+        self,
+        variants: Sequence[BotSettings],
+        workers: Optional[int] = None,
+        fee_rate: float = 0.0,
+    ) -> None:
+        """
+        Initialize the ParameterSweep.
+
+        Args:
+            variants (Sequence[BotSettings]): Settings variants to evaluate.
+            workers (Optional[int], optional): Process count. Defaults to all cores.
+            fee_rate (float, optional): Fee per side as a fraction of notional. Defaults to 0.0.
+        """
+        self.variants: List[BotSettings] = list(variants)
+        self.workers: int = workers or os.cpu_count() or 1
+        self.fee_rate: float = fee_rate
+
+    @staticmethod
+    def grid(
+        base: BotSettings,
+        tp_ratios: Sequence[float],
+        sl_ratios: Sequence[float],
+        leverages: Sequence[int],
+        intervals: Sequence[str],
+    ) -> List[BotSettings]:
+        """
+        Build every combination of the given parameter values.
+
+        Args:
+            base (BotSettings): Settings the variants are derived from.
+            tp_ratios (Sequence[float]): TP_RATIO candidates.
+            sl_ratios (Sequence[float]): SL_RATIO candidates.
+            leverages (Sequence[int]): LEVERAGE candidates.
+            intervals (Sequence[str]): INTERVAL candidates.
+
+        Returns:
+            List[BotSettings]: Settings variants.
+        """
+        return [
+            replace(base, TP_RATIO=tp, SL_RATIO=sl, LEVERAGE=lev, INTERVAL=interval)
+            for tp, sl, lev, interval in itertools.product(
+                tp_ratios, sl_ratios, leverages, intervals
+            )
+        ]
+
+    @staticmethod
+    def random_search(
+        base: BotSettings,
+        tp_ratios: Sequence[float],
+        sl_ratios: Sequence[float],
+        leverages: Sequence[int],
+        intervals: Sequence[str],
+        samples: int,
+        seed: Optional[int] = None,
+    ) -> List[BotSettings]:
+        """
+        Sample variants with TP/SL ratios drawn uniformly from the given ranges.
+
+        Args:
+            base (BotSettings): Settings the variants are derived from.
+            tp_ratios (Sequence[float]): TP_RATIO values whose min/max bound the range.
+            sl_ratios (Sequence[float]): SL_RATIO values whose min/max bound the range.
+            leverages (Sequence[int]): LEVERAGE choices.
+            intervals (Sequence[str]): INTERVAL choices.
+            samples (int): Number of variants to draw.
+            seed (Optional[int], optional): Random seed. Defaults to None.
+
+        Returns:
+            List[BotSettings]: Settings variants.
+        """
+        rng = random.Random(seed)
+        return [
+            replace(
+                base,
+                TP_RATIO=round(rng.uniform(min(tp_ratios), max(tp_ratios)), 6),
+                SL_RATIO=round(rng.uniform(min(sl_ratios), max(sl_ratios)), 6),
+                LEVERAGE=rng.choice(list(leverages)),
+                INTERVAL=rng.choice(list(intervals)),
+            )
+            for _ in range(samples)
+        ]
+
+    @staticmethod
+    def prepare_market_data(history: KlineHistory, model) -> np.ndarray:
+        """
+        Build the (n, 4) high/low/close/signal matrix consumed by the Backtester.
+
+        The model's feature columns are computed for every candle in one
+        vectorized pass over the indicator registry, with the candle close
+        standing in for the live price, and the model predicts all valid rows
+        in a single batch.
+
+        Args:
+            history (KlineHistory): Candle series of one interval.
+            model: Trained model exposing `columns` and `predict_batch(features)`.
+
+        Returns:
+            np.ndarray: Market data matrix.
+
+        Raises:
+            ValueError: If the model reads order book features, which candles
+                do not provide.
+        """
+        if set(model.columns) & set(MarketSnapshot.BOOK_FEATURES):
+            raise ValueError("Order book features cannot be backtested on klines")
+        features = IndicatorRegistry.default().matrix(history, tuple(model.columns))
+        valid = ~np.isnan(features).any(axis=1)
+        signal = np.full(len(history), np.nan)
+        signal[valid] = model.predict_batch(features[valid]).astype(np.float64)
+        return np.column_stack([history.high, history.low, history.close, signal])
+
+    def run(self, market_data: Dict[str, np.ndarray]) -> pd.DataFrame:
+        """
+        Evaluate all variants and rank them by total return.
+
+        Args:
+            market_data (Dict[str, np.ndarray]): Market data matrix per interval.
+
+        Returns:
+            pd.DataFrame: One row per variant, best first.
+        """
+        shared: Dict[str, SharedArray] = {
+            interval: SharedArray.create(data) for interval, data in market_data.items()
+        }
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [
+                    executor.submit(
+                        _run_variant,
+                        shared[variant.INTERVAL].handle,
+                        variant,
+                        self.fee_rate,
+                    )
+                    for variant in self.variants
+                ]
+                results = [future.result() for future in futures]
+        finally:
+            for array in shared.values():
+                array.close()
+
+        table = pd.DataFrame([asdict(result) for result in results])
+        if table.empty:
+            return table
+        return table.sort_values(
+            by=["total_return", "max_drawdown"], ascending=[False, True]
+        ).reset_index(drop=True)
+
+
+def _parse_list(value: str, cast) -> List:
+    """
+    Parse a comma-separated command-line value.
+
+    Args:
+        value (str): Raw argument, e.g. "0.003,0.005".
+        cast: Callable converting each item.
+
+    Returns:
+        List: Parsed values.
+    """
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def _load_history(
+    client: Client, interval: str, start: str, klines_dir: Optional[Path]
+) -> KlineHistory:
+    """
+    Load a kline history from the local cache, downloading it when missing.
+
+    Args:
+        client (Client): Binance client instance used for downloads.
+        interval (str): Candle interval.
+        start (str): Start of the range, e.g. "3 months ago UTC".
+        klines_dir (Optional[Path]): Cache directory, or None to always download.
+
+    Returns:
+        KlineHistory: Candle series.
+    """
+    cache = klines_dir / f"{SETTINGS.SYMBOL}_{interval}.csv" if klines_dir else None
+    if cache is not None and cache.is_file():
+        return KlineHistory.from_csv(cache)
+    history = KlineHistory.download(client, SETTINGS.SYMBOL, interval, start)
+    if cache is not None:
+        history.to_csv(cache)
+    return history
+
+
+def main(argv: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Command-line entry point of the TP/SL/leverage/interval sweep.
+
+    Args:
+        argv (Optional[Sequence[str]], optional): Arguments. Defaults to sys.argv.
+
+    Returns:
+        pd.DataFrame: Ranked result table.
+    """
+    parser = argparse.ArgumentParser(
+        description="Backtest BotSettings variants in parallel and rank them."
+    )
+    parser.add_argument("--tp", default=str(SETTINGS.TP_RATIO))
+    parser.add_argument("--sl", default=str(SETTINGS.SL_RATIO))
+    parser.add_argument("--leverage", default=str(SETTINGS.LEVERAGE))
+    parser.add_argument("--interval", default=SETTINGS.INTERVAL)
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--samples", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--start", default="3 months ago UTC")
+    parser.add_argument("--klines-dir", type=Path, default=None)
+    parser.add_argument("--fee-rate", type=float, default=0.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args(argv)
+
+    tp_ratios = _parse_list(args.tp, float)
+    sl_ratios = _parse_list(args.sl, float)
+    leverages = _parse_list(args.leverage, int)
+    intervals = _parse_list(args.interval, str)
+    if args.search == "grid":
+        variants = ParameterSweep.grid(
+            SETTINGS, tp_ratios, sl_ratios, leverages, intervals
+        )
+    else:
+        variants = ParameterSweep.random_search(
+            SETTINGS, tp_ratios, sl_ratios, leverages, intervals, args.samples, args.seed
+        )
+
+    from tensorflow_model.tf_model import TFModel
+
+    model = TFModel()
+    client = Client(SETTINGS.API_PUBLIC_KEY, SETTINGS.API_SECRET_KEY)
+    market_data = {
+        interval: ParameterSweep.prepare_market_data(
+            _load_history(client, interval, args.start, args.klines_dir), model
+        )
+        for interval in intervals
+    }
+
+    sweep = ParameterSweep(variants, workers=args.workers, fee_rate=args.fee_rate)
+    started = perf_counter()
+    table = sweep.run(market_data)
+    elapsed = perf_counter() - started
+
+    Logger.log_info(
+        f"Evaluated {len(variants)} variants on {sweep.workers} workers in {elapsed:.2f}s"
+    )
+    print(table.head(args.top).to_string(index=False))
+    if args.output is not None:
+        table.to_csv(args.output, index=False)
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from time import perf_counter
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from bot.bot_settings import SETTINGS
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from model.logistic_model import LogisticModel
+from model.online_model import OnlineModel
+from tensorflow_model.model_profile import ModelProfile
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import TrainingWindow
+from utils.logger import Logger
+from utils.shared_array import SharedArray, SharedArrayHandle
+
+
+@dataclass(frozen=True)
+class FoldResult:
+    """
+    Out-of-sample metrics of one walk-forward fold.
+
+    Attributes:
+        fold (int): Fold number, in chronological order.
+        train_rows (int): Journal rows before the fold, used for training.
+        test_rows (int): Following rows the model was evaluated on.
+        accuracy (float): Fraction of test rows whose side was predicted correctly.
+        win_rate (float): Fraction of simulated trades closed at take-profit.
+        return_pct (float): Simulated return in percent of margin, without compounding.
+        seconds (float): Wall time of the fold, including training.
+    """
+
+    fold: int
+    train_rows: int
+    test_rows: int
+    accuracy: float
+    win_rate: float
+    return_pct: float
+    seconds: float
+
+
+def _init_worker(backend: str, threads: int) -> None:
+    """
+    Worker initializer: cap the threads each process may use.
+
+    Args:
+        backend (str): Model backend evaluated by the worker.
+        threads (int): Intra-op threads per worker.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    if backend == "keras":
+        from tensorflow_model.tf_model import TFModel
+
+        TFModel.configure_threads(threads, 1)
+
+
+def _run_fold(
+    handle: SharedArrayHandle,
+    fold: int,
+    train_end: int,
+    test_end: int,
+    backend: str,
+    profile: ModelProfile,
+    schema_version: int,
+) -> FoldResult:
+    """
+    Worker entry point: train on the rows before the fold and evaluate on the fold.
+
+    The model is built as production builds it, on the columns of the
+    configured feature schema: the Keras and logistic backends are trained
+    on the rows selected by the configured training window, the Keras model
+    with the configured profile, and the online backend is fitted on the
+    history and then keeps learning from each test row after predicting it.
+
+    Args:
+        handle (SharedArrayHandle): Shared (n, features + 1) matrix of features and labels.
+        fold (int): Fold number.
+        train_end (int): End of the training rows.
+        test_end (int): End of the test rows.
+        backend (str): "keras", "online" or "logistic".
+        profile (ModelProfile): Hyperparameters of the Keras model.
+        schema_version (int): Feature schema of the matrix columns.
+
+    Returns:
+        FoldResult: Metrics of the fold.
+    """
+    started = perf_counter()
+    matrix = SharedArray.attach(handle).array
+    dataset = TrainingDataset(schema_version=schema_version)
+    dataset.extend(matrix[:train_end, :-1], matrix[:train_end, -1])
+    features, labels = matrix[train_end:test_end, :-1], matrix[train_end:test_end, -1]
+
+    if backend == "online":
+        model = OnlineModel(
+            learning_rate=SETTINGS.MODEL_LEARNING_RATE, columns=dataset.columns
+        ).fit(dataset)
+        predictions = np.empty(len(labels), dtype=bool)
+        for row, (values, label) in enumerate(zip(features, labels)):
+            predictions[row] = model.predict_proba(values) >= 0.5
+            model.update(values, float(label))
+    else:
+        window = TrainingWindow.create(
+            SETTINGS.MODEL_WINDOW,
+            SETTINGS.MODEL_WINDOW_SIZE,
+            SETTINGS.MODEL_DECAY_HALF_LIFE,
+        )
+        if backend == "logistic":
+            model = LogisticModel().fit(dataset, window)
+        else:
+            from tensorflow_model.tf_model import TFModel
+
+            model = TFModel(dataset, window=window, profile=profile)
+        predictions = model.predict_batch(features)
+
+    wins = int((predictions == (labels == 1.0)).sum())
+    losses = len(labels) - wins
+    accuracy = wins / len(labels) if len(labels) else 0.0
+    return FoldResult(
+        fold=fold,
+        train_rows=train_end,
+        test_rows=len(labels),
+        accuracy=accuracy,
+        win_rate=accuracy,
+        return_pct=(wins * SETTINGS.TP_RATIO - losses * SETTINGS.SL_RATIO)
+        * SETTINGS.LEVERAGE
+        * 100.0,
+        seconds=perf_counter() - started,
+    )
+
+
+class WalkForward:
+    """
+    Time-aware evaluation of the prediction model on the trade journal.
+
+    The journal is replayed in chronological folds: each fold trains a fresh
+    model on every row before it, as the bot retrains on its history, and is
+    evaluated on the rows that follow. Folds run concurrently on a process
+    pool with the rows placed once in shared memory. Workers are started
+    with "spawn", because TensorFlow is not fork-safe, and each one is
+    limited to `threads` intra-op threads so that the workers do not
+    oversubscribe the cores. The models read the columns of the feature
+    schema in SETTINGS.MODEL_FEATURE_SCHEMA, and journal rows missing any
+    of them are left out, as the bot's training data leaves them out.
+
+    The ensemble backend has no walk-forward counterpart and is rejected.
+
+    Every journal row is a resolved trade labelled with the side that
+    reached take-profit, so a simulated trade wins exactly when the side is
+    predicted correctly: the win rate equals the accuracy, and the return
+    weighs wins by TP_RATIO and losses by SL_RATIO at the configured leverage.
+    """
+
+    BACKENDS: Tuple[str, ...] = ("keras", "online", "logistic")
+
+    def __init__(
+        self,
+        folds: int = 5,
+        workers: Optional[int] = None,
+        threads: Optional[int] = None,
+        backend: Optional[str] = None,
+        profile: Optional[ModelProfile] = None,
+        schema_version: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the WalkForward evaluation.
+
+        Args:
+            folds (int, optional): Number of test folds. Defaults to 5.
+            workers (Optional[int], optional): Process count. Defaults to
+                min(folds, CPU count).
+            threads (Optional[int], optional): Threads per worker. Defaults to
+                the CPU count divided by the workers.
+            backend (Optional[str], optional): "keras", "online" or "logistic".
+                Defaults to SETTINGS.MODEL_BACKEND.
+            profile (Optional[ModelProfile], optional): Hyperparameters of the
+                Keras model. Defaults to the profile at SETTINGS.MODEL_PROFILE_PATH,
+                or the default profile if there is none.
+            schema_version (Optional[int], optional): Feature schema of the models.
+                Defaults to SETTINGS.MODEL_FEATURE_SCHEMA.
+
+        Raises:
+            ValueError: If the backend cannot be evaluated walk-forward.
+        """
+        cpus: int = os.cpu_count() or 1
+        self.folds: int = folds
+        self.workers: int = workers or max(1, min(folds, cpus))
+        self.threads: int = threads or max(1, cpus // self.workers)
+        self.backend: str = backend or SETTINGS.MODEL_BACKEND
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported walk-forward backend: {self.backend}")
+        self.schema_version: int = schema_version or SETTINGS.MODEL_FEATURE_SCHEMA
+        self.profile: ModelProfile = (
+            profile
+            or ModelProfile.load(SETTINGS.MODEL_PROFILE_PATH)
+            or ModelProfile.default()
+        )
+
+    def boundaries(self, rows: int) -> List[Tuple[int, int]]:
+        """
+        Split the rows into chronological folds.
+
+        The first share of the rows only trains; the remaining rows are cut
+        into `folds` consecutive test ranges of almost equal size.
+
+        Args:
+            rows (int): Number of journal rows.
+
+        Returns:
+            List[Tuple[int, int]]: (train_end, test_end) per fold.
+
+        Raises:
+            ValueError: If there are fewer rows than folds + 1.
+        """
+        if rows < self.folds + 1:
+            raise ValueError(f"Need at least {self.folds + 1} rows, got {rows}")
+        edges = np.linspace(0, rows, self.folds + 2).astype(int)
+        return [(int(edges[i]), int(edges[i + 1])) for i in range(1, self.folds + 1)]
+
+    def matrix(self, frame: pd.DataFrame) -> np.ndarray:
+        """
+        Convert journal rows into a feature and label matrix.
+
+        Args:
+            frame (pd.DataFrame): Rows in the results CSV schema, oldest first.
+
+        Returns:
+            np.ndarray: Matrix of shape (n, features + 1) with the columns of the
+            feature schema and the labels in the last column. Rows missing a
+            feature are dropped.
+        """
+        columns = list(MarketSnapshot.SCHEMAS[self.schema_version])
+        features = frame[columns].to_numpy(dtype=np.float64)
+        labels = (frame["result"].to_numpy() == "LONG").astype(np.float64)
+        complete = ~np.isnan(features).any(axis=1)
+        return np.column_stack([features[complete], labels[complete]])
+
+    def run(self, matrix: np.ndarray) -> pd.DataFrame:
+        """
+        Evaluate every fold concurrently.
+
+        Args:
+            matrix (np.ndarray): Feature and label matrix built by `matrix`, oldest
+                row first.
+
+        Returns:
+            pd.DataFrame: One row per fold, in chronological order.
+
+        Raises:
+            ValueError: If the matrix does not have the columns of the feature schema.
+        """
+        width = len(MarketSnapshot.SCHEMAS[self.schema_version]) + 1
+        if matrix.shape[1] != width:
+            raise ValueError(
+                f"Feature schema {self.schema_version} needs {width} matrix "
+                f"columns, got {matrix.shape[1]}"
+            )
+        folds = self.boundaries(len(matrix))
+        with SharedArray.create(matrix) as shared:
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.backend, self.threads),
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _run_fold,
+                        shared.handle,
+                        fold,
+                        train_end,
+                        test_end,
+                        self.backend,
+                        self.profile,
+                        self.schema_version,
+                    )
+                    for fold, (train_end, test_end) in enumerate(folds, start=1)
+                ]
+                results = [future.result() for future in futures]
+        return pd.DataFrame([asdict(result) for result in results])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Command-line entry point of the walk-forward evaluation.
+
+    Args:
+        argv (Optional[Sequence[str]], optional): Arguments. Defaults to sys.argv.
+
+    Returns:
+        pd.DataFrame: Fold table.
+    """
+    parser = argparse.ArgumentParser(
+        description="Evaluate the model on the trade journal in chronological folds."
+    )
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--backend", choices=WalkForward.BACKENDS, default=None)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    with TradeJournal(SETTINGS.OUTPUT_DB_PATH) as journal:
+        frame = journal.read_frame()
+    walk = WalkForward(args.folds, args.workers, args.threads, args.backend)
+    started = perf_counter()
+    table = walk.run(walk.matrix(frame))
+    elapsed = perf_counter() - started
+
+    Logger.log_info(
+        f"Evaluated {len(table)} folds of {len(frame)} rows on {walk.workers} "
+        f"workers x {walk.threads} threads in {elapsed:.2f}s"
+    )
+    print(table.to_string(index=False))
+    if args.output is not None:
+        table.to_csv(args.output, index=False)
+    return table
+
+
+if __name__ == "__main__":
+    main()
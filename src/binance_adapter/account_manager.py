@@ -45,6 +45,22 @@ class AccountManager:
                 return float(item["balance"])
         return 0.0
 
+    def get_position_amount(self, order_type: str) -> float:
+        """
+        Retrieve the size of the open futures position on one side.
+
+        Args:
+            order_type (str): Type of position ("LONG" or "SHORT").
+
+        Returns:
+            float: Absolute position quantity. Returns 0.0 if no position is open.
+        """
+        positions = self.client.futures_position_information(symbol=SETTINGS.SYMBOL)
+        for item in positions:
+            if item.get("positionSide") == order_type:
+                return abs(float(item["positionAmt"]))
+        return 0.0
+
     def enter_position(self, order_type: str, quantity: float) -> None:
         """
         Enter a futures position (LONG or SHORT) using a market order.
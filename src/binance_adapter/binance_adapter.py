@@ -2,7 +2,7 @@ from binance_adapter.account_manager import AccountManager
 from bot.bot_settings import SETTINGS
 from binance_adapter.indicator_manager import IndicatorManager
 from binance.client import Client
-from typing import Tuple
+from typing import Optional, Tuple
 
 
 class BinanceAdapter:
@@ -30,6 +30,37 @@ class BinanceAdapter:
                 leverage=SETTINGS.LEVERAGE,
             )
 
+    @staticmethod
+    def calculate_target_prices(
+        order_type: str,
+        coin_price: float,
+        tp_ratio: Optional[float] = None,
+        sl_ratio: Optional[float] = None,
+    ) -> Tuple[float, float]:
+        """
+        Calculate the take-profit and stop-loss prices for a new position.
+
+        Args:
+            order_type (str): Type of position ("LONG" or "SHORT").
+            coin_price (float): Entry price of the coin.
+            tp_ratio (Optional[float], optional): Take-profit ratio. Defaults to SETTINGS.TP_RATIO.
+            sl_ratio (Optional[float], optional): Stop-loss ratio. Defaults to SETTINGS.SL_RATIO.
+
+        Returns:
+            Tuple[float, float]: A tuple containing (take_profit_price, stop_loss_price).
+        """
+        tp_ratio = SETTINGS.TP_RATIO if tp_ratio is None else tp_ratio
+        sl_ratio = SETTINGS.SL_RATIO if sl_ratio is None else sl_ratio
+        direction: int = 1 if order_type == "LONG" else -1
+
+        tp_price: float = float(
+            round(coin_price * (1 + direction * tp_ratio), SETTINGS.COIN_PRECISION)
+        )
+        sl_price: float = float(
+            round(coin_price * (1 - direction * sl_ratio), SETTINGS.COIN_PRECISION)
+        )
+        return tp_price, sl_price
+
     def enter_long(
         self, coin_price: float, state_block: bool = False
     ) -> Tuple[float, float]:
@@ -49,12 +80,7 @@ class BinanceAdapter:
             account_balance * 0.95, coin_price
         )
 
-        tp_price: float = float(
-            round(coin_price * (1 + SETTINGS.TP_RATIO), SETTINGS.COIN_PRECISION)
-        )
-        sl_price: float = float(
-            round(coin_price * (1 - SETTINGS.SL_RATIO), SETTINGS.COIN_PRECISION)
-        )
+        tp_price, sl_price = self.calculate_target_prices("LONG", coin_price)
 
         if not SETTINGS.TEST_MODE and not state_block:
             self.account_manager.enter_position("LONG", coin_amount)
@@ -82,12 +108,7 @@ class BinanceAdapter:
             account_balance * 0.95, coin_price
         )
 
-        tp_price: float = float(
-            round(coin_price * (1 - SETTINGS.TP_RATIO), SETTINGS.COIN_PRECISION)
-        )
-        sl_price: float = float(
-            round(coin_price * (1 + SETTINGS.SL_RATIO), SETTINGS.COIN_PRECISION)
-        )
+        tp_price, sl_price = self.calculate_target_prices("SHORT", coin_price)
 
         if not SETTINGS.TEST_MODE and not state_block:
             self.account_manager.enter_position("SHORT", coin_amount)
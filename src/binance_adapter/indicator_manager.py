@@ -1,10 +1,14 @@
-from datetime import datetime, timedelta
-from typing import Optional, List, Tuple
+import math
+from time import time
+from typing import Dict, Optional
 import numpy as np
-import talib
-import pandas as pd
 from binance.client import Client
+from binance_adapter.order_book_manager import OrderBookManager
+from binance_adapter.trade_bar_manager import TradeBarManager
 from bot.bot_settings import SETTINGS
+from data.candle_store import CandleStore
+from data.indicator_registry import IndicatorRegistry
+from data.kline_history import KlineHistory
 from data.market_snapshot import MarketSnapshot
 from utils.date_utils import DateUtils
 
@@ -13,47 +17,107 @@ class IndicatorManager:
     """
     Handles fetching historical market data from Binance
     and calculating technical indicators such as EMA, MACD, and RSI.
+
+    The indicators are declared in an `IndicatorRegistry` and evaluated
+    from a `CandleStore` of INTERVAL candles. The store is filled once with
+    enough candles for the lookback of the registry, derived from the largest
+    warm-up of the features. Later ticks only fetch the candles opened since
+    the previous tick, including the one that was still open then.
+
+    The TIMEFRAMES are resampled locally from the stored candles, so their
+    snapshots cost no extra requests per tick. They are only evaluated when
+    asked for with `timeframe_snapshot`. The first call for a timeframe grows
+    the store to the lookback in that timeframe and downloads the older
+    candles once, so the bot does not hold or fetch them until a timeframe is
+    read. When the order book is enabled, the
+    `MarketSnapshot.BOOK_FEATURES` are read from the local book kept by an
+    `OrderBookManager` instead of a REST depth request per tick; they are the
+    columns that feature schema 3 adds to the model inputs.
+
+    With a BAR_TYPE other than "time", the snapshot is evaluated on volume,
+    tick or dollar bars built from the aggTrade stream by a
+    `TradeBarManager` instead of on klines, and there are no TIMEFRAMES.
     """
 
+    KLINES_LIMIT = 1000
+
     def __init__(self, client: Client) -> None:
         """
         Initialize the IndicatorManager.
 
         Args:
             client (Client): Binance Futures client instance used for API communication.
+
+        Raises:
+            ValueError: If the model needs the order book features and the
+                order book is disabled.
         """
+        if SETTINGS.MODEL_FEATURE_SCHEMA >= 3 and not SETTINGS.ORDER_BOOK_ENABLED:
+            raise ValueError("Feature schema 3 requires [ORDER_BOOK] ENABLED")
         self.client: Client = client
-
-    def _get_close_prices(self) -> np.ndarray:
+        self.registry: IndicatorRegistry = IndicatorRegistry.default()
+        self.lookback: int = self.registry.lookback(MarketSnapshot.KLINE_FEATURES)
+        base_seconds = DateUtils.interval_to_seconds(SETTINGS.INTERVAL)
+        self.timeframes: Dict[str, int] = {
+            interval: DateUtils.interval_to_seconds(interval)
+            for interval in SETTINGS.TIMEFRAMES
+            if SETTINGS.BAR_TYPE == "time"
+        }
+        self.candles: CandleStore = CandleStore(base_seconds, self.lookback)
+        # Price and time of the latest tick, shared by the timeframe snapshots.
+        self._price: float = math.nan
+        self._timestamp: float = math.nan
+        self.order_book: Optional[OrderBookManager] = None
+        if SETTINGS.ORDER_BOOK_ENABLED:
+            self.order_book = OrderBookManager(client, SETTINGS.ORDER_BOOK_DEPTH)
+            self.order_book.start()
+        self.bars: Optional[TradeBarManager] = None
+        if SETTINGS.BAR_TYPE != "time":
+            self.bars = TradeBarManager(
+                SETTINGS.BAR_TYPE, SETTINGS.BAR_THRESHOLD, self.lookback
+            )
+            self.bars.start()
+        for seconds in self.timeframes.values():
+            # Rejects timeframes that cannot be resampled before the first tick.
+            self.candles.resample(seconds)
+
+    def _get_klines(self, count: int) -> KlineHistory:
         """
-        Retrieve closing prices for the last month from Binance.
+        Retrieve the latest `count` klines from Binance.
+
+        Up to KLINES_LIMIT klines are fetched with a single request.
+
+        Args:
+            count (int): Number of klines, the latest of which is still open.
 
         Returns:
-            np.ndarray: An array of closing prices.
+            KlineHistory: Every fetched column of the klines.
         """
-        klines = self.client.get_historical_klines(
-            symbol=SETTINGS.SYMBOL,
-            interval=SETTINGS.INTERVAL,
-            start_str="1 month ago UTC",
-        )
-        df = pd.DataFrame(
-            klines,
-            columns=[
-                "timestamp",
-                "open",
-                "high",
-                "low",
-                "close",
-                "volume",
-                "close_time",
-                "quote_asset_volume",
-                "number_of_trades",
-                "taker_buy_base_asset_volume",
-                "taker_buy_quote_asset_volume",
-                "ignore",
-            ],
-        )
-        return df["close"].astype(float).to_numpy()
+        if count <= self.KLINES_LIMIT:
+            klines = self.client.get_klines(
+                symbol=SETTINGS.SYMBOL, interval=SETTINGS.INTERVAL, limit=count
+            )
+        else:
+            span = count * self.candles.interval_seconds
+            klines = self.client.get_historical_klines(
+                symbol=SETTINGS.SYMBOL,
+                interval=SETTINGS.INTERVAL,
+                start_str=int((time() - span) * 1000),
+            )
+        return KlineHistory.from_klines(klines)
+
+    def _refresh_candles(self, timestamp: float) -> None:
+        """
+        Fetch the klines missing from the candle store.
+
+        Args:
+            timestamp (float): Current epoch seconds.
+        """
+        count = self.candles.capacity
+        if len(self.candles):
+            elapsed = int(timestamp * 1000) - self.candles.last_open_time
+            count = min(count, elapsed // (self.candles.interval_seconds * 1000) + 1)
+        self.candles.update(self._get_klines(max(count, 1)))
 
     def _fetch_price(self) -> float:
         """
@@ -67,92 +131,124 @@ class IndicatorManager:
             return float(ticker["price"])
         return 0.0
 
-    def _calculate_EMA(
-        self, period: int, close_prices: Optional[np.ndarray] = None
-    ) -> float:
+    @staticmethod
+    def calculate_indicator_series(close_prices: np.ndarray) -> np.ndarray:
         """
-        Calculate the Exponential Moving Average (EMA).
+        Calculate the snapshot features for every candle in a single vectorized pass.
+
+        The columns follow the `MarketSnapshot` order (price, macd_12, macd_26,
+        ema_100, rsi_6), with the candle close standing in for the live price.
+        Rows inside the indicator warm-up period contain NaN.
 
         Args:
-            period (int): The lookback period for EMA.
-            close_prices (Optional[np.ndarray], optional): Array of closing prices.
-                If None, fresh data will be fetched. Defaults to None.
+            close_prices (np.ndarray): Array of closing prices.
 
         Returns:
-            float: The latest EMA value.
+            np.ndarray: Feature matrix of shape (len(close_prices), 5).
         """
-        close_prices = (
-            self._get_close_prices() if close_prices is None else close_prices
+        return IndicatorRegistry.default().matrix(
+            {"close": close_prices}, MarketSnapshot.FEATURES
         )
-        ema = talib.EMA(close_prices, timeperiod=period)
-        return float(ema[-1])
 
-    def _calculate_MACD(
-        self,
-        macd_period: int,
-        signal_period: int,
-        close_prices: Optional[np.ndarray] = None,
-    ) -> Tuple[float, float]:
+    def _snapshot(
+        self, history: KlineHistory, price: float, timestamp: float
+    ) -> MarketSnapshot:
         """
-        Calculate the Moving Average Convergence Divergence (MACD) indicator.
+        Evaluate the snapshot features of the latest candle of a history.
+
+        The order book features are those of the local book at the time of
+        the call, NaN when the order book is disabled or out of sync.
 
         Args:
-            macd_period (int): Fast EMA period.
-            signal_period (int): Slow EMA and signal line period.
-            close_prices (Optional[np.ndarray], optional): Array of closing prices.
-                If None, fresh data will be fetched. Defaults to None.
+            history (KlineHistory): Candles of one interval.
+            price (float): Live price of the symbol.
+            timestamp (float): Epoch seconds of the snapshot.
 
         Returns:
-            Tuple[float, float]: Latest MACD and signal line values.
+            MarketSnapshot: Snapshot of the latest candle at the live price.
         """
-        close_prices = (
-            self._get_close_prices() if close_prices is None else close_prices
-        )
-        macd, signal, _ = talib.MACD(
-            close_prices,
-            fastperiod=macd_period,
-            slowperiod=signal_period,
-            signalperiod=signal_period,
+        values = self.registry.latest(history, MarketSnapshot.KLINE_FEATURES)
+        values["price"] = price
+        if self.order_book is not None:
+            values.update(self.order_book.features())
+        return MarketSnapshot(
+            date=DateUtils.get_date(timestamp), timestamp=timestamp, **values
         )
-        return float(macd[-1]), float(signal[-1])
 
-    def _calculate_RSI(
-        self, period: int, close_prices: Optional[np.ndarray] = None
-    ) -> float:
+    def fetch_indicators(self) -> MarketSnapshot:
         """
-        Calculate the Relative Strength Index (RSI).
+        Fetch and calculate all configured indicators for the trading symbol.
 
-        Args:
-            period (int): The lookback period for RSI.
-            close_prices (Optional[np.ndarray], optional): Array of closing prices.
-                If None, fresh data will be fetched. Defaults to None.
+        With trade bars, the snapshot is that of the closed bars and the
+        latest trade stands in for the live price.
 
         Returns:
-            float: The latest RSI value.
+            MarketSnapshot: INTERVAL or bar snapshot containing the latest price
+                and indicators.
         """
-        close_prices = (
-            self._get_close_prices() if close_prices is None else close_prices
-        )
-        rsi = talib.RSI(close_prices, timeperiod=period)
-        return float(rsi[-1])
+        timestamp: float = time()
+        if self.bars is not None:
+            price = self.bars.last_price
+            if math.isnan(price):
+                price = self._fetch_price()
+            snapshot = self._snapshot(self.bars.history(), price, timestamp)
+        else:
+            self._refresh_candles(timestamp)
+            price = self._fetch_price()
+            snapshot = self._snapshot(self.candles.history, price, timestamp)
+        self._price, self._timestamp = price, timestamp
+        return snapshot
+
+    def _extend_candles(self, interval_seconds: int) -> None:
+        """
+        Grow the candle store to the lookback of a longer interval.
 
-    def fetch_indicators(self) -> MarketSnapshot:
+        The missing older candles are downloaded once; later ticks keep
+        fetching only the candles opened since the previous tick.
+
+        Args:
+            interval_seconds (int): Length of the resampled candles in seconds.
         """
-        Fetch and calculate all configured indicators for the trading symbol.
+        # Timeframes need one extra interval of candles before the first
+        # aligned one.
+        ratio = interval_seconds // self.candles.interval_seconds
+        capacity = max(self.lookback, (self.lookback + 1) * ratio)
+        if capacity > self.candles.capacity:
+            self.candles.capacity = capacity
+            self.candles.update(self._get_klines(capacity))
+
+    def timeframe_snapshot(self, interval: str) -> MarketSnapshot:
+        """
+        Evaluate the snapshot of one of the TIMEFRAMES.
+
+        The stored candles are resampled when asked, incrementally since the
+        previous call, at the price and time of the latest `fetch_indicators`.
+        The first call for the timeframe downloads the candles its lookback
+        needs beyond those already stored.
+
+        Args:
+            interval (str): One of the TIMEFRAMES, e.g. "4h".
 
         Returns:
-            MarketSnapshot: Snapshot containing the latest price and indicators.
+            MarketSnapshot: Snapshot of the latest candle of the timeframe.
+
+        Raises:
+            KeyError: If the interval is not one of the TIMEFRAMES.
         """
-        close_prices = self._get_close_prices()
-        temp_macd_12, temp_macd_26 = self._calculate_MACD(
-            macd_period=12, signal_period=26, close_prices=close_prices
+        if interval not in self.timeframes:
+            raise KeyError(f"Timeframe {interval} is not configured")
+        self._extend_candles(self.timeframes[interval])
+        return self._snapshot(
+            self.candles.resample(self.timeframes[interval]),
+            self._price,
+            self._timestamp,
         )
 
-        return MarketSnapshot(
-            date=DateUtils.get_date(),
-            price=self._fetch_price(),
-            macd_12=temp_macd_12,
-            macd_26=temp_macd_26,
-            ema_100=self._calculate_EMA(period=100, close_prices=close_prices),
-            rsi_6=self._calculate_RSI(period=6, close_prices=close_prices),
-        )
+    def close(self) -> None:
+        """
+        Stop the order book and trade streams, if any.
+        """
+        if self.order_book is not None:
+            self.order_book.stop()
+        if self.bars is not None:
+            self.bars.stop()
@@ -0,0 +1,134 @@
+import threading
+from typing import Any, Dict, List, Mapping, Optional
+from binance import ThreadedWebsocketManager
+from binance.client import Client
+from bot.bot_settings import SETTINGS
+from data.order_book import OrderBook
+from utils.logger import Logger
+from utils.metrics import Metrics
+
+
+class OrderBookManager:
+    """
+    Maintains a local order book of the trading symbol from the diff-depth stream.
+
+    Depth events are applied on the websocket thread in the order they
+    arrive. The first event, and the first one after a sequence gap, starts
+    a resync on a background thread, so the websocket callback never waits
+    for REST: the events received meanwhile are buffered, one depth
+    snapshot is fetched and loaded, and the buffered events are replayed on
+    it, skipping those older than the snapshot. Only a snapshot older than
+    the buffered events is fetched again. Resyncs after a gap are counted in
+    the `order_book.resyncs` metric.
+
+    The book is guarded by a lock, so the trading thread reads consistent
+    aggregates with `features` while events are applied.
+    """
+
+    SNAPSHOT_LIMIT = 1000
+    UPDATE_SPEED_MS = 100
+
+    def __init__(self, client: Client, depth: int = 20) -> None:
+        """
+        Initialize the OrderBookManager.
+
+        Args:
+            client (Client): Binance client used for the depth snapshots.
+            depth (int, optional): Number of best levels per side summed in the
+                features. Defaults to 20.
+        """
+        self.client: Client = client
+        self.book: OrderBook = OrderBook(depth)
+        self._lock: threading.Lock = threading.Lock()
+        # Events received while resyncing, None when the book is live.
+        self._pending: Optional[List[Mapping[str, Any]]] = None
+        self._resync_thread: Optional[threading.Thread] = None
+        self._socket_manager: Optional[ThreadedWebsocketManager] = None
+
+    def handle_message(self, message: Mapping[str, Any]) -> None:
+        """
+        Apply one message of the diff-depth stream, resyncing on a gap.
+
+        Args:
+            message (Mapping[str, Any]): "depthUpdate" event, or an error
+                reported by the websocket manager.
+        """
+        if message.get("e") == "error":
+            Logger.log_exception(f"Order book stream: {message.get('m')}")
+            with self._lock:
+                self.book.synced = False
+            return
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(message)
+                return
+            if self.book.apply(message):
+                return
+            self._pending = [message]
+        if self.book.last_update_id:
+            Metrics.increment("order_book.resyncs")
+        self._resync_thread = threading.Thread(target=self._resync, daemon=True)
+        self._resync_thread.start()
+
+    def _resync(self) -> None:
+        """
+        Resync thread: load a depth snapshot and replay the buffered events.
+
+        A new snapshot is only fetched while the loaded one is older than
+        the buffered events. If the request fails, the buffer is dropped and
+        the next event starts another resync.
+        """
+        while True:
+            try:
+                snapshot = self.client.get_order_book(
+                    symbol=SETTINGS.SYMBOL, limit=self.SNAPSHOT_LIMIT
+                )
+            except Exception as e:
+                Logger.log_exception(f"Order book snapshot: {e}")
+                with self._lock:
+                    self._pending = None
+                return
+            with self._lock:
+                self.book.load_snapshot(snapshot)
+                pending = self._pending or []
+                for index, event in enumerate(pending):
+                    if not self.book.apply(event):
+                        self._pending = pending[index:]
+                        break
+                else:
+                    self._pending = None
+                    return
+
+    def features(self) -> Dict[str, float]:
+        """
+        Return the aggregates of the best levels of the book.
+
+        Returns:
+            Dict[str, float]: `OrderBook.FEATURES` by name, NaN while the book
+                is out of sync.
+        """
+        with self._lock:
+            return self.book.features()
+
+    def start(self) -> None:
+        """
+        Subscribe to the diff-depth stream of the trading symbol.
+        """
+        self._socket_manager = ThreadedWebsocketManager(
+            SETTINGS.API_PUBLIC_KEY, SETTINGS.API_SECRET_KEY
+        )
+        self._socket_manager.start()
+        self._socket_manager.start_depth_socket(
+            callback=self.handle_message,
+            symbol=SETTINGS.SYMBOL,
+            interval=self.UPDATE_SPEED_MS,
+        )
+        Logger.log_info(f"Order book stream started for {SETTINGS.SYMBOL}")
+
+    def stop(self) -> None:
+        """
+        Close the stream.
+        """
+        if self._socket_manager is not None:
+            self._socket_manager.stop()
+            self._socket_manager = None
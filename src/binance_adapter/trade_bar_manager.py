@@ -0,0 +1,115 @@
+import threading
+from typing import Any, Mapping, Optional
+from binance import ThreadedWebsocketManager
+from bot.bot_settings import SETTINGS
+from data.bar_builder import BarBuilder
+from data.kline_history import KlineHistory
+from utils.logger import Logger
+from utils.metrics import Metrics
+
+
+class TradeBarManager:
+    """
+    Builds volume, tick or dollar bars of the trading symbol from the aggTrade stream.
+
+    Trades are added to a `BarBuilder` on the websocket thread as they
+    arrive, each in O(1). Closing a bar wakes up the trading loop waiting in
+    `wait`, so the bot evaluates the market when a bar completes instead of
+    on a clock. The builder is guarded by a lock, and `history` hands the
+    trading thread a copy of the closed bars.
+    """
+
+    def __init__(self, kind: str, threshold: float, capacity: int) -> None:
+        """
+        Initialize the TradeBarManager.
+
+        Args:
+            kind (str): "volume", "tick" or "dollar".
+            threshold (float): Base volume, trade count or quote volume per bar.
+            capacity (int): Closed bars retained.
+        """
+        self.builder: BarBuilder = BarBuilder(kind, threshold, capacity)
+        self._lock: threading.Lock = threading.Lock()
+        self._bar_closed: threading.Event = threading.Event()
+        self._socket_manager: Optional[ThreadedWebsocketManager] = None
+
+    @property
+    def last_price(self) -> float:
+        """
+        Price of the latest trade.
+
+        Returns:
+            float: Latest trade price, NaN before the first trade.
+        """
+        return self.builder.last_price
+
+    def handle_message(self, message: Mapping[str, Any]) -> None:
+        """
+        Add one aggTrade event to the open bar.
+
+        Args:
+            message (Mapping[str, Any]): "aggTrade" event, or an error reported
+                by the websocket manager.
+        """
+        if message.get("e") == "error":
+            Logger.log_exception(f"Trade stream: {message.get('m')}")
+            return
+        with self._lock:
+            closed = self.builder.add_trade(
+                float(message["p"]),
+                float(message["q"]),
+                float(message["T"]),
+                bool(message["m"]),
+                int(message["l"]) - int(message["f"]) + 1,
+            )
+        if closed:
+            Metrics.increment("bars.closed")
+            self._bar_closed.set()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until a bar closes.
+
+        Args:
+            timeout (float): Maximum seconds to wait.
+
+        Returns:
+            bool: True if a bar closed since the previous call.
+        """
+        closed = self._bar_closed.wait(timeout)
+        self._bar_closed.clear()
+        return closed
+
+    def history(self) -> KlineHistory:
+        """
+        Return the closed bars.
+
+        Returns:
+            KlineHistory: Copy of the closed bars, oldest first.
+        """
+        with self._lock:
+            return self.builder.history()
+
+    def start(self) -> None:
+        """
+        Subscribe to the aggTrade stream of the trading symbol.
+        """
+        self._socket_manager = ThreadedWebsocketManager(
+            SETTINGS.API_PUBLIC_KEY, SETTINGS.API_SECRET_KEY
+        )
+        self._socket_manager.start()
+        self._socket_manager.start_aggtrade_socket(
+            callback=self.handle_message, symbol=SETTINGS.SYMBOL
+        )
+        Logger.log_info(
+            f"Building {self.builder.kind} bars of {SETTINGS.SYMBOL} "
+            f"every {self.builder.threshold:g}"
+        )
+
+    def stop(self) -> None:
+        """
+        Close the stream.
+        """
+        if self._socket_manager is not None:
+            self._socket_manager.stop()
+            self._socket_manager = None
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from utils.file_utils import FileUtils
 from base_dir import BASE_DIR
 from pathlib import Path
-from typing import Union
+from typing import Tuple, Union
 
 
 @dataclass(frozen=True)
@@ -19,11 +19,54 @@ class BotSettings:
     INTERVAL: str
     SLEEP_DURATION: float
     OUTPUT_CSV_PATH: Union[str, Path]
+    OUTPUT_DB_PATH: Union[str, Path]
+    TIMEFRAMES: Tuple[str, ...] = ()
+    BAR_TYPE: str = "time"
+    BAR_THRESHOLD: float = 1000.0
+    ORDER_BOOK_ENABLED: bool = False
+    ORDER_BOOK_DEPTH: int = 20
+    SNAPSHOT_LOG_ENABLED: bool = False
+    SNAPSHOT_LOG_DIR: Union[str, Path] = BASE_DIR / "snapshots"
+    SNAPSHOT_LOG_FLUSH_INTERVAL: float = 5.0
+    SNAPSHOT_LOG_MAX_SEGMENT_MB: float = 64.0
+    SNAPSHOT_LOG_COMPRESS: bool = True
+    STATE_CHECKPOINT_PATH: Union[str, Path] = BASE_DIR / "state.json"
+    MODEL_BACKEND: str = "keras"
+    MODEL_LEARNING_RATE: float = 0.05
+    MODEL_WINDOW: str = "all"
+    MODEL_WINDOW_SIZE: int = 5000
+    MODEL_DECAY_HALF_LIFE: float = 1000.0
+    MODEL_EPOCHS: int = 32
+    MODEL_BATCH_SIZE: int = 256
+    MODEL_SHUFFLE_BUFFER: int = 10000
+    MODEL_EARLY_STOPPING_PATIENCE: int = 3
+    MODEL_INTRA_OP_THREADS: int = 0
+    MODEL_INTER_OP_THREADS: int = 0
+    MODEL_CHECKPOINT_DIR: Union[str, Path] = BASE_DIR / "model_checkpoint"
+    MODEL_PROFILE_PATH: Union[str, Path] = BASE_DIR / "model_profile.json"
+    MODEL_PREDICTION_CACHE_SIZE: int = 256
+    MODEL_PREDICTION_CACHE_DIGITS: int = 4
+    MODEL_SERVER_SOCKET: str = ""
+    MODEL_ISOLATE_TRAINING: bool = False
+    MODEL_RUNTIME: str = "keras"
+    MODEL_TFLITE_QUANTIZE: bool = False
+    MODEL_TFLITE_MIN_AGREEMENT: float = 0.99
+    MODEL_ENSEMBLE_MEMBERS: Tuple[str, ...] = ("logistic", "logistic", "logistic")
+    MODEL_ENSEMBLE_VOTE: str = "mean"
+    MODEL_SHADOW_BACKENDS: Tuple[str, ...] = ()
+    MODEL_SHADOW_QUEUE_SIZE: int = 1024
+    MODEL_FEATURE_SCHEMA: int = 1
 
 
 SETTINGS_PATH = BASE_DIR / "settings.toml"
 OUTPUT_CSV_PATH = BASE_DIR / "results.csv"
+OUTPUT_DB_PATH = BASE_DIR / "results.db"
+STATE_CHECKPOINT_PATH = BASE_DIR / "state.json"
 _settings = FileUtils.read_toml_file(SETTINGS_PATH)
+_snapshot_log = _settings.get("SNAPSHOT_LOG", {})
+_model = _settings.get("MODEL", {})
+_order_book = _settings.get("ORDER_BOOK", {})
+_bars = _settings.get("BARS", {})
 SETTINGS = BotSettings(
     _settings["API"]["PUBLIC_KEY"],
     _settings["API"]["SECRET_KEY"],
@@ -37,4 +80,43 @@ SETTINGS = BotSettings(
     _settings["RUNTIME"]["INTERVAL"],
     _settings["RUNTIME"]["SLEEP_DURATION"],
     OUTPUT_CSV_PATH,
+    OUTPUT_DB_PATH,
+    TIMEFRAMES=tuple(_settings["RUNTIME"].get("TIMEFRAMES", [])),
+    BAR_TYPE=_bars.get("TYPE", "time"),
+    BAR_THRESHOLD=_bars.get("THRESHOLD", 1000.0),
+    ORDER_BOOK_ENABLED=_order_book.get("ENABLED", False),
+    ORDER_BOOK_DEPTH=_order_book.get("DEPTH", 20),
+    SNAPSHOT_LOG_ENABLED=_snapshot_log.get("ENABLED", False),
+    SNAPSHOT_LOG_DIR=BASE_DIR / _snapshot_log.get("DIRECTORY", "snapshots"),
+    SNAPSHOT_LOG_FLUSH_INTERVAL=_snapshot_log.get("FLUSH_INTERVAL", 5.0),
+    SNAPSHOT_LOG_MAX_SEGMENT_MB=_snapshot_log.get("MAX_SEGMENT_MB", 64.0),
+    SNAPSHOT_LOG_COMPRESS=_snapshot_log.get("COMPRESS", True),
+    STATE_CHECKPOINT_PATH=STATE_CHECKPOINT_PATH,
+    MODEL_BACKEND=_model.get("BACKEND", "keras"),
+    MODEL_LEARNING_RATE=_model.get("LEARNING_RATE", 0.05),
+    MODEL_WINDOW=_model.get("WINDOW", "all"),
+    MODEL_WINDOW_SIZE=_model.get("WINDOW_SIZE", 5000),
+    MODEL_DECAY_HALF_LIFE=_model.get("DECAY_HALF_LIFE", 1000.0),
+    MODEL_EPOCHS=_model.get("EPOCHS", 32),
+    MODEL_BATCH_SIZE=_model.get("BATCH_SIZE", 256),
+    MODEL_SHUFFLE_BUFFER=_model.get("SHUFFLE_BUFFER", 10000),
+    MODEL_EARLY_STOPPING_PATIENCE=_model.get("EARLY_STOPPING_PATIENCE", 3),
+    MODEL_INTRA_OP_THREADS=_model.get("INTRA_OP_THREADS", 0),
+    MODEL_INTER_OP_THREADS=_model.get("INTER_OP_THREADS", 0),
+    MODEL_CHECKPOINT_DIR=BASE_DIR / _model.get("CHECKPOINT_DIR", "model_checkpoint"),
+    MODEL_PROFILE_PATH=BASE_DIR / _model.get("PROFILE", "model_profile.json"),
+    MODEL_PREDICTION_CACHE_SIZE=_model.get("PREDICTION_CACHE_SIZE", 256),
+    MODEL_PREDICTION_CACHE_DIGITS=_model.get("PREDICTION_CACHE_DIGITS", 4),
+    MODEL_SERVER_SOCKET=_model.get("SERVER_SOCKET", ""),
+    MODEL_ISOLATE_TRAINING=_model.get("ISOLATE_TRAINING", False),
+    MODEL_RUNTIME=_model.get("RUNTIME", "keras"),
+    MODEL_TFLITE_QUANTIZE=_model.get("TFLITE_QUANTIZE", False),
+    MODEL_TFLITE_MIN_AGREEMENT=_model.get("TFLITE_MIN_AGREEMENT", 0.99),
+    MODEL_ENSEMBLE_MEMBERS=tuple(
+        _model.get("ENSEMBLE_MEMBERS", ["logistic", "logistic", "logistic"])
+    ),
+    MODEL_ENSEMBLE_VOTE=_model.get("ENSEMBLE_VOTE", "mean"),
+    MODEL_SHADOW_BACKENDS=tuple(_model.get("SHADOW_BACKENDS", [])),
+    MODEL_SHADOW_QUEUE_SIZE=_model.get("SHADOW_QUEUE_SIZE", 1024),
+    MODEL_FEATURE_SCHEMA=_model.get("FEATURE_SCHEMA", 1),
 )
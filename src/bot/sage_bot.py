@@ -2,13 +2,26 @@ from __future__ import annotations
 
 from bot.performance_tracker import PerformanceTracker
 from bot.data_manager import DataManager
+from bot.shadow_runner import ShadowRunner
+from bot.state_checkpoint import StateCheckpoint
+from bot.states.active.long_position_state import LongPositionState
+from bot.states.active.short_position_state import ShortPositionState
 from bot.states.flat.flat_position_state import FlatPositionState
 from bot.states.position_state import PositionState
 from bot.bot_settings import SETTINGS
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from data.snapshot_log import SnapshotLogWriter
+from model.model_manager import ModelManager
+from tensorflow_model.training_dataset import TrainingDataset
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
 from binance_adapter.binance_adapter import BinanceAdapter
 from utils.logger import Logger
 from time import sleep
 
+if TYPE_CHECKING:
+    from model.model_server import ModelClient
+
 
 class SageBot:
     """
@@ -28,22 +41,213 @@ class SageBot:
             performance_tracker (PerformanceTracker): Tracks wins and losses.
             data_manager (DataManager): Manages market indicators and position snapshots.
             binance_adapter (BinanceAdapter): Interface for Binance API operations.
-            state (PositionState): Current trading state of the bot.
+            trade_journal (TradeJournal): Store of closed trade results.
+            training_dataset (Optional[TrainingDataset]): In-memory model training
+                data, loaded from the journal once and appended as trades close,
+                or None when predictions come from a model server.
+            model_manager (Union[ModelManager, ModelClient]): Prediction model
+                selected in the settings, or a client of the model server when
+                one is configured.
+            snapshot_log (Optional[SnapshotLogWriter]): Binary log of every tick's
+                snapshot, or None when disabled in the settings.
+            shadow_runner (Optional[ShadowRunner]): Background paper trading of
+                the candidate backends, or None when none are configured.
+            state_checkpoint (StateCheckpoint): Crash-recovery checkpoint written
+                on every state transition.
+            state (PositionState): Current trading state of the bot, restored
+                from the checkpoint when one exists.
         """
         self.performance_tracker: PerformanceTracker = PerformanceTracker()
         self.data_manager: DataManager = DataManager()
         self.binance_adapter: BinanceAdapter = BinanceAdapter()
+        self.trade_journal: TradeJournal = TradeJournal.open(
+            SETTINGS.OUTPUT_DB_PATH, csv_path=SETTINGS.OUTPUT_CSV_PATH
+        )
+        self.training_dataset: Optional[TrainingDataset] = None
+        self.model_manager: Union[ModelManager, ModelClient]
+        if SETTINGS.MODEL_SERVER_SOCKET:
+            # The server module is only needed by clients of a shared model.
+            from model.model_server import ModelClient
+
+            self.model_manager = ModelClient(SETTINGS.MODEL_SERVER_SOCKET)
+        else:
+            self.training_dataset = TrainingDataset.from_journal(
+                self.trade_journal, schema_version=SETTINGS.MODEL_FEATURE_SCHEMA
+            )
+            self.model_manager = ModelManager(self.training_dataset)
+        self.snapshot_log: Optional[SnapshotLogWriter] = (
+            SnapshotLogWriter(
+                SETTINGS.SNAPSHOT_LOG_DIR,
+                flush_interval=SETTINGS.SNAPSHOT_LOG_FLUSH_INTERVAL,
+                max_segment_bytes=int(SETTINGS.SNAPSHOT_LOG_MAX_SEGMENT_MB * 1024 * 1024),
+                compress=SETTINGS.SNAPSHOT_LOG_COMPRESS,
+                schema_version=SETTINGS.MODEL_FEATURE_SCHEMA,
+            )
+            if SETTINGS.SNAPSHOT_LOG_ENABLED
+            else None
+        )
+        self.shadow_runner: Optional[ShadowRunner] = (
+            self._start_shadow_runner() if SETTINGS.MODEL_SHADOW_BACKENDS else None
+        )
+        self.state_checkpoint: StateCheckpoint = StateCheckpoint(
+            SETTINGS.STATE_CHECKPOINT_PATH
+        )
         Logger.log_start("SageBot is running...")
-        self.state: PositionState = FlatPositionState(parent=self)
+        self._state: PositionState
+        self.state = self._restore_state()
+
+    def _start_shadow_runner(self) -> ShadowRunner:
+        """
+        Start paper trading the shadow backends on the live snapshots.
+
+        Each backend gets its own `ModelManager` and dataset loaded from the
+        journal, so the shadow models never touch the serving model's data,
+        never clear the Keras session the serving model runs in, and export
+        their metrics under "shadow.<backend>.". The serving model clears the
+        session when its architecture changes, so a shadow backend may only
+        use Keras when the serving model in this process does not.
+
+        Returns:
+            ShadowRunner: Running shadow runner.
+
+        Raises:
+            ValueError: If a shadow backend is the serving backend, or would
+                share Keras with it.
+        """
+        serving = None if SETTINGS.MODEL_SERVER_SOCKET else SETTINGS.MODEL_BACKEND
+        serving_keras = serving is not None and ModelManager.uses_keras(serving)
+        models: Dict[str, ModelManager] = {}
+        for backend in SETTINGS.MODEL_SHADOW_BACKENDS:
+            if backend == serving:
+                raise ValueError(f"Shadow backend {backend} is already serving")
+            if serving_keras and ModelManager.uses_keras(backend):
+                raise ValueError(
+                    f"Shadow backend {backend} cannot use Keras beside the "
+                    f"serving {serving} model"
+                )
+            dataset = TrainingDataset.from_journal(
+                self.trade_journal, schema_version=SETTINGS.MODEL_FEATURE_SCHEMA
+            )
+            models[backend] = ModelManager(
+                dataset,
+                backend=backend,
+                shadow=True,
+                metric_prefix=f"shadow.{backend}.",
+            )
+        runner = ShadowRunner(
+            models, self.performance_tracker, SETTINGS.MODEL_SHADOW_QUEUE_SIZE
+        )
+        runner.start()
+        return runner
+
+    @property
+    def state(self) -> PositionState:
+        """
+        Current trading state of the bot.
+
+        Returns:
+            PositionState: The active state.
+        """
+        return self._state
+
+    @state.setter
+    def state(self, state: PositionState) -> None:
+        """
+        Transition to a new state and checkpoint it.
+
+        Args:
+            state (PositionState): The new state.
+        """
+        self._state = state
+        self.state_checkpoint.save(self._checkpoint_data())
+
+    def _checkpoint_data(self) -> Dict[str, Any]:
+        """
+        Collect the state data and tracker counters to checkpoint.
+
+        Returns:
+            Dict[str, Any]: JSON-serializable checkpoint data.
+        """
+        return {
+            **self._state.checkpoint_data(),
+            "win_count": self.performance_tracker.win_count,
+            "loss_count": self.performance_tracker.loss_count,
+        }
+
+    def _restore_state(self) -> PositionState:
+        """
+        Rebuild the state saved by the last checkpoint.
+
+        Tracker counters are always restored. An active position is resumed
+        with its target prices and entry snapshot after a single exchange
+        position query confirms it is still open; in test mode no orders
+        exist, so the checkpoint is trusted as is.
+
+        Returns:
+            PositionState: The restored state, or FlatPositionState when there
+                is nothing to resume.
+        """
+        checkpoint = self.state_checkpoint.load()
+        if checkpoint is None:
+            return FlatPositionState(parent=self)
+
+        self.performance_tracker.win_count = int(checkpoint.get("win_count", 0))
+        self.performance_tracker.loss_count = int(checkpoint.get("loss_count", 0))
+
+        position: str = checkpoint.get("state", FlatPositionState.NAME)
+        if position not in (LongPositionState.NAME, ShortPositionState.NAME):
+            return FlatPositionState(parent=self)
+
+        if (
+            not SETTINGS.TEST_MODE
+            and self.binance_adapter.account_manager.get_position_amount(position)
+            == 0.0
+        ):
+            Logger.log_info(
+                f"Checkpointed {position} position is no longer open, resuming FLAT"
+            )
+            return FlatPositionState(parent=self)
+
+        self.data_manager.position_snapshot = MarketSnapshot.from_dict(
+            checkpoint["position_snapshot"]
+        )
+        Logger.log_info(
+            f"Resumed {position} TP_PRICE: {round(checkpoint['tp_price'], 2)}"
+            f" SL_PRICE: {round(checkpoint['sl_price'], 2)}"
+        )
+        state_class = (
+            LongPositionState if position == LongPositionState.NAME else ShortPositionState
+        )
+        return state_class(
+            parent=self,
+            target_prices=[checkpoint["tp_price"], checkpoint["sl_price"]],
+        )
 
     def run(self) -> None:
         """
         Start the trading loop.
 
         The loop executes indefinitely, with each iteration:
-            - Sleeping for the configured duration.
+            - Sleeping for the configured duration, or with trade bars,
+              waiting for the next bar to close for at most that long.
             - Executing the current state's `step` method.
+
+        The snapshot log, the shadow runner and the order book stream, if
+        enabled, are flushed and stopped when the loop exits, and the trade
+        journal is closed.
         """
-        while True:
-            sleep(SETTINGS.SLEEP_DURATION)
-            self.state.step()
+        bars = self.binance_adapter.indicator_manager.bars
+        try:
+            while True:
+                if bars is None:
+                    sleep(SETTINGS.SLEEP_DURATION)
+                else:
+                    bars.wait(SETTINGS.SLEEP_DURATION)
+                self.state.step()
+        finally:
+            if self.snapshot_log is not None:
+                self.snapshot_log.close()
+            if self.shadow_runner is not None:
+                self.shadow_runner.stop()
+            self.binance_adapter.indicator_manager.close()
+            self.trade_journal.close()
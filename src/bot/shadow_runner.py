@@ -0,0 +1,213 @@
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from binance_adapter.binance_adapter import BinanceAdapter
+from bot.bot_settings import SETTINGS
+from bot.performance_tracker import PerformanceTracker
+from data.market_snapshot import MarketSnapshot
+from utils.logger import Logger
+from utils.metrics import Metrics
+
+
+class ShadowTrader:
+    """
+    Paper-trades the predictions of one model on the live snapshots.
+
+    It replays the position state machine without placing orders: when flat
+    it enters the predicted side at the snapshot price with the TP/SL prices
+    of `BinanceAdapter.calculate_target_prices`, and on later snapshots it
+    closes the position with the same strict price comparisons as the active
+    position states, take-profit first. A position is never opened on the
+    snapshot that closed the previous one, nor while a feature of the model
+    is unknown, as in the live bot.
+    """
+
+    def __init__(self, name: str, model: Any) -> None:
+        """
+        Initialize a flat ShadowTrader.
+
+        Args:
+            name (str): Name used in the reports and metrics.
+            model (Any): Model exposing `predict(snapshot)` and `record_result`.
+        """
+        self.name: str = name
+        self.model: Any = model
+        self.performance_tracker: PerformanceTracker = PerformanceTracker()
+        self.position: Optional[str] = None
+        self.tp_price: float = 0.0
+        self.sl_price: float = 0.0
+
+    def step(self, snapshot: MarketSnapshot) -> Optional[bool]:
+        """
+        Process one live snapshot.
+
+        Args:
+            snapshot (MarketSnapshot): Latest market snapshot.
+
+        Returns:
+            Optional[bool]: True if a position closed with TP, False if it
+                closed with SL, None otherwise.
+        """
+        if self.position is None:
+            if not snapshot.is_complete(SETTINGS.MODEL_FEATURE_SCHEMA):
+                return None
+            self.position = self.model.predict(snapshot)
+            self.tp_price, self.sl_price = BinanceAdapter.calculate_target_prices(
+                self.position, snapshot.price
+            )
+            return None
+        price = snapshot.price
+        if self.position == "LONG":
+            is_tp, is_sl = price > self.tp_price, price < self.sl_price
+        else:
+            is_tp, is_sl = price < self.tp_price, price > self.sl_price
+        if is_tp:
+            self.performance_tracker.increase_win()
+        elif is_sl:
+            self.performance_tracker.increase_loss()
+        else:
+            return None
+        self.position = None
+        return is_tp
+
+
+class ShadowRunner:
+    """
+    Evaluates candidate models on the live snapshots off the trading thread.
+
+    The trading loop hands over each snapshot and each closed trade with a
+    non-blocking `put_nowait`; a background thread makes the predictions,
+    paper-trades them with a `ShadowTrader` per model and feeds the closed
+    trades to the candidates so they learn like the serving model. When the
+    queue is full the item is dropped and counted in `shadow.dropped`, so a
+    slow candidate never delays `PositionState.step`.
+
+    Every closed shadow trade logs the candidate's win rate next to the live
+    one and updates the `shadow.<name>.win_rate` and `shadow.<name>.trades`
+    metrics.
+    """
+
+    def __init__(
+        self,
+        models: Dict[str, Any],
+        live_tracker: PerformanceTracker,
+        queue_size: int = 1024,
+    ) -> None:
+        """
+        Initialize the ShadowRunner.
+
+        Args:
+            models (Dict[str, Any]): Candidate models by name, each exposing
+                `predict(snapshot)` and `record_result(result, snapshot)`.
+            live_tracker (PerformanceTracker): Results of the serving model.
+            queue_size (int, optional): Items buffered for the worker. Defaults to 1024.
+        """
+        self.traders: List[ShadowTrader] = [
+            ShadowTrader(name, model) for name, model in models.items()
+        ]
+        self.live_tracker: PerformanceTracker = live_tracker
+        self._queue: "queue.Queue[Optional[Tuple[str, Any]]]" = queue.Queue(queue_size)
+        self._thread: Optional[threading.Thread] = None
+
+    def _put(self, item: Tuple[str, Any]) -> None:
+        """
+        Queue an item for the worker without blocking.
+
+        Args:
+            item (Tuple[str, Any]): Kind and payload.
+        """
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            Metrics.increment("shadow.dropped")
+
+    def submit(self, snapshot: MarketSnapshot) -> None:
+        """
+        Hand a live snapshot to the shadow models.
+
+        Args:
+            snapshot (MarketSnapshot): Latest market snapshot.
+        """
+        self._put(("snapshot", snapshot))
+
+    def record_result(self, result: str, snapshot: MarketSnapshot) -> None:
+        """
+        Hand a closed live trade to the shadow models.
+
+        Args:
+            result (str): Correct side of the trade ("LONG"/"SHORT").
+            snapshot (MarketSnapshot): Market snapshot at the time of entry.
+        """
+        self._put(("result", (result, snapshot)))
+
+    def process(self, kind: str, payload: Any) -> None:
+        """
+        Apply one queued item to every shadow model.
+
+        A failing model is logged and skipped, like a failing trading step.
+
+        Args:
+            kind (str): "snapshot" or "result".
+            payload (Any): Snapshot, or result and entry snapshot.
+        """
+        for trader in self.traders:
+            try:
+                if kind == "result":
+                    trader.model.record_result(*payload)
+                elif trader.step(payload) is not None:
+                    self._report(trader)
+            except Exception as e:
+                Logger.log_exception(f"Shadow model {trader.name}: {e}")
+
+    def _report(self, trader: ShadowTrader) -> None:
+        """
+        Log and export the win rate of a shadow model next to the live one.
+
+        Args:
+            trader (ShadowTrader): Shadow model that closed a trade.
+        """
+        tracker = trader.performance_tracker
+        trades = tracker.win_count + tracker.loss_count
+        live_trades = self.live_tracker.win_count + self.live_tracker.loss_count
+        Metrics.set_gauge(f"shadow.{trader.name}.win_rate", tracker.win_count / trades)
+        Metrics.set_gauge(f"shadow.{trader.name}.trades", trades)
+        Logger.log_info(
+            f"Shadow {trader.name} Win-Rate: {tracker.calculate_win_rate()} "
+            f"over {trades} trades, live {self.live_tracker.calculate_win_rate()} "
+            f"over {live_trades}"
+        )
+
+    def _run(self) -> None:
+        """
+        Worker thread: process queued items until `stop` is called.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self.process(*item)
+            self._queue.task_done()
+
+    def start(self) -> None:
+        """
+        Start the worker thread.
+        """
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        names = ", ".join(trader.name for trader in self.traders)
+        Logger.log_info(f"Shadow models running: {names}")
+
+    def stop(self) -> None:
+        """
+        Drop the queued items and stop the worker after the item in progress.
+        """
+        if self._thread is not None:
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                self._queue.task_done()
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,78 @@
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+from utils.file_utils import FileUtils
+from utils.logger import Logger
+
+
+class StateCheckpoint:
+    """
+    Crash-safe JSON checkpoint of the bot's position state.
+
+    Every save writes a temporary file next to the checkpoint, fsyncs it and
+    atomically renames it over the previous checkpoint, so a crash at any
+    point leaves either the old or the new checkpoint on disk, never a
+    partially written one.
+    """
+
+    VERSION: int = 1
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Initialize the StateCheckpoint.
+
+        Args:
+            path (Union[str, Path]): Path to the checkpoint file.
+        """
+        self.path: Path = Path(path)
+        self._temp_path: Path = self.path.with_name(self.path.name + ".tmp")
+
+    def save(self, data: Dict[str, Any]) -> None:
+        """
+        Atomically replace the checkpoint with the given data.
+
+        Args:
+            data (Dict[str, Any]): JSON-serializable state to persist.
+        """
+        FileUtils.ensure_parent(self.path)
+        payload = {"version": self.VERSION, **data}
+        with open(self._temp_path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self._temp_path, self.path)
+        self._sync_directory()
+
+    def _sync_directory(self) -> None:
+        """
+        Flush the rename to disk on platforms that support syncing directories.
+        """
+        if not hasattr(os, "O_DIRECTORY"):
+            return
+        fd = os.open(self.path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the last saved checkpoint.
+
+        Returns:
+            Optional[Dict[str, Any]]: Saved state, or None if there is no
+                usable checkpoint (missing, unreadable or from another version).
+        """
+        if not self.path.is_file():
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            Logger.log_exception(f"Ignoring unreadable state checkpoint: {e}")
+            return None
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            Logger.log_exception("Ignoring incompatible state checkpoint")
+            return None
+        return data
@@ -1,11 +1,9 @@
 from __future__ import annotations
 
 from abc import abstractmethod
-from typing import Callable, Sequence, Literal, Any
+from typing import Callable, Dict, Sequence, Literal, Any
 from bot.states.position_state import PositionState
 from utils.logger import Logger
-from utils.file_utils import FileUtils
-from bot.bot_settings import SETTINGS
 from data.market_snapshot import MarketSnapshot
 from bot.performance_tracker import PerformanceTracker
 
@@ -31,6 +29,20 @@ class ActivePositionState(PositionState):
         self.tp_price: float = float(target_prices[0])
         self.sl_price: float = float(target_prices[1])
 
+    def checkpoint_data(self) -> Dict[str, Any]:
+        """
+        Describe this state, its target prices and entry snapshot for the checkpoint.
+
+        Returns:
+            Dict[str, Any]: JSON-serializable state data.
+        """
+        return {
+            **super().checkpoint_data(),
+            "tp_price": self.tp_price,
+            "sl_price": self.sl_price,
+            "position_snapshot": self.parent.data_manager.position_snapshot.to_dict(),
+        }
+
     def _close_position(
         self,
         position: Literal["LONG", "SHORT"],
@@ -85,17 +97,19 @@ class ActivePositionState(PositionState):
 
         Actions performed:
             - Increments win count.
-            - Persists the TP result to CSV.
+            - Persists the TP result to the trade journal and records it
+              with the model manager and the shadow models.
             - Logs the outcome.
         """
         Logger.log_success("Position is closed with TP")
         performance_tracker.increase_win()
-        FileUtils.save_result(
-            file_path=SETTINGS.OUTPUT_CSV_PATH,
-            result=self._get_position_result(position=position, is_tp=True),
-            position=position,
-            snapshot=snapshot,
+        result: str = self._get_position_result(position=position, is_tp=True)
+        self.parent.trade_journal.save_result(
+            result=result, position=position, snapshot=snapshot
         )
+        self.parent.model_manager.record_result(result, snapshot)
+        if self.parent.shadow_runner is not None:
+            self.parent.shadow_runner.record_result(result, snapshot)
 
     def _handle_sl(
         self,
@@ -113,17 +127,19 @@ class ActivePositionState(PositionState):
 
         Actions performed:
             - Increments loss count.
-            - Persists the SL result to CSV.
+            - Persists the SL result to the trade journal and records it
+              with the model manager and the shadow models.
             - Logs the outcome.
         """
         Logger.log_failure("Position is closed with SL")
         performance_tracker.increase_loss()
-        FileUtils.save_result(
-            file_path=SETTINGS.OUTPUT_CSV_PATH,
-            result=self._get_position_result(position=position, is_tp=False),
-            position=position,
-            snapshot=snapshot,
+        result: str = self._get_position_result(position=position, is_tp=False)
+        self.parent.trade_journal.save_result(
+            result=result, position=position, snapshot=snapshot
         )
+        self.parent.model_manager.record_result(result, snapshot)
+        if self.parent.shadow_runner is not None:
+            self.parent.shadow_runner.record_result(result, snapshot)
 
     def _get_position_result(
         self, position: Literal["LONG", "SHORT"], is_tp: bool
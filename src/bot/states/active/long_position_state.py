@@ -11,6 +11,8 @@ class LongPositionState(ActivePositionState):
     is satisfied, it closes the position and updates the bot's state accordingly.
     """
 
+    NAME: str = "LONG"
+
     def apply(self) -> None:
         """
         Apply the logic for managing an active LONG position.
@@ -11,6 +11,8 @@ class ShortPositionState(ActivePositionState):
     is satisfied, it closes the position and updates the bot's state accordingly.
     """
 
+    NAME: str = "SHORT"
+
     def apply(self) -> None:
         """
         Apply the logic for managing an active SHORT position.
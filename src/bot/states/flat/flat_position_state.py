@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+from bot.bot_settings import SETTINGS
 from bot.states.position_state import PositionState
 from utils.logger import Logger
-from tensorflow_model.tf_model import TFModel
 
 
 class FlatPositionState(PositionState):
@@ -14,15 +14,21 @@ class FlatPositionState(PositionState):
     appropriate active-position state when conditions are satisfied.
     """
 
+    NAME: str = "FLAT"
+
     def apply(self) -> None:
         """
         Evaluate entry conditions and transition to a new position state if met.
 
         When a LONG or SHORT entry condition is satisfied, the method delegates
         to the respective handler to open a position and update the bot state.
+        No position is entered while a feature of the model is unknown, e.g.
+        before enough trade bars have closed or while the order book resyncs.
         """
-        model = TFModel()
-        prediction = model.predict(self.parent.data_manager.market_snapshot)
+        snapshot = self.parent.data_manager.market_snapshot
+        if not snapshot.is_complete(SETTINGS.MODEL_FEATURE_SCHEMA):
+            return
+        prediction = self.parent.model_manager.predict(snapshot)
         self._apply_long() if prediction == "LONG" else self._apply_short()
 
     def _update_position_snapshot(self) -> None:
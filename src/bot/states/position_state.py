@@ -1,6 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import final, Any
+from typing import final, Any, Dict
+from time import perf_counter
 from utils.logger import Logger
 from bot.bot_settings import SETTINGS
 
@@ -14,6 +15,8 @@ class PositionState(ABC):
     to define specific trading logic.
     """
 
+    NAME: str
+
     def __init__(self, parent: Any) -> None:
         """
         Initialize a PositionState.
@@ -53,13 +56,28 @@ class PositionState(ABC):
         """
         pass
 
+    def checkpoint_data(self) -> Dict[str, Any]:
+        """
+        Describe this state for the crash-recovery checkpoint.
+
+        Returns:
+            Dict[str, Any]: JSON-serializable state data.
+        """
+        return {"state": self.NAME}
+
     def _refresh_indicators(self) -> None:
         """
         Refresh the latest market indicators.
 
         Updates the parent's DataManager with a fresh snapshot
-        of indicators fetched from the BinanceAdapter.
+        of indicators fetched from the BinanceAdapter and appends it,
+        together with the fetch latency, to the snapshot log when enabled.
+        The snapshot is also queued for the shadow models, if any.
         """
-        self.parent.data_manager.market_snapshot = (
-            self.parent.binance_adapter.indicator_manager.fetch_indicators()
-        )
+        started: float = perf_counter()
+        snapshot = self.parent.binance_adapter.indicator_manager.fetch_indicators()
+        self.parent.data_manager.market_snapshot = snapshot
+        if self.parent.snapshot_log is not None:
+            self.parent.snapshot_log.append(snapshot, latency=perf_counter() - started)
+        if self.parent.shadow_runner is not None:
+            self.parent.shadow_runner.submit(snapshot)
@@ -0,0 +1,320 @@
+import math
+from pathlib import Path
+from typing import Iterator, Optional, Union
+import numpy as np
+import pandas as pd
+from data.kline_history import KlineHistory
+
+
+class BarBuilder:
+    """
+    Builds volume, tick or dollar bars incrementally from aggregate trades.
+
+    A bar closes on the trade that brings its base asset volume, trade count
+    or quote asset volume to the threshold, so bars sample the market as
+    information arrives instead of on a clock. Trades are not split across
+    bars.
+
+    Closed bars are kept in a fixed-capacity ring of KlineHistory columns,
+    written twice, at the ring index and half a ring further, so the latest
+    bars are always one contiguous slice; the open bar is a handful of scalars. Memory is therefore bounded
+    by `capacity` however many trades are ingested. Single trades from the
+    stream go through `add_trade`, and recorded trades through the
+    vectorized `add_trades`, which only loops once per closed bar.
+    """
+
+    KINDS = ("volume", "tick", "dollar")
+    # Columns of the Binance aggTrades dumps, which have no header row.
+    AGG_TRADE_COLUMNS = [
+        "agg_trade_id",
+        "price",
+        "quantity",
+        "first_trade_id",
+        "last_trade_id",
+        "transact_time",
+        "is_buyer_maker",
+        "is_best_match",
+    ]
+
+    def __init__(self, kind: str, threshold: float, capacity: int = 1000) -> None:
+        """
+        Initialize an empty BarBuilder.
+
+        Args:
+            kind (str): "volume", "tick" or "dollar".
+            threshold (float): Base volume, trade count or quote volume per bar.
+            capacity (int, optional): Closed bars retained. Defaults to 1000.
+
+        Raises:
+            ValueError: If the kind is unknown or the threshold or capacity is
+                not positive.
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown bar type: {kind}")
+        if threshold <= 0:
+            raise ValueError("Bar threshold must be positive")
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.kind: str = kind
+        self.threshold: float = float(threshold)
+        self.capacity: int = capacity
+        self.last_price: float = math.nan
+        # One row per KlineHistory column, each a mirrored ring of bars.
+        self._bars: np.ndarray = np.zeros((len(KlineHistory.ARRAYS), 2 * capacity))
+        self._next: int = 0
+        self._size: int = 0
+        self._reset()
+
+    def __len__(self) -> int:
+        """
+        Return the number of retained closed bars.
+
+        Returns:
+            int: Closed bar count, at most `capacity`.
+        """
+        return self._size
+
+    def _reset(self) -> None:
+        """
+        Start an empty open bar.
+        """
+        self._open_time: float = 0.0
+        self._open: float = math.nan
+        self._high: float = -math.inf
+        self._low: float = math.inf
+        self._close: float = math.nan
+        self._volume: float = 0.0
+        self._trades: float = 0.0
+        self._taker_buy_volume: float = 0.0
+        self._measure: float = 0.0
+
+    def _open_bar(self) -> np.ndarray:
+        """
+        Return the open bar as a column of KlineHistory values.
+
+        Returns:
+            np.ndarray: Open time, OHLC, volume, trades and taker buy volume.
+        """
+        return np.array(
+            [
+                self._open_time,
+                self._open,
+                self._high,
+                self._low,
+                self._close,
+                self._volume,
+                self._trades,
+                self._taker_buy_volume,
+            ]
+        )
+
+    def _store(self, bars: np.ndarray) -> None:
+        """
+        Append closed bars to the ring, evicting the oldest ones.
+
+        Args:
+            bars (np.ndarray): Bars as columns, shape (columns, count).
+        """
+        bars = bars[:, -self.capacity :]
+        count = bars.shape[1]
+        positions = (self._next + np.arange(count)) % self.capacity
+        self._bars[:, positions] = bars
+        self._bars[:, positions + self.capacity] = bars
+        self._next = (self._next + count) % self.capacity
+        self._size = min(self._size + count, self.capacity)
+
+    def add_trade(
+        self,
+        price: float,
+        quantity: float,
+        timestamp: float,
+        buyer_maker: bool,
+        trades: int = 1,
+    ) -> bool:
+        """
+        Add one aggregate trade to the open bar.
+
+        Args:
+            price (float): Trade price.
+            quantity (float): Base asset quantity.
+            timestamp (float): Trade time in epoch milliseconds.
+            buyer_maker (bool): True if the buyer was the maker, i.e. a taker
+                sold.
+            trades (int, optional): Trades aggregated in it. Defaults to 1.
+
+        Returns:
+            bool: True if the trade closed a bar.
+        """
+        if self._trades == 0:
+            self._open_time = timestamp
+            self._open = price
+        self._high = max(self._high, price)
+        self._low = min(self._low, price)
+        self._close = price
+        self._volume += quantity
+        self._trades += trades
+        if not buyer_maker:
+            self._taker_buy_volume += quantity
+        self.last_price = price
+        if self.kind == "volume":
+            self._measure += quantity
+        elif self.kind == "tick":
+            self._measure += trades
+        else:
+            self._measure += price * quantity
+        if self._measure < self.threshold:
+            return False
+        self._store(self._open_bar()[:, None])
+        self._reset()
+        return True
+
+    def add_trades(
+        self,
+        prices: np.ndarray,
+        quantities: np.ndarray,
+        timestamps: np.ndarray,
+        buyer_maker: np.ndarray,
+        trades: Optional[np.ndarray] = None,
+    ) -> int:
+        """
+        Add consecutive aggregate trades in one vectorized pass.
+
+        The result matches calling `add_trade` for each trade, up to the
+        rounding of the running volume sums.
+
+        Args:
+            prices (np.ndarray): Trade prices.
+            quantities (np.ndarray): Base asset quantities.
+            timestamps (np.ndarray): Trade times in epoch milliseconds.
+            buyer_maker (np.ndarray): True where a taker sold.
+            trades (Optional[np.ndarray], optional): Trades aggregated in each.
+                Defaults to one each.
+
+        Returns:
+            int: Number of bars closed.
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        count = len(prices)
+        if count == 0:
+            return 0
+        quantities = np.asarray(quantities, dtype=np.float64)
+        trades = np.ones(count) if trades is None else np.asarray(trades, np.float64)
+        if self.kind == "volume":
+            measure = np.cumsum(quantities)
+        elif self.kind == "tick":
+            measure = np.cumsum(trades)
+        else:
+            measure = np.cumsum(prices * quantities)
+
+        ends = []
+        base, needed = 0.0, self.threshold - self._measure
+        while True:
+            end = int(np.searchsorted(measure, base + needed))
+            if end >= count:
+                break
+            ends.append(end)
+            base, needed = measure[end], self.threshold
+
+        starts = np.concatenate(([0], np.asarray(ends, dtype=np.int64) + 1))
+        starts = starts[starts < count]
+        last = np.append(starts[1:], count) - 1
+        bars = np.stack(
+            [
+                np.asarray(timestamps, dtype=np.float64)[starts],
+                prices[starts],
+                np.maximum.reduceat(prices, starts),
+                np.minimum.reduceat(prices, starts),
+                prices[last],
+                np.add.reduceat(quantities, starts),
+                np.add.reduceat(trades, starts),
+                np.add.reduceat(
+                    np.where(np.asarray(buyer_maker, dtype=bool), 0.0, quantities),
+                    starts,
+                ),
+            ]
+        )
+        if self._trades:
+            # The first segment continues the open bar.
+            opened = self._open_bar()
+            bars[:2, 0] = opened[:2]
+            bars[2, 0] = max(bars[2, 0], opened[2])
+            bars[3, 0] = min(bars[3, 0], opened[3])
+            bars[5:, 0] += opened[5:]
+        self._store(bars[:, : len(ends)])
+
+        self.last_price = float(prices[-1])
+        if len(ends) == bars.shape[1]:
+            self._reset()
+        else:
+            (
+                self._open_time,
+                self._open,
+                self._high,
+                self._low,
+                self._close,
+                self._volume,
+                self._trades,
+                self._taker_buy_volume,
+            ) = bars[:, -1].tolist()
+            self._measure = float(measure[-1] - base) + (
+                0.0 if ends else self._measure
+            )
+        return len(ends)
+
+    def history(self) -> KlineHistory:
+        """
+        Return the retained closed bars, oldest first.
+
+        Returns:
+            KlineHistory: Copy of the closed bars.
+        """
+        start = self._next - self._size + self.capacity
+        return KlineHistory(
+            *(column[start : start + self._size].copy() for column in self._bars)
+        )
+
+    @classmethod
+    def read_agg_trades(
+        cls, path: Union[str, Path], chunksize: int = 1_000_000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read a recorded Binance aggTrades CSV file in bounded chunks.
+
+        Args:
+            path (Union[str, Path]): File in the layout of the Binance aggTrades
+                dumps, with or without a header row.
+            chunksize (int, optional): Trades per chunk. Defaults to 1,000,000.
+
+        Returns:
+            Iterator[pd.DataFrame]: Chunks with the `AGG_TRADE_COLUMNS`.
+        """
+        with open(path) as file:
+            header = 0 if file.readline().startswith("agg_trade_id") else None
+        return pd.read_csv(
+            path,
+            header=header,
+            names=cls.AGG_TRADE_COLUMNS[:7],
+            usecols=range(7),
+            chunksize=chunksize,
+        )
+
+    def add_agg_trades(self, path: Union[str, Path]) -> int:
+        """
+        Add every trade of a recorded aggTrades file.
+
+        Args:
+            path (Union[str, Path]): File read with `read_agg_trades`.
+
+        Returns:
+            int: Number of bars closed.
+        """
+        closed = 0
+        for chunk in self.read_agg_trades(path):
+            closed += self.add_trades(
+                chunk["price"].to_numpy(np.float64),
+                chunk["quantity"].to_numpy(np.float64),
+                chunk["transact_time"].to_numpy(np.float64),
+                chunk["is_buyer_maker"].astype(str).str.lower().eq("true").to_numpy(),
+                (chunk["last_trade_id"] - chunk["first_trade_id"] + 1).to_numpy(),
+            )
+        return closed
@@ -0,0 +1,118 @@
+from typing import Dict
+import numpy as np
+from data.kline_history import KlineHistory
+
+
+class CandleStore:
+    """
+    Bounded history of base-interval candles resampled locally into longer ones.
+
+    The store keeps the latest `capacity` candles of one fine-grained
+    interval. Fetched candles replace the stored ones from their first open
+    time onward, so re-fetching the candle that was still open when it was
+    last stored updates it in place.
+
+    Longer intervals are aggregated from the base candles instead of being
+    downloaded. Each resampled history is cached and updated incrementally:
+    only the intervals touched by candles stored since the last call are
+    aggregated again. Resampled histories start at the first interval whose
+    candles are all stored, so they do not depend on where the store was
+    trimmed.
+    """
+
+    def __init__(self, interval_seconds: int, capacity: int) -> None:
+        """
+        Initialize an empty CandleStore.
+
+        Args:
+            interval_seconds (int): Length of the base candles in seconds.
+            capacity (int): Maximum number of base candles retained.
+
+        Raises:
+            ValueError: If capacity is not positive.
+        """
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive")
+        self.interval_seconds: int = interval_seconds
+        self.capacity: int = capacity
+        self.history: KlineHistory = KlineHistory(*[np.empty(0)] * 6)
+        self._resampled: Dict[int, KlineHistory] = {}
+        self._changed: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        """
+        Return the number of stored base candles.
+
+        Returns:
+            int: Candle count, at most `capacity`.
+        """
+        return len(self.history)
+
+    @property
+    def last_open_time(self) -> int:
+        """
+        Open time of the latest stored candle.
+
+        Returns:
+            int: Epoch milliseconds, 0 when the store is empty.
+        """
+        return int(self.history.open_time[-1]) if len(self.history) else 0
+
+    def update(self, candles: KlineHistory) -> None:
+        """
+        Store consecutive base candles, the latest of which may still be open.
+
+        Args:
+            candles (KlineHistory): Fetched candles in chronological order.
+        """
+        if len(candles) == 0:
+            return
+        first = int(candles.open_time[0])
+        kept = int(np.searchsorted(self.history.open_time, first))
+        self.history = KlineHistory.concatenate((self.history[:kept], candles))[
+            -self.capacity :
+        ]
+        for interval_seconds, changed in self._changed.items():
+            self._changed[interval_seconds] = min(changed, first)
+
+    def resample(self, interval_seconds: int) -> KlineHistory:
+        """
+        Return the stored candles aggregated into a longer interval.
+
+        Args:
+            interval_seconds (int): Length of the resampled candles in seconds,
+                a multiple of the base interval of at most one day.
+
+        Returns:
+            KlineHistory: Resampled candles; the latest is partial while its
+                interval is not over.
+
+        Raises:
+            ValueError: If the interval cannot be aggregated from base candles.
+        """
+        if interval_seconds % self.interval_seconds or interval_seconds > 86400:
+            raise ValueError(
+                f"Cannot resample {self.interval_seconds}s candles "
+                f"into {interval_seconds}s candles"
+            )
+        interval_ms = interval_seconds * 1000
+        open_time = self.history.open_time
+        if len(open_time) == 0:
+            return self.history
+        start = -(-int(open_time[0]) // interval_ms) * interval_ms
+        kept = self._resampled.get(interval_seconds, self.history[:0])
+        if len(kept):
+            changed = self._changed[interval_seconds] // interval_ms * interval_ms
+            kept = kept[
+                np.searchsorted(kept.open_time, start) : np.searchsorted(
+                    kept.open_time, changed
+                )
+            ]
+            start = max(start, changed)
+        fresh = self.history[np.searchsorted(open_time, start) :]
+        resampled = KlineHistory.concatenate(
+            (kept, fresh.resample(interval_seconds))
+        )
+        self._resampled[interval_seconds] = resampled
+        self._changed[interval_seconds] = self.last_open_time + 1
+        return resampled
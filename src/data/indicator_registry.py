@@ -0,0 +1,325 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Union
+import numpy as np
+import talib
+from data.kline_history import KlineHistory
+
+Sources = Union[KlineHistory, Mapping[str, np.ndarray]]
+
+# Candles after which the seed of an exponential average weighs about 3e-4.
+_EMA_SETTLE = 5
+_WILDER_SETTLE = 9
+
+
+@dataclass(frozen=True)
+class Indicator:
+    """
+    Declaration of one indicator series.
+
+    Attributes:
+        name (str): Column name, e.g. "ema_100".
+        inputs (Sequence[str]): Kline columns or registered indicators passed
+            positionally to `function`.
+        function (Callable[..., np.ndarray]): Computes the series, one value per
+            candle, from the input series.
+        params (Mapping[str, Any]): Keyword arguments of `function`.
+        warmup (int): Candles of input needed before a value is settled.
+    """
+
+    name: str
+    inputs: Sequence[str]
+    function: Callable[..., np.ndarray]
+    params: Mapping[str, Any] = field(default_factory=dict)
+    warmup: int = 0
+
+
+def _bollinger_width(close: np.ndarray, timeperiod: int, nbdev: float) -> np.ndarray:
+    """
+    Width of the Bollinger Bands over their middle band.
+
+    Args:
+        close (np.ndarray): Close prices.
+        timeperiod (int): Moving average length.
+        nbdev (float): Band distance in standard deviations.
+
+    Returns:
+        np.ndarray: Relative band width per candle.
+    """
+    upper, middle, lower = talib.BBANDS(
+        close, timeperiod=timeperiod, nbdevup=nbdev, nbdevdn=nbdev
+    )
+    return (upper - lower) / middle
+
+
+def _zscore(values: np.ndarray, timeperiod: int) -> np.ndarray:
+    """
+    Z-score of each value against a trailing window.
+
+    Args:
+        values (np.ndarray): Input series.
+        timeperiod (int): Window length.
+
+    Returns:
+        np.ndarray: Z-score per candle, 0 when the window is constant.
+    """
+    mean = talib.SMA(values, timeperiod=timeperiod)
+    std = talib.STDDEV(values, timeperiod=timeperiod, nbdev=1)
+    zscore = np.where(np.isnan(std), np.nan, 0.0)
+    np.divide(values - mean, std, out=zscore, where=std > 0)
+    return zscore
+
+
+def _ratio(part: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """
+    Share of a total, 0.5 where the total is zero and NaN where the part is unknown.
+
+    Args:
+        part (np.ndarray): Numerator series.
+        total (np.ndarray): Denominator series.
+
+    Returns:
+        np.ndarray: Ratio per candle.
+    """
+    ratio = np.where(np.isnan(part), np.nan, 0.5)
+    np.divide(part, total, out=ratio, where=total > 0)
+    return ratio
+
+
+class IndicatorRegistry:
+    """
+    Declarative set of indicators evaluated as a deduplicated dependency graph.
+
+    Each `Indicator` names its inputs, which are kline columns or indicators
+    registered before it, so the graph is acyclic by construction. Shared
+    intermediates are ordinary indicators: MACD and its signal line both
+    read the registered 12- and 26-candle EMAs, which are computed once per
+    evaluation. Every requested series and its dependencies are evaluated
+    with one vectorized call each over the whole history.
+
+    The warm-up of an indicator adds up along its inputs, so `lookback`
+    returns the number of candles to fetch for the values of the last
+    candle to be settled.
+    """
+
+    KLINE_INPUTS = ("open", "high", "low", "close", "volume", "taker_buy_volume")
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty IndicatorRegistry.
+        """
+        self.indicators: Dict[str, Indicator] = {}
+        self._warmups: Dict[str, int] = {name: 0 for name in self.KLINE_INPUTS}
+
+    @classmethod
+    def default(cls) -> "IndicatorRegistry":
+        """
+        Build the registry of every `MarketSnapshot.KLINE_FEATURES` column.
+
+        Returns:
+            IndicatorRegistry: Registry with the snapshot features and their
+                intermediate EMAs.
+        """
+        registry = cls()
+        registry.register(Indicator("price", ("close",), np.copy))
+        for period in (12, 26, 100):
+            registry.register(
+                Indicator(
+                    f"ema_{period}",
+                    ("close",),
+                    talib.EMA,
+                    {"timeperiod": period},
+                    _EMA_SETTLE * period,
+                )
+            )
+        registry.register(Indicator("macd_12", ("ema_12", "ema_26"), np.subtract))
+        registry.register(
+            Indicator(
+                "macd_26", ("macd_12",), talib.EMA, {"timeperiod": 26}, _EMA_SETTLE * 26
+            )
+        )
+        registry.register(
+            Indicator(
+                "rsi_6", ("close",), talib.RSI, {"timeperiod": 6}, _WILDER_SETTLE * 6
+            )
+        )
+        registry.register(
+            Indicator(
+                "atr_14",
+                ("high", "low", "close"),
+                talib.ATR,
+                {"timeperiod": 14},
+                _WILDER_SETTLE * 14,
+            )
+        )
+        registry.register(
+            Indicator(
+                "bb_width_20",
+                ("close",),
+                _bollinger_width,
+                {"timeperiod": 20, "nbdev": 2},
+                19,
+            )
+        )
+        registry.register(
+            Indicator("volume_z_20", ("volume",), _zscore, {"timeperiod": 20}, 19)
+        )
+        registry.register(
+            Indicator("taker_buy_ratio", ("taker_buy_volume", "volume"), _ratio)
+        )
+        return registry
+
+    def register(self, indicator: Indicator) -> None:
+        """
+        Add an indicator to the graph.
+
+        Args:
+            indicator (Indicator): Indicator whose inputs are already known.
+
+        Raises:
+            ValueError: If the name is taken or an input is unknown.
+        """
+        if indicator.name in self._warmups:
+            raise ValueError(f"Indicator {indicator.name} is already registered")
+        unknown = [name for name in indicator.inputs if name not in self._warmups]
+        if unknown:
+            raise ValueError(
+                f"Unknown inputs of indicator {indicator.name}: {', '.join(unknown)}"
+            )
+        self.indicators[indicator.name] = indicator
+        self._warmups[indicator.name] = indicator.warmup + max(
+            (self._warmups[name] for name in indicator.inputs), default=0
+        )
+
+    def warmup(self, name: str) -> int:
+        """
+        Return the candles of history an indicator needs before it is settled.
+
+        Args:
+            name (str): Indicator or kline column.
+
+        Returns:
+            int: Warm-up of the indicator including that of its inputs.
+
+        Raises:
+            KeyError: If the indicator is unknown.
+        """
+        if name not in self._warmups:
+            raise KeyError(f"Unknown indicator: {name}")
+        return self._warmups[name]
+
+    def lookback(self, names: Sequence[str]) -> int:
+        """
+        Return the number of candles to fetch to evaluate indicators.
+
+        Args:
+            names (Sequence[str]): Requested indicators.
+
+        Returns:
+            int: Largest warm-up of the indicators plus the current candle.
+        """
+        return max((self.warmup(name) for name in names), default=0) + 1
+
+    def _order(self, names: Sequence[str]) -> List[str]:
+        """
+        Return the indicators needed for some outputs, each after its inputs.
+
+        Args:
+            names (Sequence[str]): Requested indicators.
+
+        Returns:
+            List[str]: Indicator names in evaluation order, without duplicates.
+
+        Raises:
+            KeyError: If an indicator is unknown.
+        """
+        order: List[str] = []
+        pending = list(reversed(names))
+        while pending:
+            name = pending.pop()
+            if name in order or name in self.KLINE_INPUTS:
+                continue
+            indicator = self.indicators.get(name)
+            if indicator is None:
+                raise KeyError(f"Unknown indicator: {name}")
+            missing = [
+                source
+                for source in indicator.inputs
+                if source not in order and source not in self.KLINE_INPUTS
+            ]
+            if missing:
+                pending.append(name)
+                pending.extend(reversed(missing))
+            else:
+                order.append(name)
+        return order
+
+    def evaluate(self, sources: Sources, names: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Evaluate indicators and their dependencies once each.
+
+        Args:
+            sources (Sources): `KlineHistory`, or kline columns by name.
+            names (Sequence[str]): Requested indicators.
+
+        Returns:
+            Dict[str, np.ndarray]: Series of every evaluated indicator by name.
+        """
+        series: Dict[str, np.ndarray] = {}
+        for name in self._order(names):
+            indicator = self.indicators[name]
+            arguments = [
+                series[source] if source in series else self._source(sources, source)
+                for source in indicator.inputs
+            ]
+            series[name] = np.asarray(
+                indicator.function(*arguments, **indicator.params), dtype=np.float64
+            )
+        return series
+
+    @staticmethod
+    def _source(sources: Sources, name: str) -> np.ndarray:
+        """
+        Return a kline column.
+
+        Args:
+            sources (Sources): `KlineHistory`, or kline columns by name.
+            name (str): Column name.
+
+        Returns:
+            np.ndarray: Column as float64.
+        """
+        if isinstance(sources, Mapping):
+            return np.asarray(sources[name], dtype=np.float64)
+        return getattr(sources, name)
+
+    def matrix(self, sources: Sources, names: Sequence[str]) -> np.ndarray:
+        """
+        Evaluate indicators into a feature matrix.
+
+        Args:
+            sources (Sources): `KlineHistory`, or kline columns by name.
+            names (Sequence[str]): Requested indicators, in column order.
+
+        Returns:
+            np.ndarray: Matrix of shape (candles, len(names)).
+        """
+        series = self.evaluate(sources, names)
+        if not names:
+            return np.zeros((len(self._source(sources, "close")), 0))
+        return np.column_stack([series[name] for name in names])
+
+    def latest(self, sources: Sources, names: Sequence[str]) -> Dict[str, float]:
+        """
+        Evaluate indicators for the last candle.
+
+        Args:
+            sources (Sources): `KlineHistory`, or kline columns by name.
+            names (Sequence[str]): Requested indicators.
+
+        Returns:
+            Dict[str, float]: Values by name, NaN without candles.
+        """
+        if len(self._source(sources, "close")) == 0:
+            return {name: np.nan for name in names}
+        series = self.evaluate(sources, names)
+        return {name: float(series[name][-1]) for name in names}
@@ -0,0 +1,276 @@
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from binance.client import Client
+
+
+class KlineHistory:
+    """
+    Column-oriented container for a historical kline (candlestick) series.
+
+    Each OHLCV column is stored as a contiguous NumPy array so that
+    backtests and feature generation can work on whole series at once. The
+    trade count and taker buy volume are kept as well when the source has
+    them, and are NaN otherwise.
+    """
+
+    COLUMNS = [
+        "timestamp",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "close_time",
+        "quote_asset_volume",
+        "number_of_trades",
+        "taker_buy_base_asset_volume",
+        "taker_buy_quote_asset_volume",
+        "ignore",
+    ]
+    ARRAYS = (
+        "open_time",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "number_of_trades",
+        "taker_buy_volume",
+    )
+
+    def __init__(
+        self,
+        open_time: np.ndarray,
+        open_prices: np.ndarray,
+        high_prices: np.ndarray,
+        low_prices: np.ndarray,
+        close_prices: np.ndarray,
+        volume: np.ndarray,
+        number_of_trades: Optional[np.ndarray] = None,
+        taker_buy_volume: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Initialize a KlineHistory.
+
+        Args:
+            open_time (np.ndarray): Candle open times in epoch milliseconds.
+            open_prices (np.ndarray): Open prices.
+            high_prices (np.ndarray): High prices.
+            low_prices (np.ndarray): Low prices.
+            close_prices (np.ndarray): Close prices.
+            volume (np.ndarray): Base asset volume.
+            number_of_trades (Optional[np.ndarray], optional): Trades per candle.
+                Defaults to NaN.
+            taker_buy_volume (Optional[np.ndarray], optional): Base asset volume
+                bought by takers. Defaults to NaN.
+
+        Raises:
+            ValueError: If the columns do not have the same length.
+        """
+        missing = np.full(len(close_prices), np.nan)
+        number_of_trades = missing if number_of_trades is None else number_of_trades
+        taker_buy_volume = missing if taker_buy_volume is None else taker_buy_volume
+        lengths = {
+            len(open_time),
+            len(open_prices),
+            len(high_prices),
+            len(low_prices),
+            len(close_prices),
+            len(volume),
+            len(number_of_trades),
+            len(taker_buy_volume),
+        }
+        if len(lengths) != 1:
+            raise ValueError("All kline columns must have the same length")
+
+        self.open_time: np.ndarray = np.ascontiguousarray(open_time, dtype=np.int64)
+        self.open: np.ndarray = np.ascontiguousarray(open_prices, dtype=np.float64)
+        self.high: np.ndarray = np.ascontiguousarray(high_prices, dtype=np.float64)
+        self.low: np.ndarray = np.ascontiguousarray(low_prices, dtype=np.float64)
+        self.close: np.ndarray = np.ascontiguousarray(close_prices, dtype=np.float64)
+        self.volume: np.ndarray = np.ascontiguousarray(volume, dtype=np.float64)
+        self.number_of_trades: np.ndarray = np.ascontiguousarray(
+            number_of_trades, dtype=np.float64
+        )
+        self.taker_buy_volume: np.ndarray = np.ascontiguousarray(
+            taker_buy_volume, dtype=np.float64
+        )
+
+    def __len__(self) -> int:
+        """
+        Return the number of candles in the history.
+
+        Returns:
+            int: Candle count.
+        """
+        return len(self.close)
+
+    def __getitem__(self, index: slice) -> "KlineHistory":
+        """
+        Return a range of candles.
+
+        Args:
+            index (slice): Candle range.
+
+        Returns:
+            KlineHistory: History of the candles in the range.
+        """
+        return KlineHistory(*(getattr(self, name)[index] for name in self.ARRAYS))
+
+    @classmethod
+    def concatenate(cls, histories: Iterable["KlineHistory"]) -> "KlineHistory":
+        """
+        Join consecutive histories into one.
+
+        Args:
+            histories (Iterable[KlineHistory]): Histories in chronological order.
+
+        Returns:
+            KlineHistory: Candles of every history.
+        """
+        histories = list(histories)
+        return cls(
+            *(
+                np.concatenate([getattr(history, name) for history in histories])
+                for name in cls.ARRAYS
+            )
+        )
+
+    def resample(self, interval_seconds: int) -> "KlineHistory":
+        """
+        Aggregate the candles into a longer interval.
+
+        Candles are grouped by their open time rounded down to a multiple of
+        the interval, as Binance aligns intervals up to one day, and every
+        group is reduced with one vectorized call per column: first open,
+        highest high, lowest low, last close and summed volumes. The first
+        and last groups are partial when the history starts or ends inside
+        an interval.
+
+        Args:
+            interval_seconds (int): Length of the resampled candles in seconds.
+
+        Returns:
+            KlineHistory: One candle per interval containing candles.
+        """
+        if len(self) == 0:
+            return self
+        interval_ms = interval_seconds * 1000
+        buckets = self.open_time // interval_ms * interval_ms
+        starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+        ends = np.append(starts[1:], len(self)) - 1
+        return KlineHistory(
+            buckets[starts],
+            self.open[starts],
+            np.maximum.reduceat(self.high, starts),
+            np.minimum.reduceat(self.low, starts),
+            self.close[ends],
+            np.add.reduceat(self.volume, starts),
+            np.add.reduceat(self.number_of_trades, starts),
+            np.add.reduceat(self.taker_buy_volume, starts),
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "KlineHistory":
+        """
+        Build a history from a DataFrame using the Binance kline column names.
+
+        Args:
+            df (pd.DataFrame): Kline rows with at least timestamp and OHLCV columns.
+
+        Returns:
+            KlineHistory: Parsed history.
+        """
+        optional = {
+            name: df[column].astype(float).to_numpy() if column in df else None
+            for name, column in (
+                ("number_of_trades", "number_of_trades"),
+                ("taker_buy_volume", "taker_buy_base_asset_volume"),
+            )
+        }
+        return cls(
+            open_time=df["timestamp"].astype(np.int64).to_numpy(),
+            open_prices=df["open"].astype(float).to_numpy(),
+            high_prices=df["high"].astype(float).to_numpy(),
+            low_prices=df["low"].astype(float).to_numpy(),
+            close_prices=df["close"].astype(float).to_numpy(),
+            volume=df["volume"].astype(float).to_numpy(),
+            **optional,
+        )
+
+    @classmethod
+    def from_klines(cls, klines: Sequence[Sequence[Any]]) -> "KlineHistory":
+        """
+        Build a history from raw Binance kline rows.
+
+        Args:
+            klines (Sequence[Sequence[Any]]): Rows as returned by `get_historical_klines`.
+
+        Returns:
+            KlineHistory: Parsed history.
+        """
+        df = pd.DataFrame(list(klines), columns=cls.COLUMNS)
+        return cls.from_frame(df)
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path]) -> "KlineHistory":
+        """
+        Load a history previously written with `to_csv`.
+
+        Args:
+            path (Union[str, Path]): Path to the kline CSV file.
+
+        Returns:
+            KlineHistory: Parsed history.
+        """
+        return cls.from_frame(pd.read_csv(path))
+
+    @classmethod
+    def download(
+        cls,
+        client: Client,
+        symbol: str,
+        interval: str,
+        start_str: str,
+        end_str: Optional[str] = None,
+    ) -> "KlineHistory":
+        """
+        Download a kline history from Binance.
+
+        Args:
+            client (Client): Binance client instance used for API communication.
+            symbol (str): Trading symbol, e.g. "ETHUSDT".
+            interval (str): Candle interval, e.g. "15m".
+            start_str (str): Start of the range, e.g. "3 months ago UTC".
+            end_str (Optional[str], optional): End of the range. Defaults to now.
+
+        Returns:
+            KlineHistory: Downloaded history.
+        """
+        klines: List[List[Any]] = client.get_historical_klines(
+            symbol=symbol, interval=interval, start_str=start_str, end_str=end_str
+        )
+        return cls.from_klines(klines)
+
+    def to_csv(self, path: Union[str, Path]) -> None:
+        """
+        Write the history to a CSV file with timestamp, OHLCV and taker columns.
+
+        Args:
+            path (Union[str, Path]): Destination file path.
+        """
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame(
+            {
+                "timestamp": self.open_time,
+                "open": self.open,
+                "high": self.high,
+                "low": self.low,
+                "close": self.close,
+                "volume": self.volume,
+                "number_of_trades": self.number_of_trades,
+                "taker_buy_base_asset_volume": self.taker_buy_volume,
+            }
+        ).to_csv(path, index=False)
@@ -1,15 +1,67 @@
-from typing import Tuple, Sequence, List, Optional
-import copy
+import math
+from typing import Any, Dict, Optional, Sequence, Tuple
+from utils.date_utils import DateUtils
 
 
 class MarketSnapshot:
     """
-    Container for a single snapshot of technical indicators.
+    Immutable container for a single snapshot of technical indicators.
 
     This structure captures the timestamp, current price, and commonly-used
-    indicators (MACD, EMA, RSI), along with a list of recent OHLC bars.
+    indicators (MACD, EMA, RSI). Instances use `__slots__` and have no
+    per-instance `__dict__`, so many of them stay cheap to keep in memory.
+
+    The feature columns are versioned in `SCHEMAS`, each schema starting
+    with the columns of the previous one. Version 1 is the five `FEATURES`;
+    version 2 adds the `EXTRA_FEATURES`, and version 3 the `BOOK_FEATURES`
+    of the local order book. The kline features are declared in the
+    `IndicatorRegistry` and computed from the same klines. Optional features
+    that were not computed are NaN, and `schema_version` reports the newest
+    schema whose columns are all known.
     """
 
+    FEATURES: Tuple[str, ...] = ("price", "macd_12", "macd_26", "ema_100", "rsi_6")
+    EXTRA_FEATURES: Tuple[str, ...] = (
+        "atr_14",
+        "bb_width_20",
+        "volume_z_20",
+        "taker_buy_ratio",
+    )
+    BOOK_FEATURES: Tuple[str, ...] = (
+        "book_spread",
+        "book_imbalance",
+        "book_bid_volume",
+        "book_ask_volume",
+        "book_microprice",
+    )
+    KLINE_FEATURES: Tuple[str, ...] = FEATURES + EXTRA_FEATURES
+    OPTIONAL_FEATURES: Tuple[str, ...] = EXTRA_FEATURES + BOOK_FEATURES
+    SCHEMAS: Dict[int, Tuple[str, ...]] = {
+        1: FEATURES,
+        2: KLINE_FEATURES,
+        3: KLINE_FEATURES + BOOK_FEATURES,
+    }
+    SCHEMA_VERSION: int = 3
+    ALL_FEATURES: Tuple[str, ...] = SCHEMAS[SCHEMA_VERSION]
+    __slots__ = ("date", "timestamp") + ALL_FEATURES
+
+    date: str
+    timestamp: float
+    price: float
+    macd_12: float
+    macd_26: float
+    ema_100: float
+    rsi_6: float
+    atr_14: float
+    bb_width_20: float
+    volume_z_20: float
+    taker_buy_ratio: float
+    book_spread: float
+    book_imbalance: float
+    book_bid_volume: float
+    book_ask_volume: float
+    book_microprice: float
+
     def __init__(
         self,
         date: str,
@@ -18,6 +70,16 @@ class MarketSnapshot:
         macd_26: float,
         ema_100: float,
         rsi_6: float,
+        timestamp: Optional[float] = None,
+        atr_14: float = math.nan,
+        bb_width_20: float = math.nan,
+        volume_z_20: float = math.nan,
+        taker_buy_ratio: float = math.nan,
+        book_spread: float = math.nan,
+        book_imbalance: float = math.nan,
+        book_bid_volume: float = math.nan,
+        book_ask_volume: float = math.nan,
+        book_microprice: float = math.nan,
     ) -> None:
         """
         Initialize a MarketSnapshot.
@@ -29,42 +91,218 @@ class MarketSnapshot:
             macd_26 (float): MACD signal/line value (26-period).
             ema_100 (float): Exponential Moving Average over 100 periods.
             rsi_6 (float): Relative Strength Index over 6 periods.
+            timestamp (Optional[float], optional): Snapshot time in epoch seconds.
+                Defaults to the parsed `date`, or NaN if it cannot be parsed.
+            atr_14 (float, optional): Average True Range over 14 candles.
+                Defaults to NaN.
+            bb_width_20 (float, optional): Width of the 20-candle Bollinger Bands
+                relative to their middle band. Defaults to NaN.
+            volume_z_20 (float, optional): Z-score of the candle volume over 20
+                candles. Defaults to NaN.
+            taker_buy_ratio (float, optional): Share of the candle volume bought
+                by takers. Defaults to NaN.
+            book_spread (float, optional): Order book spread relative to the mid
+                price. Defaults to NaN.
+            book_imbalance (float, optional): Bid minus ask share of the volume
+                of the best order book levels. Defaults to NaN.
+            book_bid_volume (float, optional): Volume of the best bid levels.
+                Defaults to NaN.
+            book_ask_volume (float, optional): Volume of the best ask levels.
+                Defaults to NaN.
+            book_microprice (float, optional): Mid price weighted by the size at
+                the opposite best price. Defaults to NaN.
+        """
+        if timestamp is None:
+            timestamp = DateUtils.parse_date(date)
+        _set = object.__setattr__
+        _set(self, "date", date)
+        _set(self, "timestamp", float("nan") if timestamp is None else float(timestamp))
+        _set(self, "price", float(price))
+        _set(self, "macd_12", float(macd_12))
+        _set(self, "macd_26", float(macd_26))
+        _set(self, "ema_100", float(ema_100))
+        _set(self, "rsi_6", float(rsi_6))
+        _set(self, "atr_14", float(atr_14))
+        _set(self, "bb_width_20", float(bb_width_20))
+        _set(self, "volume_z_20", float(volume_z_20))
+        _set(self, "taker_buy_ratio", float(taker_buy_ratio))
+        _set(self, "book_spread", float(book_spread))
+        _set(self, "book_imbalance", float(book_imbalance))
+        _set(self, "book_bid_volume", float(book_bid_volume))
+        _set(self, "book_ask_volume", float(book_ask_volume))
+        _set(self, "book_microprice", float(book_microprice))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """
+        Reject attribute assignment; snapshots are immutable.
+
+        Raises:
+            AttributeError: Always.
+        """
+        raise AttributeError(f"MarketSnapshot is immutable (cannot set {name!r})")
+
+    def __delattr__(self, name: str) -> None:
         """
+        Reject attribute deletion; snapshots are immutable.
 
-        self.date: str = date
-        self.price: float = float(price)
-        self.macd_12: float = float(macd_12)
-        self.macd_26: float = float(macd_26)
-        self.ema_100: float = float(ema_100)
-        self.rsi_6: float = float(rsi_6)
+        Raises:
+            AttributeError: Always.
+        """
+        raise AttributeError(f"MarketSnapshot is immutable (cannot delete {name!r})")
+
+    def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+        """
+        Support pickling despite the immutable attributes.
+
+        Returns:
+            Tuple[Any, Tuple[Any, ...]]: Constructor and its arguments.
+        """
+        return (
+            MarketSnapshot,
+            (
+                self.date,
+                *self.features(),
+                self.timestamp,
+                *self.values(self.OPTIONAL_FEATURES),
+            ),
+        )
 
     def __str__(self) -> str:
         """
         Return a compact, human-readable summary of key indicators.
 
+        The optional features are included when they are known.
+
         Returns:
             str: A single-line summary string.
         """
-        return (
+        summary = (
             f"PRICE: {self.price:.2f} | "
             f"MACD_12: {self.macd_12:.2f} | "
             f"MACD_26: {self.macd_26:.2f} | "
             f"EMA_100: {self.ema_100:.2f} | "
             f"RSI_6: {self.rsi_6:.2f}"
         )
+        return summary + "".join(
+            f" | {name.upper()}: {getattr(self, name):.2f}"
+            for name in self.OPTIONAL_FEATURES
+            if not math.isnan(getattr(self, name))
+        )
+
+    def features(self) -> Tuple[float, ...]:
+        """
+        Return the feature values in `FEATURES` order.
+
+        Returns:
+            Tuple[float, ...]: Price and indicator values.
+        """
+        return (self.price, self.macd_12, self.macd_26, self.ema_100, self.rsi_6)
+
+    def values(self, columns: Sequence[str]) -> Tuple[float, ...]:
+        """
+        Return the values of some feature columns.
+
+        Args:
+            columns (Sequence[str]): Feature names, e.g. a schema from `SCHEMAS`.
+
+        Returns:
+            Tuple[float, ...]: Values in `columns` order.
+        """
+        return tuple(getattr(self, name) for name in columns)
+
+    def schema_version(self) -> int:
+        """
+        Return the newest feature schema whose columns are all known.
+
+        Returns:
+            int: Schema version, 1 when the extra features are missing.
+        """
+        version = 1
+        while version < self.SCHEMA_VERSION and self.is_complete(version + 1):
+            version += 1
+        return version
+
+    def is_complete(self, schema_version: int) -> bool:
+        """
+        Check that every column of a feature schema is known.
+
+        Args:
+            schema_version (int): Key of `SCHEMAS`.
+
+        Returns:
+            bool: False while a column is NaN, e.g. during an indicator
+                warm-up or while the order book is out of sync.
+        """
+        values = self.values(self.SCHEMAS[schema_version])
+        return not any(math.isnan(value) for value in values)
+
+    @classmethod
+    def schema_columns(cls, width: int) -> Tuple[str, ...]:
+        """
+        Return the columns of the feature schema with a number of columns.
+
+        Args:
+            width (int): Number of feature columns, e.g. of a saved scaler.
+
+        Returns:
+            Tuple[str, ...]: Columns of the matching schema.
+
+        Raises:
+            ValueError: If no schema has that many columns.
+        """
+        for columns in cls.SCHEMAS.values():
+            if len(columns) == width:
+                return columns
+        raise ValueError(f"No feature schema has {width} columns")
 
     def clone(self) -> "MarketSnapshot":
         """
-        Create a deep copy of the snapshot, including the OHLC bar list.
+        Create a copy of the snapshot.
+
+        The fields are already validated floats, so they are copied as is
+        instead of being converted again.
 
         Returns:
             MarketSnapshot: A new snapshot instance with the same values.
         """
-        return MarketSnapshot(
-            date=self.date,
-            price=self.price,
-            macd_12=self.macd_12,
-            macd_26=self.macd_26,
-            ema_100=self.ema_100,
-            rsi_6=self.rsi_6,
+        copy = object.__new__(MarketSnapshot)
+        for name in self.__slots__:
+            object.__setattr__(copy, name, getattr(self, name))
+        return copy
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the snapshot into a JSON-serializable dictionary.
+
+        Optional features that are NaN are left out, so snapshots without
+        them serialize as before the optional features existed.
+
+        Returns:
+            Dict[str, Any]: The date, timestamp and every known feature keyed by name.
+        """
+        data = {name: getattr(self, name) for name in self.__slots__}
+        for name in self.OPTIONAL_FEATURES:
+            if math.isnan(data[name]):
+                del data[name]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MarketSnapshot":
+        """
+        Rebuild a snapshot from the output of `to_dict`.
+
+        Optional features missing from older data are NaN.
+
+        Args:
+            data (Dict[str, Any]): Snapshot fields keyed by name.
+
+        Returns:
+            MarketSnapshot: The restored snapshot.
+        """
+        return cls(
+            date=data["date"],
+            timestamp=data.get("timestamp"),
+            **{name: data[name] for name in cls.FEATURES},
+            **{name: data.get(name, math.nan) for name in cls.OPTIONAL_FEATURES},
         )
+
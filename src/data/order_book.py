@@ -0,0 +1,224 @@
+import math
+from bisect import bisect_left
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+from data.market_snapshot import MarketSnapshot
+
+
+class BookSide:
+    """
+    Price levels of one side of an order book, best level first.
+
+    The prices are kept in a sorted list searched with `bisect`, and the
+    quantities in a dict by price. Finding a level is O(log n); inserting
+    or removing one shifts the list with a single `memmove`, which is
+    negligible at order-book depths. The volume of the best `depth` levels
+    is updated with every change, so reading it is O(1).
+    """
+
+    def __init__(self, descending: bool, depth: int) -> None:
+        """
+        Initialize an empty BookSide.
+
+        Args:
+            descending (bool): True for bids, whose best level is the highest.
+            depth (int): Number of best levels summed in the aggregates.
+        """
+        self.descending: bool = descending
+        self.depth: int = depth
+        self.levels: Dict[float, float] = {}
+        self.top_volume: float = 0.0
+        # Sort keys: the prices, negated for bids.
+        self._keys: List[float] = []
+
+    def __len__(self) -> int:
+        """
+        Return the number of price levels.
+
+        Returns:
+            int: Level count.
+        """
+        return len(self._keys)
+
+    def _price(self, index: int) -> float:
+        """
+        Return the price of the level at a rank.
+
+        Args:
+            index (int): Rank of the level, 0 being the best.
+
+        Returns:
+            float: Price of the level.
+        """
+        key = self._keys[index]
+        return -key if self.descending else key
+
+    def best(self) -> float:
+        """
+        Return the best price.
+
+        Returns:
+            float: Highest bid or lowest ask, NaN when the side is empty.
+        """
+        return self._price(0) if self._keys else math.nan
+
+    def top(self, count: int) -> List[Tuple[float, float]]:
+        """
+        Return the best levels.
+
+        Args:
+            count (int): Maximum number of levels.
+
+        Returns:
+            List[Tuple[float, float]]: Price and quantity, best level first.
+        """
+        return [
+            (price, self.levels[price])
+            for price in map(self._price, range(min(count, len(self._keys))))
+        ]
+
+    def clear(self) -> None:
+        """
+        Remove every level.
+        """
+        self.levels.clear()
+        self._keys.clear()
+        self.top_volume = 0.0
+
+    def set(self, price: float, quantity: float) -> None:
+        """
+        Set the quantity of a level, removing it when the quantity is zero.
+
+        Args:
+            price (float): Level price.
+            quantity (float): New total quantity at the price.
+        """
+        key = -price if self.descending else price
+        index = bisect_left(self._keys, key)
+        exists = index < len(self._keys) and self._keys[index] == key
+        if quantity == 0.0:
+            if not exists:
+                return
+            previous = self.levels.pop(price)
+            del self._keys[index]
+            if index < self.depth:
+                self.top_volume -= previous
+                if len(self._keys) >= self.depth:
+                    self.top_volume += self.levels[self._price(self.depth - 1)]
+        elif exists:
+            previous = self.levels[price]
+            self.levels[price] = quantity
+            if index < self.depth:
+                self.top_volume += quantity - previous
+        else:
+            self._keys.insert(index, key)
+            self.levels[price] = quantity
+            if index < self.depth:
+                self.top_volume += quantity
+                if len(self._keys) > self.depth:
+                    self.top_volume -= self.levels[self._price(self.depth)]
+
+
+class OrderBook:
+    """
+    Local order book kept current by Binance diff-depth events.
+
+    The book is loaded from a REST depth snapshot and every later event is
+    applied in update-id order. An event whose updates are all older than
+    the book is ignored; an event starting after the next expected update
+    id means updates were missed, so the event is rejected and the book
+    marked out of sync until the next snapshot is loaded.
+
+    Aggregates over the best `depth` levels of each side (spread,
+    imbalance, volumes) are read in O(1).
+    """
+
+    FEATURES: Tuple[str, ...] = MarketSnapshot.BOOK_FEATURES
+
+    def __init__(self, depth: int = 20) -> None:
+        """
+        Initialize an empty OrderBook.
+
+        Args:
+            depth (int, optional): Number of best levels per side summed in the
+                aggregates. Defaults to 20.
+        """
+        self.bids: BookSide = BookSide(descending=True, depth=depth)
+        self.asks: BookSide = BookSide(descending=False, depth=depth)
+        self.last_update_id: int = 0
+        self.synced: bool = False
+
+    @staticmethod
+    def _apply_levels(side: BookSide, levels: Sequence[Sequence[Any]]) -> None:
+        """
+        Set the levels of a side from Binance [price, quantity] pairs.
+
+        Args:
+            side (BookSide): Side to update.
+            levels (Sequence[Sequence[Any]]): Prices and quantities as strings.
+        """
+        for price, quantity in levels:
+            side.set(float(price), float(quantity))
+
+    def load_snapshot(self, snapshot: Mapping[str, Any]) -> None:
+        """
+        Replace the book with a REST depth snapshot.
+
+        Args:
+            snapshot (Mapping[str, Any]): Response of the depth endpoint, with
+                "lastUpdateId", "bids" and "asks".
+        """
+        self.bids.clear()
+        self.asks.clear()
+        self._apply_levels(self.bids, snapshot["bids"])
+        self._apply_levels(self.asks, snapshot["asks"])
+        self.last_update_id = int(snapshot["lastUpdateId"])
+        self.synced = True
+
+    def apply(self, event: Mapping[str, Any]) -> bool:
+        """
+        Apply a diff-depth event.
+
+        Args:
+            event (Mapping[str, Any]): "depthUpdate" event with its first and
+                last update ids "U" and "u" and the changed levels "b" and "a".
+
+        Returns:
+            bool: False if updates were missed and the book needs a new
+                snapshot, True otherwise.
+        """
+        if not self.synced or event["U"] > self.last_update_id + 1:
+            self.synced = False
+            return False
+        if event["u"] <= self.last_update_id:
+            return True
+        self._apply_levels(self.bids, event["b"])
+        self._apply_levels(self.asks, event["a"])
+        self.last_update_id = int(event["u"])
+        return True
+
+    def features(self) -> Dict[str, float]:
+        """
+        Return the aggregates of the best levels.
+
+        The spread is relative to the mid price, the imbalance is the bid
+        share of the volume minus the ask share, and the microprice is the
+        mid price weighted by the quantity at the opposite best price.
+
+        Returns:
+            Dict[str, float]: `FEATURES` by name, NaN while a side is empty or
+                the book is out of sync.
+        """
+        bid, ask = self.bids.best(), self.asks.best()
+        if not self.synced or math.isnan(bid) or math.isnan(ask):
+            return {name: math.nan for name in self.FEATURES}
+        bid_volume, ask_volume = self.bids.top_volume, self.asks.top_volume
+        volume = bid_volume + ask_volume
+        bid_size, ask_size = self.bids.levels[bid], self.asks.levels[ask]
+        microprice = (bid * ask_size + ask * bid_size) / (bid_size + ask_size)
+        return {
+            "book_spread": 2.0 * (ask - bid) / (ask + bid),
+            "book_imbalance": (bid_volume - ask_volume) / volume,
+            "book_bid_volume": bid_volume,
+            "book_ask_volume": ask_volume,
+            "book_microprice": microprice,
+        }
@@ -0,0 +1,310 @@
+import gzip
+import shutil
+import struct
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, List, Optional, Tuple, Union
+import numpy as np
+from data.market_snapshot import MarketSnapshot
+
+
+def record_dtype(schema_version: int = 1) -> np.dtype:
+    """
+    Build the record layout of a feature schema.
+
+    Args:
+        schema_version (int, optional): Key of `MarketSnapshot.SCHEMAS`. Defaults to 1.
+
+    Returns:
+        np.dtype: Timestamp, fetch latency and the schema's feature columns.
+
+    Raises:
+        ValueError: If the schema version is unknown.
+    """
+    if schema_version not in MarketSnapshot.SCHEMAS:
+        raise ValueError(f"Unknown feature schema version: {schema_version}")
+    return np.dtype(
+        [("timestamp", "<f8"), ("latency", "<f4")]
+        + [(name, "<f8") for name in MarketSnapshot.SCHEMAS[schema_version]]
+    )
+
+
+class SnapshotLogWriter:
+    """
+    Append-only binary log of every tick's market snapshot.
+
+    Records have the fixed width of the log's feature schema
+    (`record_dtype`), which every segment header stores, and are staged in
+    a preallocated NumPy buffer, so an append is a single structured-array
+    assignment. Features a snapshot lacks are logged as NaN. The buffer is
+    written out when it is full or when the flush interval has elapsed.
+    Segments are rotated by size and, optionally, gzip-compressed by a
+    background thread.
+    """
+
+    MAGIC: bytes = b"SAGESNAP"
+    VERSION: int = 2
+    # Version 1 segments have no schema field and hold schema 1 records.
+    HEADER_V1 = struct.Struct("<8sII")
+    HEADER = struct.Struct("<8sIII")
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        flush_interval: float = 5.0,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        buffer_records: int = 4096,
+        compress: bool = True,
+        schema_version: int = 1,
+    ) -> None:
+        """
+        Initialize the SnapshotLogWriter.
+
+        Args:
+            directory (Union[str, Path]): Directory holding the log segments.
+            flush_interval (float, optional): Maximum seconds between flushes. Defaults to 5.0.
+            max_segment_bytes (int, optional): Segment size that triggers rotation. Defaults to 64 MiB.
+            buffer_records (int, optional): Records staged in memory before a forced flush. Defaults to 4096.
+            compress (bool, optional): Gzip rotated segments in the background. Defaults to True.
+            schema_version (int, optional): Feature schema of the records, a key of
+                `MarketSnapshot.SCHEMAS`. Defaults to 1.
+
+        Raises:
+            ValueError: If the schema version is unknown.
+        """
+        self.directory: Path = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_interval: float = flush_interval
+        self.max_segment_bytes: int = max_segment_bytes
+        self.compress: bool = compress
+        self.schema_version: int = schema_version
+        self.dtype: np.dtype = record_dtype(schema_version)
+        self.columns: Tuple[str, ...] = MarketSnapshot.SCHEMAS[schema_version]
+
+        self._buffer: np.ndarray = np.zeros(buffer_records, dtype=self.dtype)
+        self._count: int = 0
+        self._last_flush: float = time.monotonic()
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1)
+        self._pending: List[Future] = []
+
+        existing = SnapshotLogReader(self.directory).segments()
+        self._segment_index: int = (
+            int(existing[-1].name.split(".")[0].split("-")[1]) + 1 if existing else 0
+        )
+        self._file: BinaryIO
+        self._segment_path: Path
+        self._open_segment()
+
+    def _open_segment(self) -> None:
+        """
+        Create a new segment file and write its header.
+        """
+        self._segment_path = self.directory / f"segment-{self._segment_index:06d}.bin"
+        self._file = open(self._segment_path, "wb")
+        self._file.write(
+            self.HEADER.pack(
+                self.MAGIC, self.VERSION, self.dtype.itemsize, self.schema_version
+            )
+        )
+        self._file.flush()
+        self._segment_index += 1
+
+    def _rotate(self) -> None:
+        """
+        Close the current segment, schedule its compression and open a new one.
+        """
+        self._file.close()
+        if self.compress:
+            self._pending.append(
+                self._executor.submit(self._compress_segment, self._segment_path)
+            )
+        self._open_segment()
+
+    @staticmethod
+    def _compress_segment(path: Path) -> Path:
+        """
+        Gzip a closed segment and remove the uncompressed file.
+
+        Args:
+            path (Path): Segment file path.
+
+        Returns:
+            Path: Path of the compressed segment.
+        """
+        target = path.with_name(path.name + ".gz")
+        with open(path, "rb") as source, gzip.open(target, "wb") as destination:
+            shutil.copyfileobj(source, destination)
+        path.unlink()
+        return target
+
+    def append(
+        self,
+        snapshot: MarketSnapshot,
+        latency: float = 0.0,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """
+        Stage one snapshot record, flushing when the buffer or interval is exhausted.
+
+        Args:
+            snapshot (MarketSnapshot): Snapshot to record.
+            latency (float, optional): Seconds spent fetching the snapshot. Defaults to 0.0.
+            timestamp (Optional[float], optional): Epoch seconds. Defaults to now.
+        """
+        self._buffer[self._count] = (
+            time.time() if timestamp is None else timestamp,
+            latency,
+            *snapshot.values(self.columns),
+        )
+        self._count += 1
+        if (
+            self._count == len(self._buffer)
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write staged records to the current segment and rotate it if it is full.
+        """
+        if self._count:
+            self._file.write(self._buffer[: self._count].tobytes())
+            self._file.flush()
+            self._count = 0
+        self._last_flush = time.monotonic()
+        if self._file.tell() >= self.max_segment_bytes:
+            self._rotate()
+
+    def close(self) -> None:
+        """
+        Flush remaining records and wait for background compression to finish.
+        """
+        self.flush()
+        self._file.close()
+        self._executor.shutdown(wait=True)
+        for future in self._pending:
+            future.result()
+        self._pending.clear()
+
+
+class SnapshotLogReader:
+    """
+    Reads snapshot log segments as NumPy structured arrays.
+
+    Uncompressed segments are memory-mapped, so reading a segment costs
+    nothing until its pages are touched; compressed segments are inflated
+    into memory. Segments of version 1, written before the header carried
+    the feature schema, are read as schema 1.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        """
+        Initialize the SnapshotLogReader.
+
+        Args:
+            directory (Union[str, Path]): Directory holding the log segments.
+        """
+        self.directory: Path = Path(directory)
+
+    def segments(self) -> List[Path]:
+        """
+        List the log segments in write order.
+
+        Returns:
+            List[Path]: Segment paths, compressed or not.
+        """
+        return sorted(
+            list(self.directory.glob("segment-*.bin"))
+            + list(self.directory.glob("segment-*.bin.gz")),
+            key=lambda path: path.name.split(".")[0],
+        )
+
+    @staticmethod
+    def _parse_header(data: bytes, path: Path) -> Tuple[int, np.dtype]:
+        """
+        Validate a segment header.
+
+        Args:
+            data (bytes): Leading bytes of the segment, at least `HEADER.size`
+                of them unless the segment is shorter.
+            path (Path): Segment path, used in the error message.
+
+        Returns:
+            Tuple[int, np.dtype]: Header size and record layout of the segment.
+
+        Raises:
+            ValueError: If the header does not describe a compatible segment.
+        """
+        legacy = SnapshotLogWriter.HEADER_V1
+        magic, version, record_size = legacy.unpack(data[: legacy.size])
+        if version == 1:
+            size, schema_version = legacy.size, 1
+        else:
+            size = SnapshotLogWriter.HEADER.size
+            schema_version = SnapshotLogWriter.HEADER.unpack(data[:size])[3]
+        if (
+            magic != SnapshotLogWriter.MAGIC
+            or version > SnapshotLogWriter.VERSION
+            or schema_version not in MarketSnapshot.SCHEMAS
+            or record_size != record_dtype(schema_version).itemsize
+        ):
+            raise ValueError(f"Incompatible snapshot log segment: {path}")
+        return size, record_dtype(schema_version)
+
+    def read_segment(self, path: Union[str, Path]) -> np.ndarray:
+        """
+        Read one segment.
+
+        Args:
+            path (Union[str, Path]): Segment path.
+
+        Returns:
+            np.ndarray: Records with the segment's `record_dtype`. Trailing partial
+            records are ignored.
+
+        Raises:
+            ValueError: If the segment header is not compatible.
+        """
+        path = Path(path)
+        if path.suffix == ".gz":
+            with gzip.open(path, "rb") as f:
+                data = f.read()
+            header_size, dtype = self._parse_header(data, path)
+            count = (len(data) - header_size) // dtype.itemsize
+            return np.frombuffer(data, dtype=dtype, count=count, offset=header_size)
+
+        with open(path, "rb") as f:
+            header_size, dtype = self._parse_header(
+                f.read(SnapshotLogWriter.HEADER.size), path
+            )
+        count = (path.stat().st_size - header_size) // dtype.itemsize
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(
+            path, dtype=dtype, mode="r", offset=header_size, shape=(count,)
+        )
+
+    def read_all(self) -> np.ndarray:
+        """
+        Read and concatenate every segment.
+
+        Segments written in different feature schemas are widened to the
+        largest one, with NaN for the features a segment lacks.
+
+        Returns:
+            np.ndarray: All records in write order.
+        """
+        parts = [self.read_segment(path) for path in self.segments()]
+        if not parts:
+            return np.zeros(0, dtype=record_dtype())
+        dtype = max((part.dtype for part in parts), key=lambda dtype: dtype.itemsize)
+        widened = []
+        for part in parts:
+            if part.dtype != dtype:
+                wide = np.full(len(part), np.nan, dtype=dtype)
+                for name in part.dtype.names:
+                    wide[name] = part[name]
+                part = wide
+            widened.append(part)
+        return np.concatenate(widened)
@@ -0,0 +1,329 @@
+import argparse
+import math
+import sqlite3
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+import pandas as pd
+from data.market_snapshot import MarketSnapshot
+from utils.date_utils import DateUtils
+from utils.file_utils import FileUtils
+from utils.logger import Logger
+
+
+class TradeJournal:
+    """
+    SQLite-backed store of closed trade results.
+
+    The database runs in WAL mode so the bot can append while other readers
+    (training, exports) query it concurrently. Rows carry an autoincrement id
+    for incremental reads and an indexed epoch timestamp for time-range
+    queries; the remaining columns mirror the results CSV schema, followed by
+    the nullable `MarketSnapshot.OPTIONAL_FEATURES` and the feature schema
+    version of the row. Journals created before the optional features
+    existed are migrated in place, their rows keeping their schema version.
+    """
+
+    _COLUMNS: List[str] = (
+        FileUtils.HEADER + list(MarketSnapshot.OPTIONAL_FEATURES) + ["schema_version"]
+    )
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Open (and create if needed) the journal database.
+
+        Args:
+            path (Union[str, Path]): Path to the SQLite database file.
+        """
+        self.path: Path = Path(path)
+        FileUtils.ensure_parent(self.path)
+        self.connection: sqlite3.Connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "timestamp REAL, "
+            "date TEXT NOT NULL, "
+            "result TEXT NOT NULL, "
+            "position TEXT NOT NULL, "
+            "price REAL NOT NULL, "
+            "macd_12 REAL NOT NULL, "
+            "macd_26 REAL NOT NULL, "
+            "ema_100 REAL NOT NULL, "
+            "rsi_6 REAL NOT NULL, "
+            + "".join(f"{name} REAL, " for name in MarketSnapshot.OPTIONAL_FEATURES)
+            + "schema_version INTEGER NOT NULL DEFAULT 1)"
+        )
+        self._migrate()
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results(timestamp)"
+        )
+        self.connection.commit()
+
+    def _migrate(self) -> None:
+        """
+        Add the columns missing from a journal created by an older version.
+        """
+        existing = {
+            row[1] for row in self.connection.execute("PRAGMA table_info(results)")
+        }
+        for name in MarketSnapshot.OPTIONAL_FEATURES:
+            if name not in existing:
+                self.connection.execute(f"ALTER TABLE results ADD COLUMN {name} REAL")
+        if "schema_version" not in existing:
+            self.connection.execute(
+                "ALTER TABLE results "
+                "ADD COLUMN schema_version INTEGER NOT NULL DEFAULT 1"
+            )
+
+    @classmethod
+    def open(
+        cls, path: Union[str, Path], csv_path: Optional[Union[str, Path]] = None
+    ) -> "TradeJournal":
+        """
+        Open the journal, migrating an existing results CSV into it when empty.
+
+        Args:
+            path (Union[str, Path]): Path to the SQLite database file.
+            csv_path (Optional[Union[str, Path]], optional): Legacy results CSV
+                to import on first use. Defaults to None.
+
+        Returns:
+            TradeJournal: Opened journal.
+        """
+        journal = cls(path)
+        if (
+            csv_path is not None
+            and journal.count() == 0
+            and not FileUtils.is_empty_file(csv_path)
+        ):
+            journal.import_csv(csv_path)
+        return journal
+
+    def count(self) -> int:
+        """
+        Return the number of stored trades.
+
+        Returns:
+            int: Row count.
+        """
+        return int(self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0])
+
+    @staticmethod
+    def _record(row: Sequence[Optional[Union[str, float]]]) -> tuple:
+        """
+        Convert an inserted row into the values of the journal columns.
+
+        Missing or NaN optional features are stored as NULL, and the schema
+        version is the newest one whose features are all present.
+
+        Args:
+            row (Sequence[Optional[Union[str, float]]]): Row in the results CSV
+                column order, optionally followed by the optional features.
+
+        Returns:
+            tuple: Timestamp followed by the `_COLUMNS` values.
+        """
+        width = len(FileUtils.HEADER)
+        extras = [
+            None if value is None or math.isnan(value) else float(value)
+            for value in row[width : width + len(MarketSnapshot.OPTIONAL_FEATURES)]
+        ]
+        extras += [None] * (len(MarketSnapshot.OPTIONAL_FEATURES) - len(extras))
+        # Every schema extends the previous one with optional features.
+        known = width - 3 + (extras + [None]).index(None)
+        version = max(
+            version
+            for version, columns in MarketSnapshot.SCHEMAS.items()
+            if len(columns) <= known
+        )
+        return (DateUtils.parse_date(str(row[0])), *row[:width], *extras, version)
+
+    def insert_many(
+        self, rows: Iterable[Sequence[Optional[Union[str, float]]]]
+    ) -> int:
+        """
+        Insert rows in the results CSV column order within one transaction.
+
+        Args:
+            rows (Iterable[Sequence[Optional[Union[str, float]]]]): Rows as
+                (date, result, position, price, macd_12, macd_26, ema_100, rsi_6),
+                optionally followed by the `MarketSnapshot.OPTIONAL_FEATURES`.
+
+        Returns:
+            int: Number of inserted rows.
+        """
+        records = [self._record(row) for row in rows]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO results (timestamp, "
+                + ", ".join(self._COLUMNS)
+                + ") VALUES ("
+                + ", ".join("?" * (len(self._COLUMNS) + 1))
+                + ")",
+                records,
+            )
+        return len(records)
+
+    def insert_frame(self, frame: pd.DataFrame, batch_size: int = 50000) -> int:
+        """
+        Insert a DataFrame with the results CSV columns in batches.
+
+        Optional feature columns missing from the frame are stored as NULL.
+
+        Args:
+            frame (pd.DataFrame): Rows to insert.
+            batch_size (int, optional): Rows per transaction. Defaults to 50000.
+
+        Returns:
+            int: Number of inserted rows.
+        """
+        inserted: int = 0
+        for start in range(0, len(frame), batch_size):
+            batch = frame.iloc[start : start + batch_size].reindex(
+                columns=self._COLUMNS[:-1]
+            )
+            inserted += self.insert_many(batch.itertuples(index=False, name=None))
+        return inserted
+
+    def save_result(
+        self, result: str, position: str, snapshot: MarketSnapshot
+    ) -> None:
+        """
+        Record a closed trade.
+
+        Args:
+            result (str): Correct side of the trade ("LONG"/"SHORT").
+            position (str): Position side that was taken ("LONG"/"SHORT").
+            snapshot (MarketSnapshot): Market snapshot at the time of entry.
+        """
+        self.insert_many(
+            [
+                (
+                    snapshot.date,
+                    result,
+                    position,
+                    float(snapshot.price),
+                    float(snapshot.macd_12),
+                    float(snapshot.macd_26),
+                    float(snapshot.ema_100),
+                    float(snapshot.rsi_6),
+                    *snapshot.values(MarketSnapshot.OPTIONAL_FEATURES),
+                )
+            ]
+        )
+
+    def read_since(self, last_id: int = 0) -> Tuple[pd.DataFrame, int]:
+        """
+        Read only the rows added after a given row id.
+
+        Args:
+            last_id (int, optional): Last row id already consumed. Defaults to 0.
+
+        Returns:
+            Tuple[pd.DataFrame, int]: New rows in the `_COLUMNS` schema and
+                the id of the last returned row (unchanged if there are none).
+        """
+        frame = pd.read_sql_query(
+            "SELECT id, " + ", ".join(self._COLUMNS) + " FROM results "
+            "WHERE id > ? ORDER BY id",
+            self.connection,
+            params=(last_id,),
+        )
+        if not frame.empty:
+            last_id = int(frame["id"].iloc[-1])
+        return frame.drop(columns="id"), last_id
+
+    def read_frame(self) -> pd.DataFrame:
+        """
+        Read every stored trade.
+
+        Returns:
+            pd.DataFrame: All rows in the `_COLUMNS` schema.
+        """
+        return self.read_since(0)[0]
+
+    def import_csv(self, csv_path: Union[str, Path], chunk_size: int = 50000) -> int:
+        """
+        Import a results CSV file into the journal.
+
+        Args:
+            csv_path (Union[str, Path]): Path to the CSV file.
+            chunk_size (int, optional): Rows parsed and inserted per batch. Defaults to 50000.
+
+        Returns:
+            int: Number of imported rows.
+        """
+        imported: int = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            imported += self.insert_frame(chunk, batch_size=chunk_size)
+        return imported
+
+    def export_csv(self, csv_path: Union[str, Path]) -> int:
+        """
+        Export every stored trade to a CSV file.
+
+        The results CSV columns come first, so the file can be imported back.
+
+        Args:
+            csv_path (Union[str, Path]): Destination CSV file.
+
+        Returns:
+            int: Number of exported rows.
+        """
+        frame = self.read_frame()
+        FileUtils.ensure_parent(csv_path)
+        frame.to_csv(csv_path, index=False)
+        return len(frame)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        self.connection.close()
+
+    def __enter__(self) -> "TradeJournal":
+        """
+        Enter a context that closes the journal on exit.
+
+        Returns:
+            TradeJournal: This instance.
+        """
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        """
+        Close the journal when leaving the context.
+        """
+        self.close()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Command-line entry point for migrating and exporting the trade journal.
+
+    Args:
+        argv (Optional[Sequence[str]], optional): Arguments. Defaults to sys.argv.
+
+    Returns:
+        int: Number of migrated or exported rows.
+    """
+    from bot.bot_settings import SETTINGS
+
+    parser = argparse.ArgumentParser(description="Manage the SQLite trade journal.")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--csv", type=Path, default=Path(SETTINGS.OUTPUT_CSV_PATH))
+    parser.add_argument("--db", type=Path, default=Path(SETTINGS.OUTPUT_DB_PATH))
+    args = parser.parse_args(argv)
+
+    with TradeJournal(args.db) as journal:
+        if args.command == "import":
+            count = journal.import_csv(args.csv)
+        else:
+            count = journal.export_csv(args.csv)
+    Logger.log_info(f"{args.command}: {count} rows")
+    return count
+
+
+if __name__ == "__main__":
+    main()
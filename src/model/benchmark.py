@@ -0,0 +1,443 @@
+import argparse
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from bot.bot_settings import SETTINGS
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from model.ensemble_model import EnsembleModel
+from model.logistic_model import LogisticModel
+from model.model_lifecycle import ModelLifecycle
+from model.online_model import OnlineModel
+from tensorflow_model.model_profile import ModelProfile
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import BootstrapWindow, TrainingWindow
+from utils.logger import Logger
+from utils.memory_utils import MemoryUtils
+
+
+def _synthetic_dataset(rows: int, seed: int = 42) -> TrainingDataset:
+    """
+    Build a dataset of random snapshots labelled by a simple RSI rule.
+
+    Args:
+        rows (int): Number of rows.
+        seed (int, optional): Random seed. Defaults to 42.
+
+    Returns:
+        TrainingDataset: Generated training data.
+    """
+    rng = np.random.default_rng(seed)
+    price = 2000.0 + rng.normal(0.0, 50.0, rows)
+    features = np.column_stack(
+        [
+            price,
+            rng.normal(0.0, 5.0, rows),
+            rng.normal(0.0, 5.0, rows),
+            price + rng.normal(0.0, 20.0, rows),
+            rng.uniform(0.0, 100.0, rows),
+        ]
+    )
+    dataset = TrainingDataset()
+    dataset.extend(features, (features[:, 4] < 50.0).astype(np.float32))
+    return dataset
+
+
+def _mean_ms(function: Callable[[], object], iterations: int) -> float:
+    """
+    Measure the mean wall time of a call.
+
+    Args:
+        function (Callable[[], object]): Call to measure.
+        iterations (int): Number of calls.
+
+    Returns:
+        float: Mean milliseconds per call.
+    """
+    started = perf_counter()
+    for _ in range(iterations):
+        function()
+    return (perf_counter() - started) * 1000.0 / iterations
+
+
+def benchmark(
+    dataset: TrainingDataset, backends: Sequence[str], iterations: int
+) -> pd.DataFrame:
+    """
+    Measure update and predict latency of the model backends.
+
+    For the online backend an update is one `update_result` call; for the
+    Keras and logistic backends it is the retrain that follows every new
+    result.
+
+    Args:
+        dataset (TrainingDataset): Training data.
+        backends (Sequence[str]): Backends to measure ("online", "keras",
+            "logistic").
+        iterations (int): Calls measured per online operation and per Keras predict.
+
+    Returns:
+        pd.DataFrame: One row per backend with update_ms and predict_ms.
+    """
+    snapshot = MarketSnapshot(
+        "[2025-01-01 00:00:00]", *dataset.X_train[-1].astype(np.float64)
+    )
+    rows: List[dict] = []
+    for backend in backends:
+        if backend == "online":
+            model = OnlineModel(learning_rate=SETTINGS.MODEL_LEARNING_RATE).fit(dataset)
+            update_ms = _mean_ms(lambda: model.update_result("LONG", snapshot), iterations)
+        elif backend == "logistic":
+            started = perf_counter()
+            model = LogisticModel().fit(dataset)
+            update_ms = (perf_counter() - started) * 1000.0
+        else:
+            from tensorflow_model.tf_model import TFModel
+
+            started = perf_counter()
+            model = TFModel(dataset)
+            update_ms = (perf_counter() - started) * 1000.0
+        predict_ms = _mean_ms(lambda: model.predict(snapshot), iterations)
+        rows.append(
+            {
+                "backend": backend,
+                "rows": len(dataset),
+                "update_ms": update_ms,
+                "predict_ms": predict_ms,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def _scaled_csv_dataset(path: Union[str, Path], scale: int) -> TrainingDataset:
+    """
+    Load a results CSV and repeat its rows to build a large dataset.
+
+    Args:
+        path (Union[str, Path]): Results CSV file.
+        scale (int): Number of times the rows are repeated.
+
+    Returns:
+        TrainingDataset: Scaled training data.
+    """
+    frame = pd.read_csv(path)
+    dataset = TrainingDataset()
+    features = frame[list(dataset.columns)].to_numpy(dtype=np.float32)
+    labels = (frame["result"].to_numpy() == "LONG").astype(np.float32)
+    dataset.extend(np.tile(features, (scale, 1)), np.tile(labels, scale))
+    return dataset
+
+
+def training_throughput(
+    dataset: TrainingDataset, epochs: int, legacy_rows: int
+) -> pd.DataFrame:
+    """
+    Measure training throughput of per-row fitting against the tf.data pipeline.
+
+    The legacy path fits NumPy arrays with `batch_size=1` and a
+    `validation_split`, as TFModel used to. It is limited to `legacy_rows`
+    rows because it is orders of magnitude slower.
+
+    Args:
+        dataset (TrainingDataset): Training data.
+        epochs (int): Epochs per measurement.
+        legacy_rows (int): Training rows used for the legacy path.
+
+    Returns:
+        pd.DataFrame: One row per path with rows, seconds and rows_per_second.
+    """
+    from tensorflow_model.tf_model import TFModel
+
+    X, y = dataset.X_train[:legacy_rows], dataset.y_train[:legacy_rows]
+    model = TFModel._build_model(input_dim=X.shape[1])
+    started = perf_counter()
+    model.fit(X, y, epochs=epochs, batch_size=1, validation_split=0.2, verbose=0)
+    legacy_seconds = perf_counter() - started
+
+    started = perf_counter()
+    trained = TFModel(dataset)
+    pipeline_seconds = perf_counter() - started
+    pipeline_rows = len(dataset.y_train) * trained.epochs_trained
+
+    return pd.DataFrame(
+        [
+            {
+                "path": "batch_size=1",
+                "rows": len(y) * epochs,
+                "seconds": legacy_seconds,
+                "rows_per_second": len(y) * epochs / legacy_seconds,
+            },
+            {
+                "path": "tf.data",
+                "rows": pipeline_rows,
+                "seconds": pipeline_seconds,
+                "rows_per_second": pipeline_rows / pipeline_seconds,
+            },
+        ]
+    )
+
+
+def soak(dataset: TrainingDataset, retrains: int, isolate: bool) -> pd.DataFrame:
+    """
+    Retrain the Keras model repeatedly and record the resident memory.
+
+    Every retrain goes through one `ModelLifecycle`, as in the bot, so a
+    leak shows up as RSS growing with the retrain count.
+
+    Args:
+        dataset (TrainingDataset): Training data.
+        retrains (int): Number of retrains.
+        isolate (bool): Train in a subprocess.
+
+    Returns:
+        pd.DataFrame: One row per retrain with seconds, rss_mb and growth_mb.
+    """
+    lifecycle = ModelLifecycle(isolate=isolate)
+    window = TrainingWindow()
+    profile = ModelProfile.default()
+    rows: List[dict] = []
+    for retrain in range(1, retrains + 1):
+        started = perf_counter()
+        lifecycle.train(dataset, window, profile)
+        rows.append(
+            {
+                "retrain": retrain,
+                "seconds": perf_counter() - started,
+                "rss_mb": lifecycle.rss_mb,
+                "growth_mb": lifecycle.rss_mb - lifecycle.baseline_rss_mb,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def _serving_footprint(
+    runtime: str, directory: str, features: np.ndarray, iterations: int
+) -> dict:
+    """
+    Load a saved model in a fresh process and measure single-row predictions.
+
+    Args:
+        runtime (str): "keras" or "tflite".
+        directory (str): Directory written by the model's `save`.
+        features (np.ndarray): Rows predicted one at a time.
+        iterations (int): Number of predictions.
+
+    Returns:
+        dict: predict_ms, rss_mb and the decisions for `features`.
+    """
+    if runtime == "keras":
+        from tensorflow_model.tf_model import TFModel
+
+        model = TFModel.load(directory)
+    else:
+        from tensorflow_model.tflite_model import TFLiteModel
+
+        model = TFLiteModel.load(directory)
+    snapshots = [
+        MarketSnapshot("[2025-01-01 00:00:00]", *row.astype(np.float64))
+        for row in features
+    ]
+    decisions = [model.predict(snapshot) for snapshot in snapshots]
+    cycle = iter(range(iterations))
+    predict_ms = _mean_ms(
+        lambda: model.predict(snapshots[next(cycle) % len(snapshots)]), iterations
+    )
+    return {
+        "predict_ms": predict_ms,
+        "rss_mb": MemoryUtils.rss_mb(),
+        "decisions": decisions,
+    }
+
+
+def runtime_comparison(
+    dataset: TrainingDataset, iterations: int, quantize: bool
+) -> pd.DataFrame:
+    """
+    Compare serving a trained model with Keras and with its TFLite export.
+
+    Each runtime is loaded in its own spawned process, so the resident
+    memory reflects only what serving that runtime needs.
+
+    Args:
+        dataset (TrainingDataset): Training data.
+        iterations (int): Single-row predictions measured per runtime.
+        quantize (bool): Quantize the TFLite export.
+
+    Returns:
+        pd.DataFrame: One row per runtime with predict_ms, rss_mb, size_bytes
+        and the fraction of decisions that agree with Keras.
+    """
+    from tensorflow_model.tf_model import TFModel
+    from tensorflow_model.tflite_model import TFLiteModel
+
+    model = TFModel(dataset)
+    exported = TFLiteModel.export(model, quantize=quantize)
+    features = dataset.X_test[:200] if len(dataset.X_test) else dataset.X_train[:200]
+    rows: List[dict] = []
+    with tempfile.TemporaryDirectory() as directory:
+        model.save(f"{directory}/keras")
+        exported.save(f"{directory}/tflite")
+        context = multiprocessing.get_context("spawn")
+        for runtime in ("keras", "tflite"):
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(
+                    _serving_footprint,
+                    runtime,
+                    f"{directory}/{runtime}",
+                    features,
+                    iterations,
+                ).result()
+            rows.append({"runtime": runtime, **result})
+        size = {
+            "keras": Path(directory, "keras", TFModel.MODEL_FILE).stat().st_size,
+            "tflite": len(exported.content),
+        }
+    reference = rows[0]["decisions"]
+    for row in rows:
+        decisions = row.pop("decisions")
+        row["size_bytes"] = size[row["runtime"]]
+        same = [a == b for a, b in zip(decisions, reference)]
+        row["agreement"] = float(np.mean(same))
+    return pd.DataFrame(rows)
+
+
+def ensemble_latency(
+    dataset: TrainingDataset, members: int, iterations: int
+) -> pd.DataFrame:
+    """
+    Compare a vectorized ensemble with predicting its members one by one.
+
+    The members are logistic models fitted on bootstrap resamples of the
+    dataset. Latency is measured for one snapshot and for a batch of the
+    test rows (training rows when there are none).
+
+    Args:
+        dataset (TrainingDataset): Training data.
+        members (int): Number of ensemble members.
+        iterations (int): Calls measured per path.
+
+    Returns:
+        pd.DataFrame: One row per path ("single", "sequential", "ensemble")
+            with predict_ms and batch_ms.
+    """
+    window = TrainingWindow()
+    models = [
+        LogisticModel().fit(dataset, BootstrapWindow(window, seed=index))
+        for index in range(members)
+    ]
+    ensemble = EnsembleModel()
+    for index, model in enumerate(models):
+        ensemble.add(str(index), model)
+    batch = dataset.X_test if len(dataset.X_test) else dataset.X_train
+    row = batch[-1:]
+
+    def sequential(features: np.ndarray) -> np.ndarray:
+        return np.mean([model.predict_proba(features) for model in models], axis=0)
+
+    paths = {
+        "single": models[0].predict_proba,
+        "sequential": sequential,
+        "ensemble": ensemble.predict_proba,
+    }
+    return pd.DataFrame(
+        [
+            {
+                "path": path,
+                "members": 1 if path == "single" else members,
+                "predict_ms": _mean_ms(lambda: predict(row), iterations),
+                "batch_rows": len(batch),
+                "batch_ms": _mean_ms(lambda: predict(batch), iterations),
+            }
+            for path, predict in paths.items()
+        ]
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Command-line entry point of the model benchmarks.
+
+    Args:
+        argv (Optional[Sequence[str]], optional): Arguments. Defaults to sys.argv.
+
+    Returns:
+        pd.DataFrame: Latency, throughput, soak, runtime or ensemble table.
+    """
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmark model update/predict latency, training throughput, "
+            "memory over repeated retrains, the serving runtimes or ensembles."
+        )
+    )
+    parser.add_argument("--backends", default="online,keras")
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--journal", action="store_true")
+    parser.add_argument(
+        "--mode",
+        choices=["latency", "throughput", "soak", "runtime", "ensemble"],
+        default="latency",
+    )
+    parser.add_argument("--csv", type=Path, default=None)
+    parser.add_argument("--scale", type=int, default=10000)
+    parser.add_argument("--epochs", type=int, default=1)
+    parser.add_argument("--legacy-rows", type=int, default=20000)
+    parser.add_argument("--retrains", type=int, default=50)
+    parser.add_argument("--isolate", action="store_true")
+    parser.add_argument("--max-growth-mb", type=float, default=None)
+    parser.add_argument("--quantize", action="store_true")
+    parser.add_argument("--members", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.csv is not None:
+        dataset = _scaled_csv_dataset(args.csv, args.scale)
+    elif args.journal:
+        with TradeJournal(SETTINGS.OUTPUT_DB_PATH) as journal:
+            dataset = TrainingDataset.from_journal(
+                journal, schema_version=SETTINGS.MODEL_FEATURE_SCHEMA
+            )
+    else:
+        dataset = _synthetic_dataset(args.rows)
+    if args.mode == "throughput":
+        table = training_throughput(dataset, args.epochs, args.legacy_rows)
+        Logger.log_info(f"Measured training throughput on {len(dataset)} rows")
+        print(table.to_string(index=False))
+        return table
+    if args.mode == "runtime":
+        table = runtime_comparison(dataset, args.iterations, args.quantize)
+        Logger.log_info(f"Compared serving runtimes on {len(dataset)} rows")
+        print(table.to_string(index=False))
+        return table
+    if args.mode == "ensemble":
+        table = ensemble_latency(dataset, args.members, args.iterations)
+        Logger.log_info(f"Compared {args.members}-member ensemble paths")
+        print(table.to_string(index=False))
+        return table
+    if args.mode == "soak":
+        table = soak(dataset, args.retrains, args.isolate)
+        growth = float(table["growth_mb"].iloc[-1]) if len(table) else 0.0
+        Logger.log_info(
+            f"RSS grew {growth:.1f} MiB over {len(table)} retrains "
+            f"on {len(dataset)} rows"
+        )
+        print(table.to_string(index=False))
+        if args.max_growth_mb is not None and growth > args.max_growth_mb:
+            parser.exit(
+                1, f"RSS growth {growth:.1f} MiB exceeds {args.max_growth_mb} MiB\n"
+            )
+        return table
+
+    backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+    table = benchmark(dataset, backends, args.iterations)
+    Logger.log_info(f"Benchmarked {len(backends)} backends on {len(dataset)} rows")
+    print(table.to_string(index=False))
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+from typing import Dict, List, Tuple
+import numpy as np
+from model.prediction_model import PredictionModel
+
+
+class _MemberGroup:
+    """
+    Members with the same layer shapes, stacked along a leading member axis.
+    """
+
+    def __init__(self, indices: List[int]) -> None:
+        """
+        Initialize an empty _MemberGroup.
+
+        Args:
+            indices (List[int]): Positions of the members in the ensemble.
+        """
+        self.indices: List[int] = indices
+        self.mean: np.ndarray = np.zeros((0, 0))
+        self.inv_std: np.ndarray = np.zeros((0, 0))
+        self.kernels: List[np.ndarray] = []
+        self.biases: List[np.ndarray] = []
+
+    def forward(self, features: np.ndarray) -> np.ndarray:
+        """
+        Evaluate every member of the group on the same rows.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, number of features).
+
+        Returns:
+            np.ndarray: Probabilities of shape (members, n).
+        """
+        values = (features[None] - self.mean[:, None]) * self.inv_std[:, None]
+        for kernel, bias in zip(self.kernels[:-1], self.biases[:-1]):
+            values = np.maximum(np.matmul(values, kernel) + bias, 0.0)
+        logits = np.matmul(values, self.kernels[-1]) + self.biases[-1]
+        return 0.5 * (1.0 + np.tanh(0.5 * logits[:, :, 0]))
+
+
+class EnsembleModel(PredictionModel):
+    """
+    Several trained models voting on each prediction in one vectorized pass.
+
+    Each member is frozen into its normalization statistics and dense layers
+    when it is added, so the model it came from can be retrained or released
+    afterwards. Members with the same layer shapes are stacked into 3-D
+    kernels and evaluated together with batched matrix products, which makes
+    a prediction cost about one NumPy forward pass per architecture rather
+    than one model call per member.
+
+    The "mean" vote averages the member probabilities. The "majority" vote
+    returns the share of members voting LONG, breaking ties with the mean.
+    Every prediction also counts how often each member agrees with the
+    ensemble decision and how often all members agree.
+    """
+
+    VOTES = ("mean", "majority")
+
+    def __init__(self, vote: str = "mean") -> None:
+        """
+        Initialize an EnsembleModel without members.
+
+        Args:
+            vote (str, optional): "mean" or "majority". Defaults to "mean".
+
+        Raises:
+            ValueError: If the vote is unknown.
+        """
+        if vote not in self.VOTES:
+            raise ValueError(f"Unknown ensemble vote: {vote}")
+        self.vote: str = vote
+        self.names: List[str] = []
+        self._members: List[Tuple[np.ndarray, np.ndarray, List[tuple]]] = []
+        self._groups: List[_MemberGroup] = []
+        self.rows: int = 0
+        self.unanimous: int = 0
+        self.agreements: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.X_train: np.ndarray = np.zeros((0, 0))
+        self.y_train: np.ndarray = np.zeros(0)
+
+    def __len__(self) -> int:
+        """
+        Return the number of members.
+
+        Returns:
+            int: Number of members.
+        """
+        return len(self.names)
+
+    def add(self, name: str, model: PredictionModel) -> None:
+        """
+        Freeze a trained model into the ensemble.
+
+        The training rows and feature columns of the first member become the
+        ensemble's `X_train`, `y_train` and `columns`.
+
+        Args:
+            name (str): Member name used in the agreement statistics.
+            model (PredictionModel): Trained model exposing `layers` and `scaler`.
+
+        Raises:
+            NotImplementedError: If the model has no dense layers.
+        """
+        layers = [
+            (np.asarray(kernel, dtype=np.float64), np.asarray(bias, dtype=np.float64))
+            for kernel, bias in model.layers()
+        ]
+        if not self.names:
+            self.X_train, self.y_train = model.X_train, model.y_train
+            self.columns = model.columns
+        self.names.append(name)
+        self._members.append((model.scaler.mean.copy(), 1.0 / model.scaler.std, layers))
+        self._stack()
+
+    def _stack(self) -> None:
+        """
+        Rebuild the member groups from the frozen members.
+        """
+        shapes: Dict[tuple, List[int]] = {}
+        for index, (mean, _, layers) in enumerate(self._members):
+            key = (mean.shape,) + tuple(kernel.shape for kernel, _ in layers)
+            shapes.setdefault(key, []).append(index)
+        self._groups = []
+        for indices in shapes.values():
+            group = _MemberGroup(indices)
+            members = [self._members[i] for i in indices]
+            group.mean = np.stack([mean for mean, _, _ in members])
+            group.inv_std = np.stack([inv_std for _, inv_std, _ in members])
+            for depth in range(len(members[0][2])):
+                kernels, biases = zip(*(layers[depth] for _, _, layers in members))
+                group.kernels.append(np.stack(kernels))
+                group.biases.append(np.stack(biases)[:, None])
+            self._groups.append(group)
+        self.agreements = np.zeros(len(self._members), dtype=np.int64)
+        self.rows = self.unanimous = 0
+
+    def member_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Return the LONG probability of every member for feature rows.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, number of features).
+
+        Returns:
+            np.ndarray: Probabilities of shape (members, n), in member order.
+
+        Raises:
+            ValueError: If the ensemble has no members.
+        """
+        if not self._members:
+            raise ValueError("Ensemble has no members")
+        features = np.asarray(features, dtype=np.float64)
+        probabilities = np.empty((len(self._members), len(features)))
+        for group in self._groups:
+            probabilities[group.indices] = group.forward(features)
+        return probabilities
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Return the ensemble's LONG probability and count member agreement.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, number of features).
+
+        Returns:
+            np.ndarray: Probabilities, one per row.
+        """
+        probabilities = self.member_proba(features)
+        mean = probabilities.mean(axis=0)
+        votes = probabilities >= 0.5
+        if self.vote == "majority":
+            share = votes.mean(axis=0)
+            result = np.where(share == 0.5, mean, share)
+        else:
+            result = mean
+        decisions = result >= 0.5
+        self.rows += len(decisions)
+        self.agreements += np.count_nonzero(votes == decisions, axis=1)
+        self.unanimous += int(np.count_nonzero(votes.all(axis=0) | ~votes.any(axis=0)))
+        return result
+
+    def agreement(self) -> Dict[str, float]:
+        """
+        Return the agreement statistics of the predictions made so far.
+
+        Returns:
+            Dict[str, float]: Share of rows on which each member made the
+                ensemble decision, and under "unanimous" the share of rows on
+                which all members agreed. Empty before the first prediction.
+        """
+        if self.rows == 0:
+            return {}
+        stats = {
+            name: float(count) / self.rows
+            for name, count in zip(self.names, self.agreements)
+        }
+        stats["unanimous"] = self.unanimous / self.rows
+        return stats
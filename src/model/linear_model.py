@@ -0,0 +1,50 @@
+from typing import List, Tuple
+import numpy as np
+from model.prediction_model import PredictionModel
+
+
+class LinearModel(PredictionModel):
+    """
+    Base of the logistic regressions: one sigmoid unit over standardized features.
+
+    Subclasses only differ in how they learn `weights` and `bias`; the
+    probability, the layer export used by `EnsembleModel` and the logistic
+    function are shared.
+    """
+
+    weights: np.ndarray
+    bias: float
+
+    @staticmethod
+    def _sigmoid(value):
+        """
+        Numerically stable logistic function.
+
+        Args:
+            value: Scalar or array of logits.
+
+        Returns:
+            Probabilities with the same shape.
+        """
+        return 0.5 * (1.0 + np.tanh(0.5 * value))
+
+    def layers(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Return the model as a single sigmoid layer.
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray]]: Kernel and bias of the layer.
+        """
+        return [(self.weights[:, None], np.array([self.bias]))]
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Return the LONG probability for one row or a matrix of rows.
+
+        Args:
+            features (np.ndarray): A row or a matrix of rows.
+
+        Returns:
+            np.ndarray: Probabilities.
+        """
+        return self._sigmoid(self.scaler.transform(features) @ self.weights + self.bias)
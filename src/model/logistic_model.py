@@ -0,0 +1,93 @@
+from typing import Optional
+import numpy as np
+from model.linear_model import LinearModel
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import TrainingWindow
+from utils.running_stats import RunningStats
+
+
+class LogisticModel(LinearModel):
+    """
+    Batch logistic regression in NumPy, the TensorFlow-free twin of `TFModel`.
+
+    It has the architecture of the default Keras model, one sigmoid unit over
+    features standardized with the dataset's running statistics, but it is
+    fitted with Newton's method on the rows chosen by the training window.
+    That converges in a few iterations of O(rows * features²), so the model
+    is simply refitted when the dataset grows, and neither training nor
+    prediction needs TensorFlow in the process.
+    """
+
+    def __init__(self, l2: float = 1e-4, max_iter: int = 50, tol: float = 1e-8) -> None:
+        """
+        Initialize an untrained LogisticModel.
+
+        Args:
+            l2 (float, optional): L2 regularization of the weights. Defaults to 1e-4.
+            max_iter (int, optional): Maximum Newton iterations. Defaults to 50.
+            tol (float, optional): Largest parameter step at which fitting stops.
+                Defaults to 1e-8.
+        """
+        self.l2: float = l2
+        self.max_iter: int = max_iter
+        self.tol: float = tol
+        self.scaler: RunningStats = RunningStats(0)
+        self.weights: np.ndarray = np.zeros(0, dtype=np.float64)
+        self.bias: float = 0.0
+        self.iterations: int = 0
+
+    def fit(
+        self, dataset: TrainingDataset, window: Optional[TrainingWindow] = None
+    ) -> "LogisticModel":
+        """
+        Fit the model on the training rows of a dataset.
+
+        Args:
+            dataset (TrainingDataset): Training data.
+            window (Optional[TrainingWindow], optional): Training-set policy.
+                Defaults to every training row.
+
+        Returns:
+            LogisticModel: The model itself.
+
+        Raises:
+            ValueError: If the dataset contains no data.
+        """
+        if len(dataset) == 0:
+            raise ValueError("No data in trade journal")
+        self.columns = dataset.columns
+        self.scaler = dataset.stats.copy()
+        self.X_train, self.y_train = (window or TrainingWindow()).select(dataset)
+        self.X_test, self.y_test = dataset.X_test, dataset.y_test
+
+        X = self.scaler.transform(self.X_train)
+        X = np.column_stack([X, np.ones(len(X))])
+        y = self.y_train.astype(np.float64)
+        penalty = np.full(X.shape[1], self.l2)
+        # A tiny ridge on the bias keeps the Hessian invertible for one-class data.
+        penalty[-1] = 1e-10
+        params = np.zeros(X.shape[1])
+        rows = max(len(y), 1)
+        self.iterations = 0
+        while self.iterations < self.max_iter:
+            self.iterations += 1
+            probs = self._sigmoid(X @ params)
+            gradient = X.T @ (probs - y) / rows + penalty * params
+            hessian = (X.T * (probs * (1.0 - probs))) @ X / rows + np.diag(penalty)
+            step = np.linalg.solve(hessian, gradient)
+            params -= step
+            if np.max(np.abs(step)) < self.tol:
+                break
+        self.weights, self.bias = params[:-1], float(params[-1])
+        return self
+
+    def get_accuracy_metric(self) -> float:
+        """
+        Evaluate the fitted model on the test set.
+
+        Returns:
+            float: Accuracy on the test rows, 0.0 without test rows.
+        """
+        if len(self.y_test) == 0:
+            return 0.0
+        return float(np.mean(self.predict_batch(self.X_test) == (self.y_test == 1.0)))
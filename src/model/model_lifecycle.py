@@ -0,0 +1,234 @@
+import gc
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Tuple
+import numpy as np
+from tensorflow_model.model_profile import ModelProfile
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import TrainingWindow
+from utils.memory_utils import MemoryUtils
+from utils.metrics import Metrics
+
+
+def _train_isolated(
+    dataset: TrainingDataset,
+    window: TrainingWindow,
+    profile: ModelProfile,
+    directory: str,
+) -> int:
+    """
+    Train a Keras model in a worker process and save it as a checkpoint.
+
+    Args:
+        dataset (TrainingDataset): Training data.
+        window (TrainingWindow): Copy of the manager's training-set policy.
+        profile (ModelProfile): Hyperparameters.
+        directory (str): Checkpoint directory read back by the parent.
+
+    Returns:
+        int: Number of epochs trained.
+    """
+    from tensorflow_model.tf_model import TFModel
+
+    model = TFModel(dataset, window=window, profile=profile)
+    model.save(directory)
+    return model.epochs_trained
+
+
+class ModelLifecycle:
+    """
+    Bounds the memory that repeated Keras retraining accumulates.
+
+    Building a new `Sequential` for every retrain leaves graph and weight
+    objects behind in the Keras backend, so a long-running bot grows until
+    it runs out of memory. The lifecycle keeps one compiled network and
+    reuses it while the architecture (input width, learning rate and hidden
+    layers) is unchanged, resetting its weights and optimizer state to the
+    values they had when it was built. A new network is only built when the
+    architecture changes, after the old one is released by clearing the
+    Keras session. The session is global to the process, so lifecycles of
+    models trained beside the serving one, such as shadow candidates, are
+    created with `clear_session=False` and only drop their references.
+
+    With `isolate`, every retrain instead runs in a short-lived spawned
+    process that saves a checkpoint, which the bot loads after releasing the
+    previous model, so the memory used for training is returned to the OS.
+
+    The resident memory is measured after every retrain and exported as the
+    `model.rss_mb` gauge, with `model.rss_growth_mb` relative to the first
+    retrain, so leaks show up in soak tests. Lifecycles of other models
+    export them under their own metric prefix.
+    """
+
+    def __init__(
+        self,
+        isolate: bool = False,
+        clear_session: bool = True,
+        metric_prefix: str = "model.",
+    ) -> None:
+        """
+        Initialize the ModelLifecycle.
+
+        Args:
+            isolate (bool, optional): Train in a subprocess. Defaults to False.
+            clear_session (bool, optional): Clear the Keras session when the
+                network is released. Defaults to True.
+            metric_prefix (str, optional): Prefix of the exported metric names.
+                Defaults to "model.".
+        """
+        self.isolate: bool = isolate
+        self.clear_session: bool = clear_session
+        self.metric_prefix: str = metric_prefix
+        self.network: Any = None
+        self.architecture: Optional[Tuple[Any, ...]] = None
+        self.retrains: int = 0
+        self.rss_mb: float = 0.0
+        self.baseline_rss_mb: Optional[float] = None
+        self._initial_state: List[np.ndarray] = []
+
+    @staticmethod
+    def _state_variables(network: Any) -> List[Any]:
+        """
+        List the variables that training changes.
+
+        Args:
+            network (Any): Compiled Keras model.
+
+        Returns:
+            List[Any]: Model weights followed by the optimizer variables.
+        """
+        return list(network.weights) + list(network.optimizer.variables)
+
+    def acquire(self, input_dim: int, profile: ModelProfile) -> Any:
+        """
+        Return a compiled network in its initial state for the given architecture.
+
+        Args:
+            input_dim (int): Number of input features.
+            profile (ModelProfile): Hyperparameters.
+
+        Returns:
+            Any: Compiled Keras model.
+        """
+        architecture = (input_dim, profile.learning_rate, profile.hidden_units)
+        if self.network is not None and architecture == self.architecture:
+            for variable, value in zip(
+                self._state_variables(self.network), self._initial_state
+            ):
+                variable.assign(value)
+            return self.network
+
+        from tensorflow_model.tf_model import TFModel
+
+        self.release()
+        network = TFModel._build_model(
+            input_dim=input_dim,
+            learning_rate=profile.learning_rate,
+            hidden_units=profile.hidden_units,
+        )
+        network.optimizer.build(network.trainable_variables)
+        self.network = network
+        self.architecture = architecture
+        self._initial_state = [
+            np.array(variable.numpy()) for variable in self._state_variables(network)
+        ]
+        return network
+
+    def release(self) -> None:
+        """
+        Drop the reusable network and clear the Keras session, if enabled.
+
+        After a session clear, models built earlier must no longer be used.
+        """
+        self.network = None
+        self.architecture = None
+        self._initial_state = []
+        if self.clear_session:
+            import tensorflow as tf
+
+            tf.keras.backend.clear_session()
+        gc.collect()
+
+    def train(
+        self,
+        dataset: TrainingDataset,
+        window: TrainingWindow,
+        profile: ModelProfile,
+    ) -> Any:
+        """
+        Train a `TFModel`, reusing or releasing the previous network.
+
+        Args:
+            dataset (TrainingDataset): Training data.
+            window (TrainingWindow): Training-set policy.
+            profile (ModelProfile): Hyperparameters.
+
+        Returns:
+            Any: Trained `TFModel`.
+
+        Raises:
+            ValueError: If the dataset contains no data.
+        """
+        from tensorflow_model import tf_model
+
+        if len(dataset) == 0:
+            raise ValueError("No data in trade journal")
+        if self.isolate:
+            model = self._train_in_subprocess(tf_model.TFModel, dataset, window, profile)
+        else:
+            network = self.acquire(len(dataset.columns), profile)
+            model = tf_model.TFModel(
+                dataset, window=window, profile=profile, network=network
+            )
+        self._track_memory()
+        return model
+
+    def _train_in_subprocess(
+        self,
+        model_class: Any,
+        dataset: TrainingDataset,
+        window: TrainingWindow,
+        profile: ModelProfile,
+    ) -> Any:
+        """
+        Train in a spawned process and load the resulting checkpoint.
+
+        Args:
+            model_class (Any): `TFModel` class providing `load`.
+            dataset (TrainingDataset): Training data.
+            window (TrainingWindow): Training-set policy.
+            profile (ModelProfile): Hyperparameters.
+
+        Returns:
+            Any: Trained `TFModel` with the training rows attached.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            with ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                epochs = executor.submit(
+                    _train_isolated, dataset, window, profile, directory
+                ).result()
+            self.release()
+            model = model_class.load(directory)
+        # The worker trained on a copy of the window; selecting here advances
+        # this window the same way and yields the same rows.
+        model.X_train, model.y_train = window.select(dataset)
+        model.X_test, model.y_test = dataset.X_test, dataset.y_test
+        model.epochs_trained = epochs
+        return model
+
+    def _track_memory(self) -> None:
+        """
+        Record the resident memory after a retrain.
+        """
+        self.retrains += 1
+        self.rss_mb = MemoryUtils.rss_mb()
+        if self.baseline_rss_mb is None:
+            self.baseline_rss_mb = self.rss_mb
+        Metrics.increment(f"{self.metric_prefix}retrains")
+        Metrics.set_gauge(f"{self.metric_prefix}rss_mb", self.rss_mb)
+        Metrics.set_gauge(
+            f"{self.metric_prefix}rss_growth_mb", self.rss_mb - self.baseline_rss_mb
+        )
@@ -0,0 +1,414 @@
+from dataclasses import replace
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Optional, Tuple
+import numpy as np
+from bot.bot_settings import SETTINGS
+from data.market_snapshot import MarketSnapshot
+from model.ensemble_model import EnsembleModel
+from model.logistic_model import LogisticModel
+from model.model_lifecycle import ModelLifecycle
+from model.online_model import OnlineModel
+from model.prediction_model import PredictionModel
+from model.prediction_cache import PredictionCache
+from tensorflow_model.model_profile import ModelProfile
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import BootstrapWindow, TrainingWindow
+from utils.date_utils import DateUtils
+from utils.logger import Logger
+from utils.metrics import Metrics
+
+
+class ModelManager:
+    """
+    Owns the prediction model selected in the settings and keeps it current.
+
+    Four backends implement the `PredictionModel` interface:
+        - "keras": `TFModel`, retrained on the rows chosen by the configured
+          training window, but only when new results have been recorded
+          since the last training. Its hyperparameters come from the model
+          profile written by the hyperparameter search, when one exists.
+          Each trained network is checkpointed with its normalization
+          statistics and profile, and a checkpoint matching the dataset and
+          profile is reused at startup instead of retraining. Retraining
+          goes through a `ModelLifecycle`, which reuses one compiled network
+          and tracks the memory of the process. With the "tflite" runtime,
+          every trained network is exported to a `TFLiteModel` that serves
+          the predictions, as long as its decisions agree with Keras.
+        - "online": `OnlineModel`, updated in constant time per closed trade.
+        - "logistic": `LogisticModel`, the single-unit Keras architecture
+          fitted in NumPy when new results have been recorded, for
+          deployments without TensorFlow.
+        - "ensemble": `EnsembleModel` over the "keras" and "logistic" members
+          listed in SETTINGS.MODEL_ENSEMBLE_MEMBERS, retrained together when
+          new results have been recorded. The first member trains on the
+          rows of the training window and the others on bootstrap resamples
+          of them, so members of the same kind still differ. The agreement
+          of each member with the ensemble is logged after every training.
+          Ensembles are not checkpointed.
+
+    Every change of the model bumps `version`. Predictions are memoized per
+    candle in a `PredictionCache` that is cleared when the version changes.
+    """
+
+    BACKENDS = ("keras", "online", "logistic", "ensemble")
+    RUNTIMES = ("keras", "tflite")
+    AGREEMENT_ROWS = 1000
+
+    def __init__(
+        self,
+        dataset: TrainingDataset,
+        backend: Optional[str] = None,
+        shadow: bool = False,
+        metric_prefix: str = "model.",
+    ) -> None:
+        """
+        Initialize the ModelManager.
+
+        Args:
+            dataset (TrainingDataset): Training data shared with the bot.
+            backend (Optional[str], optional): "keras", "online", "logistic" or
+                "ensemble". Defaults to SETTINGS.MODEL_BACKEND.
+            shadow (bool, optional): Candidate trained beside the serving model
+                on another thread, which must never clear the shared Keras
+                session. Defaults to False.
+            metric_prefix (str, optional): Prefix of the exported metric names,
+                so that shadow models do not overwrite the serving model's
+                metrics. Defaults to "model.".
+
+        Raises:
+            ValueError: If the backend, the runtime or an ensemble member is unknown.
+        """
+        self.backend: str = backend or SETTINGS.MODEL_BACKEND
+        self.metric_prefix: str = metric_prefix
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown model backend: {self.backend}")
+        if self.backend == "ensemble":
+            for spec in SETTINGS.MODEL_ENSEMBLE_MEMBERS:
+                self._parse_member(spec)
+        self.runtime: str = SETTINGS.MODEL_RUNTIME
+        if self.runtime not in self.RUNTIMES:
+            raise ValueError(f"Unknown model runtime: {self.runtime}")
+        self.dataset: TrainingDataset = dataset
+        self.window: TrainingWindow = TrainingWindow.create(
+            SETTINGS.MODEL_WINDOW,
+            SETTINGS.MODEL_WINDOW_SIZE,
+            SETTINGS.MODEL_DECAY_HALF_LIFE,
+        )
+        self.profile: ModelProfile = self._load_profile()
+        self.model: Optional[PredictionModel] = None
+        self.lifecycle: ModelLifecycle = ModelLifecycle(
+            isolate=SETTINGS.MODEL_ISOLATE_TRAINING,
+            clear_session=not shadow,
+            metric_prefix=metric_prefix,
+        )
+        self.version: int = 0
+        self.prediction_cache: PredictionCache = PredictionCache(
+            SETTINGS.MODEL_PREDICTION_CACHE_SIZE,
+            DateUtils.interval_to_seconds(SETTINGS.INTERVAL),
+            SETTINGS.MODEL_PREDICTION_CACHE_DIGITS,
+            dataset.columns,
+            metric_prefix,
+        )
+        self._trained_size: int = -1
+        if self.backend == "online":
+            self.model = OnlineModel(
+                learning_rate=SETTINGS.MODEL_LEARNING_RATE, columns=dataset.columns
+            ).fit(dataset)
+            self._trained_size = len(dataset)
+            Metrics.set_gauge(f"{self.metric_prefix}training_rows", len(dataset))
+
+    @staticmethod
+    def _load_profile() -> ModelProfile:
+        """
+        Load the model profile from the settings path, falling back to the defaults.
+
+        Returns:
+            ModelProfile: Hyperparameters of the Keras model.
+        """
+        profile = ModelProfile.load(SETTINGS.MODEL_PROFILE_PATH)
+        if profile is None:
+            return ModelProfile.default()
+        Logger.log_info(f"Loaded model profile from {SETTINGS.MODEL_PROFILE_PATH}")
+        return profile
+
+    @classmethod
+    def uses_keras(cls, backend: str) -> bool:
+        """
+        Tell whether a backend trains Keras networks in the bot process.
+
+        Args:
+            backend (str): Model backend.
+
+        Returns:
+            bool: True for "keras" and for an ensemble with a Keras member.
+        """
+        if backend == "ensemble":
+            return any(
+                cls._parse_member(spec)[0] == "keras"
+                for spec in SETTINGS.MODEL_ENSEMBLE_MEMBERS
+            )
+        return backend == "keras"
+
+    @staticmethod
+    def _parse_member(spec: str) -> Tuple[str, Optional[Tuple[int, ...]]]:
+        """
+        Parse an ensemble member such as "logistic", "keras" or "keras:16x8".
+
+        Args:
+            spec (str): Backend, followed for "keras" by the optional sizes of
+                the hidden layers, overriding the model profile.
+
+        Returns:
+            Tuple[str, Optional[Tuple[int, ...]]]: Backend and hidden layer sizes,
+                None to keep the profile's.
+
+        Raises:
+            ValueError: If the member is not valid.
+        """
+        backend, _, units = spec.partition(":")
+        if backend not in ("keras", "logistic") or (units and backend != "keras"):
+            raise ValueError(f"Unknown ensemble member: {spec}")
+        if not units:
+            return backend, None
+        try:
+            return backend, tuple(int(size) for size in units.split("x"))
+        except ValueError:
+            raise ValueError(f"Unknown ensemble member: {spec}") from None
+
+    def record_result(self, result: str, snapshot: MarketSnapshot) -> None:
+        """
+        Record a closed trade in the dataset and, for the online backend, the model.
+
+        Trades whose snapshot lacks a feature of the dataset's schema are skipped.
+
+        Args:
+            result (str): Correct side of the trade ("LONG"/"SHORT").
+            snapshot (MarketSnapshot): Market snapshot at the time of entry.
+        """
+        if not self.dataset.append_result(result, snapshot):
+            return
+        if self.backend == "online":
+            self.model.update_result(result, snapshot)
+            self.version += 1
+            self._trained_size = len(self.dataset)
+            Metrics.set_gauge(f"{self.metric_prefix}training_rows", len(self.dataset))
+
+    def _current_model(self) -> PredictionModel:
+        """
+        Return a model trained on the current dataset, retraining it if needed.
+
+        Returns:
+            PredictionModel: Model exposing `predict` and `predict_batch`.
+
+        Raises:
+            ValueError: If the dataset contains no data.
+        """
+        if len(self.dataset) == 0:
+            raise ValueError("No data in trade journal")
+        if self._trained_size == len(self.dataset):
+            return self.model
+        if self.backend == "logistic":
+            self._retrain(lambda: LogisticModel().fit(self.dataset, self.window))
+            return self.model
+        if self.backend == "ensemble":
+            self._retrain(self._train_ensemble)
+            self._report_agreement()
+            return self.model
+
+        from tensorflow_model.tf_model import TFModel
+
+        if self._trained_size < 0 and self._load_checkpoint(TFModel):
+            return self.model
+        self._retrain(
+            lambda: self.lifecycle.train(self.dataset, self.window, self.profile)
+        )
+        self._save_checkpoint()
+        self._select_runtime()
+        return self.model
+
+    def _retrain(self, train: Callable[[], PredictionModel]) -> None:
+        """
+        Replace the model with a newly trained one and report the training.
+
+        Args:
+            train (Callable[[], PredictionModel]): Trains the new model.
+        """
+        started: float = perf_counter()
+        self.model = train()
+        elapsed: float = perf_counter() - started
+        self.version += 1
+        self._trained_size = len(self.dataset)
+        Metrics.set_gauge(
+            f"{self.metric_prefix}training_rows", len(self.model.y_train)
+        )
+        Metrics.set_gauge(f"{self.metric_prefix}train_seconds", elapsed)
+        memory = ""
+        if self.lifecycle.retrains:
+            memory = f", RSS {self.lifecycle.rss_mb:.0f} MiB"
+        Logger.log_info(
+            f"Model trained on {len(self.model.y_train)} of "
+            f"{len(self.dataset)} rows in {elapsed:.2f}s{memory}"
+        )
+
+    def _train_ensemble(self) -> EnsembleModel:
+        """
+        Train every ensemble member and freeze it into a new ensemble.
+
+        Returns:
+            EnsembleModel: Ensemble voting with SETTINGS.MODEL_ENSEMBLE_VOTE.
+        """
+        ensemble = EnsembleModel(SETTINGS.MODEL_ENSEMBLE_VOTE)
+        for index, spec in enumerate(SETTINGS.MODEL_ENSEMBLE_MEMBERS):
+            backend, hidden_units = self._parse_member(spec)
+            window = self.window
+            if index:
+                window = BootstrapWindow(self.window, seed=index)
+            if backend == "logistic":
+                member = LogisticModel().fit(self.dataset, window)
+            else:
+                profile = self.profile
+                if hidden_units is not None:
+                    profile = replace(profile, hidden_units=hidden_units)
+                member = self.lifecycle.train(self.dataset, window, profile)
+            # Freezing copies the weights before the next member reuses the network.
+            ensemble.add(f"{index}:{spec}", member)
+        return ensemble
+
+    def _recent_features(self) -> np.ndarray:
+        """
+        Return the most recent test rows, or training rows when there are none.
+
+        Returns:
+            np.ndarray: At most AGREEMENT_ROWS feature rows.
+        """
+        features = self.dataset.X_test
+        if len(features) == 0:
+            features = self.dataset.X_train
+        return features[-self.AGREEMENT_ROWS :]
+
+    def _report_agreement(self) -> None:
+        """
+        Evaluate the ensemble on recent rows and report how often its members agree.
+        """
+        features = self._recent_features()
+        self.model.predict_proba(features)
+        stats = self.model.agreement()
+        for name, share in stats.items():
+            Metrics.set_gauge(f"{self.metric_prefix}ensemble_agreement.{name}", share)
+        Logger.log_info(
+            f"Ensemble agreement on {len(features)} rows: "
+            + ", ".join(f"{name} {share:.1%}" for name, share in stats.items())
+        )
+
+    def _load_checkpoint(self, model_class: Any) -> bool:
+        """
+        Use the saved Keras model if it was trained on the current training rows
+        and feature schema with the current profile.
+
+        Args:
+            model_class (Any): `TFModel` class providing `load`.
+
+        Returns:
+            bool: True if the checkpoint was loaded.
+        """
+        directory = Path(SETTINGS.MODEL_CHECKPOINT_DIR)
+        if not (directory / model_class.SCALER_FILE).exists():
+            return False
+        try:
+            model = model_class.load(directory)
+        except (OSError, ValueError) as e:
+            Logger.log_exception(f"Ignoring unreadable model checkpoint: {e}")
+            return False
+        if (
+            len(model.scaler.mean) != len(self.dataset.columns)
+            or model.scaler.count != self.dataset.stats.count
+            or model.profile != self.profile
+        ):
+            Logger.log_info("Ignoring stale model checkpoint")
+            return False
+        self.model = model
+        self.version += 1
+        self._trained_size = len(self.dataset)
+        Metrics.set_gauge(f"{self.metric_prefix}training_rows", model.scaler.count)
+        Logger.log_info(f"Model loaded from checkpoint in {directory}")
+        self._select_runtime()
+        return True
+
+    def _select_runtime(self) -> None:
+        """
+        Replace the Keras model with its TFLite export when that runtime is configured.
+
+        The export is kept only if its decisions on the most recent test rows
+        (training rows when there are none) agree with Keras at least as often
+        as SETTINGS.MODEL_TFLITE_MIN_AGREEMENT; otherwise Keras keeps serving.
+        """
+        if self.runtime != "tflite":
+            return
+        from tensorflow_model.tflite_model import TFLiteModel
+
+        features = self._recent_features()
+        exported = TFLiteModel.export(
+            self.model, quantize=SETTINGS.MODEL_TFLITE_QUANTIZE
+        )
+        agreement = exported.agreement(self.model, features)
+        Metrics.set_gauge(f"{self.metric_prefix}tflite_agreement", agreement)
+        if agreement < SETTINGS.MODEL_TFLITE_MIN_AGREEMENT:
+            Logger.log_info(
+                f"Keeping Keras runtime: TFLite agrees on {agreement:.1%} of "
+                f"{len(features)} rows"
+            )
+            return
+        self.model = exported
+        Logger.log_info(
+            f"Serving predictions with TFLite ({len(exported.content)} bytes, "
+            f"agreement {agreement:.1%})"
+        )
+
+    def _save_checkpoint(self) -> None:
+        """
+        Save the Keras model and its normalization statistics.
+        """
+        try:
+            self.model.save(SETTINGS.MODEL_CHECKPOINT_DIR)
+        except OSError as e:
+            Logger.log_exception(f"Failed to save model checkpoint: {e}")
+
+    def predict(self, snapshot: MarketSnapshot) -> str:
+        """
+        Predict the trading state for a market snapshot.
+
+        Repeated predictions for the same candle and rounded features are
+        answered from the prediction cache while the model is unchanged.
+
+        Args:
+            snapshot (MarketSnapshot): Latest market snapshot.
+
+        Returns:
+            str: "LONG" or "SHORT".
+
+        Raises:
+            ValueError: If the dataset contains no data.
+        """
+        model = self._current_model()
+        key = self.prediction_cache.key(snapshot)
+        prediction = self.prediction_cache.get(self.version, key)
+        if prediction is None:
+            prediction = model.predict(snapshot)
+            self.prediction_cache.put(key, prediction)
+        return prediction
+
+    def predict_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict the trading state for many feature rows in one pass.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, number of features).
+
+        Returns:
+            np.ndarray: Boolean array, True where the prediction is "LONG".
+
+        Raises:
+            ValueError: If the dataset contains no data.
+        """
+        return self._current_model().predict_batch(features)
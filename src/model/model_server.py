@@ -0,0 +1,553 @@
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from time import perf_counter, sleep
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+import numpy as np
+from bot.bot_settings import SETTINGS
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from model.model_manager import ModelManager
+from tensorflow_model.training_dataset import TrainingDataset
+from utils.logger import Logger
+from utils.metrics import Metrics
+
+
+class _Request:
+    """
+    A request waiting in the server queue for the batching thread.
+    """
+
+    def __init__(self, message: Dict[str, Any]) -> None:
+        """
+        Initialize a queued request.
+
+        Args:
+            message (Dict[str, Any]): Decoded request message.
+        """
+        self.message: Dict[str, Any] = message
+        self.enqueued: float = perf_counter()
+        self.response: Dict[str, Any] = {}
+        self.done: threading.Event = threading.Event()
+
+    def reply(self, response: Dict[str, Any]) -> None:
+        """
+        Set the response and wake the connection thread.
+
+        Args:
+            response (Dict[str, Any]): Response message.
+        """
+        self.response = response
+        self.done.set()
+
+
+class _ConnectionHandler(socketserver.StreamRequestHandler):
+    """
+    Serves one client connection: one JSON request and response per line.
+    """
+
+    server: "_TCPServer"
+
+    def setup(self) -> None:
+        """
+        Register the connection so that stopping the server closes it.
+        """
+        super().setup()
+        self.server.model_server._track(self.connection, True)
+
+    def finish(self) -> None:
+        """
+        Unregister the connection.
+        """
+        self.server.model_server._track(self.connection, False)
+        super().finish()
+
+    def handle(self) -> None:
+        """
+        Forward each request line to the model server and write its response.
+        """
+        for line in self.rfile:
+            try:
+                request = _Request(json.loads(line))
+            except ValueError as e:
+                response: Dict[str, Any] = {"error": f"Invalid request: {e}"}
+            else:
+                self.server.model_server.submit(request)
+                request.done.wait()
+                response = request.response
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    Threaded TCP server that knows its ModelServer.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    model_server: "ModelServer"
+
+
+# Windows has no Unix domain sockets, and no UnixStreamServer to subclass.
+if hasattr(socket, "AF_UNIX"):
+
+    class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """
+        Threaded Unix socket server that knows its ModelServer.
+        """
+
+        daemon_threads = True
+        model_server: "ModelServer"
+
+
+def _tcp_address(address: Union[str, Path]) -> Optional[Tuple[str, int]]:
+    """
+    Parse a "host:port" server address.
+
+    Args:
+        address (Union[str, Path]): Unix socket path or "host:port".
+
+    Returns:
+        Optional[Tuple[str, int]]: Host and port, None for a socket path.
+
+    Raises:
+        ValueError: If the address is a path and Unix sockets are unavailable.
+    """
+    host, _, port = str(address).rpartition(":")
+    if host and port.isdigit() and not any(sep in host for sep in "/\\"):
+        return host, int(port)
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError(
+            f"Unix sockets are not available here, use host:port instead of {address}"
+        )
+    return None
+
+
+class ModelServer:
+    """
+    Local prediction server owning a single model for many bot processes.
+
+    Bots connect over a Unix domain socket, or a "host:port" TCP socket on
+    platforms without them such as Windows, and send newline-delimited JSON
+    requests:
+        - {"op": "predict", "features": [...]}: returns {"prediction", "queue_ms"}.
+          The features are in `MarketSnapshot.ALL_FEATURES` order; the model
+          reads the leading ones of its schema, so clients sending fewer
+          extra features keep working with schema 1 models.
+        - {"op": "record", "result": "LONG", "snapshot": {...}, "id": "..."}:
+          adds a closed trade to the model's training data. A record whose
+          optional id was already recorded is acknowledged without adding it
+          again, so clients may resend it after a lost connection.
+        - {"op": "stats"}: returns the server metrics.
+
+    Every connection has its own thread, but only the batching thread
+    touches the model. It waits at most `max_wait` seconds after the first
+    queued prediction to collect up to `max_batch` of them and answers them
+    all with one forward pass. The time each request spent queued is
+    reported in its response and in the `model_server.queue_ms` metric.
+    A failing model answers the affected requests with an error instead of
+    stopping the batching thread.
+    """
+
+    RECORD_IDS: int = 1024
+
+    def __init__(
+        self,
+        manager: ModelManager,
+        socket_path: Union[str, Path],
+        max_batch: int = 64,
+        max_wait: float = 0.002,
+    ) -> None:
+        """
+        Initialize the ModelServer.
+
+        Args:
+            manager (ModelManager): Model served to the clients.
+            socket_path (Union[str, Path]): Path of the Unix domain socket, or
+                "host:port" of a TCP socket.
+            max_batch (int, optional): Maximum predictions per forward pass. Defaults to 64.
+            max_wait (float, optional): Seconds to wait for more requests after the
+                first one. Defaults to 0.002.
+        """
+        self.manager: ModelManager = manager
+        self.socket_path: Path = Path(socket_path)
+        self.tcp_address: Optional[Tuple[str, int]] = _tcp_address(socket_path)
+        self.max_batch: int = max_batch
+        self.max_wait: float = max_wait
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._server: Optional[_TCPServer] = None
+        self._threads: List[threading.Thread] = []
+        self._recorded: "OrderedDict[str, None]" = OrderedDict()
+        self._connections: Set[socket.socket] = set()
+        self._connections_lock: threading.Lock = threading.Lock()
+
+    def _track(self, connection: socket.socket, active: bool) -> None:
+        """
+        Add or remove an open client connection.
+
+        Args:
+            connection (socket.socket): Client connection.
+            active (bool): True when it opened, False when it closed.
+        """
+        with self._connections_lock:
+            if active:
+                self._connections.add(connection)
+            else:
+                self._connections.discard(connection)
+
+    def submit(self, request: _Request) -> None:
+        """
+        Queue a request for the batching thread.
+
+        Args:
+            request (_Request): Request to answer.
+        """
+        self._queue.put(request)
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        """
+        Gather the requests queued shortly after the first one.
+
+        Args:
+            first (_Request): Request that started the batch.
+
+        Returns:
+            List[_Request]: Up to `max_batch` requests, in arrival order.
+        """
+        batch = [first]
+        deadline = perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                request = self._queue.get(timeout=max(0.0, deadline - perf_counter()))
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _predict(self, requests: List[_Request]) -> None:
+        """
+        Answer prediction requests with a single forward pass.
+
+        Args:
+            requests (List[_Request]): Prediction requests.
+        """
+        started = perf_counter()
+        queue_ms = [(started - request.enqueued) * 1000.0 for request in requests]
+        try:
+            features = np.array(
+                [request.message["features"] for request in requests], dtype=np.float64
+            )[:, : len(self.manager.dataset.columns)]
+            predictions = self.manager.predict_batch(features)
+        except (KeyError, TypeError, ValueError) as e:
+            for request in requests:
+                request.reply({"error": str(e)})
+            return
+        except Exception as e:
+            Logger.log_exception(f"Model server prediction failed: {e}")
+            for request in requests:
+                request.reply({"error": f"Prediction failed: {e}"})
+            return
+        Metrics.increment("model_server.predictions", len(requests))
+        Metrics.set_gauge("model_server.batch_size", len(requests))
+        Metrics.set_gauge("model_server.queue_ms", float(np.mean(queue_ms)))
+        Metrics.set_gauge("model_server.queue_ms_max", max(queue_ms))
+        for request, is_long, waited in zip(requests, predictions, queue_ms):
+            request.reply(
+                {"prediction": "LONG" if is_long else "SHORT", "queue_ms": waited}
+            )
+
+    def _handle(self, request: _Request) -> None:
+        """
+        Answer a non-prediction request.
+
+        Args:
+            request (_Request): Record or stats request.
+        """
+        op = request.message.get("op")
+        if op == "record":
+            record_id = request.message.get("id")
+            if record_id is not None and record_id in self._recorded:
+                request.reply({"ok": True})
+                return
+            try:
+                snapshot = MarketSnapshot.from_dict(request.message["snapshot"])
+                self.manager.record_result(request.message["result"], snapshot)
+            except (KeyError, TypeError, ValueError) as e:
+                request.reply({"error": str(e)})
+                return
+            except Exception as e:
+                Logger.log_exception(f"Model server record failed: {e}")
+                request.reply({"error": f"Record failed: {e}"})
+                return
+            if record_id is not None:
+                self._recorded[record_id] = None
+                if len(self._recorded) > self.RECORD_IDS:
+                    self._recorded.popitem(last=False)
+            request.reply({"ok": True})
+        elif op == "stats":
+            request.reply({"metrics": Metrics.snapshot()})
+        else:
+            request.reply({"error": f"Unknown op: {op}"})
+
+    def process(self, batch: List[_Request]) -> None:
+        """
+        Answer a batch in order, grouping consecutive predictions into one pass.
+
+        Args:
+            batch (List[_Request]): Requests in arrival order.
+        """
+        pending: List[_Request] = []
+        for request in batch:
+            if request.message.get("op") == "predict":
+                pending.append(request)
+                continue
+            if pending:
+                self._predict(pending)
+                pending = []
+            self._handle(request)
+        if pending:
+            self._predict(pending)
+
+    def _batch_loop(self) -> None:
+        """
+        Batching thread: answer queued requests until `stop` is called.
+        """
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self.process(self._collect(first))
+
+    def start(self) -> None:
+        """
+        Bind the socket and start the batching and accepting threads.
+        """
+        if self.tcp_address is not None:
+            self._server = _TCPServer(self.tcp_address, _ConnectionHandler)
+        else:
+            if self.socket_path.exists():
+                os.unlink(self.socket_path)
+            self._server = _UnixServer(str(self.socket_path), _ConnectionHandler)
+        self._server.model_server = self
+        self._threads = [
+            threading.Thread(target=self._batch_loop, daemon=True),
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        Logger.log_info(f"Model server listening on {self.socket_path}")
+
+    def stop(self) -> None:
+        """
+        Stop accepting requests, finish the queued ones and remove the socket.
+
+        Open client connections are shut down, so that clients reconnect to
+        the next server instead of waiting on this one.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        with self._connections_lock:
+            for connection in self._connections:
+                try:
+                    connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self.tcp_address is None and self.socket_path.exists():
+            os.unlink(self.socket_path)
+
+
+class ModelClient:
+    """
+    Thin client of a `ModelServer` with the prediction interface of `ModelManager`.
+
+    The connection is opened lazily and re-opened once if the server
+    restarted since the previous request. A request that timed out is not
+    sent again, and records carry an id so that a resent one is not added
+    twice.
+    """
+
+    def __init__(self, socket_path: Union[str, Path], timeout: float = 30.0) -> None:
+        """
+        Initialize the ModelClient.
+
+        Args:
+            socket_path (Union[str, Path]): Path of the server's Unix domain
+                socket, or "host:port" of its TCP socket.
+            timeout (float, optional): Socket timeout in seconds. Defaults to 30.0.
+        """
+        self.socket_path: Path = Path(socket_path)
+        self.tcp_address: Optional[Tuple[str, int]] = _tcp_address(socket_path)
+        self.timeout: float = timeout
+        self._socket: Optional[socket.socket] = None
+        self._reader: Any = None
+
+    def _connect(self) -> None:
+        """
+        Open the connection to the server.
+        """
+        if self.tcp_address is not None:
+            self._socket = socket.create_connection(self.tcp_address, self.timeout)
+        else:
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._socket.settimeout(self.timeout)
+            self._socket.connect(str(self.socket_path))
+        self._reader = self._socket.makefile("rb")
+
+    def close(self) -> None:
+        """
+        Close the connection, if open.
+        """
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+            self._socket = None
+            self._reader = None
+
+    def _exchange(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send one request line and read its response line.
+
+        Args:
+            message (Dict[str, Any]): Request message.
+
+        Returns:
+            Dict[str, Any]: Response message.
+
+        Raises:
+            ConnectionError: If the server closed the connection.
+        """
+        if self._socket is None:
+            self._connect()
+        self._socket.sendall(json.dumps(message).encode() + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Model server closed the connection")
+        return json.loads(line)
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a request, reconnecting once if the connection was lost.
+
+        Args:
+            message (Dict[str, Any]): Request message.
+
+        Returns:
+            Dict[str, Any]: Response message.
+
+        Raises:
+            ValueError: If the server answered with an error.
+            OSError: If the server cannot be reached, or did not answer within
+                the timeout.
+        """
+        try:
+            response = self._exchange(message)
+        except socket.timeout:
+            self.close()
+            raise
+        except OSError:
+            self.close()
+            response = self._exchange(message)
+        if "error" in response:
+            raise ValueError(response["error"])
+        return response
+
+    def predict(self, snapshot: MarketSnapshot) -> str:
+        """
+        Predict the trading state for a market snapshot.
+
+        Args:
+            snapshot (MarketSnapshot): Latest market snapshot.
+
+        Returns:
+            str: "LONG" or "SHORT".
+        """
+        features = [float(value) for value in snapshot.values(snapshot.ALL_FEATURES)]
+        return self.request({"op": "predict", "features": features})["prediction"]
+
+    def record_result(self, result: str, snapshot: MarketSnapshot) -> None:
+        """
+        Send a closed trade to the server's training data.
+
+        Args:
+            result (str): Correct side of the trade ("LONG"/"SHORT").
+            snapshot (MarketSnapshot): Market snapshot at the time of entry.
+        """
+        self.request(
+            {
+                "op": "record",
+                "result": result,
+                "snapshot": snapshot.to_dict(),
+                "id": uuid.uuid4().hex,
+            }
+        )
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the server metrics.
+
+        Returns:
+            Dict[str, float]: Metric values by name.
+        """
+        return self.request({"op": "stats"})["metrics"]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> ModelServer:
+    """
+    Command-line entry point of the model server.
+
+    Args:
+        argv (Optional[Sequence[str]], optional): Arguments. Defaults to sys.argv.
+
+    Returns:
+        ModelServer: The server, after it was stopped.
+    """
+    parser = argparse.ArgumentParser(
+        description="Serve model predictions to bot processes over a local socket."
+    )
+    parser.add_argument("--socket", default=SETTINGS.MODEL_SERVER_SOCKET or None)
+    parser.add_argument("--max-batch", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+    if not args.socket:
+        parser.error("--socket is required when [MODEL] SERVER_SOCKET is not set")
+
+    with TradeJournal(SETTINGS.OUTPUT_DB_PATH) as journal:
+        dataset = TrainingDataset.from_journal(
+            journal, schema_version=SETTINGS.MODEL_FEATURE_SCHEMA
+        )
+    server = ModelServer(
+        ModelManager(dataset),
+        args.socket,
+        max_batch=args.max_batch,
+        max_wait=args.max_wait_ms / 1000.0,
+    )
+    server.start()
+    try:
+        while True:
+            sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return server
+
+
+if __name__ == "__main__":
+    main()
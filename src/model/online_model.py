@@ -0,0 +1,78 @@
+from typing import Sequence, Tuple
+import numpy as np
+from data.market_snapshot import MarketSnapshot
+from model.linear_model import LinearModel
+from tensorflow_model.training_dataset import TrainingDataset
+from utils.running_stats import RunningStats
+
+
+class OnlineModel(LinearModel):
+    """
+    Online logistic regression that learns from one closed trade at a time.
+
+    Features are standardized with running statistics that are updated
+    together with the weights, and each result applies a single stochastic
+    gradient step with L2 regularization. Updating and predicting cost
+    O(number of features), independent of the size of the trade history.
+    """
+
+    def __init__(
+        self,
+        learning_rate: float = 0.05,
+        l2: float = 1e-4,
+        columns: Sequence[str] = MarketSnapshot.FEATURES,
+    ) -> None:
+        """
+        Initialize an untrained OnlineModel.
+
+        Args:
+            learning_rate (float, optional): Gradient step size. Defaults to 0.05.
+            l2 (float, optional): L2 regularization strength. Defaults to 1e-4.
+            columns (Sequence[str], optional): Feature columns. Defaults to the
+                version 1 snapshot features.
+        """
+        self.learning_rate: float = learning_rate
+        self.l2: float = l2
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.scaler: RunningStats = RunningStats(len(self.columns))
+        self.weights: np.ndarray = np.zeros(len(self.columns), dtype=np.float64)
+        self.bias: float = 0.0
+
+    def fit(self, dataset: TrainingDataset) -> "OnlineModel":
+        """
+        Learn from every row of a dataset, one update per row.
+
+        Args:
+            dataset (TrainingDataset): Training data.
+
+        Returns:
+            OnlineModel: The model itself.
+        """
+        for split in ((dataset.X_train, dataset.y_train), (dataset.X_test, dataset.y_test)):
+            for features, label in zip(*split):
+                self.update(features, float(label))
+        return self
+
+    def update(self, features: Sequence[float], label: float) -> None:
+        """
+        Apply one gradient step for a labelled row.
+
+        Args:
+            features (Sequence[float]): Feature values in `columns` order.
+            label (float): 1.0 for LONG and 0.0 for SHORT.
+        """
+        self.scaler.update(features)
+        scaled = self.scaler.transform(features)
+        error: float = self._sigmoid(float(scaled @ self.weights) + self.bias) - label
+        self.weights -= self.learning_rate * (error * scaled + self.l2 * self.weights)
+        self.bias -= self.learning_rate * error
+
+    def update_result(self, result: str, snapshot: MarketSnapshot) -> None:
+        """
+        Learn from a closed trade.
+
+        Args:
+            result (str): Correct side of the trade ("LONG"/"SHORT").
+            snapshot (MarketSnapshot): Market snapshot at the time of entry.
+        """
+        self.update(snapshot.values(self.columns), 1.0 if result == "LONG" else 0.0)
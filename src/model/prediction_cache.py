@@ -0,0 +1,128 @@
+import math
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence, Tuple
+from data.market_snapshot import MarketSnapshot
+from utils.metrics import Metrics
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of model predictions within a candle.
+
+    Entries are keyed by the open time of the snapshot's candle and its
+    features rounded to a number of significant digits, so the ticks of one
+    candle that carry practically identical features share one prediction.
+    The cache is cleared whenever the model version changes. Hits and
+    misses are exported as metrics together with the hit rate, under the
+    metric prefix of the model that owns the cache.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        interval_seconds: int,
+        digits: int = 4,
+        columns: Sequence[str] = MarketSnapshot.FEATURES,
+        metric_prefix: str = "model.",
+    ) -> None:
+        """
+        Initialize the PredictionCache.
+
+        Args:
+            capacity (int): Maximum number of entries; 0 disables caching.
+            interval_seconds (int): Candle length in seconds.
+            digits (int, optional): Significant digits kept per feature. Defaults to 4.
+            columns (Sequence[str], optional): Features the model reads. Defaults
+                to the version 1 snapshot features.
+            metric_prefix (str, optional): Prefix of the exported metric names.
+                Defaults to "model.".
+        """
+        self.capacity: int = capacity
+        self.interval_seconds: int = interval_seconds
+        self.digits: int = digits
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.metric_prefix: str = metric_prefix
+        self.version: Optional[int] = None
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def __len__(self) -> int:
+        """
+        Return the number of cached predictions.
+
+        Returns:
+            int: Entry count.
+        """
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Fraction of lookups answered from the cache.
+
+        Returns:
+            float: Hit rate, 0.0 before any lookup.
+        """
+        lookups: int = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def key(self, snapshot: MarketSnapshot) -> Optional[Tuple[float, ...]]:
+        """
+        Build the cache key of a snapshot.
+
+        Args:
+            snapshot (MarketSnapshot): Market snapshot to predict for.
+
+        Returns:
+            Optional[Tuple[float, ...]]: Candle open time followed by the rounded
+            features, or None when the snapshot has no valid timestamp.
+        """
+        if math.isnan(snapshot.timestamp):
+            return None
+        candle: float = snapshot.timestamp // self.interval_seconds * self.interval_seconds
+        return (candle,) + tuple(
+            float(f"{value:.{self.digits}g}") for value in snapshot.values(self.columns)
+        )
+
+    def get(self, version: int, key: Optional[Hashable]) -> Optional[str]:
+        """
+        Look up a prediction made by the given model version.
+
+        Args:
+            version (int): Current model version; a new version clears the cache.
+            key (Optional[Hashable]): Key from `key`, or None to bypass the cache.
+
+        Returns:
+            Optional[str]: Cached prediction, or None on a miss.
+        """
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+        prediction = None if key is None else self._entries.get(key)
+        if prediction is None:
+            self.misses += 1
+            Metrics.increment(f"{self.metric_prefix}prediction_cache_misses")
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            Metrics.increment(f"{self.metric_prefix}prediction_cache_hits")
+        Metrics.set_gauge(
+            f"{self.metric_prefix}prediction_cache_hit_rate", self.hit_rate
+        )
+        return prediction
+
+    def put(self, key: Optional[Hashable], prediction: str) -> None:
+        """
+        Store a prediction, evicting the least recently used entry when full.
+
+        Args:
+            key (Optional[Hashable]): Key from `key`; None is not stored.
+            prediction (str): "LONG" or "SHORT".
+        """
+        if key is None or self.capacity <= 0:
+            return
+        self._entries[key] = prediction
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
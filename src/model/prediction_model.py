@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from typing import List, Sequence, Tuple
+import numpy as np
+from data.market_snapshot import MarketSnapshot
+from utils.running_stats import RunningStats
+
+
+class PredictionModel(ABC):
+    """
+    Interface of the models served by `ModelManager`.
+
+    A model maps rows of its `columns`, a `MarketSnapshot` feature schema, to
+    the probability that the correct side is LONG; the decisions follow from
+    that probability.
+    Implementations may override `predict` and `predict_batch` with faster
+    paths that make the same decisions.
+    """
+
+    scaler: RunningStats
+    columns: Sequence[str] = MarketSnapshot.FEATURES
+
+    @abstractmethod
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Return the LONG probability of feature rows.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, number of features).
+
+        Returns:
+            np.ndarray: Probabilities, one per row.
+        """
+
+    def predict(self, indicators) -> str:
+        """
+        Predict the trading state ("LONG" or "SHORT") given new market indicators.
+
+        Args:
+            indicators: An object containing market indicator attributes.
+
+        Returns:
+            str: Predicted state ("LONG" if probability >= 0.5, else "SHORT").
+        """
+        features = [float(getattr(indicators, name)) for name in self.columns]
+        return "LONG" if self.predict_proba(np.array([features]))[0] >= 0.5 else "SHORT"
+
+    def predict_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict the trading state for many feature rows.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, number of features).
+
+        Returns:
+            np.ndarray: Boolean array, True where the prediction is "LONG".
+        """
+        if len(features) == 0:
+            return np.zeros(0, dtype=bool)
+        return self.predict_proba(features) >= 0.5
+
+    def layers(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Return the network as dense layers over the standardized features.
+
+        The hidden layers use ReLU and the last layer a sigmoid unit, which
+        lets `EnsembleModel` stack the weights of several members.
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray]]: Kernel and bias of each layer.
+
+        Raises:
+            NotImplementedError: If the model is not a dense network.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no dense layers")
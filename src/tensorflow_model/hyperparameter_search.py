@@ -0,0 +1,473 @@
+import argparse
+import hashlib
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from base_dir import BASE_DIR
+from bot.bot_settings import SETTINGS
+from bot.state_checkpoint import StateCheckpoint
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from tensorflow_model.model_profile import ModelProfile
+from tensorflow_model.training_dataset import TrainingDataset
+from utils.logger import Logger
+from utils.shared_array import SharedArray, SharedArrayHandle
+
+
+def _init_worker(threads: int) -> None:
+    """
+    Worker initializer: cap the TensorFlow threads each process may use.
+
+    Args:
+        threads (int): Intra-op threads per worker.
+    """
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    from tensorflow_model.tf_model import TFModel
+
+    TFModel.configure_threads(threads, 1)
+
+
+def _run_trial(
+    handle: SharedArrayHandle,
+    profile: Dict[str, Any],
+    budget: float,
+    schema_version: int,
+) -> Dict[str, Any]:
+    """
+    Worker entry point: train one candidate profile and score it.
+
+    The model is trained on the training rows of the journal minus a
+    validation split carved from them, and is scored on that validation
+    split; the search ranks the trials by this score. The accuracy on the
+    journal's test split is only reported as `test_score`, so the final
+    estimate is not biased by the selection.
+
+    Training stops when the time budget is spent; the trial is then scored
+    with the weights reached so far and flagged as timed out.
+
+    Args:
+        handle (SharedArrayHandle): Shared (n, features + 1) matrix of journal rows.
+        profile (Dict[str, Any]): Candidate `ModelProfile` as a dict.
+        budget (float): Training time budget in seconds.
+        schema_version (int): Feature schema of the matrix columns.
+
+    Returns:
+        Dict[str, Any]: Trial result with score, test_score, epochs_trained, seconds
+        and timed_out.
+    """
+    import tensorflow as tf
+    from tensorflow_model.tf_model import TFModel
+
+    class TimeBudget(tf.keras.callbacks.Callback):
+        def __init__(self) -> None:
+            super().__init__()
+            self.timed_out: bool = False
+
+        def on_train_batch_end(self, batch, logs=None) -> None:
+            if perf_counter() - started > budget:
+                self.timed_out = True
+                self.model.stop_training = True
+
+    started = perf_counter()
+    matrix = SharedArray.attach(handle).array
+    dataset = TrainingDataset(schema_version=schema_version)
+    dataset.extend(matrix[:, :-1], matrix[:, -1])
+    validation = TrainingDataset(
+        test_interval=dataset.test_interval, schema_version=schema_version
+    )
+    validation.extend(dataset.X_train, dataset.y_train)
+    stopper = TimeBudget()
+    model = TFModel(
+        validation, profile=ModelProfile.from_dict(profile), callbacks=[stopper]
+    )
+    hits = model.predict_batch(dataset.X_test) == (dataset.y_test == 1.0)
+    return {
+        "profile": profile,
+        "score": float(model.get_accuracy_metric()),
+        "test_score": float(hits.mean()) if len(hits) else math.nan,
+        "epochs_trained": model.epochs_trained,
+        "seconds": perf_counter() - started,
+        "timed_out": stopper.timed_out,
+    }
+
+
+class HyperparameterSearch:
+    """
+    Successive-halving search over Keras model profiles on a process pool.
+
+    Every candidate is first trained for `min_epochs`; only the best
+    1/`eta` of them advance to the next rung, which trains `eta` times as
+    many epochs, until `max_epochs` is reached or one candidate is left.
+    Bad candidates are thus pruned after a cheap trial. Each trial runs in
+    a spawned worker capped at `threads` TensorFlow threads, stops at its
+    time budget, and is ranked by accuracy on a validation split of the
+    training rows. The test split is left out of the ranking and only
+    scores the trials for the final report.
+
+    The models read the columns of the feature schema in
+    SETTINGS.MODEL_FEATURE_SCHEMA, so the profile is tuned for the inputs
+    the bot's model uses.
+
+    Trials are kept in a crash-safe JSON cache keyed by the profile and a
+    fingerprint of the data, so repeating a search skips completed trials.
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[ModelProfile],
+        cache_path: Optional[Path] = None,
+        workers: Optional[int] = None,
+        threads: Optional[int] = None,
+        budget: float = 600.0,
+        min_epochs: int = 2,
+        max_epochs: int = 32,
+        eta: int = 3,
+        schema_version: Optional[int] = None,
+    ) -> None:
+        """
+        Initialize the HyperparameterSearch.
+
+        Args:
+            candidates (Sequence[ModelProfile]): Profiles to compare; their epochs are
+                replaced by the rung budgets.
+            cache_path (Optional[Path], optional): Trial cache file, or None to disable
+                caching. Defaults to None.
+            workers (Optional[int], optional): Process count. Defaults to all cores.
+            threads (Optional[int], optional): Threads per worker. Defaults to the
+                CPU count divided by the workers.
+            budget (float, optional): Time budget per trial in seconds. Defaults to 600.0.
+            min_epochs (int, optional): Epochs of the first rung. Defaults to 2.
+            max_epochs (int, optional): Epochs of the last rung. Defaults to 32.
+            eta (int, optional): Reduction factor between rungs. Defaults to 3.
+            schema_version (Optional[int], optional): Feature schema of the models.
+                Defaults to SETTINGS.MODEL_FEATURE_SCHEMA.
+        """
+        cpus: int = os.cpu_count() or 1
+        self.candidates: List[ModelProfile] = list(dict.fromkeys(candidates))
+        self.workers: int = workers or cpus
+        self.threads: int = threads or max(1, cpus // self.workers)
+        self.budget: float = budget
+        self.min_epochs: int = min_epochs
+        self.max_epochs: int = max_epochs
+        self.eta: int = eta
+        self.schema_version: int = schema_version or SETTINGS.MODEL_FEATURE_SCHEMA
+        self.cache: Optional[StateCheckpoint] = (
+            StateCheckpoint(cache_path) if cache_path is not None else None
+        )
+        self.trials: Dict[str, Dict[str, Any]] = {}
+        if self.cache is not None:
+            self.trials = (self.cache.load() or {}).get("trials", {})
+
+    @staticmethod
+    def grid(
+        learning_rates: Sequence[float],
+        hidden_units: Sequence[Sequence[int]],
+        batch_sizes: Sequence[int],
+    ) -> List[ModelProfile]:
+        """
+        Build every combination of the given hyperparameter values.
+
+        Args:
+            learning_rates (Sequence[float]): Learning rate candidates.
+            hidden_units (Sequence[Sequence[int]]): Hidden layer layouts.
+            batch_sizes (Sequence[int]): Batch size candidates.
+
+        Returns:
+            List[ModelProfile]: Candidate profiles.
+        """
+        return [
+            ModelProfile(learning_rate=lr, hidden_units=tuple(units), batch_size=batch)
+            for lr, units, batch in itertools.product(
+                learning_rates, hidden_units, batch_sizes
+            )
+        ]
+
+    @staticmethod
+    def random_search(
+        learning_rates: Sequence[float],
+        hidden_units: Sequence[Sequence[int]],
+        batch_sizes: Sequence[int],
+        samples: int,
+        seed: Optional[int] = None,
+    ) -> List[ModelProfile]:
+        """
+        Sample profiles with a log-uniform learning rate.
+
+        Args:
+            learning_rates (Sequence[float]): Values whose min/max bound the range.
+            hidden_units (Sequence[Sequence[int]]): Hidden layer layout choices.
+            batch_sizes (Sequence[int]): Batch size choices.
+            samples (int): Number of profiles to draw.
+            seed (Optional[int], optional): Random seed. Defaults to None.
+
+        Returns:
+            List[ModelProfile]: Candidate profiles.
+        """
+        rng = random.Random(seed)
+        low, high = math.log10(min(learning_rates)), math.log10(max(learning_rates))
+        return [
+            ModelProfile(
+                learning_rate=round(10 ** rng.uniform(low, high), 6),
+                hidden_units=tuple(rng.choice(list(hidden_units))),
+                batch_size=rng.choice(list(batch_sizes)),
+            )
+            for _ in range(samples)
+        ]
+
+    @staticmethod
+    def fingerprint(matrix: np.ndarray) -> str:
+        """
+        Identify the data a trial was run on.
+
+        Args:
+            matrix (np.ndarray): Journal feature and label matrix.
+
+        Returns:
+            str: SHA-1 hex digest of the shape and contents.
+        """
+        digest = hashlib.sha1(str(matrix.shape).encode())
+        digest.update(np.ascontiguousarray(matrix).data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def trial_key(profile: ModelProfile, fingerprint: str) -> str:
+        """
+        Build the cache key of a trial.
+
+        Args:
+            profile (ModelProfile): Profile including its epoch budget.
+            fingerprint (str): Data fingerprint.
+
+        Returns:
+            str: Cache key.
+        """
+        return json.dumps(
+            {"profile": profile.to_dict(), "data": fingerprint, "score": "validation"},
+            sort_keys=True,
+        )
+
+    def rungs(self) -> List[int]:
+        """
+        Epoch budgets of the successive-halving rungs.
+
+        Returns:
+            List[int]: Increasing epoch counts ending at `max_epochs`.
+        """
+        epochs, rungs = max(1, self.min_epochs), []
+        while epochs < self.max_epochs:
+            rungs.append(epochs)
+            epochs *= self.eta
+        return rungs + [self.max_epochs]
+
+    def _run_rung(
+        self,
+        shared: SharedArray,
+        profiles: Sequence[ModelProfile],
+        fingerprint: str,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run the trials of one rung that are not cached and return every result.
+
+        Timed-out trials are cached but not complete, so they run again.
+
+        Args:
+            shared (SharedArray): Shared journal matrix.
+            profiles (Sequence[ModelProfile]): Profiles with the rung's epochs.
+            fingerprint (str): Data fingerprint.
+
+        Returns:
+            List[Dict[str, Any]]: Results in the order of `profiles`.
+        """
+        keys = [self.trial_key(profile, fingerprint) for profile in profiles]
+        pending = {
+            key: profile
+            for key, profile in zip(keys, profiles)
+            if key not in self.trials or self.trials[key]["timed_out"]
+        }
+        if pending:
+            with ProcessPoolExecutor(
+                max_workers=min(self.workers, len(pending)),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.threads,),
+            ) as executor:
+                futures = {
+                    key: executor.submit(
+                        _run_trial,
+                        shared.handle,
+                        profile.to_dict(),
+                        self.budget,
+                        self.schema_version,
+                    )
+                    for key, profile in pending.items()
+                }
+                for key, future in futures.items():
+                    self.trials[key] = future.result()
+                    if self.cache is not None:
+                        self.cache.save({"trials": self.trials})
+        return [{**self.trials[key], "cached": key not in pending} for key in keys]
+
+    def run(self, matrix: np.ndarray) -> pd.DataFrame:
+        """
+        Run the search.
+
+        Args:
+            matrix (np.ndarray): Journal feature and label matrix, oldest row first.
+
+        Returns:
+            pd.DataFrame: One row per trial, best of the last rung first.
+
+        Raises:
+            ValueError: If the matrix width does not match the feature schema.
+        """
+        width = len(MarketSnapshot.SCHEMAS[self.schema_version]) + 1
+        if matrix.shape[1] != width:
+            raise ValueError(
+                f"Feature schema {self.schema_version} needs {width} matrix "
+                f"columns, got {matrix.shape[1]}"
+            )
+        fingerprint = self.fingerprint(matrix)
+        survivors = list(self.candidates)
+        rows: List[Dict[str, Any]] = []
+        with SharedArray.create(matrix) as shared:
+            for rung, epochs in enumerate(self.rungs()):
+                profiles = [profile.with_epochs(epochs) for profile in survivors]
+                results = self._run_rung(shared, profiles, fingerprint)
+                rows.extend({"rung": rung, **result} for result in results)
+                ranked = sorted(
+                    zip(survivors, results), key=lambda pair: -pair[1]["score"]
+                )
+                survivors = [
+                    profile for profile, _ in ranked[: max(1, len(ranked) // self.eta)]
+                ]
+                if len(ranked) == 1:
+                    break
+
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        return table.sort_values(
+            by=["rung", "score"], ascending=[False, False], kind="stable"
+        ).reset_index(drop=True)
+
+
+def _parse_list(value: str, cast) -> List:
+    """
+    Parse a comma-separated command-line value.
+
+    Args:
+        value (str): Raw argument, e.g. "0.001,0.01".
+        cast: Callable converting each item.
+
+    Returns:
+        List: Parsed values.
+    """
+    return [cast(item.strip()) for item in value.split(",") if item.strip()]
+
+
+def _parse_layouts(value: str) -> List[List[int]]:
+    """
+    Parse hidden layer layouts such as "none;16;32x16".
+
+    Args:
+        value (str): Semicolon-separated layouts; "x" separates layers and
+            "none" is a model without hidden layers.
+
+    Returns:
+        List[List[int]]: Layer sizes per layout.
+    """
+    return [
+        [] if layout.strip() == "none" else _parse_list(layout.replace("x", ","), int)
+        for layout in value.split(";")
+        if layout.strip()
+    ]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Command-line entry point of the hyperparameter search.
+
+    Args:
+        argv (Optional[Sequence[str]], optional): Arguments. Defaults to sys.argv.
+
+    Returns:
+        pd.DataFrame: Trial table.
+    """
+    parser = argparse.ArgumentParser(
+        description="Search Keras model hyperparameters and write the best profile."
+    )
+    parser.add_argument("--learning-rates", default="0.001,0.003,0.01,0.03")
+    parser.add_argument("--hidden", default="none;16;32x16")
+    parser.add_argument("--batch-sizes", default=str(SETTINGS.MODEL_BATCH_SIZE))
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--samples", type=int, default=27)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--min-epochs", type=int, default=2)
+    parser.add_argument("--max-epochs", type=int, default=SETTINGS.MODEL_EPOCHS)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=600.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument(
+        "--cache", type=Path, default=BASE_DIR / "model_search_cache.json"
+    )
+    parser.add_argument("--profile", type=Path, default=SETTINGS.MODEL_PROFILE_PATH)
+    args = parser.parse_args(argv)
+
+    learning_rates = _parse_list(args.learning_rates, float)
+    layouts = _parse_layouts(args.hidden)
+    batch_sizes = _parse_list(args.batch_sizes, int)
+    if args.search == "grid":
+        candidates = HyperparameterSearch.grid(learning_rates, layouts, batch_sizes)
+    else:
+        candidates = HyperparameterSearch.random_search(
+            learning_rates, layouts, batch_sizes, args.samples, args.seed
+        )
+
+    with TradeJournal(SETTINGS.OUTPUT_DB_PATH) as journal:
+        frame = journal.read_frame()
+    if frame.empty:
+        raise ValueError("No data in trade journal")
+    columns = MarketSnapshot.SCHEMAS[SETTINGS.MODEL_FEATURE_SCHEMA]
+    features = frame[list(columns)].to_numpy(dtype=np.float64)
+    labels = (frame["result"].to_numpy() == "LONG").astype(np.float64)
+    complete = ~np.isnan(features).any(axis=1)
+    features, labels = features[complete], labels[complete]
+
+    search = HyperparameterSearch(
+        candidates,
+        cache_path=args.cache,
+        workers=args.workers,
+        threads=args.threads,
+        budget=args.budget,
+        min_epochs=args.min_epochs,
+        max_epochs=args.max_epochs,
+        eta=args.eta,
+    )
+    started = perf_counter()
+    table = search.run(np.column_stack([features, labels]))
+    elapsed = perf_counter() - started
+
+    best = ModelProfile.from_dict(table.iloc[0]["profile"])
+    best.save(args.profile)
+    Logger.log_info(
+        f"Searched {len(candidates)} profiles ({len(table)} trials, "
+        f"{int(table['cached'].sum())} cached) in {elapsed:.2f}s; "
+        f"best validation accuracy {table.iloc[0]['score']:.4f} "
+        f"(test accuracy {table.iloc[0]['test_score']:.4f}) saved to {args.profile}"
+    )
+    print(table.assign(profile=table["profile"].map(json.dumps)).to_string(index=False))
+    return table
+
+
+if __name__ == "__main__":
+    main()
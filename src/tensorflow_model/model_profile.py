@@ -0,0 +1,109 @@
+import json
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+from bot.bot_settings import SETTINGS
+from utils.file_utils import FileUtils
+from utils.logger import Logger
+
+
+@dataclass(frozen=True)
+class ModelProfile:
+    """
+    Hyperparameters of the Keras model.
+
+    Attributes:
+        learning_rate (float): Adam learning rate.
+        hidden_units (Tuple[int, ...]): Sizes of the ReLU hidden layers, empty for
+            a plain logistic model.
+        epochs (int): Maximum training epochs.
+        batch_size (int): Rows per training batch.
+    """
+
+    learning_rate: float = 0.01
+    hidden_units: Tuple[int, ...] = ()
+    epochs: int = 32
+    batch_size: int = 256
+
+    @classmethod
+    def default(cls) -> "ModelProfile":
+        """
+        Build the profile described by the settings.
+
+        Returns:
+            ModelProfile: Profile with the configured epochs and batch size.
+        """
+        return cls(epochs=SETTINGS.MODEL_EPOCHS, batch_size=SETTINGS.MODEL_BATCH_SIZE)
+
+    def with_epochs(self, epochs: int) -> "ModelProfile":
+        """
+        Return a copy with a different epoch budget.
+
+        Args:
+            epochs (int): Maximum training epochs.
+
+        Returns:
+            ModelProfile: Modified copy.
+        """
+        return replace(self, epochs=epochs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the profile to a JSON-serializable dict.
+
+        Returns:
+            Dict[str, Any]: Profile fields.
+        """
+        data = asdict(self)
+        data["hidden_units"] = list(self.hidden_units)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ModelProfile":
+        """
+        Build a profile from a dict produced by `to_dict`.
+
+        Args:
+            data (Dict[str, Any]): Profile fields.
+
+        Returns:
+            ModelProfile: The profile.
+        """
+        return cls(
+            learning_rate=float(data["learning_rate"]),
+            hidden_units=tuple(int(units) for units in data["hidden_units"]),
+            epochs=int(data["epochs"]),
+            batch_size=int(data["batch_size"]),
+        )
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write the profile as JSON.
+
+        Args:
+            path (Union[str, Path]): Destination file.
+        """
+        FileUtils.ensure_parent(path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["ModelProfile"]:
+        """
+        Read a profile written by `save`.
+
+        Args:
+            path (Union[str, Path]): Source file.
+
+        Returns:
+            Optional[ModelProfile]: The profile, or None if the file is missing
+            or invalid.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            Logger.log_exception(f"Ignoring unreadable model profile: {e}")
+            return None
@@ -2,117 +2,302 @@ import tensorflow as tf
 from tensorflow.keras.layers import Dense
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras import Model
-from tensorflow.keras.models import Sequential
-from sklearn.model_selection import train_test_split
-import pandas as pd
+from tensorflow.keras.models import Sequential, load_model
 import numpy as np
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
 from bot.bot_settings import SETTINGS
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from model.prediction_model import PredictionModel
+from tensorflow_model.model_profile import ModelProfile
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import TrainingWindow
+from utils.running_stats import RunningStats
 
 
-class TFModel:
+class TFModel(PredictionModel):
     """
     TensorFlow-based binary classification model for predicting trading positions.
 
     The model uses a simple feedforward neural network with a sigmoid activation
     to classify whether the state is "LONG" or "SHORT" based on market indicators.
+
+    Features are standardized with the dataset's running statistics, copied
+    when the model is trained and saved with it, so training, evaluation and
+    prediction always use the same scaling.
     """
 
-    def __init__(self):
+    MODEL_FILE = "model.keras"
+    SCALER_FILE = "scaler.npz"
+    PROFILE_FILE = "profile.json"
+
+    def __init__(
+        self,
+        dataset: Optional[TrainingDataset] = None,
+        window: Optional[TrainingWindow] = None,
+        profile: Optional[ModelProfile] = None,
+        callbacks: Sequence[tf.keras.callbacks.Callback] = (),
+        network: Optional[Model] = None,
+    ):
         """
         Initialize the TFModel instance.
 
         Steps:
-            - Load data from the configured CSV path.
+            - Take the train/test splits of the in-memory training dataset,
+              limiting the training rows with the window policy.
+            - Freeze a copy of the dataset's normalization statistics.
             - Validate that the dataset is not empty.
-            - Prepare training and testing data.
             - Train the neural network model.
 
+        Args:
+            dataset (Optional[TrainingDataset], optional): Training data. Defaults
+                to a dataset loaded from the journal at the configured database path.
+            window (Optional[TrainingWindow], optional): Training-set policy.
+                Defaults to every training row.
+            profile (Optional[ModelProfile], optional): Hyperparameters. Defaults
+                to `ModelProfile.default()`.
+            callbacks (Sequence[tf.keras.callbacks.Callback], optional): Extra
+                Keras callbacks used during training. Defaults to none.
+            network (Optional[Model], optional): Compiled network with the profile's
+                architecture and freshly initialized weights, trained instead of a
+                newly built one. Defaults to None.
+
         Raises:
-            ValueError: If the CSV file contains no data.
+            ValueError: If the dataset contains no data.
         """
-        df = pd.read_csv(SETTINGS.OUTPUT_CSV_PATH)
-        if df.empty:
-            raise ValueError("No data in csv file")
+        if dataset is None:
+            with TradeJournal(SETTINGS.OUTPUT_DB_PATH) as journal:
+                dataset = TrainingDataset.from_journal(
+                    journal, schema_version=SETTINGS.MODEL_FEATURE_SCHEMA
+                )
+        if len(dataset) == 0:
+            raise ValueError("No data in trade journal")
 
-        self.columns = ["price", "macd_12", "macd_26", "ema_100", "rsi_6"]
-        X_train, X_test, y_train, y_test = self._prepare_data(df)
-        self.X_train, self.X_test = X_train, X_test
-        self.y_train, self.y_test = y_train, y_test
+        self.columns = list(dataset.columns)
+        self.profile: ModelProfile = profile or ModelProfile.default()
+        self.scaler: RunningStats = dataset.stats.copy()
+        self.X_train, self.y_train = (window or TrainingWindow()).select(dataset)
+        self.X_test, self.y_test = dataset.X_test, dataset.y_test
 
-        self.model = self._train_model()
+        self.model = self._train_model(callbacks=callbacks, network=network)
 
-    def _prepare_data(self, df: pd.DataFrame):
+    @staticmethod
+    def _build_model(
+        input_dim: int,
+        learning_rate: float = 0.01,
+        hidden_units: Sequence[int] = (),
+    ) -> Model:
         """
-        Prepare the dataset for training and testing.
+        Build the Keras Sequential model architecture.
 
         Args:
-            df (pd.DataFrame): Input DataFrame containing features and target state.
+            input_dim (int): Number of input features.
+            learning_rate (float, optional): Adam learning rate. Defaults to 0.01.
+            hidden_units (Sequence[int], optional): Sizes of the ReLU hidden layers.
+                Defaults to none.
 
         Returns:
-            tuple: X_train, X_test, y_train, y_test
+            Model: Compiled Keras model ready for training.
         """
-        X = df[self.columns].values
-        y = np.where(df["result"].values == "LONG", 1, 0).astype(np.float32)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.1, random_state=42, stratify=y
+        layers: List = []
+        for units in hidden_units:
+            shape = {} if layers else {"input_shape": (input_dim,)}
+            layers.append(Dense(units, activation="relu", **shape))
+        shape = {} if layers else {"input_shape": (input_dim,)}
+        layers.append(Dense(1, activation="sigmoid", **shape))
+        model = Sequential(layers)
+        optimizer = Adam(learning_rate=learning_rate)
+        model.compile(
+            optimizer=optimizer, loss="binary_crossentropy", metrics=["accuracy"]
         )
-        return X_train, X_test, y_train, y_test
+        return model
 
-    def _build_model(self, input_dim: int) -> Model:
+    @staticmethod
+    def configure_threads(intra_op: int, inter_op: int) -> bool:
         """
-        Build the Keras Sequential model architecture.
+        Set the TensorFlow CPU thread pools.
+
+        TensorFlow only accepts this before its runtime has started, so the
+        call is a no-op (returning False) once any operation has run.
 
         Args:
-            input_dim (int): Number of input features.
+            intra_op (int): Threads used inside a single op; 0 keeps the default.
+            inter_op (int): Ops run concurrently; 0 keeps the default.
 
         Returns:
-            Model: Compiled Keras model ready for training.
+            bool: True if the settings were applied.
         """
-        model = Sequential(
-            [
-                # add your model layers here
-                #
-                #
-                #
-                Dense(1, activation="sigmoid", input_shape=(input_dim,))
-            ]
-        )
-        optimizer = Adam(learning_rate=0.01)
-        model.compile(
-            optimizer=optimizer, loss="binary_crossentropy", metrics=["accuracy"]
-        )
-        return model
+        try:
+            if intra_op:
+                tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+            if inter_op:
+                tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+        except RuntimeError:
+            return False
+        return True
+
+    @staticmethod
+    def make_pipeline(
+        X: np.ndarray,
+        y: np.ndarray,
+        batch_size: int,
+        shuffle_buffer: int = 0,
+    ) -> tf.data.Dataset:
+        """
+        Build a batched `tf.data` input pipeline.
+
+        The rows are cached after the first epoch, optionally shuffled with
+        a bounded buffer every epoch, and prefetched so batches are ready
+        while the previous step runs.
+
+        Args:
+            X (np.ndarray): Feature matrix.
+            y (np.ndarray): Label vector.
+            batch_size (int): Rows per batch.
+            shuffle_buffer (int, optional): Shuffle buffer size; 0 disables shuffling.
+                Defaults to 0.
+
+        Returns:
+            tf.data.Dataset: Batched dataset of (features, labels).
+        """
+        dataset = tf.data.Dataset.from_tensor_slices((X, y)).cache()
+        if shuffle_buffer:
+            dataset = dataset.shuffle(
+                min(shuffle_buffer, max(len(y), 1)), reshuffle_each_iteration=True
+            )
+        return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
 
     def _train_model(
         self,
-        epochs: int = 32,
-        batch_size: int = 1,
+        epochs: Optional[int] = None,
+        batch_size: Optional[int] = None,
         validation_split: float = 0.2,
         verbose: int = 0,
+        callbacks: Sequence[tf.keras.callbacks.Callback] = (),
+        network: Optional[Model] = None,
     ) -> Model:
         """
         Train the model on the prepared training data.
 
+        The last `validation_split` of the training rows is held out for
+        validation, and training stops early once the validation loss stops
+        improving, restoring the best weights.
+
         Args:
-            epochs (int, optional): Number of training epochs. Defaults to 32.
-            batch_size (int, optional): Batch size for training. Defaults to 1.
+            epochs (Optional[int], optional): Maximum number of training epochs.
+                Defaults to the profile's epochs.
+            batch_size (Optional[int], optional): Batch size for training.
+                Defaults to the profile's batch size.
             validation_split (float, optional): Fraction of training data for validation. Defaults to 0.2.
             verbose (int, optional): Verbosity mode. Defaults to 0.
+            callbacks (Sequence[tf.keras.callbacks.Callback], optional): Extra
+                Keras callbacks. Defaults to none.
+            network (Optional[Model], optional): Compiled network to train.
+                Defaults to a new one built from the profile.
 
         Returns:
             Model: Trained Keras model.
         """
-        model = self._build_model(input_dim=len(self.columns))
-        model.fit(
-            self.X_train,
-            self.y_train,
+        epochs = epochs or self.profile.epochs
+        batch_size = batch_size or self.profile.batch_size
+        self.configure_threads(
+            SETTINGS.MODEL_INTRA_OP_THREADS, SETTINGS.MODEL_INTER_OP_THREADS
+        )
+
+        X = self.normalize(self.X_train)
+        split: int = len(self.y_train) - int(len(self.y_train) * validation_split)
+        train = self.make_pipeline(
+            X[:split],
+            self.y_train[:split],
+            batch_size,
+            shuffle_buffer=SETTINGS.MODEL_SHUFFLE_BUFFER,
+        )
+        callbacks = list(callbacks)
+        validation = None
+        if split < len(self.y_train):
+            validation = self.make_pipeline(X[split:], self.y_train[split:], batch_size)
+            callbacks.append(
+                tf.keras.callbacks.EarlyStopping(
+                    monitor="val_loss",
+                    patience=SETTINGS.MODEL_EARLY_STOPPING_PATIENCE,
+                    restore_best_weights=True,
+                )
+            )
+
+        model = network
+        if model is None:
+            model = self._build_model(
+                input_dim=len(self.columns),
+                learning_rate=self.profile.learning_rate,
+                hidden_units=self.profile.hidden_units,
+            )
+        history = model.fit(
+            train,
+            validation_data=validation,
             epochs=epochs,
-            batch_size=batch_size,
-            validation_split=validation_split,
+            callbacks=callbacks,
             verbose=verbose,
         )
+        self.epochs_trained: int = len(history.epoch)
         return model
 
+    def normalize(self, features: np.ndarray) -> np.ndarray:
+        """
+        Standardize feature rows with the statistics frozen at training time.
+
+        Args:
+            features (np.ndarray): A row or a matrix of rows.
+
+        Returns:
+            np.ndarray: Standardized float32 values with the same shape.
+        """
+        return self.scaler.transform(features).astype(np.float32)
+
+    def save(self, directory: Union[str, Path]) -> None:
+        """
+        Save the trained network with its normalization statistics and profile.
+
+        Args:
+            directory (Union[str, Path]): Checkpoint directory, created if missing.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.model.save(directory / self.MODEL_FILE)
+        self.scaler.save(directory / self.SCALER_FILE)
+        self.profile.save(directory / self.PROFILE_FILE)
+
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> "TFModel":
+        """
+        Load a model saved by `save` without retraining it.
+
+        The loaded model has empty training and test data, and the feature
+        columns of the schema matching the width of its normalization statistics.
+
+        Args:
+            directory (Union[str, Path]): Checkpoint directory.
+
+        Returns:
+            TFModel: Model ready for prediction.
+
+        Raises:
+            OSError: If the checkpoint files cannot be read.
+            ValueError: If the checkpoint files are invalid.
+        """
+        directory = Path(directory)
+        loaded = cls.__new__(cls)
+        loaded.scaler = RunningStats.load(directory / cls.SCALER_FILE)
+        loaded.model = load_model(directory / cls.MODEL_FILE)
+        loaded.profile = (
+            ModelProfile.load(directory / cls.PROFILE_FILE) or ModelProfile.default()
+        )
+        loaded.columns = list(MarketSnapshot.schema_columns(len(loaded.scaler.mean)))
+        loaded.X_train = loaded.X_test = np.empty((0, len(loaded.columns)), np.float32)
+        loaded.y_train = loaded.y_test = np.empty(0, np.float32)
+        loaded.epochs_trained = 0
+        return loaded
+
     def get_accuracy_metric(self) -> float:
         """
         Evaluate the trained model on the test set.
@@ -120,7 +305,9 @@ class TFModel:
         Returns:
             float: Accuracy score on the test dataset.
         """
-        _, test_acc = self.model.evaluate(self.X_test, self.y_test, verbose=0)
+        _, test_acc = self.model.evaluate(
+            self.normalize(self.X_test), self.y_test, verbose=0
+        )
         return test_acc
 
     def predict(self, indicators) -> str:
@@ -133,13 +320,44 @@ class TFModel:
         Returns:
             str: Predicted state ("LONG" if probability >= 0.5, else "SHORT").
         """
-        features = [
-            float(indicators.price),
-            float(indicators.macd_12),
-            float(indicators.macd_26),
-            float(indicators.ema_100),
-            float(indicators.rsi_6),
-        ]
-        new_data = np.array([features])
+        features = [float(getattr(indicators, name)) for name in self.columns]
+        new_data = self.normalize(np.array([features]))
         prob = self.model.predict(new_data, verbose=0)[0][0]
         return "LONG" if prob >= 0.5 else "SHORT"
+
+    def predict_batch(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict the trading state for many feature rows in one forward pass.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, len(self.columns)).
+
+        Returns:
+            np.ndarray: Boolean array, True where the prediction is "LONG".
+        """
+        if len(features) == 0:
+            return np.zeros(0, dtype=bool)
+        return self.predict_proba(features) >= 0.5
+
+    def layers(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Return the kernel and bias of each Dense layer of the network.
+
+        Returns:
+            List[Tuple[np.ndarray, np.ndarray]]: Weights of the layers, input first.
+        """
+        return [tuple(layer.get_weights()) for layer in self.model.layers]
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Return the LONG probability of many feature rows in one forward pass.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, len(self.columns)).
+
+        Returns:
+            np.ndarray: Probabilities, one per row.
+        """
+        return self.model.predict(
+            self.normalize(features), batch_size=4096, verbose=0
+        ).reshape(-1)
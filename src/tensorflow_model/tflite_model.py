@@ -0,0 +1,191 @@
+from pathlib import Path
+from typing import Any, Union
+import numpy as np
+from data.market_snapshot import MarketSnapshot
+from model.prediction_model import PredictionModel
+from utils.running_stats import RunningStats
+
+
+def _interpreter_class() -> Any:
+    """
+    Return the TFLite interpreter class, preferring the standalone LiteRT runtime.
+
+    Returns:
+        Any: `ai_edge_litert` interpreter when installed, else `tf.lite.Interpreter`.
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        import tensorflow as tf
+
+        Interpreter = tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteModel(PredictionModel):
+    """
+    Inference-only copy of a trained `TFModel` running on the TFLite interpreter.
+
+    The Keras network is converted to a flat TFLite graph, optionally with
+    post-training dynamic-range quantization of the weights. The interpreter
+    tensors are allocated once for a single row, and `predict` writes the
+    normalized features into a preallocated buffer, so a prediction costs
+    one `invoke` instead of a Keras `predict` call. Batches resize the input
+    tensor only when their size changes.
+
+    The normalization statistics are the ones frozen with the Keras model,
+    so both runtimes see the same inputs, and their width selects the
+    feature schema.
+    """
+
+    MODEL_FILE = "model.tflite"
+    SCALER_FILE = "scaler.npz"
+
+    def __init__(self, content: bytes, scaler: RunningStats) -> None:
+        """
+        Initialize the TFLiteModel.
+
+        Args:
+            content (bytes): Serialized TFLite flatbuffer.
+            scaler (RunningStats): Normalization statistics of the Keras model.
+        """
+        self.content: bytes = content
+        self.scaler: RunningStats = scaler
+        self.columns = list(MarketSnapshot.schema_columns(len(scaler.mean)))
+        self._mean: np.ndarray = scaler.mean.copy()
+        self._inv_std: np.ndarray = 1.0 / scaler.std
+        self.interpreter = _interpreter_class()(model_content=content)
+        self._input_index: int = self.interpreter.get_input_details()[0]["index"]
+        self._output_index: int = self.interpreter.get_output_details()[0]["index"]
+        self._row: np.ndarray = np.zeros((1, len(self.columns)), dtype=np.float32)
+        self._rows: int = 0
+        self._resize(1)
+
+    @classmethod
+    def export(cls, model: Any, quantize: bool = False) -> "TFLiteModel":
+        """
+        Convert a trained `TFModel` to TFLite.
+
+        Args:
+            model (Any): Trained `TFModel`.
+            quantize (bool, optional): Apply post-training dynamic-range
+                quantization. Defaults to False.
+
+        Returns:
+            TFLiteModel: Converted model.
+        """
+        import tensorflow as tf
+
+        converter = tf.lite.TFLiteConverter.from_keras_model(model.model)
+        if quantize:
+            converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        return cls(converter.convert(), model.scaler.copy())
+
+    def _resize(self, rows: int) -> None:
+        """
+        Resize the input tensor to a number of rows, if it changed.
+
+        Args:
+            rows (int): Rows in the next invocation.
+        """
+        if rows != self._rows:
+            self.interpreter.resize_tensor_input(
+                self._input_index, [rows, len(self.columns)]
+            )
+            self.interpreter.allocate_tensors()
+            self._rows = rows
+
+    def _invoke(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Run the graph on normalized float32 rows.
+
+        Args:
+            inputs (np.ndarray): Matrix of shape (n, len(self.columns)).
+
+        Returns:
+            np.ndarray: Probabilities of "LONG", one per row.
+        """
+        self._resize(len(inputs))
+        self.interpreter.set_tensor(self._input_index, inputs)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output_index).reshape(-1)
+
+    def predict(self, indicators) -> str:
+        """
+        Predict the trading state ("LONG" or "SHORT") given new market indicators.
+
+        Args:
+            indicators: An object containing market indicator attributes.
+
+        Returns:
+            str: Predicted state ("LONG" if probability >= 0.5, else "SHORT").
+        """
+        row = self._row[0]
+        for index, name in enumerate(self.columns):
+            row[index] = getattr(indicators, name)
+        row[:] = (row - self._mean) * self._inv_std
+        return "LONG" if self._invoke(self._row)[0] >= 0.5 else "SHORT"
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Predict the probability of "LONG" for many feature rows.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, len(self.columns)).
+
+        Returns:
+            np.ndarray: Probabilities, one per row.
+        """
+        if len(features) == 0:
+            return np.zeros(0, dtype=np.float32)
+        inputs = self.scaler.transform(features).astype(np.float32)
+        return self._invoke(inputs).copy()
+
+    def agreement(self, model: Any, features: np.ndarray) -> float:
+        """
+        Measure how often this model makes the same decision as a Keras model.
+
+        Args:
+            model (Any): `TFModel` the runtime was exported from.
+            features (np.ndarray): Feature rows to compare on.
+
+        Returns:
+            float: Fraction of rows with the same decision, 1.0 without rows.
+        """
+        if len(features) == 0:
+            return 1.0
+        same = self.predict_batch(features) == model.predict_batch(features)
+        return float(np.mean(same))
+
+    def save(self, directory: Union[str, Path]) -> None:
+        """
+        Save the TFLite graph with its normalization statistics.
+
+        Args:
+            directory (Union[str, Path]): Destination directory, created if missing.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / self.MODEL_FILE).write_bytes(self.content)
+        self.scaler.save(directory / self.SCALER_FILE)
+
+    @classmethod
+    def load(cls, directory: Union[str, Path]) -> "TFLiteModel":
+        """
+        Load a model saved by `save`.
+
+        Args:
+            directory (Union[str, Path]): Source directory.
+
+        Returns:
+            TFLiteModel: Model ready for prediction.
+
+        Raises:
+            OSError: If the files cannot be read.
+            ValueError: If the files are invalid.
+        """
+        directory = Path(directory)
+        return cls(
+            (directory / cls.MODEL_FILE).read_bytes(),
+            RunningStats.load(directory / cls.SCALER_FILE),
+        )
@@ -0,0 +1,248 @@
+from typing import Sequence, Tuple
+import numpy as np
+import pandas as pd
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from utils.running_stats import RunningStats
+
+
+class _GrowableSplit:
+    """
+    Contiguous float32 feature matrix and label vector with amortized growth.
+    """
+
+    def __init__(self, width: int, capacity: int) -> None:
+        """
+        Initialize an empty split.
+
+        Args:
+            width (int): Number of feature columns.
+            capacity (int): Initial row capacity.
+        """
+        self.features: np.ndarray = np.empty((capacity, width), dtype=np.float32)
+        self.labels: np.ndarray = np.empty(capacity, dtype=np.float32)
+        self.size: int = 0
+
+    def _reserve(self, size: int) -> None:
+        """
+        Grow the storage geometrically so it holds at least `size` rows.
+
+        Args:
+            size (int): Required row count.
+        """
+        capacity: int = len(self.labels)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        features = np.empty((capacity, self.features.shape[1]), dtype=np.float32)
+        labels = np.empty(capacity, dtype=np.float32)
+        features[: self.size] = self.features[: self.size]
+        labels[: self.size] = self.labels[: self.size]
+        self.features, self.labels = features, labels
+
+    def extend(self, features: np.ndarray, labels: np.ndarray) -> None:
+        """
+        Append rows in place.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, width).
+            labels (np.ndarray): Vector of length n.
+        """
+        end: int = self.size + len(labels)
+        self._reserve(end)
+        self.features[self.size : end] = features
+        self.labels[self.size : end] = labels
+        self.size = end
+
+
+class TrainingDataset:
+    """
+    In-memory training data for the model, loaded once and grown in place.
+
+    Rows are stored as contiguous float32 arrays. Each row is assigned to the
+    train or test split when it is appended (every `test_interval`-th row goes
+    to the test split), so the splits never have to be recomputed and are
+    exposed as views without copying the history.
+
+    Running mean and variance of the training rows are kept up to date as
+    rows are appended, so normalizing the features never rescans the history.
+
+    The columns are those of a `MarketSnapshot` feature schema. Rows missing
+    any of them, such as trades recorded before the extra features existed,
+    are skipped.
+    """
+
+    def __init__(
+        self, test_interval: int = 10, capacity: int = 1024, schema_version: int = 1
+    ) -> None:
+        """
+        Initialize an empty TrainingDataset.
+
+        Args:
+            test_interval (int, optional): One in this many rows is held out for
+                testing. Defaults to 10 (a 90/10 split).
+            capacity (int, optional): Initial row capacity per split. Defaults to 1024.
+            schema_version (int, optional): Feature schema of the rows, a key of
+                `MarketSnapshot.SCHEMAS`. Defaults to 1.
+
+        Raises:
+            ValueError: If the schema version is unknown.
+        """
+        if schema_version not in MarketSnapshot.SCHEMAS:
+            raise ValueError(f"Unknown feature schema version: {schema_version}")
+        self.schema_version: int = schema_version
+        self.columns: Tuple[str, ...] = MarketSnapshot.SCHEMAS[schema_version]
+        self.test_interval: int = test_interval
+        self.last_id: int = 0
+        self._train: _GrowableSplit = _GrowableSplit(len(self.columns), capacity)
+        self._test: _GrowableSplit = _GrowableSplit(
+            len(self.columns), max(1, capacity // test_interval)
+        )
+        self.stats: RunningStats = RunningStats(len(self.columns))
+
+    @classmethod
+    def from_journal(cls, journal: TradeJournal, **kwargs) -> "TrainingDataset":
+        """
+        Load every stored trade result from the journal.
+
+        Args:
+            journal (TradeJournal): Trade journal to read from.
+            **kwargs: Forwarded to the constructor.
+
+        Returns:
+            TrainingDataset: Dataset holding the journal rows.
+        """
+        dataset = cls(**kwargs)
+        dataset.sync(journal)
+        return dataset
+
+    def __len__(self) -> int:
+        """
+        Return the total number of rows.
+
+        Returns:
+            int: Row count across both splits.
+        """
+        return self._train.size + self._test.size
+
+    def sync(self, journal: TradeJournal) -> int:
+        """
+        Append the journal rows added since the last sync.
+
+        Args:
+            journal (TradeJournal): Trade journal to read from.
+
+        Returns:
+            int: Number of appended rows.
+        """
+        frame, self.last_id = journal.read_since(self.last_id)
+        return self.extend_frame(frame)
+
+    def extend_frame(self, frame: pd.DataFrame) -> int:
+        """
+        Append rows in the results CSV schema.
+
+        Args:
+            frame (pd.DataFrame): Rows with the feature columns and "result".
+
+        Returns:
+            int: Number of appended rows.
+        """
+        if frame.empty:
+            return 0
+        features = frame[list(self.columns)].to_numpy(dtype=np.float32)
+        labels = (frame["result"].to_numpy() == "LONG").astype(np.float32)
+        complete = ~np.isnan(features).any(axis=1)
+        self.extend(features[complete], labels[complete])
+        return int(np.count_nonzero(complete))
+
+    def extend(self, features: np.ndarray, labels: np.ndarray) -> None:
+        """
+        Append many rows, routing each one to its split.
+
+        Args:
+            features (np.ndarray): Matrix of shape (n, len(columns)).
+            labels (np.ndarray): Vector of length n with 1.0 for LONG and 0.0 for SHORT.
+        """
+        positions = len(self) + np.arange(len(labels))
+        is_test = positions % self.test_interval == self.test_interval - 1
+        self._train.extend(features[~is_test], labels[~is_test])
+        self._test.extend(features[is_test], labels[is_test])
+        self.stats.update_batch(features[~is_test])
+
+    def append(self, features: Sequence[float], label: float) -> bool:
+        """
+        Append a single row, unless a feature is missing.
+
+        Args:
+            features (Sequence[float]): Feature values in `columns` order.
+            label (float): 1.0 for LONG and 0.0 for SHORT.
+
+        Returns:
+            bool: True if the row was appended.
+        """
+        row = np.asarray(features, dtype=np.float32)
+        if np.isnan(row).any():
+            return False
+        if len(self) % self.test_interval == self.test_interval - 1:
+            split = self._test
+        else:
+            split = self._train
+            self.stats.update(row)
+        split.extend(row[None, :], np.array([label], dtype=np.float32))
+        return True
+
+    def append_result(self, result: str, snapshot: MarketSnapshot) -> bool:
+        """
+        Append a closed trade.
+
+        Args:
+            result (str): Correct side of the trade ("LONG"/"SHORT").
+            snapshot (MarketSnapshot): Market snapshot at the time of entry.
+
+        Returns:
+            bool: True if the snapshot had every feature of the schema.
+        """
+        label = 1.0 if result == "LONG" else 0.0
+        return self.append(snapshot.values(self.columns), label)
+
+    @property
+    def X_train(self) -> np.ndarray:
+        """
+        Training features as a view.
+
+        Returns:
+            np.ndarray: Matrix of shape (n_train, len(columns)).
+        """
+        return self._train.features[: self._train.size]
+
+    @property
+    def y_train(self) -> np.ndarray:
+        """
+        Training labels as a view.
+
+        Returns:
+            np.ndarray: Vector of length n_train.
+        """
+        return self._train.labels[: self._train.size]
+
+    @property
+    def X_test(self) -> np.ndarray:
+        """
+        Test features as a view.
+
+        Returns:
+            np.ndarray: Matrix of shape (n_test, len(columns)).
+        """
+        return self._test.features[: self._test.size]
+
+    @property
+    def y_test(self) -> np.ndarray:
+        """
+        Test labels as a view.
+
+        Returns:
+            np.ndarray: Vector of length n_test.
+        """
+        return self._test.labels[: self._test.size]
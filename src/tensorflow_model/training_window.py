@@ -0,0 +1,222 @@
+from typing import Optional, Tuple
+import numpy as np
+from tensorflow_model.training_dataset import TrainingDataset
+
+
+class TrainingWindow:
+    """
+    Policy choosing which training rows the model is fitted on.
+
+    The base policy uses every row. Subclasses cap the number of training
+    rows so that retraining time stays bounded however large the journal
+    grows. Only the train split is windowed; the test split is left intact.
+    """
+
+    POLICIES = ("all", "sliding", "decay", "reservoir")
+
+    def select(self, dataset: TrainingDataset) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Select the training rows.
+
+        Args:
+            dataset (TrainingDataset): Training data.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Training features and labels.
+        """
+        return dataset.X_train, dataset.y_train
+
+    @staticmethod
+    def create(
+        policy: str,
+        size: int,
+        half_life: float,
+        seed: Optional[int] = None,
+    ) -> "TrainingWindow":
+        """
+        Build a window policy by name.
+
+        Args:
+            policy (str): "all", "sliding", "decay" or "reservoir".
+            size (int): Maximum number of training rows for bounded policies.
+            half_life (float): Age in rows at which the "decay" sampling weight halves.
+            seed (Optional[int], optional): Random seed of sampling policies. Defaults to None.
+
+        Returns:
+            TrainingWindow: The policy.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy == "all":
+            return TrainingWindow()
+        if policy == "sliding":
+            return SlidingWindow(size)
+        if policy == "decay":
+            return DecayWindow(size, half_life, seed=seed)
+        if policy == "reservoir":
+            return ReservoirWindow(size, seed=seed)
+        raise ValueError(f"Unknown training window policy: {policy}")
+
+
+class SlidingWindow(TrainingWindow):
+    """
+    Trains on the most recent `size` rows, returned as views without copying.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        Initialize the SlidingWindow.
+
+        Args:
+            size (int): Maximum number of training rows.
+        """
+        self.size: int = size
+
+    def select(self, dataset: TrainingDataset) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Select the most recent training rows.
+
+        Args:
+            dataset (TrainingDataset): Training data.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Training features and labels.
+        """
+        start: int = max(0, len(dataset.y_train) - self.size)
+        return dataset.X_train[start:], dataset.y_train[start:]
+
+
+class DecayWindow(TrainingWindow):
+    """
+    Samples `size` rows without replacement, favouring recent ones.
+
+    A row's sampling weight halves for every `half_life` newer rows, so old
+    market regimes fade out gradually instead of being cut off.
+    """
+
+    def __init__(self, size: int, half_life: float, seed: Optional[int] = None) -> None:
+        """
+        Initialize the DecayWindow.
+
+        Args:
+            size (int): Maximum number of training rows.
+            half_life (float): Age in rows at which the sampling weight halves.
+            seed (Optional[int], optional): Random seed. Defaults to None.
+        """
+        self.size: int = size
+        self.half_life: float = half_life
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+
+    def select(self, dataset: TrainingDataset) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sample training rows with exponentially decaying weights.
+
+        Args:
+            dataset (TrainingDataset): Training data.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Training features and labels in arrival order.
+        """
+        count: int = len(dataset.y_train)
+        if count <= self.size:
+            return dataset.X_train, dataset.y_train
+        age = np.arange(count - 1, -1, -1, dtype=np.float64)
+        weights = np.exp2(-age / self.half_life)
+        weights /= weights.sum()
+        rows = np.sort(
+            self._rng.choice(count, size=self.size, replace=False, p=weights)
+        )
+        return dataset.X_train[rows], dataset.y_train[rows]
+
+
+class ReservoirWindow(TrainingWindow):
+    """
+    Uniform sample of `size` rows over the whole history (Algorithm R).
+
+    The reservoir is updated incrementally: each call only processes the rows
+    appended since the previous call, so its cost does not grow with the
+    size of the journal.
+    """
+
+    def __init__(self, size: int, seed: Optional[int] = None) -> None:
+        """
+        Initialize the ReservoirWindow.
+
+        Args:
+            size (int): Reservoir size.
+            seed (Optional[int], optional): Random seed. Defaults to None.
+        """
+        self.size: int = size
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self._rows: np.ndarray = np.empty(0, dtype=np.int64)
+        self._seen: int = 0
+
+    def _observe(self, count: int) -> None:
+        """
+        Feed the rows with index in [seen, count) through the reservoir.
+
+        Args:
+            count (int): Current number of training rows.
+        """
+        fill: int = min(count, self.size)
+        if self._seen < fill:
+            self._rows = np.concatenate(
+                (self._rows, np.arange(self._seen, fill, dtype=np.int64))
+            )
+            self._seen = fill
+        if self._seen < count:
+            indices = np.arange(self._seen, count, dtype=np.int64)
+            slots = self._rng.integers(0, indices + 1)
+            hits = slots < self.size
+            for slot, index in zip(slots[hits], indices[hits]):
+                self._rows[slot] = index
+            self._seen = count
+
+    def select(self, dataset: TrainingDataset) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the current reservoir sample.
+
+        Args:
+            dataset (TrainingDataset): Training data.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Training features and labels in arrival order.
+        """
+        self._observe(len(dataset.y_train))
+        rows = np.sort(self._rows)
+        return dataset.X_train[rows], dataset.y_train[rows]
+
+
+class BootstrapWindow(TrainingWindow):
+    """
+    Resamples the rows chosen by another policy with replacement.
+
+    Ensemble members trained on different bootstrap samples of the same
+    rows differ even when they share an architecture and initialization.
+    """
+
+    def __init__(self, base: TrainingWindow, seed: Optional[int] = None) -> None:
+        """
+        Initialize the BootstrapWindow.
+
+        Args:
+            base (TrainingWindow): Policy choosing the rows to resample.
+            seed (Optional[int], optional): Random seed. Defaults to None.
+        """
+        self.base: TrainingWindow = base
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+
+    def select(self, dataset: TrainingDataset) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Draw as many rows as the base policy selects, with replacement.
+
+        Args:
+            dataset (TrainingDataset): Training data.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Training features and labels in arrival order.
+        """
+        X, y = self.base.select(dataset)
+        rows = np.sort(self._rng.integers(0, len(y), size=len(y)))
+        return X[rows], y[rows]
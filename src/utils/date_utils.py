@@ -1,4 +1,6 @@
 import datetime
+from typing import Optional
+import numpy as np
 
 
 class DateUtils:
@@ -9,12 +11,100 @@ class DateUtils:
     the current date and time in standardized formats.
     """
 
+    _INTERVAL_UNITS = {
+        "s": 1,
+        "m": 60,
+        "h": 3600,
+        "d": 86400,
+        "w": 604800,
+        "M": 2592000,
+    }
+
     @staticmethod
-    def get_date() -> str:
+    def get_date(timestamp: Optional[float] = None) -> str:
         """
-        Get the current date and time as a formatted string.
+        Get the current (or given) date and time as a formatted string.
+
+        Args:
+            timestamp (Optional[float], optional): Epoch seconds to format.
+                Defaults to the current time.
 
         Returns:
-            str: Current timestamp in the format "[YYYY-MM-DD HH:MM:SS]".
+            str: Local timestamp in the format "[YYYY-MM-DD HH:MM:SS]".
+        """
+        moment = (
+            datetime.datetime.now()
+            if timestamp is None
+            else datetime.datetime.fromtimestamp(timestamp)
+        )
+        return moment.strftime("[%Y-%m-%d %H:%M:%S]")
+
+    @staticmethod
+    def format_dates(timestamps: np.ndarray) -> np.ndarray:
+        """
+        Format many epoch timestamps like `get_date`, in local time.
+
+        The local UTC offset is looked up once per quarter hour covered by
+        the timestamps, since time zones only change offset on quarter hours,
+        and the strings are then formatted in one vectorized pass.
+
+        Args:
+            timestamps (np.ndarray): Epoch seconds.
+
+        Returns:
+            np.ndarray: Strings in the format "[YYYY-MM-DD HH:MM:SS]".
+        """
+        seconds = np.floor(np.asarray(timestamps, dtype=np.float64)).astype(np.int64)
+        quarters, inverse = np.unique(seconds // 900, return_inverse=True)
+        offsets = np.array(
+            [
+                datetime.datetime.fromtimestamp(quarter * 900, datetime.timezone.utc)
+                .astimezone()
+                .utcoffset()
+                .total_seconds()
+                for quarter in quarters
+            ],
+            dtype=np.int64,
+        )
+        local = (seconds + offsets[inverse.reshape(-1)]).astype("datetime64[s]")
+        dates = np.char.replace(np.datetime_as_string(local, unit="s"), "T", " ")
+        return np.char.add(np.char.add("[", dates), "]")
+
+    @staticmethod
+    def parse_date(date: str) -> Optional[float]:
+        """
+        Parse a date produced by `get_date` into an epoch timestamp.
+
+        Args:
+            date (str): Timestamp in the format "[YYYY-MM-DD HH:MM:SS]"
+                (the surrounding brackets are optional).
+
+        Returns:
+            Optional[float]: Epoch seconds in local time, or None if the
+                string does not match the format.
+        """
+        try:
+            parsed = datetime.datetime.strptime(date.strip("[] "), "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            return None
+        return parsed.timestamp()
+
+    @staticmethod
+    def interval_to_seconds(interval: str) -> int:
+        """
+        Convert a Binance kline interval into its length in seconds.
+
+        Args:
+            interval (str): Interval such as "1m", "15m", "4h", "1d", "1w" or
+                "1M" (counted as 30 days).
+
+        Returns:
+            int: Interval length in seconds.
+
+        Raises:
+            ValueError: If the interval is not in the Binance format.
         """
-        return datetime.datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
+        count, unit = interval[:-1], interval[-1:]
+        if not count.isdigit() or unit not in DateUtils._INTERVAL_UNITS:
+            raise ValueError(f"Invalid kline interval: {interval}")
+        return int(count) * DateUtils._INTERVAL_UNITS[unit]
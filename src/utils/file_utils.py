@@ -13,7 +13,7 @@ class FileUtils:
         - Reading configuration from TOML files
     """
 
-    _HEADER = [
+    HEADER = [
         "date",
         "result",
         "position",
@@ -25,7 +25,7 @@ class FileUtils:
     ]
 
     @staticmethod
-    def _ensure_parent(path: Union[str, Path]) -> None:
+    def ensure_parent(path: Union[str, Path]) -> None:
         """
         Ensure that the parent directory of the given path exists.
 
@@ -35,7 +35,7 @@ class FileUtils:
         Path(path).parent.mkdir(parents=True, exist_ok=True)
 
     @staticmethod
-    def _is_empty_file(path: Union[str, Path]) -> bool:
+    def is_empty_file(path: Union[str, Path]) -> bool:
         """
         Check whether the file at the given path exists and is non-empty.
 
@@ -58,12 +58,12 @@ class FileUtils:
             path (Union[str, Path]): Path to the CSV file.
             row (Iterable[Union[str, float]]): Row data to append.
         """
-        FileUtils._ensure_parent(path)
-        write_header = FileUtils._is_empty_file(path)
+        FileUtils.ensure_parent(path)
+        write_header = FileUtils.is_empty_file(path)
         with open(path, "a", newline="", encoding="utf-8") as f:
             writer = csv.writer(f)
             if write_header:
-                writer.writerow(FileUtils._HEADER)
+                writer.writerow(FileUtils.HEADER)
             writer.writerow(row)
 
     @staticmethod
@@ -0,0 +1,39 @@
+import math
+import os
+import sys
+
+
+class MemoryUtils:
+    """
+    Utility class for inspecting the memory use of the current process.
+    """
+
+    @staticmethod
+    def rss_mb() -> float:
+        """
+        Get the resident set size of the current process.
+
+        Reads `/proc/self/statm` where available and falls back to the peak
+        RSS reported by `getrusage` elsewhere. The `resource` module is
+        Unix-only, so on Windows `psutil` is used when installed.
+
+        Returns:
+            float: Resident memory in MiB, NaN if it cannot be measured.
+        """
+        try:
+            with open("/proc/self/statm", "r", encoding="ascii") as f:
+                pages = int(f.read().split()[1])
+            return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+        try:
+            import resource
+        except ImportError:
+            try:
+                import psutil
+            except ImportError:
+                return math.nan
+            return psutil.Process().memory_info().rss / 2**20
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS reports bytes, Linux kilobytes.
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
@@ -0,0 +1,66 @@
+from typing import Dict, Optional
+
+
+class Metrics:
+    """
+    Process-wide registry of named numeric metrics.
+
+    Provides class-level methods, like `Logger`, so any component can record
+    a gauge or counter without holding a reference to a metrics object.
+    """
+
+    _values: Dict[str, float] = {}
+
+    @classmethod
+    def set_gauge(cls, name: str, value: float) -> None:
+        """
+        Set a metric to the given value.
+
+        Args:
+            name (str): Metric name, e.g. "model.training_rows".
+            value (float): Current value.
+        """
+        cls._values[name] = float(value)
+
+    @classmethod
+    def increment(cls, name: str, amount: float = 1.0) -> None:
+        """
+        Add to a counter metric, starting from zero.
+
+        Args:
+            name (str): Metric name.
+            amount (float, optional): Amount to add. Defaults to 1.0.
+        """
+        cls._values[name] = cls._values.get(name, 0.0) + amount
+
+    @classmethod
+    def get(cls, name: str, default: Optional[float] = None) -> Optional[float]:
+        """
+        Return the value of a metric.
+
+        Args:
+            name (str): Metric name.
+            default (Optional[float], optional): Value returned when the metric
+                has not been recorded. Defaults to None.
+
+        Returns:
+            Optional[float]: The metric value or the default.
+        """
+        return cls._values.get(name, default)
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, float]:
+        """
+        Return a copy of every recorded metric.
+
+        Returns:
+            Dict[str, float]: Metric values by name.
+        """
+        return dict(cls._values)
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Remove every recorded metric.
+        """
+        cls._values.clear()
@@ -0,0 +1,131 @@
+from pathlib import Path
+from typing import Sequence, Union
+import numpy as np
+
+
+class RunningStats:
+    """
+    Incremental per-column mean and variance (Welford's algorithm).
+
+    Each update costs O(width) regardless of how many rows have been seen,
+    which makes it suitable for scaling features of an online learner.
+    """
+
+    def __init__(self, width: int) -> None:
+        """
+        Initialize empty statistics.
+
+        Args:
+            width (int): Number of columns tracked.
+        """
+        self.count: int = 0
+        self.mean: np.ndarray = np.zeros(width, dtype=np.float64)
+        self._m2: np.ndarray = np.zeros(width, dtype=np.float64)
+
+    def update(self, values: Sequence[float]) -> None:
+        """
+        Add one row to the statistics.
+
+        Args:
+            values (Sequence[float]): Row with `width` values.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (values - self.mean)
+
+    def update_batch(self, values: np.ndarray) -> None:
+        """
+        Add many rows at once by merging their statistics (Chan et al.).
+
+        Args:
+            values (np.ndarray): Matrix of shape (n, width).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        count: int = len(values)
+        if count == 0:
+            return
+        mean = values.mean(axis=0)
+        m2 = ((values - mean) ** 2).sum(axis=0)
+        total: int = self.count + count
+        delta = mean - self.mean
+        self.mean = self.mean + delta * (count / total)
+        self._m2 = self._m2 + m2 + delta**2 * (self.count * count / total)
+        self.count = total
+
+    def copy(self) -> "RunningStats":
+        """
+        Return an independent copy of the statistics.
+
+        Returns:
+            RunningStats: Frozen copy that later updates do not affect.
+        """
+        stats = RunningStats(len(self.mean))
+        stats.count = self.count
+        stats.mean = self.mean.copy()
+        stats._m2 = self._m2.copy()
+        return stats
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write the statistics to an `.npz` file.
+
+        Args:
+            path (Union[str, Path]): Destination file.
+        """
+        with open(path, "wb") as f:
+            np.savez(f, count=self.count, mean=self.mean, m2=self._m2)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "RunningStats":
+        """
+        Read statistics written by `save`.
+
+        Args:
+            path (Union[str, Path]): Source file.
+
+        Returns:
+            RunningStats: The loaded statistics.
+        """
+        with np.load(path) as data:
+            stats = cls(len(data["mean"]))
+            stats.count = int(data["count"])
+            stats.mean = data["mean"].astype(np.float64)
+            stats._m2 = data["m2"].astype(np.float64)
+        return stats
+
+    @property
+    def variance(self) -> np.ndarray:
+        """
+        Population variance per column.
+
+        Returns:
+            np.ndarray: Variances, zero before two rows have been seen.
+        """
+        if self.count < 2:
+            return np.zeros_like(self.mean)
+        return self._m2 / self.count
+
+    @property
+    def std(self) -> np.ndarray:
+        """
+        Standard deviation per column, with zeros replaced by one.
+
+        Returns:
+            np.ndarray: Values safe to divide by.
+        """
+        std = np.sqrt(self.variance)
+        return np.where(std > 0.0, std, 1.0)
+
+    def transform(self, values: np.ndarray) -> np.ndarray:
+        """
+        Standardize rows with the current statistics.
+
+        Args:
+            values (np.ndarray): A row or a matrix of rows.
+
+        Returns:
+            np.ndarray: Standardized values with the same shape.
+        """
+        return (np.asarray(values, dtype=np.float64) - self.mean) / self.std
@@ -0,0 +1,115 @@
+from multiprocessing import shared_memory
+from typing import Dict, NamedTuple, Tuple
+import numpy as np
+
+
+class SharedArrayHandle(NamedTuple):
+    """
+    Picklable reference to a shared array that worker processes can attach to.
+
+    Attributes:
+        name (str): Name of the shared memory block.
+        shape (Tuple[int, ...]): Shape of the array.
+        dtype (str): NumPy dtype string of the array.
+    """
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+class SharedArray:
+    """
+    NumPy array backed by a `multiprocessing.shared_memory` block.
+
+    The owning process copies the data in once with `create`; worker
+    processes then `attach` by handle and read the same pages without
+    any pickling or copying.
+    """
+
+    _attached: Dict[str, "SharedArray"] = {}
+
+    def __init__(
+        self, shm: shared_memory.SharedMemory, handle: SharedArrayHandle, owner: bool
+    ) -> None:
+        """
+        Initialize a SharedArray. Prefer `create` or `attach`.
+
+        Args:
+            shm (shared_memory.SharedMemory): Underlying shared memory block.
+            handle (SharedArrayHandle): Handle describing the array layout.
+            owner (bool): Whether this instance is responsible for unlinking the block.
+        """
+        self.shm: shared_memory.SharedMemory = shm
+        self.handle: SharedArrayHandle = handle
+        self.owner: bool = owner
+        self.array: np.ndarray = np.ndarray(
+            handle.shape, dtype=np.dtype(handle.dtype), buffer=shm.buf
+        )
+        if not owner:
+            self.array.flags.writeable = False
+
+    @classmethod
+    def create(cls, array: np.ndarray) -> "SharedArray":
+        """
+        Allocate a shared memory block and copy the given array into it.
+
+        Args:
+            array (np.ndarray): Source array.
+
+        Returns:
+            SharedArray: Owning shared array.
+        """
+        source = np.ascontiguousarray(array)
+        shm = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+        handle = SharedArrayHandle(shm.name, tuple(source.shape), source.dtype.str)
+        shared = cls(shm, handle, owner=True)
+        shared.array[...] = source
+        return shared
+
+    @classmethod
+    def attach(cls, handle: SharedArrayHandle) -> "SharedArray":
+        """
+        Attach to an existing shared array, reusing the attachment per process.
+
+        Args:
+            handle (SharedArrayHandle): Handle obtained from the owning process.
+
+        Returns:
+            SharedArray: Read-only view of the shared data.
+        """
+        shared = cls._attached.get(handle.name)
+        if shared is None:
+            try:
+                shm = shared_memory.SharedMemory(name=handle.name, track=False)  # type: ignore[call-arg]
+            except TypeError:
+                shm = shared_memory.SharedMemory(name=handle.name)
+            shared = cls(shm, handle, owner=False)
+            cls._attached[handle.name] = shared
+        return shared
+
+    def close(self) -> None:
+        """
+        Release this process' mapping and unlink the block if it is the owner.
+        """
+        del self.array
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        else:
+            SharedArray._attached.pop(self.handle.name, None)
+
+    def __enter__(self) -> "SharedArray":
+        """
+        Enter a context that closes the shared array on exit.
+
+        Returns:
+            SharedArray: This instance.
+        """
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        """
+        Close the shared array when leaving the context.
+        """
+        self.close()
@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from backtest.backtester import Backtester
+import binance_adapter.binance_adapter as adapter_module
+
+
+@pytest.fixture(autouse=True)
+def patch_settings(monkeypatch):
+    monkeypatch.setattr(
+        adapter_module,
+        "SETTINGS",
+        SimpleNamespace(TP_RATIO=0.01, SL_RATIO=0.01, COIN_PRECISION=2),
+        raising=False,
+    )
+
+
+def _settings(tp=0.01, sl=0.01, leverage=1):
+    return SimpleNamespace(TP_RATIO=tp, SL_RATIO=sl, LEVERAGE=leverage, INTERVAL="1h")
+
+
+def _market(rows):
+    return np.array(rows, dtype=np.float64)
+
+
+def test_long_tp_then_short_sl():
+    data = _market(
+        [
+            # high, low, close, signal
+            [100.0, 100.0, 100.0, 1.0],  # enter LONG at 100 (TP 101, SL 99)
+            [100.5, 99.5, 100.2, 1.0],  # no hit
+            [101.5, 100.5, 101.0, 0.0],  # TP hit -> enter SHORT at 101 (TP 99.99, SL 102.01)
+            [102.5, 100.8, 102.0, 0.0],  # SL hit
+            [102.0, 102.0, 102.0, 1.0],
+        ]
+    )
+    result = Backtester(_settings(), data).run()
+    assert result.trades == 2
+    assert result.wins == 1
+    assert result.losses == 1
+    assert result.win_rate == "50.0%"
+    assert result.total_return == pytest.approx(1.01 * 0.99 - 1.0)
+    assert result.max_drawdown == pytest.approx(0.01)
+    assert result.avg_trade_return == pytest.approx(0.0)
+    assert result.INTERVAL == "1h"
+
+
+def test_same_candle_hit_counts_as_sl_and_fees_and_leverage():
+    data = _market(
+        [
+            [100.0, 100.0, 100.0, 1.0],
+            [102.0, 98.0, 100.0, 1.0],
+        ]
+    )
+    result = Backtester(_settings(leverage=2), data, fee_rate=0.001).run()
+    assert result.losses == 1
+    assert result.avg_trade_return == pytest.approx(-0.01 * 2 - 2 * 0.001 * 2)
+
+
+def test_skips_warmup_and_open_position_is_ignored():
+    data = _market(
+        [
+            [100.0, 100.0, 100.0, np.nan],
+            [100.0, 100.0, 100.0, 0.0],  # enter SHORT, never closed
+        ]
+        + [[100.2, 99.8, 100.0, 0.0]] * 600
+    )
+    result = Backtester(_settings(), data, search_window=4).run()
+    assert result.trades == 0
+    assert result.win_rate == "0.00%"
+    assert result.total_return == 0.0
+    assert result.max_drawdown == 0.0
+
+
+def test_gap_in_signal_is_skipped():
+    data = _market(
+        [
+            [100.0, 100.0, 100.0, 0.0],
+            [100.0, 98.0, 98.0, np.nan],  # SHORT TP at 99 hit here
+            [98.0, 98.0, 98.0, np.nan],
+            [98.0, 98.0, 98.0, 1.0],
+            [100.0, 97.0, 98.0, 1.0],  # LONG TP at 98.98 hit (SL 97.02 also) -> SL
+        ]
+    )
+    result = Backtester(_settings(), data).run()
+    assert result.trades == 2
+    assert result.wins == 1
+    assert result.losses == 1
+
+
+def test_all_nan_signal():
+    data = _market([[1.0, 1.0, 1.0, np.nan]] * 3)
+    assert Backtester(_settings(), data).run().trades == 0
@@ -0,0 +1,267 @@
+from pathlib import Path
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+import backtest.label_generator as label_module
+from backtest.label_generator import LabelGenerator
+from data.kline_history import KlineHistory
+from data.market_snapshot import MarketSnapshot
+from utils.date_utils import DateUtils
+from utils.file_utils import FileUtils
+
+
+@pytest.fixture(autouse=True)
+def patch_settings(monkeypatch):
+    monkeypatch.setattr(
+        label_module,
+        "SETTINGS",
+        SimpleNamespace(
+            COIN_PRECISION=2,
+            INTERVAL="1m",
+            TP_RATIO=0.01,
+            SL_RATIO=0.01,
+            SYMBOL="ETHUSDT",
+            API_PUBLIC_KEY="",
+            API_SECRET_KEY="",
+            OUTPUT_DB_PATH="unused.db",
+            BAR_TYPE="time",
+            BAR_THRESHOLD=1000.0,
+        ),
+        raising=False,
+    )
+
+
+def _history(high, low, close):
+    n = len(close)
+    return KlineHistory(
+        open_time=np.arange(n) * 60_000,
+        open_prices=np.asarray(close),
+        high_prices=np.asarray(high),
+        low_prices=np.asarray(low),
+        close_prices=np.asarray(close),
+        volume=np.ones(n),
+    )
+
+
+def _random_history(n=400, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 0.4, n))
+    return _history(close + 0.5, close - 0.5, close)
+
+
+def test_label_marks_first_side_to_hit_tp():
+    history = _history(
+        high=[100.0, 101.5, 100.0, 99.0, 99.0],
+        low=[100.0, 100.5, 98.5, 99.0, 99.0],
+        close=[100.0, 101.0, 99.0, 99.0, 99.0],
+    )
+    labels = LabelGenerator(0.01, 0.01, horizon=3).label(history)
+    # candle 0: up to 101.5 first -> LONG
+    # candle 1: entry 101, low 98.5 hits short TP (99.99) first -> SHORT
+    # candles 2-4: price stays flat afterwards -> unresolved
+    assert labels.tolist() == [1, 0, -1, -1, -1]
+
+
+def test_same_candle_touch_of_both_levels_is_unresolved_for_that_side():
+    history = _history(
+        high=[100.0, 102.0], low=[100.0, 98.0], close=[100.0, 100.0]
+    )
+    labels = LabelGenerator(0.01, 0.01, horizon=2).label(history)
+    assert labels.tolist() == [-1, -1]
+
+
+def test_label_short_history():
+    history = _history([1.0], [1.0], [1.0])
+    assert LabelGenerator(0.01, 0.01).label(history).tolist() == [-1]
+
+
+def test_chunked_labels_match_single_chunk():
+    history = _random_history()
+    whole = LabelGenerator(0.005, 0.005, horizon=20).label(history)
+    chunked = LabelGenerator(0.005, 0.005, horizon=20, chunk_size=7).label(history)
+    np.testing.assert_array_equal(whole, chunked)
+
+
+def test_labels_match_bruteforce_reference():
+    history = _random_history(200, seed=11)
+    generator = LabelGenerator(0.004, 0.006, horizon=15)
+    labels = generator.label(history)
+
+    def first_hit(entry_index, tp_hit, sl_hit):
+        for j in range(entry_index + 1, min(entry_index + 1 + 15, len(history))):
+            tp, sl = tp_hit(j), sl_hit(j)
+            if tp or sl:
+                return tp and not sl, j
+        return False, None
+
+    for i in range(len(history)):
+        entry = history.close[i]
+        long_win, long_at = first_hit(
+            i,
+            lambda j: history.high[j] > round(entry * 1.004, 2),
+            lambda j: history.low[j] < round(entry * 0.994, 2),
+        )
+        short_win, short_at = first_hit(
+            i,
+            lambda j: history.low[j] < round(entry * 0.996, 2),
+            lambda j: history.high[j] > round(entry * 1.006, 2),
+        )
+        if long_win and (not short_win or long_at <= short_at):
+            expected = 1
+        elif short_win:
+            expected = 0
+        else:
+            expected = -1
+        assert labels[i] == expected, i
+
+
+def test_generate_uses_results_schema():
+    history = _random_history()
+    frame = LabelGenerator(0.005, 0.005, horizon=20).generate(history)
+    assert list(frame.columns) == FileUtils.HEADER + list(
+        MarketSnapshot.EXTRA_FEATURES
+    )
+    assert len(frame) > 0
+    assert not frame[FileUtils.HEADER[3:] + ["atr_14", "bb_width_20"]].isna().any(
+        axis=None
+    )
+    assert frame["taker_buy_ratio"].isna().all()
+    assert set(frame["result"]) <= {"LONG", "SHORT"}
+    assert (frame["result"] == frame["position"]).all()
+    parsed = [DateUtils.parse_date(date) for date in frame["date"]]
+    assert set(parsed) <= set(history.open_time / 1000.0)
+
+
+def test_write_csv_appends_with_single_header(tmp_path: Path):
+    frame = LabelGenerator(0.005, 0.005, horizon=20).generate(_random_history())
+    path = tmp_path / "out" / "results.csv"
+    LabelGenerator.write_csv(frame, path, append=True)
+    LabelGenerator.write_csv(frame, path, append=True)
+    loaded = pd.read_csv(path)
+    assert len(loaded) == 2 * len(frame)
+    LabelGenerator.write_csv(frame, path, append=False)
+    assert len(pd.read_csv(path)) == len(frame)
+
+
+def test_main_from_klines_file(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(label_module.Logger, "log_info", lambda msg: None)
+    klines = tmp_path / "klines.csv"
+    _random_history().to_csv(klines)
+    output = tmp_path / "labels.csv"
+    frame = label_module.main(
+        ["--klines", str(klines), "--output", str(output), "--overwrite"]
+    )
+    assert len(pd.read_csv(output)) == len(frame)
+
+
+def test_main_from_recorded_agg_trades(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(label_module.Logger, "log_info", lambda msg: None)
+    close = _random_history().close
+    # Four trades per one-minute bar, recorded in two files.
+    trades = np.repeat(close, 4), np.repeat(np.arange(len(close)) * 60_000, 4)
+    paths = []
+    for index, (prices, times) in enumerate(
+        zip(*(np.array_split(column, 2) for column in trades))
+    ):
+        path = tmp_path / f"ETHUSDT-aggTrades-{index}.csv"
+        pd.DataFrame(
+            {
+                "agg_trade_id": np.arange(len(prices)),
+                "price": prices,
+                "quantity": 0.5,
+                "first_trade_id": 0,
+                "last_trade_id": 0,
+                "transact_time": times,
+                "is_buyer_maker": "true",
+                "is_best_match": "true",
+            }
+        ).to_csv(path, index=False, header=index == 0)
+        paths.append(str(path))
+    output = tmp_path / "labels.csv"
+
+    frame = label_module.main(
+        ["--agg-trades", *paths, "--bar-type", "tick", "--bar-threshold", "4"]
+        + ["--output", str(output), "--overwrite"]
+    )
+    expected = LabelGenerator(0.01, 0.01, horizon=96).generate(
+        _history(close, close, close)
+    )
+    header = FileUtils.HEADER
+    pd.testing.assert_frame_equal(frame[header], expected[header])
+    assert (frame["taker_buy_ratio"] == 0.0).all()
+    assert len(pd.read_csv(output)) == len(frame)
+
+
+def test_main_downloads_when_no_file(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(label_module.Logger, "log_info", lambda msg: None)
+    monkeypatch.setattr(label_module, "Client", lambda *args: None)
+    calls = []
+
+    def fake_download(client, symbol, interval, start):
+        calls.append((symbol, interval, start))
+        return _random_history()
+
+    monkeypatch.setattr(label_module.KlineHistory, "download", fake_download)
+    output = tmp_path / "labels.csv"
+    label_module.main(["--output", str(output), "--start", "1 week ago UTC"])
+    assert calls == [("ETHUSDT", "1m", "1 week ago UTC")]
+    assert output.exists()
+
+
+def test_npz_roundtrip_preserves_schema(tmp_path: Path):
+    frame = LabelGenerator(0.005, 0.005, horizon=20).generate(_random_history())
+    path = tmp_path / "labels.npz"
+    LabelGenerator.write_npz(frame, path)
+    loaded = LabelGenerator.read_npz(path)
+    assert list(loaded.columns) == FileUtils.HEADER
+    assert loaded["result"].tolist() == frame["result"].tolist()
+    assert loaded["date"].tolist() == frame["date"].tolist()
+    np.testing.assert_allclose(
+        loaded["rsi_6"].to_numpy(), frame["rsi_6"].to_numpy(), rtol=1e-6
+    )
+
+
+def test_main_writes_npz_by_suffix(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(label_module.Logger, "log_info", lambda msg: None)
+    klines = tmp_path / "klines.csv"
+    _random_history().to_csv(klines)
+    output = tmp_path / "labels.npz"
+    frame = label_module.main(["--klines", str(klines), "--output", str(output)])
+    assert len(LabelGenerator.read_npz(output)) == len(frame)
+
+
+def test_main_writes_journal_by_suffix(monkeypatch, tmp_path: Path):
+    from data.trade_journal import TradeJournal
+
+    monkeypatch.setattr(label_module.Logger, "log_info", lambda msg: None)
+    klines = tmp_path / "klines.csv"
+    _random_history().to_csv(klines)
+    output = tmp_path / "results.db"
+    frame = label_module.main(["--klines", str(klines), "--output", str(output)])
+    journal = TradeJournal(output)
+    assert journal.count() == len(frame)
+    stored = journal.read_frame()
+    journal.close()
+    np.testing.assert_allclose(stored["atr_14"], frame["atr_14"])
+
+
+def test_main_keeps_the_live_journal_by_default(monkeypatch, tmp_path: Path):
+    from data.trade_journal import TradeJournal
+
+    monkeypatch.setattr(label_module.Logger, "log_info", lambda msg: None)
+    monkeypatch.setattr(
+        label_module,
+        "SETTINGS",
+        SimpleNamespace(
+            **{**vars(label_module.SETTINGS), "OUTPUT_DB_PATH": tmp_path / "results.db"}
+        ),
+    )
+    klines = tmp_path / "klines.csv"
+    _random_history().to_csv(klines)
+    frame = label_module.main(["--klines", str(klines)])
+
+    assert not (tmp_path / "results.db").exists()
+    journal = TradeJournal(tmp_path / "labels.db")
+    assert journal.count() == len(frame)
+    journal.close()
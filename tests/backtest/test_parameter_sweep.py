@@ -0,0 +1,178 @@
+from dataclasses import replace
+from types import SimpleNamespace
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+import backtest.parameter_sweep as sweep_module
+import binance_adapter.binance_adapter as adapter_module
+from backtest.parameter_sweep import ParameterSweep
+from bot.bot_settings import SETTINGS
+from data.kline_history import KlineHistory
+from data.market_snapshot import MarketSnapshot
+from model.logistic_model import LogisticModel
+from tensorflow_model.training_dataset import TrainingDataset
+
+
+@pytest.fixture(autouse=True)
+def patch_precision(monkeypatch):
+    monkeypatch.setattr(
+        adapter_module,
+        "SETTINGS",
+        SimpleNamespace(TP_RATIO=0.01, SL_RATIO=0.01, COIN_PRECISION=2),
+        raising=False,
+    )
+
+
+class FakeExecutor:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        result = fn(*args)
+        return SimpleNamespace(result=lambda: result)
+
+
+class FakeModel:
+    columns = MarketSnapshot.FEATURES
+
+    def predict_batch(self, features):
+        return features[:, 4] >= 50.0
+
+
+def _history(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 0.5, n))
+    return KlineHistory(
+        open_time=np.arange(n) * 60_000,
+        open_prices=close,
+        high_prices=close + 1.0,
+        low_prices=close - 1.0,
+        close_prices=close,
+        volume=np.ones(n),
+    )
+
+
+def test_grid_builds_every_combination():
+    variants = ParameterSweep.grid(SETTINGS, [0.01, 0.02], [0.01], [1, 2], ["1h"])
+    assert len(variants) == 4
+    assert {(v.TP_RATIO, v.LEVERAGE) for v in variants} == {
+        (0.01, 1),
+        (0.01, 2),
+        (0.02, 1),
+        (0.02, 2),
+    }
+    assert all(v.SYMBOL == SETTINGS.SYMBOL for v in variants)
+
+
+def test_random_search_samples_within_bounds():
+    variants = ParameterSweep.random_search(
+        SETTINGS, [0.01, 0.03], [0.005, 0.01], [1, 3], ["15m", "1h"], 20, seed=1
+    )
+    assert len(variants) == 20
+    assert all(0.01 <= v.TP_RATIO <= 0.03 for v in variants)
+    assert all(0.005 <= v.SL_RATIO <= 0.01 for v in variants)
+    assert {v.INTERVAL for v in variants} <= {"15m", "1h"}
+    again = ParameterSweep.random_search(
+        SETTINGS, [0.01, 0.03], [0.005, 0.01], [1, 3], ["15m", "1h"], 20, seed=1
+    )
+    assert variants == again
+
+
+def test_prepare_market_data_marks_warmup_as_nan():
+    data = ParameterSweep.prepare_market_data(_history(), FakeModel())
+    assert data.shape == (300, 4)
+    assert np.isnan(data[0, 3])
+    assert set(np.unique(data[~np.isnan(data[:, 3]), 3])) <= {0.0, 1.0}
+
+
+def test_prepare_market_data_evaluates_the_model_schema():
+    history = _history()
+    history.taker_buy_volume = np.full(len(history), 0.4)
+    features = np.random.default_rng(2).normal(50.0, 10.0, (40, 9))
+    dataset = TrainingDataset(schema_version=2)
+    dataset.extend(features, (features[:, 4] > 50.0).astype(np.float32))
+    model = LogisticModel().fit(dataset)
+    assert len(model.columns) == 9
+
+    data = ParameterSweep.prepare_market_data(history, model)
+    valid = ~np.isnan(data[:, 3])
+    assert valid.sum() == len(history) - 100 + 1
+    assert set(np.unique(data[valid, 3])) <= {0.0, 1.0}
+
+
+def test_prepare_market_data_rejects_order_book_features():
+    model = SimpleNamespace(columns=MarketSnapshot.SCHEMAS[3])
+    with pytest.raises(ValueError, match="Order book features cannot be backtested"):
+        ParameterSweep.prepare_market_data(_history(), model)
+
+
+def test_run_ranks_results_in_process_pool_substitute(monkeypatch):
+    monkeypatch.setattr(sweep_module, "ProcessPoolExecutor", FakeExecutor)
+    data = ParameterSweep.prepare_market_data(_history(), FakeModel())
+    variants = ParameterSweep.grid(
+        replace(SETTINGS, INTERVAL="1m"), [0.005, 0.01, 0.02], [0.01], [1], ["1m"]
+    )
+    table = ParameterSweep(variants, workers=2).run({"1m": data})
+    assert len(table) == 3
+    assert list(table["total_return"]) == sorted(table["total_return"], reverse=True)
+    assert {"win_rate", "max_drawdown", "trades"} <= set(table.columns)
+
+
+def test_run_with_real_process_pool():
+    data = ParameterSweep.prepare_market_data(_history(), FakeModel())
+    variants = ParameterSweep.grid(
+        replace(SETTINGS, INTERVAL="1m"), [0.005, 0.01], [0.01], [1], ["1m"]
+    )
+    table = ParameterSweep(variants, workers=2).run({"1m": data})
+    assert len(table) == 2
+
+
+def test_run_with_no_variants():
+    assert ParameterSweep([], workers=1).run({}).empty
+
+
+def test_load_history_uses_and_fills_cache(monkeypatch, tmp_path: Path):
+    downloads = []
+
+    def fake_download(client, symbol, interval, start):
+        downloads.append((symbol, interval, start))
+        return _history(10)
+
+    monkeypatch.setattr(sweep_module.KlineHistory, "download", fake_download)
+    first = sweep_module._load_history(None, "1h", "1 week ago UTC", tmp_path)
+    second = sweep_module._load_history(None, "1h", "1 week ago UTC", tmp_path)
+    assert len(downloads) == 1
+    assert second.close.tolist() == pytest.approx(first.close.tolist())
+    sweep_module._load_history(None, "1h", "1 week ago UTC", None)
+    assert len(downloads) == 2
+
+
+def test_main_runs_grid_and_random(monkeypatch, tmp_path: Path):
+    import tensorflow_model.tf_model as tf_model_module
+
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeModel)
+    monkeypatch.setattr(sweep_module, "Client", lambda *args: None)
+    monkeypatch.setattr(
+        sweep_module, "_load_history", lambda client, interval, start, d: _history()
+    )
+    monkeypatch.setattr(sweep_module, "ProcessPoolExecutor", FakeExecutor)
+    monkeypatch.setattr(sweep_module.Logger, "log_info", lambda msg: None)
+
+    output = tmp_path / "sweep.csv"
+    table = sweep_module.main(
+        ["--tp", "0.005,0.01", "--sl", "0.01", "--interval", "1m", "--output", str(output)]
+    )
+    assert len(table) == 2
+    assert len(pd.read_csv(output)) == 2
+
+    table = sweep_module.main(
+        ["--search", "random", "--samples", "3", "--seed", "7", "--interval", "1m"]
+    )
+    assert len(table) == 3
@@ -0,0 +1,230 @@
+from dataclasses import replace
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+import backtest.walk_forward as walk_module
+import tensorflow_model.tf_model as tf_model_module
+from backtest.walk_forward import WalkForward
+from bot.bot_settings import SETTINGS
+from data.market_snapshot import MarketSnapshot
+from tensorflow_model.model_profile import ModelProfile
+
+
+@pytest.fixture(autouse=True)
+def patch_settings(monkeypatch):
+    monkeypatch.setattr(
+        walk_module,
+        "SETTINGS",
+        replace(SETTINGS, TP_RATIO=0.01, SL_RATIO=0.02, LEVERAGE=2, MODEL_WINDOW="all"),
+    )
+    monkeypatch.setattr(walk_module.Logger, "log_info", lambda msg: None)
+
+
+class FakeExecutor:
+    instances = []
+
+    def __init__(self, max_workers=None, mp_context=None, initializer=None, initargs=()):
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+        self.initargs = initargs
+        FakeExecutor.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        result = fn(*args)
+        return SimpleNamespace(result=lambda: result)
+
+
+class FakeTFModel:
+    profiles = []
+
+    def __init__(self, dataset, window=None, profile=None) -> None:
+        self.rows = len(dataset)
+        FakeTFModel.profiles.append(profile)
+
+    def predict_batch(self, features):
+        return features[:, 4] >= 50.0
+
+
+def _frame(rows: int = 60, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rsi = rng.uniform(0.0, 100.0, rows)
+    frame = pd.DataFrame(
+        {name: rng.normal(0.0, 1.0, rows) for name in MarketSnapshot.FEATURES}
+    )
+    frame["rsi_6"] = rsi
+    frame.insert(0, "result", np.where(rsi >= 50.0, "LONG", "SHORT"))
+    return frame
+
+
+def test_boundaries_are_chronological_and_cover_the_rows():
+    walk = WalkForward(folds=3, workers=1)
+    assert walk.boundaries(20) == [(5, 10), (10, 15), (15, 20)]
+    with pytest.raises(ValueError, match="at least 4 rows"):
+        walk.boundaries(3)
+
+
+def test_defaults_split_cores_between_workers(monkeypatch):
+    monkeypatch.setattr(walk_module.os, "cpu_count", lambda: 8)
+    walk = WalkForward(folds=3, backend="online")
+    assert (walk.workers, walk.threads, walk.backend) == (3, 2, "online")
+    assert WalkForward(folds=3).backend == SETTINGS.MODEL_BACKEND
+
+
+def test_matrix_puts_labels_last():
+    frame = _frame(4)
+    matrix = WalkForward(folds=2, backend="online").matrix(frame)
+    assert matrix.shape == (4, len(MarketSnapshot.FEATURES) + 1)
+    assert matrix[:, -1].tolist() == (frame["result"] == "LONG").astype(float).tolist()
+
+
+def test_matrix_has_the_columns_of_the_feature_schema(monkeypatch):
+    monkeypatch.setattr(
+        walk_module, "SETTINGS", replace(walk_module.SETTINGS, MODEL_FEATURE_SCHEMA=2)
+    )
+    frame = _frame(6)
+    for name in MarketSnapshot.EXTRA_FEATURES:
+        frame[name] = 1.0
+    frame.loc[2, "atr_14"] = np.nan
+    walk = WalkForward(folds=2, backend="online")
+
+    matrix = walk.matrix(frame)
+
+    assert walk.schema_version == 2
+    assert matrix.shape == (5, len(MarketSnapshot.SCHEMAS[2]) + 1)
+    with pytest.raises(ValueError, match="Feature schema 2 needs 10 matrix columns"):
+        walk.run(matrix[:, 4:])
+
+
+def test_folds_train_on_the_feature_schema(monkeypatch):
+    monkeypatch.setattr(walk_module, "ProcessPoolExecutor", FakeExecutor)
+    frame = _frame(60)
+    for name in MarketSnapshot.EXTRA_FEATURES:
+        frame[name] = np.random.default_rng(1).normal(0.0, 1.0, len(frame))
+    columns = []
+    fit = walk_module.OnlineModel.fit
+
+    def record_columns(model, dataset):
+        columns.append((model.columns, dataset.columns))
+        return fit(model, dataset)
+
+    monkeypatch.setattr(walk_module.OnlineModel, "fit", record_columns)
+    walk = WalkForward(folds=2, workers=1, backend="online", schema_version=2)
+
+    walk.run(walk.matrix(frame))
+
+    assert columns == [(MarketSnapshot.SCHEMAS[2], MarketSnapshot.SCHEMAS[2])] * 2
+
+
+def test_keras_folds_train_on_the_past(monkeypatch):
+    FakeExecutor.instances = []
+    monkeypatch.setattr(walk_module, "ProcessPoolExecutor", FakeExecutor)
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    FakeTFModel.profiles = []
+    profile = ModelProfile(hidden_units=(8,), epochs=3)
+
+    walk = WalkForward(folds=2, workers=2, threads=3, backend="keras", profile=profile)
+    table = walk.run(walk.matrix(_frame(60)))
+
+    assert table["fold"].tolist() == [1, 2]
+    assert table["train_rows"].tolist() == [20, 40]
+    assert table["test_rows"].tolist() == [20, 20]
+    assert table["accuracy"].tolist() == [1.0, 1.0]
+    assert table["win_rate"].tolist() == [1.0, 1.0]
+    assert table["return_pct"].tolist() == pytest.approx([40.0, 40.0])
+    (executor,) = FakeExecutor.instances
+    assert executor.max_workers == 2
+    assert executor.mp_context.get_start_method() == "spawn"
+    assert executor.initargs == ("keras", 3)
+    assert FakeTFModel.profiles == [profile, profile]
+
+
+def test_profile_defaults_to_the_configured_file(monkeypatch, tmp_path):
+    path = tmp_path / "model_profile.json"
+    monkeypatch.setattr(
+        walk_module, "SETTINGS", replace(walk_module.SETTINGS, MODEL_PROFILE_PATH=path)
+    )
+    assert WalkForward(folds=2, backend="keras").profile == ModelProfile.default()
+    ModelProfile(hidden_units=(4,), epochs=5).save(path)
+    assert WalkForward(folds=2, backend="keras").profile.hidden_units == (4,)
+
+
+def test_unsupported_backends_are_rejected():
+    with pytest.raises(ValueError, match="Unsupported walk-forward backend: ensemble"):
+        WalkForward(folds=2, backend="ensemble")
+
+
+def test_online_folds_learn_while_predicting(monkeypatch):
+    monkeypatch.setattr(walk_module, "ProcessPoolExecutor", FakeExecutor)
+    frame = _frame(60)
+    frame["result"] = "SHORT"
+
+    walk = WalkForward(folds=2, workers=1, backend="online")
+    table = walk.run(walk.matrix(frame))
+
+    assert table["accuracy"].tolist() == [1.0, 1.0]
+    assert table["return_pct"].tolist() == pytest.approx([40.0, 40.0])
+
+
+def test_logistic_folds_need_no_tensorflow(monkeypatch):
+    monkeypatch.setattr(walk_module, "ProcessPoolExecutor", FakeExecutor)
+    monkeypatch.setattr(
+        tf_model_module, "TFModel", lambda *args, **kwargs: pytest.fail("TFModel used")
+    )
+
+    walk = WalkForward(folds=2, workers=1, backend="logistic")
+    table = walk.run(walk.matrix(_frame(120)))
+
+    assert (table["accuracy"] > 0.8).all()
+
+
+def test_init_worker_caps_threads(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        tf_model_module.TFModel,
+        "configure_threads",
+        staticmethod(lambda intra, inter: calls.append((intra, inter))),
+    )
+    monkeypatch.setenv("OMP_NUM_THREADS", "")
+
+    walk_module._init_worker("online", 2)
+    assert walk_module.os.environ["OMP_NUM_THREADS"] == "2"
+    assert calls == []
+    walk_module._init_worker("keras", 4)
+    assert calls == [(4, 1)]
+
+
+class FakeJournal:
+    def __init__(self, frame):
+        self.frame = frame
+        self.closed = False
+
+    def read_frame(self):
+        return self.frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.closed = True
+
+
+def test_main_reads_the_journal(monkeypatch, tmp_path):
+    monkeypatch.setattr(walk_module, "ProcessPoolExecutor", FakeExecutor)
+    journal = FakeJournal(_frame(30))
+    monkeypatch.setattr(walk_module, "TradeJournal", lambda path: journal)
+    output = tmp_path / "folds.csv"
+
+    table = walk_module.main(
+        ["--folds", "2", "--workers", "1", "--backend", "online", "--output", str(output)]
+    )
+
+    assert len(table) == 2
+    assert pd.read_csv(output)["fold"].tolist() == [1, 2]
+    assert journal.closed
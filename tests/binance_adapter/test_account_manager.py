@@ -148,3 +148,20 @@ def test_place_sl_order_short_builds_correct_payload(client):
     assert order_kwargs["workingType"] == "MARK_PRICE"
     assert order_kwargs["timeInForce"] == "GTE_GTC"
     assert order_kwargs["priceProtect"] == "true"
+
+
+def test_get_position_amount_returns_abs_amount_of_side(client):
+    client.futures_position_information.return_value = [
+        {"positionSide": "LONG", "positionAmt": "0.000"},
+        {"positionSide": "SHORT", "positionAmt": "-0.250"},
+    ]
+    account_manager = AccountManager(client)
+
+    assert account_manager.get_position_amount("SHORT") == pytest.approx(0.25)
+    assert account_manager.get_position_amount("LONG") == 0.0
+    client.futures_position_information.assert_called_with(symbol="BTCUSDT")
+
+
+def test_get_position_amount_returns_zero_when_side_missing(client):
+    client.futures_position_information.return_value = []
+    assert AccountManager(client).get_position_amount("LONG") == 0.0
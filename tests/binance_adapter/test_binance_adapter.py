@@ -183,3 +183,10 @@ def test_enter_short_prices_no_orders_when_state_block_true(base_settings):
     account_manager.enter_position.assert_not_called()
     account_manager.place_tp_order.assert_not_called()
     account_manager.place_sl_order.assert_not_called()
+
+
+def test_calculate_target_prices_with_overridden_ratios():
+    assert BinanceAdapter.calculate_target_prices("LONG", 100.0) == (102.0, 99.0)
+    assert BinanceAdapter.calculate_target_prices(
+        "SHORT", 100.0, tp_ratio=0.05, sl_ratio=0.03
+    ) == (95.0, 103.0)
@@ -3,7 +3,10 @@ from unittest.mock import MagicMock
 from datetime import datetime, timedelta, timezone
 import numpy as np
 import pytest
+import talib
 from binance_adapter.indicator_manager import IndicatorManager
+from data.kline_history import KlineHistory
+from data.market_snapshot import MarketSnapshot
 import binance_adapter.indicator_manager as indicator_manager_module
 
 
@@ -12,6 +15,10 @@ def patch_settings(monkeypatch):
     fake_settings = SimpleNamespace(
         SYMBOL="BTCUSDT",
         INTERVAL="1m",
+        TIMEFRAMES=(),
+        ORDER_BOOK_ENABLED=False,
+        BAR_TYPE="time",
+        MODEL_FEATURE_SCHEMA=1,
     )
     monkeypatch.setattr(
         indicator_manager_module, "SETTINGS", fake_settings, raising=False
@@ -27,25 +34,32 @@ def binance_client_mock():
     return client
 
 
-def test_get_close_prices_returns_numpy_array(binance_client_mock):
-    # Binance returns raw klines; only "close" column is used.
+def test_get_klines_fetches_the_registry_lookback_in_one_request(binance_client_mock):
     klines = [
-        # open time, open, high, low, close, volume, close_time, quote_asset_volume, number_of_trades,
-        # taker_buy_base_asset_volume, taker_buy_quote_asset_volume, ignore
-        [0, "100", "110", "90", "105.5", "1", 0, "0", "0", "0", "0", "0"],
-        [0, "105", "115", "100", "111.7", "1", 0, "0", "0", "0", "0", "0"],
+        [0, "100", "110", "90", "105.5", "1", 0, "0", "3", "0.5", "0", "0"],
+        [0, "105", "115", "100", "111.7", "1", 0, "0", "4", "0.25", "0", "0"],
     ]
-    binance_client_mock.get_historical_klines.return_value = klines
+    binance_client_mock.get_klines.return_value = klines
 
     indicator_manager = IndicatorManager(binance_client_mock)
-    close_prices = indicator_manager._get_close_prices()
+    history = indicator_manager._get_klines(indicator_manager.lookback)
+
+    assert history.close.tolist() == [105.5, 111.7]
+    assert history.taker_buy_volume.tolist() == [0.5, 0.25]
+    assert indicator_manager.lookback == 501
+    binance_client_mock.get_klines.assert_called_once_with(
+        symbol="BTCUSDT", interval="1m", limit=501
+    )
+    binance_client_mock.get_historical_klines.assert_not_called()
+
 
-    assert isinstance(close_prices, np.ndarray)
-    assert close_prices.tolist() == [105.5, 111.7]
+def test_get_klines_pages_longer_lookbacks(monkeypatch, binance_client_mock):
+    monkeypatch.setattr(indicator_manager_module, "time", lambda: 100_000.0)
+    indicator_manager = IndicatorManager(binance_client_mock)
+
+    assert len(indicator_manager._get_klines(1500)) == 0
     binance_client_mock.get_historical_klines.assert_called_once_with(
-        symbol="BTCUSDT",
-        interval="1m",
-        start_str="1 month ago UTC",
+        symbol="BTCUSDT", interval="1m", start_str=(100_000 - 1500 * 60) * 1000
     )
 
 
@@ -62,179 +76,274 @@ def test_fetch_price_returns_zero_when_unavailable(binance_client_mock):
     assert indicator_manager._fetch_price() == 0.0
 
 
-def test_calculate_ema_with_provided_closes(monkeypatch, binance_client_mock):
-    # Stub talib.EMA to return an array whose last element is distinctive
-    def fake_ema(arr, timeperiod):
-        return np.array([0.0] * (len(arr) - 1) + [42.0])
-
-    monkeypatch.setattr(indicator_manager_module.talib, "EMA", fake_ema)
-
+def test_fetch_indicators_uses_the_live_price_and_one_graph_evaluation(
+    monkeypatch, binance_client_mock
+):
     indicator_manager = IndicatorManager(binance_client_mock)
-    value = indicator_manager._calculate_EMA(
-        period=100, close_prices=np.array([1.0, 2.0, 3.0])
-    )
-    assert value == pytest.approx(42.0)
+    history = KlineHistory(*[np.array([1.0, 2.0, 3.0])] * 6)
+    monkeypatch.setattr(indicator_manager, "_get_klines", lambda count: history)
+    calls = []
 
+    def latest(sources, names):
+        calls.append((sources, names))
+        return {name: float(index) for index, name in enumerate(names)}
 
-def test_calculate_ema_fetches_when_none(monkeypatch, binance_client_mock):
-    def fake_ema(arr, timeperiod):
-        return np.array([0.0] * (len(arr) - 1) + [99.0])
-
-    monkeypatch.setattr(indicator_manager_module.talib, "EMA", fake_ema)
-
-    indicator_manager = IndicatorManager(binance_client_mock)
-    # Ensure it fetches by patching _get_close_prices
+    monkeypatch.setattr(indicator_manager.registry, "latest", latest)
+    binance_client_mock.get_symbol_ticker.return_value = {"price": "555"}
     monkeypatch.setattr(
-        indicator_manager, "_get_close_prices", lambda: np.array([5.0, 6.0, 7.0])
+        indicator_manager_module.DateUtils,
+        "get_date",
+        lambda timestamp=None: "2025-08-27T00:00:00Z",
     )
-    value = indicator_manager._calculate_EMA(period=100, close_prices=None)
-    assert value == pytest.approx(99.0)
+    monkeypatch.setattr(indicator_manager_module, "time", lambda: 1756252800.0)
 
+    snapshot = indicator_manager.fetch_indicators()
 
-def test_calculate_macd_with_provided_closes(monkeypatch, binance_client_mock):
-    def fake_macd(arr, fastperiod, slowperiod, signalperiod):
-        length = len(arr)
-        return (
-            np.array([0.0] * (length - 1) + [1.1]),
-            np.array([0.0] * (length - 1) + [2.2]),
-            np.array([0.0] * (length - 1) + [3.3]),
-        )
-
-    monkeypatch.setattr(indicator_manager_module.talib, "MACD", fake_macd)
-
-    indicator_manager = IndicatorManager(binance_client_mock)
-    macd_value, signal_value = indicator_manager._calculate_MACD(
-        macd_period=12, signal_period=26, close_prices=np.array([1.0, 2.0, 3.0])
+    assert len(calls) == 1 and calls[0][1] == MarketSnapshot.KLINE_FEATURES
+    assert calls[0][0].close.tolist() == [1.0, 2.0, 3.0]
+    assert snapshot.date == "2025-08-27T00:00:00Z"
+    assert snapshot.timestamp == 1756252800.0
+    assert snapshot.price == 555.0
+    assert snapshot.values(MarketSnapshot.KLINE_FEATURES[1:]) == tuple(
+        float(index) for index in range(1, 9)
     )
-    assert macd_value == pytest.approx(1.1)
-    assert signal_value == pytest.approx(2.2)
 
 
-def test_calculate_macd_fetches_when_none_and_params_are_passed(
-    monkeypatch, binance_client_mock
-):
-    captured = {}
-
-    def spy_macd(arr, fastperiod, slowperiod, signalperiod):
-        captured["len"] = len(arr)
-        captured["fastperiod"] = fastperiod
-        captured["slowperiod"] = slowperiod
-        captured["signalperiod"] = signalperiod
-        return (
-            np.array([0.0, 9.9]),
-            np.array([0.0, 8.8]),
-            np.array([0.0, 7.7]),
-        )
+def test_calculate_indicator_series_matches_snapshot_columns():
+    close_prices = np.linspace(100.0, 200.0, 300) + np.sin(np.arange(300))
+    series = IndicatorManager.calculate_indicator_series(close_prices)
 
-    monkeypatch.setattr(indicator_manager_module.talib, "MACD", spy_macd)
+    assert series.shape == (300, 5)
+    np.testing.assert_array_equal(series[:, 0], close_prices)
+    assert np.isnan(series[0]).any()
+    assert not np.isnan(series[-1]).any()
 
-    indicator_manager = IndicatorManager(binance_client_mock)
-    monkeypatch.setattr(
-        indicator_manager, "_get_close_prices", lambda: np.array([10.0, 20.0])
+    macd, signal, _ = talib.MACD(
+        close_prices, fastperiod=12, slowperiod=26, signalperiod=26
     )
+    # talib hides the MACD line until its signal is ready and seeds its fast EMA
+    # later; the shared EMAs start earlier and agree once settled.
+    assert np.isnan(series[:25, 1]).all() and not np.isnan(series[25:, 1]).any()
+    assert np.isnan(series[:50, 2]).all()
+    np.testing.assert_allclose(series[-100:, 1], macd[-100:], rtol=1e-6)
+    np.testing.assert_allclose(series[-100:, 2], signal[-100:], rtol=1e-6)
+    ema = talib.EMA(close_prices, timeperiod=100)
+    np.testing.assert_allclose(series[:, 3], ema, equal_nan=True)
+    rsi = talib.RSI(close_prices, timeperiod=6)
+    np.testing.assert_allclose(series[:, 4], rsi, equal_nan=True)
+
+
+def test_fetch_indicators_fills_the_extra_features_from_the_same_klines(
+    binance_client_mock,
+):
+    rng = np.random.default_rng(0)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, 200))
+    volume = rng.uniform(1.0, 10.0, 200)
+    klines = [
+        [i, str(c), str(c + 1), str(c - 1), str(c), str(v), i, "0", "5", str(v / 4)]
+        + ["0", "0"]
+        for i, (c, v) in enumerate(zip(close, volume))
+    ]
+    binance_client_mock.get_klines.return_value = klines
+    binance_client_mock.get_symbol_ticker.return_value = {"price": "101"}
 
-    macd_value, signal_value = indicator_manager._calculate_MACD(
-        macd_period=12, signal_period=26, close_prices=None
-    )
+    snapshot = IndicatorManager(binance_client_mock).fetch_indicators()
 
-    assert macd_value == pytest.approx(9.9)
-    assert signal_value == pytest.approx(8.8)
-    assert captured["len"] == 2
-    assert captured["fastperiod"] == 12
-    assert captured["slowperiod"] == 26
-    assert captured["signalperiod"] == 26
+    binance_client_mock.get_klines.assert_called_once()
+    assert snapshot.schema_version() == 2
+    assert snapshot.atr_14 == pytest.approx(2.0, abs=1.0)
+    assert snapshot.taker_buy_ratio == pytest.approx(0.25)
 
 
-def test_calculate_rsi_with_and_without_fetch(monkeypatch, binance_client_mock):
-    def fake_rsi(arr, timeperiod):
-        return np.array([0.0] * (len(arr) - 1) + [55.5])
+def _klines(open_times, close):
+    return [
+        [t, str(c), str(c + 1), str(c - 1), str(c), "2", t, "0", "5", "1", "0", "0"]
+        for t, c in zip(open_times, close)
+    ]
 
-    monkeypatch.setattr(indicator_manager_module.talib, "RSI", fake_rsi)
 
+def test_later_ticks_only_fetch_the_candles_opened_since(
+    monkeypatch, binance_client_mock
+):
     indicator_manager = IndicatorManager(binance_client_mock)
-    # with provided closes
-    provided_value = indicator_manager._calculate_RSI(
-        period=6, close_prices=np.array([1.0, 2.0, 3.0])
+    now = 1_000 * 60.0
+    monkeypatch.setattr(indicator_manager_module, "time", lambda: now)
+    open_times = [(1_000 - 501 + i) * 60_000 for i in range(501)]
+    binance_client_mock.get_klines.return_value = _klines(open_times, range(501))
+    indicator_manager.fetch_indicators()
+
+    # The stored candle opened at 999 min closed and two more opened since.
+    now = 1_002.5 * 60.0
+    binance_client_mock.get_klines.return_value = _klines(
+        [999 * 60_000, 1_000 * 60_000, 1_001 * 60_000, 1_002 * 60_000],
+        [600.0, 601.0, 602.0, 603.0],
     )
-    assert provided_value == pytest.approx(55.5)
+    snapshot = indicator_manager.fetch_indicators()
 
-    # fetch branch
-    monkeypatch.setattr(
-        indicator_manager, "_get_close_prices", lambda: np.array([4.0, 5.0, 6.0])
-    )
-    fetched_value = indicator_manager._calculate_RSI(period=6, close_prices=None)
-    assert fetched_value == pytest.approx(55.5)
+    assert binance_client_mock.get_klines.call_args_list[-1].kwargs["limit"] == 4
+    assert len(indicator_manager.candles) == 501
+    assert indicator_manager.candles.history.close[-5:].tolist() == [
+        499.0,
+        600.0,
+        601.0,
+        602.0,
+        603.0,
+    ]
+    assert snapshot.rsi_6 == pytest.approx(100.0)
 
 
-def test_fetch_indicators_integration_and_constructor_call(
+def test_timeframes_are_resampled_without_extra_requests_per_tick(
     monkeypatch, binance_client_mock
 ):
-    # Spy on the internal calls and verify parameters used in fetch_indicators
+    monkeypatch.setattr(
+        indicator_manager_module,
+        "SETTINGS",
+        SimpleNamespace(
+            SYMBOL="BTCUSDT",
+            INTERVAL="15m",
+            TIMEFRAMES=("1h", "4h"),
+            ORDER_BOOK_ENABLED=False,
+            BAR_TYPE="time",
+            MODEL_FEATURE_SCHEMA=1,
+        ),
+    )
+    now = 9_000 * 900.0
+    monkeypatch.setattr(indicator_manager_module, "time", lambda: now)
     indicator_manager = IndicatorManager(binance_client_mock)
+    assert indicator_manager.candles.capacity == 501
+
+    rng = np.random.default_rng(2)
+    open_times = [(9_000 - 8_100 + i) * 900_000 for i in range(8_100)]
+    close = 1_000.0 + np.cumsum(rng.normal(0.0, 1.0, 8_100))
+    klines = _klines(open_times, close)
+    binance_client_mock.get_klines.return_value = klines[-501:]
+    binance_client_mock.get_historical_klines.return_value = klines
+    binance_client_mock.get_symbol_ticker.return_value = {"price": "1000"}
 
+    indicator_manager.fetch_indicators()
+    binance_client_mock.get_historical_klines.assert_not_called()
+    resample = MagicMock(wraps=indicator_manager.candles.resample)
+    monkeypatch.setattr(indicator_manager.candles, "resample", resample)
+    snapshot = indicator_manager.fetch_indicators()
+    resample.assert_not_called()
+
+    timeframe = indicator_manager.timeframe_snapshot("4h")
+
+    binance_client_mock.get_historical_klines.assert_called_once()
+    assert indicator_manager.candles.capacity == 502 * 16
+    four_hours = indicator_manager.candles.history.resample(14_400)
+    assert len(four_hours) >= indicator_manager.lookback
+    expected = indicator_manager.registry.latest(four_hours, ("ema_100", "rsi_6"))
+    assert timeframe.ema_100 == pytest.approx(expected["ema_100"])
+    assert timeframe.rsi_6 == pytest.approx(expected["rsi_6"])
+    assert timeframe.price == 1000.0 and timeframe.timestamp == snapshot.timestamp
+    assert indicator_manager.timeframe_snapshot("1h").ema_100 != snapshot.ema_100
+    binance_client_mock.get_historical_klines.assert_called_once()
+    binance_client_mock.get_klines.reset_mock()
+    now += 900.0
+    indicator_manager.fetch_indicators()
+    assert binance_client_mock.get_klines.call_args.kwargs["limit"] == 3
+    with pytest.raises(KeyError, match="Timeframe 15m is not configured"):
+        indicator_manager.timeframe_snapshot("15m")
+
+
+def test_timeframes_must_be_multiples_of_the_interval(monkeypatch, binance_client_mock):
     monkeypatch.setattr(
-        indicator_manager, "_get_close_prices", lambda: np.array([1.0, 2.0, 3.0])
+        indicator_manager_module,
+        "SETTINGS",
+        SimpleNamespace(
+            SYMBOL="BTCUSDT",
+            INTERVAL="15m",
+            TIMEFRAMES=("20m",),
+            ORDER_BOOK_ENABLED=False,
+            BAR_TYPE="time",
+            MODEL_FEATURE_SCHEMA=1,
+        ),
     )
+    with pytest.raises(ValueError, match="Cannot resample 900s candles"):
+        IndicatorManager(binance_client_mock)
+
 
-    captured_params = {}
+def test_feature_schema_3_requires_the_order_book(monkeypatch, binance_client_mock):
+    settings = SimpleNamespace(
+        **{**vars(indicator_manager_module.SETTINGS), "MODEL_FEATURE_SCHEMA": 3}
+    )
+    monkeypatch.setattr(indicator_manager_module, "SETTINGS", settings)
+    with pytest.raises(ValueError, match="schema 3 requires \\[ORDER_BOOK\\] ENABLED"):
+        IndicatorManager(binance_client_mock)
 
-    def spy_macd(macd_period, signal_period, close_prices):
-        captured_params["macd_period"] = macd_period
-        captured_params["signal_period"] = signal_period
-        captured_params["macd_close_len"] = len(close_prices)
-        return 1.1, 2.2
 
-    def spy_ema(period, close_prices):
-        captured_params["ema_period"] = period
-        captured_params["ema_close_len"] = len(close_prices)
-        return 100.5
+def test_order_book_features_are_read_from_the_local_book(
+    monkeypatch, binance_client_mock
+):
+    monkeypatch.setattr(
+        indicator_manager_module,
+        "SETTINGS",
+        SimpleNamespace(
+            SYMBOL="BTCUSDT",
+            INTERVAL="1m",
+            TIMEFRAMES=(),
+            ORDER_BOOK_ENABLED=True,
+            ORDER_BOOK_DEPTH=5,
+            BAR_TYPE="time",
+            MODEL_FEATURE_SCHEMA=3,
+        ),
+    )
+    order_book = MagicMock()
+    book = dict(zip(MarketSnapshot.BOOK_FEATURES, (1e-4, 0.25, 3.0, 1.0, 100.0)))
+    order_book.features.return_value = book
+    factory = MagicMock(return_value=order_book)
+    monkeypatch.setattr(indicator_manager_module, "OrderBookManager", factory)
 
-    def spy_rsi(period, close_prices):
-        captured_params["rsi_period"] = period
-        captured_params["rsi_close_len"] = len(close_prices)
-        return 55.5
+    indicator_manager = IndicatorManager(binance_client_mock)
+    factory.assert_called_once_with(binance_client_mock, 5)
+    order_book.start.assert_called_once()
 
-    def spy_price():
-        return 555.0
+    snapshot = indicator_manager.fetch_indicators()
+    assert snapshot.values(MarketSnapshot.BOOK_FEATURES) == tuple(book.values())
+    assert snapshot.book_imbalance == 0.25
+    binance_client_mock.get_order_book.assert_not_called()
+    indicator_manager.close()
+    order_book.stop.assert_called_once()
+    IndicatorManager(binance_client_mock).close()
 
-    monkeypatch.setattr(indicator_manager, "_calculate_MACD", spy_macd)
-    monkeypatch.setattr(indicator_manager, "_calculate_EMA", spy_ema)
-    monkeypatch.setattr(indicator_manager, "_calculate_RSI", spy_rsi)
-    monkeypatch.setattr(indicator_manager, "_fetch_price", lambda: spy_price())
 
-    # Fix date
+def test_trade_bars_replace_the_klines(monkeypatch, binance_client_mock):
     monkeypatch.setattr(
-        indicator_manager_module.DateUtils, "get_date", lambda: "2025-08-27T00:00:00Z"
+        indicator_manager_module,
+        "SETTINGS",
+        SimpleNamespace(
+            SYMBOL="BTCUSDT",
+            INTERVAL="1m",
+            TIMEFRAMES=("1h",),
+            ORDER_BOOK_ENABLED=False,
+            BAR_TYPE="dollar",
+            BAR_THRESHOLD=1e6,
+            MODEL_FEATURE_SCHEMA=1,
+        ),
     )
-
-    # Replace MarketSnapshot to capture constructor kwargs
-    class FakeSnapshot:
-        def __init__(self, **kwargs):
-            self.kwargs = kwargs
-
     monkeypatch.setattr(
-        indicator_manager_module, "MarketSnapshot", FakeSnapshot, raising=False
+        indicator_manager_module.TradeBarManager, "start", lambda self: None
+    )
+    indicator_manager = IndicatorManager(binance_client_mock)
+    bars = indicator_manager.bars
+    assert bars.builder.kind == "dollar" and bars.builder.capacity == 501
+    binance_client_mock.get_symbol_ticker.return_value = {"price": "2500"}
+    assert indicator_manager.fetch_indicators().price == 2500.0
+
+    rng = np.random.default_rng(4)
+    prices = 2_500.0 + np.cumsum(rng.normal(0.0, 1.0, 40_000))
+    bars.builder.add_trades(
+        prices, np.full(40_000, 40.0), np.arange(40_000), [0] * 40_000
     )
-
     snapshot = indicator_manager.fetch_indicators()
-    assert isinstance(snapshot, FakeSnapshot)
-
-    # Verify internal call parameters
-    assert captured_params["macd_period"] == 12
-    assert captured_params["signal_period"] == 26
-    assert captured_params["ema_period"] == 100
-    assert captured_params["rsi_period"] == 6
-    assert captured_params["macd_close_len"] == 3
-    assert captured_params["ema_close_len"] == 3
-    assert captured_params["rsi_close_len"] == 3
-
-    # Verify fields passed to MarketSnapshot
-    expected = {
-        "date": "2025-08-27T00:00:00Z",
-        "price": 555.0,
-        "macd_12": 1.1,
-        "macd_26": 2.2,
-        "ema_100": 100.5,
-        "rsi_6": 55.5,
-    }
-    assert snapshot.kwargs == expected
+
+    binance_client_mock.get_klines.assert_not_called()
+    binance_client_mock.get_symbol_ticker.assert_called_once()
+    assert indicator_manager.timeframes == {}
+    assert snapshot.price == prices[-1]
+    expected = indicator_manager.registry.latest(bars.history(), ("ema_100",))
+    assert snapshot.ema_100 == expected["ema_100"]
+    monkeypatch.setattr(bars, "stop", MagicMock())
+    indicator_manager.close()
+    bars.stop.assert_called_once()
@@ -0,0 +1,162 @@
+import json
+import math
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+from binance_adapter.order_book_manager import OrderBookManager
+from data.order_book import OrderBook
+from utils.metrics import Metrics
+import binance_adapter.order_book_manager as order_book_manager_module
+
+RECORDING = Path(__file__).with_name("depth_stream.jsonl")
+
+
+@pytest.fixture(autouse=True)
+def patch_settings(monkeypatch):
+    monkeypatch.setattr(
+        order_book_manager_module,
+        "SETTINGS",
+        SimpleNamespace(SYMBOL="ETHUSDT", API_PUBLIC_KEY="k", API_SECRET_KEY="s"),
+    )
+
+
+# Runs the resync on the calling thread so that replays are deterministic.
+class InlineThread:
+    def __init__(self, target, daemon=False):
+        self.target = target
+
+    def start(self):
+        self.target()
+
+
+@pytest.fixture
+def inline_resync(monkeypatch):
+    monkeypatch.setattr(
+        order_book_manager_module,
+        "threading",
+        SimpleNamespace(Lock=threading.Lock, Thread=InlineThread),
+    )
+
+
+def _recording():
+    lines = [json.loads(line) for line in RECORDING.read_text().splitlines()]
+    stream = [line["stream"] for line in lines if "stream" in line]
+    rest = [line["rest"] for line in lines if "rest" in line]
+    (expected,) = [line["expected"] for line in lines if "expected" in line]
+    return stream, rest, expected
+
+
+def test_replaying_a_recorded_stream_rebuilds_the_exchange_book(
+    monkeypatch, inline_resync
+):
+    # The recording lost one event, and the first snapshot fetched after the
+    # gap is older than the buffered events, so that resync fetches twice.
+    monkeypatch.setattr(Metrics, "_values", {})
+    stream, rest, expected = _recording()
+    client = MagicMock()
+    client.get_order_book.side_effect = rest
+    manager = OrderBookManager(client, depth=5)
+
+    for event in stream:
+        manager.handle_message(event)
+        if manager.book.synced:
+            bids = manager.book.bids.top(5)
+            assert manager.features()["book_bid_volume"] == pytest.approx(
+                sum(quantity for _, quantity in bids)
+            )
+
+    assert client.get_order_book.call_count == 3
+    client.get_order_book.assert_called_with(symbol="ETHUSDT", limit=1000)
+    assert Metrics.get("order_book.resyncs") == 1
+    reference = OrderBook(depth=5)
+    reference.load_snapshot(expected)
+    assert manager.book.last_update_id == expected["lastUpdateId"]
+    assert manager.book.bids.levels == reference.bids.levels
+    assert manager.book.asks.levels == reference.asks.levels
+    assert manager.book.bids.top(5) == reference.bids.top(5)
+    assert manager.features() == pytest.approx(reference.features())
+
+
+def test_events_are_buffered_while_the_snapshot_is_fetched(monkeypatch):
+    stream, rest, _ = _recording()
+    fetching, release = threading.Event(), threading.Event()
+
+    def get_order_book(**kwargs):
+        fetching.set()
+        assert release.wait(5)
+        return rest[0]
+
+    client = MagicMock()
+    client.get_order_book.side_effect = get_order_book
+    manager = OrderBookManager(client, depth=5)
+    manager.handle_message(stream[0])
+    assert fetching.wait(5)
+    for event in stream[1:10]:
+        # The websocket thread never waits for the REST request.
+        manager.handle_message(event)
+    assert not manager.book.synced
+    release.set()
+    manager._resync_thread.join(5)
+
+    assert client.get_order_book.call_count == 1
+    assert manager.book.synced
+    assert manager.book.last_update_id == stream[9]["u"]
+    manager.handle_message(stream[10])
+    assert manager.book.last_update_id == stream[10]["u"]
+
+
+def test_failed_snapshot_request_resyncs_on_the_next_event(
+    monkeypatch, inline_resync
+):
+    logged = []
+    monkeypatch.setattr(
+        order_book_manager_module.Logger, "log_exception", logged.append
+    )
+    stream, rest, _ = _recording()
+    client = MagicMock()
+    client.get_order_book.side_effect = [ConnectionError("timeout"), rest[0]]
+    manager = OrderBookManager(client)
+    manager.handle_message(stream[0])
+    assert logged == ["Order book snapshot: timeout"]
+    assert not manager.book.synced
+
+    manager.handle_message(stream[2])
+    assert manager.book.synced and manager.book.last_update_id == stream[2]["u"]
+
+
+def test_stream_errors_mark_the_book_out_of_sync(monkeypatch, inline_resync):
+    logged = []
+    monkeypatch.setattr(
+        order_book_manager_module.Logger, "log_exception", logged.append
+    )
+    stream, rest, _ = _recording()
+    client = MagicMock()
+    client.get_order_book.side_effect = rest
+    manager = OrderBookManager(client)
+    manager.handle_message(stream[0])
+    assert manager.book.synced
+
+    manager.handle_message({"e": "error", "m": "connection closed"})
+    assert logged == ["Order book stream: connection closed"]
+    assert all(math.isnan(value) for value in manager.features().values())
+
+
+def test_start_subscribes_to_the_diff_depth_stream(monkeypatch):
+    socket_manager = MagicMock()
+    factory = MagicMock(return_value=socket_manager)
+    monkeypatch.setattr(order_book_manager_module, "ThreadedWebsocketManager", factory)
+    manager = OrderBookManager(MagicMock())
+    manager.stop()
+
+    manager.start()
+    factory.assert_called_once_with("k", "s")
+    socket_manager.start.assert_called_once()
+    socket_manager.start_depth_socket.assert_called_once_with(
+        callback=manager.handle_message, symbol="ETHUSDT", interval=100
+    )
+    manager.stop()
+    socket_manager.stop.assert_called_once()
+    manager.stop()
+    socket_manager.stop.assert_called_once()
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import pytest
+from binance_adapter.trade_bar_manager import TradeBarManager
+from utils.metrics import Metrics
+import binance_adapter.trade_bar_manager as trade_bar_manager_module
+
+
+@pytest.fixture(autouse=True)
+def patch_settings(monkeypatch):
+    monkeypatch.setattr(
+        trade_bar_manager_module,
+        "SETTINGS",
+        SimpleNamespace(SYMBOL="ETHUSDT", API_PUBLIC_KEY="k", API_SECRET_KEY="s"),
+    )
+
+
+def _agg_trade(price, quantity, time, buyer_maker=False, first=1, last=1):
+    return {
+        "e": "aggTrade",
+        "s": "ETHUSDT",
+        "p": str(price),
+        "q": str(quantity),
+        "T": time,
+        "m": buyer_maker,
+        "f": first,
+        "l": last,
+    }
+
+
+def test_closed_bars_wake_up_the_trading_loop(monkeypatch):
+    monkeypatch.setattr(Metrics, "_values", {})
+    manager = TradeBarManager("tick", 3, capacity=10)
+    assert manager.wait(0.0) is False
+
+    manager.handle_message(_agg_trade(100.0, 1.0, 1_000, first=1, last=2))
+    assert manager.wait(0.0) is False and len(manager.history()) == 0
+    manager.handle_message(_agg_trade(101.5, 2.0, 1_500, buyer_maker=True))
+
+    assert manager.wait(0.0) is True
+    assert manager.wait(0.0) is False
+    bars = manager.history()
+    assert bars.close.tolist() == [101.5]
+    assert bars.number_of_trades.tolist() == [3.0]
+    assert bars.taker_buy_volume.tolist() == [1.0]
+    assert manager.last_price == 101.5
+    assert Metrics.get("bars.closed") == 1
+
+
+def test_stream_errors_are_logged(monkeypatch):
+    logged = []
+    monkeypatch.setattr(
+        trade_bar_manager_module.Logger, "log_exception", logged.append
+    )
+    manager = TradeBarManager("volume", 1.0, capacity=10)
+    manager.handle_message({"e": "error", "m": "read loop closed"})
+    assert logged == ["Trade stream: read loop closed"]
+
+
+def test_start_subscribes_to_the_agg_trade_stream(monkeypatch):
+    monkeypatch.setattr(
+        trade_bar_manager_module.Logger, "log_info", lambda message: None
+    )
+    socket_manager = MagicMock()
+    factory = MagicMock(return_value=socket_manager)
+    monkeypatch.setattr(trade_bar_manager_module, "ThreadedWebsocketManager", factory)
+    manager = TradeBarManager("dollar", 1e6, capacity=10)
+    manager.stop()
+
+    manager.start()
+    factory.assert_called_once_with("k", "s")
+    socket_manager.start_aggtrade_socket.assert_called_once_with(
+        callback=manager.handle_message, symbol="ETHUSDT"
+    )
+    manager.stop()
+    manager.stop()
+    socket_manager.stop.assert_called_once()
@@ -18,10 +18,29 @@ class DataManager:
         self.position_snapshot: Any | None = None
 
 
+class FakeTradeJournal:
+    def __init__(self) -> None:
+        self.saved: list[dict[str, Any]] = []
+
+    def save_result(self, *, result: str, position: str, snapshot: Any) -> None:
+        self.saved.append({"result": result, "position": position, "snapshot": snapshot})
+
+
+class FakeModelManager:
+    def __init__(self) -> None:
+        self.recorded: list[tuple[str, Any]] = []
+
+    def record_result(self, result: str, snapshot: Any) -> None:
+        self.recorded.append((result, snapshot))
+
+
 class Parent:
     def __init__(self) -> None:
         self.data_manager = DataManager()
         self.performance_tracker = PerformanceTracker()
+        self.trade_journal = FakeTradeJournal()
+        self.model_manager = FakeModelManager()
+        self.shadow_runner = None
         self.state = None
 
 
@@ -67,18 +86,6 @@ def test_handle_tp_increases_win_and_saves(monkeypatch):
         open_pos_module.Logger, "log_success", lambda msg: success_logs.append(msg)
     )
 
-    saved: dict[str, Any] = {}
-
-    def fake_save_result(
-        *, file_path: str, result: str, position: str, snapshot: Any
-    ) -> None:
-        saved["file_path"] = file_path
-        saved["result"] = result
-        saved["position"] = position
-        saved["snapshot"] = snapshot
-
-    monkeypatch.setattr(open_pos_module.FileUtils, "save_result", fake_save_result)
-
     tracker = PerformanceTracker()
     instance._handle_tp(
         position=cast(PositionSide, "LONG"),
@@ -86,15 +93,18 @@ def test_handle_tp_increases_win_and_saves(monkeypatch):
         performance_tracker=tracker,
     )
 
+    saved = parent.trade_journal.saved[0]
     assert tracker.win_count == 1
     assert success_logs == ["Position is closed with TP"]
     assert saved["position"] == "LONG"
     assert saved["result"] == "LONG"
     assert saved["snapshot"] is snapshot
+    assert parent.model_manager.recorded == [("LONG", snapshot)]
 
 
 def test_handle_sl_increases_loss_and_saves(monkeypatch):
     parent = Parent()
+    parent.shadow_runner = FakeModelManager()
     instance = ConcreteOpen(parent=parent, target_prices=[100.0, 90.0])
     snapshot = FakeMarketSnapshot(price=111.0)
 
@@ -103,18 +113,6 @@ def test_handle_sl_increases_loss_and_saves(monkeypatch):
         open_pos_module.Logger, "log_failure", lambda msg: failure_logs.append(msg)
     )
 
-    saved: dict[str, Any] = {}
-
-    def fake_save_result(
-        *, file_path: str, result: str, position: str, snapshot: Any
-    ) -> None:
-        saved["file_path"] = file_path
-        saved["result"] = result
-        saved["position"] = position
-        saved["snapshot"] = snapshot
-
-    monkeypatch.setattr(open_pos_module.FileUtils, "save_result", fake_save_result)
-
     tracker = PerformanceTracker()
     instance._handle_sl(
         position=cast(PositionSide, "SHORT"),
@@ -122,11 +120,14 @@ def test_handle_sl_increases_loss_and_saves(monkeypatch):
         performance_tracker=tracker,
     )
 
+    saved = parent.trade_journal.saved[0]
     assert tracker.loss_count == 1
     assert failure_logs == ["Position is closed with SL"]
     assert saved["position"] == "SHORT"
     assert saved["result"] == "LONG"
     assert saved["snapshot"] is snapshot
+    assert parent.model_manager.recorded == [("LONG", snapshot)]
+    assert parent.shadow_runner.recorded == [("LONG", snapshot)]
 
 
 def test_close_position_calls_handler_logs_and_transitions(monkeypatch):
@@ -168,3 +169,31 @@ def test_close_position_calls_handler_logs_and_transitions(monkeypatch):
         and "SL:" in info_logs[0]
         and "Win-Rate:" in info_logs[0]
     )
+
+
+def test_checkpoint_data_includes_targets_and_entry_snapshot():
+    from data.market_snapshot import MarketSnapshot
+
+    class NamedOpen(ConcreteOpen):
+        NAME = "LONG"
+
+    parent = Parent()
+    parent.data_manager.position_snapshot = MarketSnapshot(
+        "[2025-01-01 00:00:00]", 100.0, 1.0, 2.0, 99.0, 50.0
+    )
+    instance = NamedOpen(parent=parent, target_prices=[101.0, 99.5])
+
+    assert instance.checkpoint_data() == {
+        "state": "LONG",
+        "tp_price": 101.0,
+        "sl_price": 99.5,
+        "position_snapshot": {
+            "date": "[2025-01-01 00:00:00]",
+            "timestamp": parent.data_manager.position_snapshot.timestamp,
+            "price": 100.0,
+            "macd_12": 1.0,
+            "macd_26": 2.0,
+            "ema_100": 99.0,
+            "rsi_6": 50.0,
+        },
+    }
@@ -1,3 +1,4 @@
+import math
 import types
 import builtins
 from bot.states.flat.flat_position_state import FlatPositionState
@@ -31,6 +32,11 @@ class DummySnapshot:
         cloned._cloned = True
         return cloned
 
+    def is_complete(self, schema_version: int) -> bool:
+        self.checked_schema = schema_version
+        features = (self.price, self.macd_12, self.macd_26, self.ema_100, self.rsi_6)
+        return not any(math.isnan(value) for value in features)
+
     def __str__(self) -> str:
         return f"Snapshot(price={self.price})"
 
@@ -74,6 +80,7 @@ class DummyParent:
     ) -> None:
         self.data_manager = DummyDataManager(snapshot)
         self.binance_adapter = adapter or DummyBinanceAdapter()
+        self.model_manager = None
         self.state = None
 
 
@@ -183,15 +190,44 @@ def test_apply_branches_with_model_prediction(monkeypatch):
         state, "_apply_short", lambda: called.__setitem__("short", True)
     )
 
-    monkeypatch.setattr(flat_pos_module, "TFModel", lambda: FakeModelLong())
+    snapshots = []
+
+    class FakeManager:
+        def __init__(self, model) -> None:
+            self.model = model
+
+        def predict(self, snap):
+            snapshots.append(snap)
+            return self.model.predict(snap)
+
+    parent.model_manager = FakeManager(FakeModelLong())
     state.apply()
     assert called["long"] is True
     assert called["short"] is False
+    assert snapshots == [snapshot]
 
     called["long"] = False
     called["short"] = False
 
-    monkeypatch.setattr(flat_pos_module, "TFModel", lambda: FakeModelShort())
+    parent.model_manager = FakeManager(FakeModelShort())
     state.apply()
     assert called["short"] is True
     assert called["long"] is False
+
+
+def test_apply_waits_until_the_indicators_are_warmed_up(monkeypatch):
+    monkeypatch.setattr(
+        flat_pos_module, "SETTINGS", types.SimpleNamespace(MODEL_FEATURE_SCHEMA=3)
+    )
+    parent = DummyParent(DummySnapshot(ema_100=float("nan")))
+    state = FlatPositionState(parent)
+
+    class FailingManager:
+        def predict(self, _):
+            raise AssertionError("predicted on a warming-up snapshot")
+
+    parent.model_manager = FailingManager()
+    state.apply()
+    assert parent.data_manager.position_snapshot is None
+    assert parent.binance_adapter.called == {}
+    assert parent.data_manager.market_snapshot.checked_schema == 3
@@ -1,3 +1,4 @@
+from types import SimpleNamespace
 from bot.states.position_state import PositionState
 import bot.states.position_state as position_state_module
 
@@ -47,6 +48,8 @@ def make_parent(snapshot: Snapshot):
         def __init__(self, s: Snapshot) -> None:
             self.data_manager = DummyDataManager()
             self.binance_adapter = DummyBinanceAdapter(s)
+            self.snapshot_log = None
+            self.shadow_runner = None
 
     return Parent(snapshot)
 
@@ -117,3 +120,30 @@ def test_refresh_indicators_sets_parent_snapshot():
     assert parent.data_manager.market_snapshot is None
     state._refresh_indicators()
     assert parent.data_manager.market_snapshot is snapshot
+
+
+def test_refresh_indicators_appends_to_snapshot_log():
+    snapshot = Snapshot(price=10.0, ema_100=9.0)
+    parent = make_parent(snapshot)
+    appended = []
+
+    class FakeLog:
+        def append(self, snap, latency):
+            appended.append((snap, latency))
+
+    parent.snapshot_log = FakeLog()
+    ConcreteState(parent)._refresh_indicators()
+
+    assert len(appended) == 1
+    assert appended[0][0] is snapshot
+    assert appended[0][1] >= 0.0
+
+
+def test_refresh_indicators_queues_the_snapshot_for_shadow_models():
+    snapshot = Snapshot(price=10.0, ema_100=9.0)
+    parent = make_parent(snapshot)
+    submitted = []
+    parent.shadow_runner = SimpleNamespace(submit=submitted.append)
+
+    ConcreteState(parent)._refresh_indicators()
+    assert submitted == [snapshot]
@@ -1,6 +1,22 @@
+import json
+import pandas as pd
+from dataclasses import replace
 import pytest
 from bot.sage_bot import SageBot
 import bot.sage_bot as sage_bot_module
+from model.model_manager import ModelManager
+from model.model_server import ModelClient
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_path(monkeypatch, tmp_path):
+    path = tmp_path / "state.json"
+    monkeypatch.setattr(
+        sage_bot_module,
+        "SETTINGS",
+        replace(sage_bot_module.SETTINGS, STATE_CHECKPOINT_PATH=path),
+    )
+    yield path
 
 
 class Snapshot:
@@ -13,16 +29,34 @@ class FakeIndicatorManager:
     def __init__(self, snapshot: Snapshot) -> None:
         self._snapshot = snapshot
 
+        self.closed = False
+        self.bars = None
+
     def fetch_indicators(self) -> Snapshot:
         return self._snapshot
 
+    def close(self) -> None:
+        self.closed = True
+
 
 class FakeBinanceAdapter:
     def __init__(self, snapshot: Snapshot) -> None:
         self.indicator_manager = FakeIndicatorManager(snapshot)
 
 
+class FakeJournal:
+    closed = False
+
+    def read_since(self, last_id):
+        return pd.DataFrame(), last_id
+
+    def close(self):
+        self.closed = True
+
+
 class FakeState(sage_bot_module.PositionState):
+    NAME = "FLAT"
+
     def __init__(self, parent: SageBot) -> None:
         super().__init__(parent=parent)
 
@@ -52,11 +86,312 @@ def test_run_exits_when_sleep_raises_and_sleep_called_once(monkeypatch):
         return FakeBinanceAdapter(snapshot)
 
     monkeypatch.setattr(sage_bot_module, "BinanceAdapter", adapter_factory)
+    opened = []
+    monkeypatch.setattr(
+        sage_bot_module.TradeJournal,
+        "open",
+        lambda path, csv_path=None: opened.append((path, csv_path)) or journal,
+    )
 
+    journal = FakeJournal()
     bot = SageBot()
 
     with pytest.raises(StopLoop):
         bot.run()
 
     assert len(calls) == 1
-    assert isinstance(calls[0], (int, float))
+    assert bot.trade_journal is journal
+    assert journal.closed
+    assert len(bot.training_dataset) == 0
+    assert opened == [
+        (sage_bot_module.SETTINGS.OUTPUT_DB_PATH, sage_bot_module.SETTINGS.OUTPUT_CSV_PATH)
+    ]
+
+
+def test_run_waits_for_trade_bars_instead_of_sleeping(monkeypatch):
+    monkeypatch.setattr(sage_bot_module, "sleep", lambda seconds: 1 / 0)
+    monkeypatch.setattr(sage_bot_module, "FlatPositionState", FakeState)
+    adapter = FakeBinanceAdapter(Snapshot(price=100.0, ema_100=50.0))
+    waits = []
+
+    class Bars:
+        def wait(self, timeout: float) -> bool:
+            waits.append(timeout)
+            if len(waits) == 2:
+                raise KeyboardInterrupt
+            return True
+
+    adapter.indicator_manager.bars = Bars()
+    monkeypatch.setattr(sage_bot_module, "BinanceAdapter", lambda: adapter)
+    monkeypatch.setattr(
+        sage_bot_module.TradeJournal, "open", lambda path, csv_path=None: FakeJournal()
+    )
+    bot = SageBot()
+
+    with pytest.raises(KeyboardInterrupt):
+        bot.run()
+
+    assert waits == [sage_bot_module.SETTINGS.SLEEP_DURATION] * 2
+    assert adapter.indicator_manager.closed
+
+
+def test_run_closes_snapshot_log_when_enabled(monkeypatch, tmp_path):
+    class StopLoop(Exception):
+        pass
+
+    def fake_sleep(seconds: float) -> None:
+        raise StopLoop
+
+    settings = replace(
+        sage_bot_module.SETTINGS,
+        SNAPSHOT_LOG_ENABLED=True,
+        SNAPSHOT_LOG_DIR=tmp_path / "snapshots",
+    )
+    monkeypatch.setattr(sage_bot_module, "SETTINGS", settings)
+    monkeypatch.setattr(sage_bot_module, "sleep", fake_sleep)
+    monkeypatch.setattr(sage_bot_module, "FlatPositionState", FakeState)
+    monkeypatch.setattr(
+        sage_bot_module, "BinanceAdapter", lambda: FakeBinanceAdapter(Snapshot(1.0, 1.0))
+    )
+    monkeypatch.setattr(
+        sage_bot_module.TradeJournal, "open", lambda path, csv_path=None: FakeJournal()
+    )
+
+    bot = SageBot()
+    assert isinstance(bot.snapshot_log, sage_bot_module.SnapshotLogWriter)
+    closed = []
+    monkeypatch.setattr(bot.snapshot_log, "close", lambda: closed.append(True))
+
+    with pytest.raises(StopLoop):
+        bot.run()
+    assert closed == [True]
+    assert bot.binance_adapter.indicator_manager.closed
+
+
+class FakeAccountManager:
+    def __init__(self, amount: float) -> None:
+        self.amount = amount
+        self.queries = []
+
+    def get_position_amount(self, order_type: str) -> float:
+        self.queries.append(order_type)
+        return self.amount
+
+
+class FakeCheckpointAdapter(FakeBinanceAdapter):
+    def __init__(self, amount: float = 0.0) -> None:
+        super().__init__(Snapshot(100.0, 50.0))
+        self.account_manager = FakeAccountManager(amount)
+
+
+def make_bot(monkeypatch, amount: float = 0.0, test_mode: bool = True) -> SageBot:
+    monkeypatch.setattr(
+        sage_bot_module,
+        "SETTINGS",
+        replace(sage_bot_module.SETTINGS, TEST_MODE=test_mode),
+    )
+    adapter = FakeCheckpointAdapter(amount)
+    monkeypatch.setattr(sage_bot_module, "BinanceAdapter", lambda: adapter)
+    monkeypatch.setattr(
+        sage_bot_module.TradeJournal, "open", lambda path, csv_path=None: FakeJournal()
+    )
+    monkeypatch.setattr(sage_bot_module.Logger, "log_start", lambda msg: None)
+    monkeypatch.setattr(sage_bot_module.Logger, "log_info", lambda msg: None)
+    return SageBot()
+
+
+def write_checkpoint(path, state: str) -> None:
+    path.write_text(
+        json.dumps(
+            {
+                "version": sage_bot_module.StateCheckpoint.VERSION,
+                "state": state,
+                "tp_price": 101.0,
+                "sl_price": 99.0,
+                "position_snapshot": {
+                    "date": "[2025-01-01 00:00:00]",
+                    "price": 100.0,
+                    "macd_12": 1.0,
+                    "macd_26": 2.0,
+                    "ema_100": 99.0,
+                    "rsi_6": 50.0,
+                },
+                "win_count": 4,
+                "loss_count": 2,
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+def test_starts_flat_and_checkpoints_without_previous_checkpoint(
+    monkeypatch, checkpoint_path
+):
+    bot = make_bot(monkeypatch)
+
+    assert isinstance(bot.state, sage_bot_module.FlatPositionState)
+    saved = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    assert saved["state"] == "FLAT"
+    assert (saved["win_count"], saved["loss_count"]) == (0, 0)
+
+
+def test_every_transition_is_checkpointed(monkeypatch, checkpoint_path):
+    bot = make_bot(monkeypatch)
+    bot.data_manager.position_snapshot = sage_bot_module.MarketSnapshot(
+        "[2025-01-01 00:00:00]", 100.0, 1.0, 2.0, 99.0, 50.0
+    )
+    bot.performance_tracker.increase_win()
+
+    bot.state = sage_bot_module.ShortPositionState(
+        parent=bot, target_prices=[99.0, 101.0]
+    )
+
+    saved = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    assert saved["state"] == "SHORT"
+    assert (saved["tp_price"], saved["sl_price"]) == (99.0, 101.0)
+    assert saved["position_snapshot"]["price"] == 100.0
+    assert saved["win_count"] == 1
+
+
+@pytest.mark.parametrize(
+    "side,state_class",
+    [
+        ("LONG", sage_bot_module.LongPositionState),
+        ("SHORT", sage_bot_module.ShortPositionState),
+    ],
+)
+def test_restores_active_position_in_test_mode(
+    monkeypatch, checkpoint_path, side, state_class
+):
+    write_checkpoint(checkpoint_path, side)
+
+    bot = make_bot(monkeypatch, test_mode=True)
+
+    assert isinstance(bot.state, state_class)
+    assert (bot.state.tp_price, bot.state.sl_price) == (101.0, 99.0)
+    assert bot.data_manager.position_snapshot.price == 100.0
+    assert bot.performance_tracker.win_count == 4
+    assert bot.performance_tracker.loss_count == 2
+    assert bot.binance_adapter.account_manager.queries == []
+
+
+def test_restores_position_confirmed_by_exchange(monkeypatch, checkpoint_path):
+    write_checkpoint(checkpoint_path, "LONG")
+
+    bot = make_bot(monkeypatch, amount=0.5, test_mode=False)
+
+    assert isinstance(bot.state, sage_bot_module.LongPositionState)
+    assert bot.binance_adapter.account_manager.queries == ["LONG"]
+
+
+def test_resumes_flat_when_exchange_position_is_closed(monkeypatch, checkpoint_path):
+    write_checkpoint(checkpoint_path, "SHORT")
+
+    bot = make_bot(monkeypatch, amount=0.0, test_mode=False)
+
+    assert isinstance(bot.state, sage_bot_module.FlatPositionState)
+    assert bot.binance_adapter.account_manager.queries == ["SHORT"]
+    assert bot.performance_tracker.win_count == 4
+    saved = json.loads(checkpoint_path.read_text(encoding="utf-8"))
+    assert saved["state"] == "FLAT"
+
+
+def test_restores_counters_from_flat_checkpoint(monkeypatch, checkpoint_path):
+    write_checkpoint(checkpoint_path, "FLAT")
+
+    bot = make_bot(monkeypatch, test_mode=False)
+
+    assert isinstance(bot.state, sage_bot_module.FlatPositionState)
+    assert bot.performance_tracker.loss_count == 2
+    assert bot.binance_adapter.account_manager.queries == []
+
+
+def test_uses_model_server_client_when_socket_is_configured(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        sage_bot_module,
+        "SETTINGS",
+        replace(
+            sage_bot_module.SETTINGS,
+            STATE_CHECKPOINT_PATH=tmp_path / "state.json",
+            MODEL_SERVER_SOCKET=str(tmp_path / "model.sock"),
+        ),
+    )
+    monkeypatch.setattr(
+        sage_bot_module.TrainingDataset,
+        "from_journal",
+        lambda journal: pytest.fail("dataset must not be loaded"),
+    )
+    bot = make_bot(monkeypatch)
+
+    assert isinstance(bot.model_manager, ModelClient)
+    assert bot.model_manager.socket_path == tmp_path / "model.sock"
+    assert bot.training_dataset is None
+
+
+def test_shadow_backends_run_beside_the_serving_model(monkeypatch):
+    managers = []
+
+    class FakeManager:
+        uses_keras = staticmethod(ModelManager.uses_keras)
+
+        def __init__(
+            self, dataset, backend=None, shadow=False, metric_prefix="model."
+        ) -> None:
+            self.dataset = dataset
+            self.backend = backend
+            self.shadow = shadow
+            self.metric_prefix = metric_prefix
+            managers.append(self)
+
+    monkeypatch.setattr(sage_bot_module, "ModelManager", FakeManager)
+    monkeypatch.setattr(sage_bot_module.ShadowRunner, "start", lambda self: None)
+    settings = replace(
+        sage_bot_module.SETTINGS,
+        MODEL_BACKEND="keras",
+        MODEL_SHADOW_BACKENDS=("logistic", "ensemble"),
+    )
+    monkeypatch.setattr(sage_bot_module, "SETTINGS", settings)
+    bot = make_bot(monkeypatch)
+
+    serving, *shadows = managers
+    assert bot.model_manager is serving and serving.backend is None
+    assert not serving.shadow and all(manager.shadow for manager in shadows)
+    assert [manager.metric_prefix for manager in managers] == [
+        "model.",
+        "shadow.logistic.",
+        "shadow.ensemble.",
+    ]
+    assert [trader.name for trader in bot.shadow_runner.traders] == [
+        "logistic",
+        "ensemble",
+    ]
+    assert [trader.model for trader in bot.shadow_runner.traders] == shadows
+    datasets = {id(manager.dataset) for manager in managers}
+    assert len(datasets) == 3
+    assert bot.shadow_runner.live_tracker is bot.performance_tracker
+
+    stopped = []
+    monkeypatch.setattr(bot.shadow_runner, "stop", lambda: stopped.append(True))
+    monkeypatch.setattr(sage_bot_module, "sleep", lambda seconds: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        bot.run()
+    assert stopped == [True]
+
+    settings = replace(settings, MODEL_SHADOW_BACKENDS=("keras",))
+    monkeypatch.setattr(sage_bot_module, "SETTINGS", settings)
+    with pytest.raises(ValueError, match="Shadow backend keras is already serving"):
+        make_bot(monkeypatch)
+
+    settings = replace(
+        settings,
+        MODEL_SHADOW_BACKENDS=("ensemble",),
+        MODEL_ENSEMBLE_MEMBERS=("logistic", "keras:8"),
+    )
+    monkeypatch.setattr(sage_bot_module, "SETTINGS", settings)
+    monkeypatch.setattr("model.model_manager.SETTINGS", settings)
+    with pytest.raises(ValueError, match="cannot use Keras beside the serving keras"):
+        make_bot(monkeypatch)
+    monkeypatch.setattr(
+        sage_bot_module, "SETTINGS", replace(settings, MODEL_BACKEND="logistic")
+    )
+    assert make_bot(monkeypatch).shadow_runner.traders[0].name == "ensemble"
@@ -0,0 +1,145 @@
+import math
+import threading
+from time import perf_counter
+from types import SimpleNamespace
+import pytest
+import bot.shadow_runner as shadow_module
+from bot.performance_tracker import PerformanceTracker
+from bot.shadow_runner import ShadowRunner, ShadowTrader
+from data.market_snapshot import MarketSnapshot
+
+
+@pytest.fixture(autouse=True)
+def quiet(monkeypatch):
+    monkeypatch.setattr(
+        shadow_module.BinanceAdapter,
+        "calculate_target_prices",
+        staticmethod(
+            lambda side, price: (price + 10, price - 5)
+            if side == "LONG"
+            else (price - 10, price + 5)
+        ),
+    )
+    monkeypatch.setattr(shadow_module.Logger, "log_info", lambda msg: None)
+    monkeypatch.setattr(
+        shadow_module, "SETTINGS", SimpleNamespace(MODEL_FEATURE_SCHEMA=1)
+    )
+    shadow_module.Metrics.reset()
+
+
+def _snapshot(price: float) -> MarketSnapshot:
+    return MarketSnapshot("[2025-01-01 00:00:00]", price, 0.0, 0.0, price, 50.0)
+
+
+class FakeModel:
+    def __init__(self, side: str) -> None:
+        self.side = side
+        self.predicted = []
+        self.recorded = []
+
+    def predict(self, snapshot) -> str:
+        self.predicted.append(snapshot.price)
+        return self.side
+
+    def record_result(self, result, snapshot) -> None:
+        self.recorded.append((result, snapshot))
+
+
+def test_trader_follows_the_position_state_machine():
+    trader = ShadowTrader("long", FakeModel("LONG"))
+    prices = [100.0, 110.0, 110.1, 200.0, 194.0, 195.0, 195.0]
+    outcomes = [trader.step(_snapshot(price)) for price in prices]
+
+    # Enter at 100 (TP 110, SL 95); 110 is not strictly above TP; exit with TP at
+    # 110.1; the exit tick does not re-enter; enter at 200 (SL 195) and exit at 194.
+    assert outcomes == [None, None, True, None, False, None, None]
+    assert trader.model.predicted == [100.0, 200.0, 195.0]
+    tracker = trader.performance_tracker
+    assert (tracker.win_count, tracker.loss_count) == (1, 1)
+    assert trader.position == "LONG" and trader.tp_price == 205.0
+
+
+def test_trader_waits_until_the_indicators_are_warmed_up():
+    model = FakeModel("LONG")
+    trader = ShadowTrader("long", model)
+    warming = MarketSnapshot("[2025-01-01 00:00:00]", 100.0, 0.0, 0.0, math.nan, 50.0)
+    assert trader.step(warming) is None
+    assert trader.position is None and model.predicted == []
+    trader.step(_snapshot(100.0))
+    assert trader.position == "LONG" and model.predicted == [100.0]
+
+
+def test_short_trader_uses_mirrored_comparisons():
+    trader = ShadowTrader("short", FakeModel("SHORT"))
+    assert [trader.step(_snapshot(p)) for p in (100.0, 89.0, 100.0, 105.5)] == [
+        None,
+        True,
+        None,
+        False,
+    ]
+
+
+def test_runner_reports_win_rates_next_to_the_live_ones(monkeypatch):
+    logs = []
+    monkeypatch.setattr(shadow_module.Logger, "log_info", logs.append)
+    live = PerformanceTracker()
+    live.increase_win()
+    models = {"long": FakeModel("LONG"), "short": FakeModel("SHORT")}
+    runner = ShadowRunner(models, live)
+
+    runner.start()
+    for price in (100.0, 111.0):
+        runner.submit(_snapshot(price))
+    entry = _snapshot(100.0)
+    runner.record_result("LONG", entry)
+    runner._queue.join()
+    runner.stop()
+
+    assert logs[0] == "Shadow models running: long, short"
+    assert logs[1:] == [
+        "Shadow long Win-Rate: 100.0% over 1 trades, live 100.0% over 1",
+        "Shadow short Win-Rate: 0.0% over 1 trades, live 100.0% over 1",
+    ]
+    assert shadow_module.Metrics.get("shadow.long.win_rate") == 1.0
+    assert shadow_module.Metrics.get("shadow.short.win_rate") == 0.0
+    assert shadow_module.Metrics.get("shadow.short.trades") == 1
+    assert models["long"].recorded == [("LONG", entry)]
+
+
+def test_failing_model_is_logged_and_skipped(monkeypatch):
+    errors = []
+    monkeypatch.setattr(shadow_module.Logger, "log_exception", errors.append)
+
+    class Broken(FakeModel):
+        def predict(self, snapshot) -> str:
+            raise ValueError("No data in trade journal")
+
+    healthy = FakeModel("LONG")
+    models = {"broken": Broken("LONG"), "healthy": healthy}
+    runner = ShadowRunner(models, PerformanceTracker())
+    runner.process("snapshot", _snapshot(100.0))
+
+    assert errors == ["Shadow model broken: No data in trade journal"]
+    assert healthy.predicted == [100.0]
+
+
+def test_submit_never_waits_for_a_slow_model():
+    release = threading.Event()
+
+    class Slow(FakeModel):
+        def predict(self, snapshot) -> str:
+            release.wait()
+            return "LONG"
+
+    runner = ShadowRunner({"slow": Slow("LONG")}, PerformanceTracker(), queue_size=2)
+    runner.start()
+    started = perf_counter()
+    for price in range(10):
+        runner.submit(_snapshot(float(price)))
+    elapsed = perf_counter() - started
+    release.set()
+    runner.stop()
+
+    assert elapsed < 0.5
+    assert shadow_module.Metrics.get("shadow.dropped") >= 7
+    runner.stop()
@@ -0,0 +1,75 @@
+import json
+from bot.state_checkpoint import StateCheckpoint
+import bot.state_checkpoint as state_checkpoint_module
+
+
+def test_save_then_load_round_trip(tmp_path):
+    checkpoint = StateCheckpoint(tmp_path / "nested" / "state.json")
+    checkpoint.save({"state": "LONG", "tp_price": 101.0, "win_count": 3})
+
+    assert checkpoint.load() == {
+        "version": StateCheckpoint.VERSION,
+        "state": "LONG",
+        "tp_price": 101.0,
+        "win_count": 3,
+    }
+    assert not (tmp_path / "nested" / "state.json.tmp").exists()
+
+
+def test_save_replaces_previous_checkpoint(tmp_path):
+    checkpoint = StateCheckpoint(tmp_path / "state.json")
+    checkpoint.save({"state": "LONG"})
+    checkpoint.save({"state": "FLAT"})
+
+    assert checkpoint.load()["state"] == "FLAT"
+
+
+def test_save_uses_atomic_rename(tmp_path, monkeypatch):
+    calls = []
+    real_replace = state_checkpoint_module.os.replace
+
+    def fake_replace(source, target):
+        calls.append((str(source), str(target)))
+        real_replace(source, target)
+
+    monkeypatch.setattr(state_checkpoint_module.os, "replace", fake_replace)
+    path = tmp_path / "state.json"
+    StateCheckpoint(path).save({"state": "FLAT"})
+
+    assert calls == [(str(path) + ".tmp", str(path))]
+
+
+def test_save_skips_directory_sync_without_o_directory(tmp_path, monkeypatch):
+    monkeypatch.delattr(state_checkpoint_module.os, "O_DIRECTORY", raising=False)
+    checkpoint = StateCheckpoint(tmp_path / "state.json")
+    checkpoint.save({"state": "FLAT"})
+
+    assert checkpoint.load()["state"] == "FLAT"
+
+
+def test_load_returns_none_when_missing(tmp_path):
+    assert StateCheckpoint(tmp_path / "state.json").load() is None
+
+
+def test_load_ignores_corrupt_file(tmp_path, monkeypatch):
+    logs = []
+    monkeypatch.setattr(
+        state_checkpoint_module.Logger, "log_exception", lambda msg: logs.append(msg)
+    )
+    path = tmp_path / "state.json"
+    path.write_text("{not json", encoding="utf-8")
+
+    assert StateCheckpoint(path).load() is None
+    assert len(logs) == 1 and "unreadable" in logs[0]
+
+
+def test_load_ignores_other_version(tmp_path, monkeypatch):
+    logs = []
+    monkeypatch.setattr(
+        state_checkpoint_module.Logger, "log_exception", lambda msg: logs.append(msg)
+    )
+    path = tmp_path / "state.json"
+    path.write_text(json.dumps({"version": 999, "state": "LONG"}), encoding="utf-8")
+
+    assert StateCheckpoint(path).load() is None
+    assert logs == ["Ignoring incompatible state checkpoint"]
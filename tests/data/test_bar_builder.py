@@ -0,0 +1,120 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+from data.bar_builder import BarBuilder
+from data.kline_history import KlineHistory
+
+
+def _trades(count=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return (
+        2_500.0 + np.round(np.cumsum(rng.normal(0.0, 0.5, count)), 1),
+        rng.integers(1, 64, count) / 16,
+        np.arange(count) * 10.0,
+        rng.random(count) < 0.5,
+        rng.integers(1, 4, count),
+    )
+
+
+def test_bars_close_on_the_trade_reaching_the_threshold():
+    builder = BarBuilder("volume", 2.0, capacity=4)
+    trades = [
+        (100.0, 1.0, 0, False),
+        (102.0, 0.5, 1, True),
+        (99.0, 1.0, 2, False),
+        (101.0, 3.0, 3, True),
+        (103.0, 0.5, 4, False),
+    ]
+    closed = [builder.add_trade(*trade) for trade in trades]
+
+    assert closed == [False, False, True, True, False]
+    bars = builder.history()
+    assert bars.open_time.tolist() == [0, 3]
+    assert bars.open.tolist() == [100.0, 101.0]
+    assert bars.high.tolist() == [102.0, 101.0]
+    assert bars.low.tolist() == [99.0, 101.0]
+    assert bars.close.tolist() == [99.0, 101.0]
+    assert bars.volume.tolist() == [2.5, 3.0]
+    assert bars.number_of_trades.tolist() == [3.0, 1.0]
+    assert bars.taker_buy_volume.tolist() == [2.0, 0.0]
+    assert builder.last_price == 103.0
+
+
+@pytest.mark.parametrize(
+    "kind, threshold", [("volume", 40.0), ("tick", 60), ("dollar", 80_000.0)]
+)
+def test_vectorized_batches_match_trade_by_trade_ingestion(kind, threshold):
+    trades = _trades()
+    streamed = BarBuilder(kind, threshold, capacity=50)
+    closed = sum(streamed.add_trade(*trade) for trade in zip(*trades))
+    batched = BarBuilder(kind, threshold, capacity=50)
+    batches = [
+        batched.add_trades(*(column[start : start + 777] for column in trades))
+        for start in range(0, 5_000, 777)
+    ]
+
+    assert sum(batches) == closed > 50
+    assert len(batched) == 50 and batched.add_trades(*([],) * 4) == 0
+    for name in KlineHistory.ARRAYS:
+        np.testing.assert_allclose(
+            getattr(batched.history(), name), getattr(streamed.history(), name)
+        )
+    assert batched.last_price == streamed.last_price
+    # The open bar carries over to the next trade as well.
+    assert batched.add_trade(2_500.0, 1e9, 0, False, 10**6)
+    assert streamed.add_trade(2_500.0, 1e9, 0, False, 10**6)
+    np.testing.assert_allclose(batched.history().volume, streamed.history().volume)
+
+
+def test_memory_is_bounded_by_the_capacity():
+    builder = BarBuilder("tick", 1, capacity=3)
+    assert builder.add_trades(np.arange(10.0), np.ones(10), np.arange(10), [0] * 10)
+    assert builder.history().close.tolist() == [7.0, 8.0, 9.0]
+    builder.add_trade(10.0, 1.0, 10, True)
+    assert builder.history().close.tolist() == [8.0, 9.0, 10.0]
+    assert builder._bars.shape == (len(KlineHistory.ARRAYS), 6)
+
+
+def test_recorded_agg_trade_files_are_read_in_chunks(monkeypatch, tmp_path: Path):
+    prices, quantities, times, buyer_maker, _ = _trades(1_000)
+    frame = pd.DataFrame(
+        {
+            "agg_trade_id": np.arange(1_000),
+            "price": prices,
+            "quantity": quantities,
+            "first_trade_id": np.arange(1_000) * 2,
+            "last_trade_id": np.arange(1_000) * 2 + 1,
+            "transact_time": times.astype(np.int64),
+            "is_buyer_maker": np.where(buyer_maker, "true", "false"),
+            "is_best_match": "true",
+        }
+    )
+    with_header, without_header = tmp_path / "a.csv", tmp_path / "b.csv"
+    frame.to_csv(with_header, index=False)
+    frame.to_csv(without_header, index=False, header=False)
+    read = BarBuilder.read_agg_trades
+    monkeypatch.setattr(
+        BarBuilder,
+        "read_agg_trades",
+        staticmethod(lambda path: read(path, chunksize=100)),
+    )
+
+    expected = BarBuilder("tick", 20)
+    expected.add_trades(prices, quantities, times, buyer_maker, np.full(1_000, 2))
+    for path in (with_header, without_header):
+        builder = BarBuilder("tick", 20)
+        assert builder.add_agg_trades(path) == len(expected) == 100
+        np.testing.assert_allclose(builder.history().close, expected.history().close)
+        np.testing.assert_allclose(
+            builder.history().taker_buy_volume, expected.history().taker_buy_volume
+        )
+
+
+def test_invalid_builders_raise():
+    with pytest.raises(ValueError, match="Unknown bar type: range"):
+        BarBuilder("range", 1.0)
+    with pytest.raises(ValueError, match="threshold must be positive"):
+        BarBuilder("tick", 0)
+    with pytest.raises(ValueError, match="Capacity must be positive"):
+        BarBuilder("tick", 1, capacity=0)
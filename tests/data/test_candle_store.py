@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from data.candle_store import CandleStore
+from data.kline_history import KlineHistory
+
+
+def _candles(first: int, count: int, seed: int = 0) -> KlineHistory:
+    rng = np.random.default_rng(seed)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, count))
+    return KlineHistory(
+        (first + np.arange(count)) * 900_000,
+        close,
+        close + rng.uniform(0.0, 1.0, count),
+        close - rng.uniform(0.0, 1.0, count),
+        close + rng.normal(0.0, 0.1, count),
+        rng.uniform(1.0, 2.0, count),
+        np.ones(count),
+        rng.uniform(0.0, 1.0, count),
+    )
+
+
+def _assert_same(left: KlineHistory, right: KlineHistory) -> None:
+    for name in KlineHistory.ARRAYS:
+        np.testing.assert_array_equal(getattr(left, name), getattr(right, name))
+
+
+def test_update_replaces_refetched_candles_and_keeps_the_capacity():
+    store = CandleStore(900, 10)
+    assert len(store) == 0 and store.last_open_time == 0
+    store.update(_candles(0, 8))
+    store.update(_candles(0, 0))
+    store.update(_candles(7, 5, seed=1))
+
+    assert len(store) == 10
+    assert store.history.open_time.tolist() == [
+        t * 900_000 for t in range(2, 12)
+    ]
+    assert store.history.close[5] == _candles(7, 5, seed=1).close[0]
+    assert store.last_open_time == 11 * 900_000
+
+
+def test_incremental_resampling_matches_a_full_resample():
+    candles = _candles(3, 3_000)
+    store = CandleStore(900, 500)
+    store.update(candles[:400])
+    assert len(store.resample(3_600)) == 100
+
+    for end in range(401, 3_000, 7):
+        # Every tick re-fetches the candle that was still open.
+        store.update(candles[end - 8 : end])
+        resampled = store.resample(3_600)
+        history = store.history
+        first = np.flatnonzero(history.open_time % 3_600_000 == 0)[0]
+        _assert_same(resampled, history[first:].resample(3_600))
+        assert resampled.open_time[0] >= history.open_time[0]
+
+
+def test_resampling_restarts_after_a_gap_longer_than_the_store():
+    store = CandleStore(900, 16)
+    store.update(_candles(0, 16))
+    store.resample(3_600)
+    store.update(_candles(1_000, 16, seed=1))
+
+    _assert_same(store.resample(3_600), _candles(1_000, 16, seed=1).resample(3_600))
+
+
+def test_invalid_stores_and_intervals_raise():
+    with pytest.raises(ValueError, match="Capacity must be positive"):
+        CandleStore(900, 0)
+    store = CandleStore(900, 10)
+    assert len(store.resample(3_600)) == 0
+    with pytest.raises(ValueError, match="Cannot resample 900s candles into 1200s"):
+        store.resample(1_200)
+    with pytest.raises(ValueError, match="into 604800s"):
+        store.resample(604_800)
@@ -0,0 +1,149 @@
+import numpy as np
+import pytest
+import talib
+from data.indicator_registry import Indicator, IndicatorRegistry
+from data.kline_history import KlineHistory
+from data.market_snapshot import MarketSnapshot
+
+
+def _history(rows: int = 120, taker: bool = True) -> KlineHistory:
+    rng = np.random.default_rng(1)
+    close = 100.0 + np.cumsum(rng.normal(0.0, 1.0, rows))
+    volume = rng.uniform(1.0, 10.0, rows)
+    return KlineHistory(
+        np.arange(rows),
+        close,
+        close + rng.uniform(0.0, 2.0, rows),
+        close - rng.uniform(0.0, 2.0, rows),
+        close,
+        volume,
+        taker_buy_volume=volume * 0.3 if taker else None,
+    )
+
+
+def test_default_registry_declares_every_snapshot_feature():
+    registry = IndicatorRegistry.default()
+    assert set(MarketSnapshot.KLINE_FEATURES) <= set(registry.indicators)
+    assert registry.indicators["macd_12"].inputs == ("ema_12", "ema_26")
+
+
+def test_extra_features_match_the_reference_formulas():
+    history = _history()
+    features = IndicatorRegistry.default().matrix(
+        history, MarketSnapshot.EXTRA_FEATURES
+    )
+
+    assert features.shape == (len(history), 4)
+    atr = talib.ATR(history.high, history.low, history.close, timeperiod=14)
+    np.testing.assert_allclose(features[:, 0], atr, equal_nan=True)
+
+    window = history.close[-20:]
+    assert features[-1, 1] == pytest.approx(4 * window.std() / window.mean())
+
+    volumes = history.volume[-20:]
+    zscore = (volumes[-1] - volumes.mean()) / volumes.std()
+    assert features[-1, 2] == pytest.approx(zscore)
+    np.testing.assert_allclose(features[:, 3], 0.3)
+
+    assert np.isnan(features[:13, 0]).all() and np.isnan(features[:19, 1:3]).all()
+    assert not np.isnan(features[19:]).any()
+
+
+def test_degenerate_candles():
+    history = _history(40, taker=False)
+    history.volume[:] = 2.0
+    history.volume[-2:] = 0.0
+    registry = IndicatorRegistry.default()
+    features = registry.matrix(history, ("volume_z_20", "taker_buy_ratio"))
+    assert features[19, 0] == 0.0
+    assert np.isnan(features[:, 1]).all()
+
+    history.taker_buy_volume[:] = 1.0
+    ratio = registry.matrix(history, ("taker_buy_ratio",))[:, 0]
+    assert ratio[-1] == 0.5 and ratio[0] == 0.5
+
+
+def test_shared_intermediates_are_evaluated_once(monkeypatch):
+    registry = IndicatorRegistry.default()
+    calls = []
+    for name in ("ema_12", "ema_26"):
+        indicator = registry.indicators[name]
+
+        def counted(*args, _function=indicator.function, _name=name, **kwargs):
+            calls.append(_name)
+            return _function(*args, **kwargs)
+
+        registry.indicators[name] = Indicator(
+            name, indicator.inputs, counted, indicator.params, indicator.warmup
+        )
+
+    series = registry.evaluate(_history(), ("macd_26", "macd_12", "price"))
+    assert sorted(calls) == ["ema_12", "ema_26"]
+    assert list(series) == ["ema_12", "ema_26", "macd_12", "macd_26", "price"]
+
+
+def test_warmups_add_up_along_the_inputs():
+    registry = IndicatorRegistry.default()
+    assert registry.warmup("close") == 0
+    assert registry.warmup("macd_12") == registry.warmup("ema_26")
+    assert registry.warmup("macd_26") == 2 * registry.warmup("ema_26")
+    assert registry.lookback(MarketSnapshot.KLINE_FEATURES) == (
+        registry.warmup("ema_100") + 1
+    )
+    assert registry.lookback(()) == 1
+
+
+def test_lookback_history_settles_to_the_long_history_values():
+    history = _history(2000)
+    registry = IndicatorRegistry.default()
+    lookback = registry.lookback(MarketSnapshot.KLINE_FEATURES)
+    recent = KlineHistory(
+        history.open_time[-lookback:],
+        history.open[-lookback:],
+        history.high[-lookback:],
+        history.low[-lookback:],
+        history.close[-lookback:],
+        history.volume[-lookback:],
+        taker_buy_volume=history.taker_buy_volume[-lookback:],
+    )
+    full = registry.latest(history, MarketSnapshot.KLINE_FEATURES)
+    short = registry.latest(recent, MarketSnapshot.KLINE_FEATURES)
+    for name in MarketSnapshot.KLINE_FEATURES:
+        assert short[name] == pytest.approx(full[name], rel=1e-5), name
+
+
+def test_custom_indicators_build_on_registered_ones():
+    registry = IndicatorRegistry.default()
+    registry.register(
+        Indicator(
+            "close_x2",
+            ("price",),
+            lambda price, factor: price * factor,
+            {"factor": 2.0},
+            warmup=3,
+        )
+    )
+    history = _history(30)
+    assert registry.latest(history, ("close_x2",)) == {
+        "close_x2": history.close[-1] * 2
+    }
+    assert registry.lookback(("close_x2",)) == 4
+    assert registry.matrix({"close": history.close}, ()).shape == (30, 0)
+
+    latest = registry.latest(_history(0), MarketSnapshot.EXTRA_FEATURES)
+    assert list(latest) == list(MarketSnapshot.EXTRA_FEATURES)
+    assert all(np.isnan(value) for value in latest.values())
+
+
+def test_invalid_indicators_raise():
+    registry = IndicatorRegistry.default()
+    with pytest.raises(ValueError, match="ema_12 is already registered"):
+        registry.register(Indicator("ema_12", ("close",), np.copy))
+    with pytest.raises(ValueError, match="close is already registered"):
+        registry.register(Indicator("close", ("open",), np.copy))
+    with pytest.raises(ValueError, match="Unknown inputs of indicator x: y, z"):
+        registry.register(Indicator("x", ("close", "y", "z"), np.add))
+    with pytest.raises(KeyError, match="Unknown indicator: vwap"):
+        registry.lookback(("vwap",))
+    with pytest.raises(KeyError, match="Unknown indicator: vwap"):
+        registry.evaluate(_history(), ("price", "vwap"))
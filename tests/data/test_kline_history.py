@@ -0,0 +1,102 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+from data.kline_history import KlineHistory
+
+
+def _raw_klines():
+    return [
+        [1000, "100", "110", "90", "105", "5", 1999, "0", "3", "1", "0", "0"],
+        [2000, "105", "115", "100", "111", "7", 2999, "0", "4", "2", "0", "0"],
+    ]
+
+
+def test_from_klines_parses_columns():
+    history = KlineHistory.from_klines(_raw_klines())
+    assert len(history) == 2
+    assert history.open_time.dtype == np.int64
+    assert history.open_time.tolist() == [1000, 2000]
+    assert history.high.tolist() == [110.0, 115.0]
+    assert history.low.tolist() == [90.0, 100.0]
+    assert history.close.tolist() == [105.0, 111.0]
+    assert history.volume.tolist() == [5.0, 7.0]
+
+
+def test_rejects_mismatched_columns():
+    with pytest.raises(ValueError, match="same length"):
+        KlineHistory(
+            np.array([1, 2]),
+            np.array([1.0]),
+            np.array([1.0]),
+            np.array([1.0]),
+            np.array([1.0]),
+            np.array([1.0]),
+        )
+
+
+def test_csv_roundtrip(tmp_path: Path):
+    history = KlineHistory.from_klines(_raw_klines())
+    path = tmp_path / "cache" / "klines.csv"
+    history.to_csv(path)
+    loaded = KlineHistory.from_csv(path)
+    assert loaded.open_time.tolist() == history.open_time.tolist()
+    assert loaded.close.tolist() == history.close.tolist()
+    assert loaded.open.tolist() == history.open.tolist()
+
+
+def test_download_uses_client():
+    client = MagicMock()
+    client.get_historical_klines.return_value = _raw_klines()
+    history = KlineHistory.download(client, "ETHUSDT", "15m", "1 week ago UTC")
+    assert len(history) == 2
+    client.get_historical_klines.assert_called_once_with(
+        symbol="ETHUSDT", interval="15m", start_str="1 week ago UTC", end_str=None
+    )
+
+
+def test_keeps_trade_counts_and_taker_volume(tmp_path: Path):
+    history = KlineHistory.from_klines(_raw_klines())
+    assert history.number_of_trades.tolist() == [3.0, 4.0]
+    assert history.taker_buy_volume.tolist() == [1.0, 2.0]
+
+    path = tmp_path / "klines.csv"
+    history.to_csv(path)
+    assert KlineHistory.from_csv(path).taker_buy_volume.tolist() == [1.0, 2.0]
+
+    bare = KlineHistory(*[np.array([1.0, 2.0])] * 6)
+    assert np.isnan(bare.number_of_trades).all()
+    assert np.isnan(bare.taker_buy_volume).all()
+
+
+def test_resample_aggregates_aligned_intervals():
+    minutes = np.arange(3, 11)
+    history = KlineHistory(
+        minutes * 60_000,
+        minutes * 1.0,
+        minutes + 0.5,
+        minutes - 0.5,
+        minutes + 0.25,
+        np.ones(8),
+        np.full(8, 2.0),
+        np.full(8, 0.5),
+    )
+    five_minute = history.resample(300)
+
+    assert five_minute.open_time.tolist() == [0, 300_000, 600_000]
+    assert five_minute.open.tolist() == [3.0, 5.0, 10.0]
+    assert five_minute.high.tolist() == [4.5, 9.5, 10.5]
+    assert five_minute.low.tolist() == [2.5, 4.5, 9.5]
+    assert five_minute.close.tolist() == [4.25, 9.25, 10.25]
+    assert five_minute.volume.tolist() == [2.0, 5.0, 1.0]
+    assert five_minute.number_of_trades.tolist() == [4.0, 10.0, 2.0]
+    assert five_minute.taker_buy_volume.tolist() == [1.0, 2.5, 0.5]
+    assert len(history[:0].resample(300)) == 0
+
+
+def test_slices_and_concatenates_every_column():
+    history = KlineHistory.from_klines(_raw_klines())
+    joined = KlineHistory.concatenate((history[1:], history[:1]))
+    assert joined.open_time.tolist() == [2000, 1000]
+    assert joined.number_of_trades.tolist() == [4.0, 3.0]
+    assert joined.taker_buy_volume.tolist() == [2.0, 1.0]
@@ -1,4 +1,8 @@
+import math
+import pickle
+import pytest
 from data.market_snapshot import MarketSnapshot
+from utils.date_utils import DateUtils
 
 
 def test_init_converts_numbers():
@@ -51,3 +55,120 @@ def test_clone_returns_deep_copy_and_is_independent():
     assert cloned.macd_26 == original.macd_26
     assert cloned.ema_100 == original.ema_100
     assert cloned.rsi_6 == original.rsi_6
+
+
+def test_to_dict_from_dict_round_trip():
+    snap = MarketSnapshot(
+        date="[2025-08-29 00:00:00]",
+        price=123.5,
+        macd_12=1.5,
+        macd_26=-0.5,
+        ema_100=120.0,
+        rsi_6=61.0,
+    )
+
+    data = snap.to_dict()
+    restored = MarketSnapshot.from_dict(data)
+
+    assert data["date"] == "[2025-08-29 00:00:00]"
+    assert set(data) == {"date", "timestamp", *MarketSnapshot.FEATURES}
+    assert data["timestamp"] == DateUtils.parse_date("[2025-08-29 00:00:00]")
+    assert restored.to_dict() == data
+
+
+def _snapshot(**overrides) -> MarketSnapshot:
+    values = dict(
+        date="[2025-08-29 00:00:00]",
+        price=10.0,
+        macd_12=0.1,
+        macd_26=0.2,
+        ema_100=100.0,
+        rsi_6=55.0,
+    )
+    values.update(overrides)
+    return MarketSnapshot(**values)
+
+
+def test_timestamp_is_explicit_parsed_or_nan():
+    assert _snapshot(timestamp=123).timestamp == 123.0
+    assert _snapshot().timestamp == DateUtils.parse_date("[2025-08-29 00:00:00]")
+    assert math.isnan(_snapshot(date="not a date").timestamp)
+
+
+def test_snapshot_is_slotted_and_immutable():
+    snap = _snapshot()
+
+    assert not hasattr(snap, "__dict__")
+    with pytest.raises(AttributeError):
+        snap.price = 11.0
+    with pytest.raises(AttributeError):
+        del snap.price
+    with pytest.raises(AttributeError):
+        snap.extra = 1
+
+
+def test_clone_copies_timestamp():
+    snap = _snapshot(timestamp=42.0)
+    assert snap.clone().timestamp == 42.0
+
+
+def test_features_follow_feature_order():
+    snap = _snapshot()
+    assert snap.features() == tuple(getattr(snap, name) for name in MarketSnapshot.FEATURES)
+
+
+def test_pickle_round_trip():
+    snap = _snapshot(timestamp=7.0, atr_14=1.0, bb_width_20=0.1, taker_buy_ratio=0.4)
+    restored = pickle.loads(pickle.dumps(snap))
+    assert restored.features() == snap.features()
+    assert restored.values(MarketSnapshot.EXTRA_FEATURES)[:2] == (1.0, 0.1)
+    assert math.isnan(restored.volume_z_20) and restored.taker_buy_ratio == 0.4
+
+
+def test_extra_features_default_to_nan_and_set_the_schema_version():
+    legacy = _snapshot()
+    assert all(math.isnan(v) for v in legacy.values(MarketSnapshot.EXTRA_FEATURES))
+    assert legacy.schema_version() == 1
+    assert "ATR_14" not in str(legacy)
+
+    extras = dict(atr_14=2.0, bb_width_20=0.05, volume_z_20=-1.0, taker_buy_ratio=0.6)
+    snap = _snapshot(**extras)
+    assert snap.schema_version() == 2
+    assert snap.values(MarketSnapshot.SCHEMAS[2])[5:] == (2.0, 0.05, -1.0, 0.6)
+    assert str(snap).endswith(
+        "ATR_14: 2.00 | BB_WIDTH_20: 0.05 | VOLUME_Z_20: -1.00 | TAKER_BUY_RATIO: 0.60"
+    )
+    assert set(snap.to_dict()) >= set(extras)
+    assert MarketSnapshot.from_dict(snap.to_dict()).schema_version() == 2
+
+    legacy_dict = {k: v for k, v in snap.to_dict().items() if k not in extras}
+    assert MarketSnapshot.from_dict(legacy_dict).schema_version() == 1
+
+
+def test_book_features_complete_schema_3():
+    book = dict(zip(MarketSnapshot.BOOK_FEATURES, (1e-4, 0.2, 3.0, 2.0, 100.5)))
+    extras = dict(atr_14=2.0, bb_width_20=0.05, volume_z_20=-1.0, taker_buy_ratio=0.6)
+    snap = _snapshot(**extras, **book)
+    assert snap.schema_version() == MarketSnapshot.SCHEMA_VERSION == 3
+    assert snap.values(MarketSnapshot.SCHEMAS[3])[9:] == tuple(book.values())
+    assert "TAKER_BUY_RATIO: 0.60 | BOOK_SPREAD: 0.00" in str(snap)
+    assert str(snap).endswith("BOOK_ASK_VOLUME: 2.00 | BOOK_MICROPRICE: 100.50")
+    restored = MarketSnapshot.from_dict(snap.to_dict())
+    assert restored.values(MarketSnapshot.ALL_FEATURES) == snap.values(
+        MarketSnapshot.ALL_FEATURES
+    )
+    assert pickle.loads(pickle.dumps(snap)).book_microprice == 100.5
+
+    # The order book is known, but a kline feature is still warming up.
+    warming = _snapshot(**book)
+    assert warming.schema_version() == 1
+    assert warming.is_complete(1) and not warming.is_complete(3)
+    assert not _snapshot(rsi_6=math.nan).is_complete(1)
+
+
+def test_schema_columns_match_a_width():
+    assert MarketSnapshot.schema_columns(5) == MarketSnapshot.FEATURES
+    assert MarketSnapshot.schema_columns(9) == MarketSnapshot.KLINE_FEATURES
+    assert MarketSnapshot.schema_columns(14) == MarketSnapshot.ALL_FEATURES
+    with pytest.raises(ValueError, match="No feature schema has 7 columns"):
+        MarketSnapshot.schema_columns(7)
@@ -0,0 +1,75 @@
+import math
+import random
+import pytest
+from data.order_book import BookSide, OrderBook
+
+
+def _snapshot(last_update_id=10):
+    return {
+        "lastUpdateId": last_update_id,
+        "bids": [["99.0", "1.0"], ["98.0", "2.0"], ["97.0", "3.0"]],
+        "asks": [["101.0", "1.5"], ["102.0", "2.5"]],
+    }
+
+
+def _event(first, last, bids=(), asks=()):
+    return {"e": "depthUpdate", "U": first, "u": last, "b": bids, "a": asks}
+
+
+def test_book_sides_keep_the_best_levels_first_and_the_top_volume():
+    rng = random.Random(3)
+    bids, asks = BookSide(True, 3), BookSide(False, 3)
+    expected = {True: {}, False: {}}
+    for _ in range(2_000):
+        side = rng.choice((bids, asks))
+        price = float(rng.randrange(90, 110))
+        quantity = rng.choice((0.0, 0.5, 1.0, 2.0))
+        side.set(price, quantity)
+        levels = expected[side.descending]
+        if quantity:
+            levels[price] = quantity
+        else:
+            levels.pop(price, None)
+
+        best = sorted(levels.items(), reverse=side.descending)
+        assert len(side) == len(levels)
+        assert side.top(len(levels) + 1) == best
+        assert side.top_volume == pytest.approx(sum(q for _, q in best[:3]))
+        if best:
+            assert side.best() == best[0][0]
+    bids.clear()
+    assert len(bids) == 0 and bids.top_volume == 0.0 and math.isnan(bids.best())
+
+
+def test_events_apply_in_update_id_order():
+    book = OrderBook(depth=2)
+    assert not book.apply(_event(1, 2))
+    book.load_snapshot(_snapshot())
+
+    assert book.apply(_event(5, 10, bids=[["99.0", "9.0"]]))
+    assert book.bids.levels[99.0] == 1.0
+    assert book.apply(_event(9, 12, bids=[["99.0", "0"], ["99.5", "4.0"]]))
+    assert book.bids.top(3) == [(99.5, 4.0), (98.0, 2.0), (97.0, 3.0)]
+    assert book.apply(_event(13, 13, asks=[["100.5", "0.5"]]))
+    assert book.last_update_id == 13
+
+    assert not book.apply(_event(15, 16, asks=[["100.0", "1.0"]]))
+    assert not book.synced and book.asks.best() == 100.5
+    assert not book.apply(_event(14, 14))
+
+
+def test_features_aggregate_the_best_levels():
+    book = OrderBook(depth=2)
+    assert all(math.isnan(value) for value in book.features().values())
+    book.load_snapshot(_snapshot())
+
+    features = book.features()
+    assert list(features) == list(OrderBook.FEATURES)
+    assert features["book_spread"] == pytest.approx(2.0 / 100.0)
+    assert features["book_bid_volume"] == 3.0
+    assert features["book_ask_volume"] == 4.0
+    assert features["book_imbalance"] == pytest.approx(-1.0 / 7.0)
+    assert features["book_microprice"] == pytest.approx((99 * 1.5 + 101) / 2.5)
+
+    book.load_snapshot({"lastUpdateId": 20, "bids": [], "asks": [["1", "1"]]})
+    assert math.isnan(book.features()["book_spread"])
@@ -0,0 +1,161 @@
+import gzip
+import struct
+from pathlib import Path
+import numpy as np
+import pytest
+import data.snapshot_log as snapshot_log_module
+from data.market_snapshot import MarketSnapshot
+from data.snapshot_log import SnapshotLogReader, SnapshotLogWriter, record_dtype
+
+RECORD_DTYPE = record_dtype()
+
+
+def _snapshot(price: float) -> MarketSnapshot:
+    return MarketSnapshot(
+        date="[2025-09-05 22:23:32]",
+        price=price,
+        macd_12=1.0,
+        macd_26=2.0,
+        ema_100=3.0,
+        rsi_6=4.0,
+    )
+
+
+def test_records_are_fixed_width():
+    assert RECORD_DTYPE.names == ("timestamp", "latency") + MarketSnapshot.FEATURES
+    assert RECORD_DTYPE.itemsize == 8 + 4 + 8 * len(MarketSnapshot.FEATURES)
+    wide = record_dtype(3)
+    assert wide.names == ("timestamp", "latency") + MarketSnapshot.SCHEMAS[3]
+    with pytest.raises(ValueError, match="Unknown feature schema version: 4"):
+        record_dtype(4)
+
+
+def test_logs_the_features_of_its_schema(tmp_path: Path):
+    writer = SnapshotLogWriter(tmp_path, compress=False, schema_version=2)
+    snapshot = MarketSnapshot(
+        "[2025-09-05 22:23:32]", 1.0, 2.0, 3.0, 4.0, 5.0, atr_14=0.5
+    )
+    writer.append(snapshot, timestamp=1.0)
+    writer.close()
+
+    records = SnapshotLogReader(tmp_path).read_all()
+    assert records.dtype == record_dtype(2)
+    assert records["atr_14"].tolist() == [0.5]
+    assert np.isnan(records["bb_width_20"][0])
+
+
+def test_segments_of_different_schemas_are_widened(tmp_path: Path):
+    legacy = tmp_path / "segment-000000.bin"
+    record = np.zeros(1, dtype=RECORD_DTYPE)
+    record["price"] = 7.0
+    legacy.write_bytes(
+        struct.pack("<8sII", SnapshotLogWriter.MAGIC, 1, RECORD_DTYPE.itemsize)
+        + record.tobytes()
+    )
+    writer = SnapshotLogWriter(tmp_path, compress=True, schema_version=2)
+    writer.append(MarketSnapshot("[2025-09-05 22:23:32]", 8.0, 0, 0, 0, 0, atr_14=1.0))
+    writer._rotate()
+    writer.close()
+
+    reader = SnapshotLogReader(tmp_path)
+    assert reader.read_segment(legacy).dtype == RECORD_DTYPE
+    records = reader.read_all()
+    assert records.dtype == record_dtype(2)
+    assert records["price"].tolist() == [7.0, 8.0]
+    assert np.isnan(records["atr_14"][0]) and records["atr_14"][1] == 1.0
+
+
+def test_append_buffers_until_flush(tmp_path: Path):
+    writer = SnapshotLogWriter(tmp_path, flush_interval=3600.0, compress=False)
+    writer.append(_snapshot(100.0), latency=0.25, timestamp=1.5)
+    reader = SnapshotLogReader(tmp_path)
+    assert len(reader.read_all()) == 0
+
+    writer.flush()
+    records = reader.read_all()
+    assert len(records) == 1
+    assert records["timestamp"][0] == 1.5
+    assert records["latency"][0] == pytest.approx(0.25)
+    assert records["price"][0] == 100.0
+    assert records["rsi_6"][0] == 4.0
+    assert isinstance(reader.read_segment(reader.segments()[0]), np.memmap)
+    writer.close()
+
+
+def test_flushes_when_buffer_is_full_or_interval_elapses(tmp_path: Path, monkeypatch):
+    writer = SnapshotLogWriter(
+        tmp_path, flush_interval=3600.0, buffer_records=2, compress=False
+    )
+    writer.append(_snapshot(1.0))
+    writer.append(_snapshot(2.0))
+    assert len(SnapshotLogReader(tmp_path).read_all()) == 2
+
+    now = [1000.0]
+    monkeypatch.setattr(snapshot_log_module.time, "monotonic", lambda: now[0])
+    writer._last_flush = 1000.0
+    writer.flush_interval = 5.0
+    writer.append(_snapshot(3.0))
+    assert len(SnapshotLogReader(tmp_path).read_all()) == 2
+    now[0] = 1006.0
+    writer.append(_snapshot(4.0))
+    assert SnapshotLogReader(tmp_path).read_all()["price"].tolist() == [1, 2, 3, 4]
+    writer.close()
+
+
+def test_rotates_and_compresses_segments(tmp_path: Path):
+    record_bytes = RECORD_DTYPE.itemsize
+    writer = SnapshotLogWriter(
+        tmp_path,
+        flush_interval=0.0,
+        max_segment_bytes=SnapshotLogWriter.HEADER.size + 3 * record_bytes,
+        compress=True,
+    )
+    for price in range(10):
+        writer.append(_snapshot(float(price)))
+    writer.close()
+
+    reader = SnapshotLogReader(tmp_path)
+    segments = reader.segments()
+    assert [p.name for p in segments[:3]] == [
+        "segment-000000.bin.gz",
+        "segment-000001.bin.gz",
+        "segment-000002.bin.gz",
+    ]
+    assert segments[-1].suffix == ".bin"
+    assert reader.read_all()["price"].tolist() == [float(p) for p in range(10)]
+
+
+def test_new_writer_continues_segment_numbering(tmp_path: Path):
+    SnapshotLogWriter(tmp_path, compress=False).close()
+    writer = SnapshotLogWriter(tmp_path, compress=False)
+    writer.append(_snapshot(5.0))
+    writer.close()
+    reader = SnapshotLogReader(tmp_path)
+    assert [p.name for p in reader.segments()] == [
+        "segment-000000.bin",
+        "segment-000001.bin",
+    ]
+    assert len(reader.read_segment(reader.segments()[0])) == 0
+    assert reader.read_all()["price"].tolist() == [5.0]
+
+
+def test_empty_directory_and_bad_headers(tmp_path: Path):
+    assert len(SnapshotLogReader(tmp_path / "none").read_all()) == 0
+
+    bad = tmp_path / "segment-000000.bin"
+    bad.write_bytes(struct.pack("<8sII", b"NOTSNAPS", 1, RECORD_DTYPE.itemsize))
+    with pytest.raises(ValueError, match="Incompatible"):
+        SnapshotLogReader(tmp_path).read_segment(bad)
+    for header in (
+        struct.pack("<8sIII", SnapshotLogWriter.MAGIC, 2, RECORD_DTYPE.itemsize, 9),
+        struct.pack("<8sIII", SnapshotLogWriter.MAGIC, 3, RECORD_DTYPE.itemsize, 1),
+    ):
+        bad.write_bytes(header)
+        with pytest.raises(ValueError, match="Incompatible"):
+            SnapshotLogReader(tmp_path).read_segment(bad)
+
+    bad_gz = tmp_path / "segment-000001.bin.gz"
+    with gzip.open(bad_gz, "wb") as f:
+        f.write(struct.pack("<8sII", SnapshotLogWriter.MAGIC, 1, 3))
+    with pytest.raises(ValueError, match="Incompatible"):
+        SnapshotLogReader(tmp_path).read_segment(bad_gz)
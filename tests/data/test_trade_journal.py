@@ -0,0 +1,189 @@
+import sqlite3
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pytest
+import data.trade_journal as journal_module
+from data.market_snapshot import MarketSnapshot
+from data.trade_journal import TradeJournal
+from utils.date_utils import DateUtils
+from utils.file_utils import FileUtils
+
+
+def _snapshot(price: float, date: str = "[2025-09-05 22:23:32]") -> MarketSnapshot:
+    return MarketSnapshot(
+        date=date, price=price, macd_12=1.0, macd_26=2.0, ema_100=3.0, rsi_6=4.0
+    )
+
+
+@pytest.fixture
+def journal(tmp_path: Path):
+    journal = TradeJournal(tmp_path / "nested" / "results.db")
+    yield journal
+    journal.close()
+
+
+def test_uses_wal_and_indexed_timestamp(journal: TradeJournal):
+    mode = journal.connection.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    indexes = journal.connection.execute("PRAGMA index_list(results)").fetchall()
+    assert any(row[1] == "idx_results_timestamp" for row in indexes)
+
+
+def test_context_closes_the_connection(tmp_path: Path):
+    with TradeJournal(tmp_path / "results.db") as journal:
+        assert journal.count() == 0
+
+    with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+        journal.count()
+
+
+def test_save_result_and_read_frame(journal: TradeJournal):
+    journal.save_result(result="LONG", position="SHORT", snapshot=_snapshot(100.0))
+    frame = journal.read_frame()
+    assert list(frame.columns) == TradeJournal._COLUMNS
+    assert frame.iloc[0][FileUtils.HEADER].tolist() == [
+        "[2025-09-05 22:23:32]",
+        "LONG",
+        "SHORT",
+        100.0,
+        1.0,
+        2.0,
+        3.0,
+        4.0,
+    ]
+    assert frame[list(MarketSnapshot.EXTRA_FEATURES)].isna().all(axis=None)
+    assert frame["schema_version"].tolist() == [1]
+    stored = journal.connection.execute("SELECT timestamp FROM results").fetchone()[0]
+    assert stored == DateUtils.parse_date("[2025-09-05 22:23:32]")
+
+
+def test_save_result_stores_extra_features(journal: TradeJournal):
+    snapshot = MarketSnapshot(
+        "[2025-09-05 22:23:32]",
+        100.0,
+        1.0,
+        2.0,
+        3.0,
+        4.0,
+        atr_14=5.0,
+        bb_width_20=0.1,
+        volume_z_20=-0.5,
+        taker_buy_ratio=0.6,
+    )
+    journal.save_result(result="LONG", position="LONG", snapshot=snapshot)
+    journal.save_result(result="LONG", position="LONG", snapshot=_snapshot(1.0))
+
+    frame = journal.read_frame()
+    assert frame.iloc[0][list(MarketSnapshot.EXTRA_FEATURES)].tolist() == [
+        5.0,
+        0.1,
+        -0.5,
+        0.6,
+    ]
+    assert frame["schema_version"].tolist() == [2, 1]
+
+
+def test_save_result_stores_order_book_features(journal: TradeJournal):
+    book = dict(zip(MarketSnapshot.BOOK_FEATURES, (1e-4, 0.2, 3.0, 2.0, 100.5)))
+    extras = dict(atr_14=5.0, bb_width_20=0.1, volume_z_20=-0.5, taker_buy_ratio=0.6)
+    for features in ({**extras, **book}, book):
+        snapshot = MarketSnapshot(
+            "[2025-09-05 22:23:32]", 100.0, 1.0, 2.0, 3.0, 4.0, **features
+        )
+        journal.save_result(result="LONG", position="LONG", snapshot=snapshot)
+
+    frame = journal.read_frame()
+    assert frame[list(MarketSnapshot.BOOK_FEATURES)].iloc[1].tolist() == list(
+        book.values()
+    )
+    # Schemas are nested, so book features without the extras are schema 1.
+    assert frame["schema_version"].tolist() == [3, 1]
+
+
+def test_legacy_journal_is_migrated(tmp_path: Path):
+    path = tmp_path / "results.db"
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE results (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp REAL, "
+        "date TEXT NOT NULL, result TEXT NOT NULL, position TEXT NOT NULL, "
+        "price REAL NOT NULL, macd_12 REAL NOT NULL, macd_26 REAL NOT NULL, "
+        "ema_100 REAL NOT NULL, rsi_6 REAL NOT NULL)"
+    )
+    connection.execute(
+        "INSERT INTO results VALUES "
+        "(1, 0, '[2025-09-05 22:23:32]', 'LONG', 'LONG', 1, 2, 3, 4, 5)"
+    )
+    connection.commit()
+    connection.close()
+
+    journal = TradeJournal(path)
+    journal.insert_many(
+        [["[2025-09-05 22:23:33]", "SHORT", "LONG", 1, 2, 3, 4, 5, 6, 7, 8, 9]]
+    )
+    frame = journal.read_frame()
+    journal.close()
+    assert frame["schema_version"].tolist() == [1, 2]
+    assert np.isnan(frame["atr_14"].iloc[0]) and frame["atr_14"].iloc[1] == 6.0
+
+
+def test_read_since_returns_only_new_rows(journal: TradeJournal):
+    journal.save_result(result="LONG", position="LONG", snapshot=_snapshot(1.0))
+    journal.save_result(result="SHORT", position="LONG", snapshot=_snapshot(2.0))
+    first, last_id = journal.read_since(0)
+    assert len(first) == 2
+
+    empty, same_id = journal.read_since(last_id)
+    assert empty.empty and same_id == last_id
+
+    journal.save_result(result="SHORT", position="SHORT", snapshot=_snapshot(3.0))
+    new_rows, new_id = journal.read_since(last_id)
+    assert new_rows["price"].tolist() == [3.0]
+    assert new_id > last_id
+
+
+def test_insert_frame_batches(journal: TradeJournal):
+    rows = [
+        [f"[2025-09-05 22:23:{i:02d}]", "LONG", "LONG", float(i), 0.0, 0.0, 0.0, 0.0]
+        for i in range(25)
+    ]
+    frame = pd.DataFrame(rows, columns=FileUtils.HEADER)
+    assert journal.insert_frame(frame, batch_size=10) == 25
+    assert journal.count() == 25
+
+
+def test_open_migrates_csv_once_and_export_preserves_columns(tmp_path: Path):
+    csv_path = tmp_path / "results.csv"
+    FileUtils.save_result(csv_path, "LONG", "SHORT", _snapshot(10.0))
+    FileUtils.save_result(csv_path, "SHORT", "SHORT", _snapshot(11.0))
+
+    db_path = tmp_path / "results.db"
+    journal = TradeJournal.open(db_path, csv_path=csv_path)
+    assert journal.count() == 2
+    journal.close()
+
+    journal = TradeJournal.open(db_path, csv_path=csv_path)
+    assert journal.count() == 2
+
+    exported = tmp_path / "export" / "results.csv"
+    assert journal.export_csv(exported) == 2
+    journal.close()
+    assert pd.read_csv(exported)[FileUtils.HEADER].equals(pd.read_csv(csv_path))
+
+
+def test_open_without_csv(tmp_path: Path):
+    journal = TradeJournal.open(tmp_path / "results.db", csv_path=tmp_path / "none.csv")
+    assert journal.count() == 0
+    journal.close()
+
+
+def test_main_import_and_export(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(journal_module.Logger, "log_info", lambda msg: None)
+    csv_path = tmp_path / "results.csv"
+    FileUtils.save_result(csv_path, "LONG", "SHORT", _snapshot(10.0))
+    db_path = tmp_path / "results.db"
+
+    assert journal_module.main(["import", "--csv", str(csv_path), "--db", str(db_path)]) == 1
+    out = tmp_path / "out.csv"
+    assert journal_module.main(["export", "--csv", str(out), "--db", str(db_path)]) == 1
+    assert pd.read_csv(out)[FileUtils.HEADER].equals(pd.read_csv(csv_path))
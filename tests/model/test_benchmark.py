@@ -0,0 +1,183 @@
+from contextlib import nullcontext
+from pathlib import Path
+import pytest
+import numpy as np
+import model.benchmark as benchmark_module
+import model.model_lifecycle as lifecycle_module
+import tensorflow_model.tf_model as tf_model_module
+import tensorflow_model.tflite_model as tflite_module
+
+
+class FakeTFModel:
+    def __init__(self, dataset) -> None:
+        self.dataset = dataset
+
+    def predict(self, snapshot) -> str:
+        return "LONG"
+
+
+def test_synthetic_dataset_has_requested_rows():
+    dataset = benchmark_module._synthetic_dataset(50)
+    assert len(dataset) == 50
+    assert set(dataset.y_train.tolist()) <= {0.0, 1.0}
+
+
+def test_main_reports_latency_per_backend(monkeypatch, capsys):
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    monkeypatch.setattr(benchmark_module.Logger, "log_info", lambda msg: None)
+
+    table = benchmark_module.main(
+        ["--backends", "online,keras,logistic", "--rows", "100", "--iterations", "3"]
+    )
+
+    assert table["backend"].tolist() == ["online", "keras", "logistic"]
+    assert (table["rows"] == 100).all()
+    assert (table["update_ms"] >= 0).all() and (table["predict_ms"] >= 0).all()
+    assert "update_ms" in capsys.readouterr().out
+
+
+def test_main_can_benchmark_the_journal(monkeypatch):
+    dataset = benchmark_module._synthetic_dataset(20)
+    monkeypatch.setattr(
+        benchmark_module, "TradeJournal", lambda path: nullcontext(path)
+    )
+    monkeypatch.setattr(
+        benchmark_module.TrainingDataset,
+        "from_journal",
+        lambda journal, **kwargs: dataset,
+    )
+    monkeypatch.setattr(benchmark_module.Logger, "log_info", lambda msg: None)
+
+    table = benchmark_module.main(["--journal", "--backends", "online", "--iterations", "1"])
+    assert table["rows"].tolist() == [20]
+
+
+def test_scaled_csv_dataset_repeats_rows(tmp_path):
+    path = tmp_path / "results.csv"
+    path.write_text(
+        "date,result,price,macd_12,macd_26,ema_100,rsi_6\n"
+        "[2025-01-01 00:00:00],LONG,1,2,3,4,5\n"
+        "[2025-01-01 00:01:00],SHORT,6,7,8,9,10\n"
+    )
+    dataset = benchmark_module._scaled_csv_dataset(path, 10)
+    assert len(dataset) == 20
+    labels = np.concatenate([dataset.y_train, dataset.y_test])
+    assert labels.sum() == 10
+
+
+def test_main_reports_training_throughput(monkeypatch, capsys):
+    class FakeKeras:
+        def fit(self, X, y, epochs, batch_size, validation_split, verbose):
+            assert batch_size == 1
+
+    class FakePipelineModel:
+        _build_model = staticmethod(lambda input_dim: FakeKeras())
+
+        def __init__(self, dataset) -> None:
+            self.epochs_trained = 2
+
+    monkeypatch.setattr(tf_model_module, "TFModel", FakePipelineModel)
+    monkeypatch.setattr(benchmark_module.Logger, "log_info", lambda msg: None)
+
+    table = benchmark_module.main(
+        ["--mode", "throughput", "--rows", "100", "--legacy-rows", "10"]
+    )
+
+    assert table["path"].tolist() == ["batch_size=1", "tf.data"]
+    assert table["rows"].tolist() == [10, 180]
+    assert (table["rows_per_second"] > 0).all()
+    assert "rows_per_second" in capsys.readouterr().out
+
+
+def test_soak_reports_memory_per_retrain(monkeypatch, capsys):
+    rss = iter([500.0, 501.0, 501.5])
+    monkeypatch.setattr(
+        benchmark_module.ModelLifecycle,
+        "train",
+        lambda self, dataset, window, profile: self._track_memory(),
+    )
+    monkeypatch.setattr(lifecycle_module.MemoryUtils, "rss_mb", lambda: next(rss))
+    monkeypatch.setattr(benchmark_module.Logger, "log_info", lambda msg: None)
+
+    table = benchmark_module.main(["--mode", "soak", "--rows", "50", "--retrains", "3"])
+    assert table["retrain"].tolist() == [1, 2, 3]
+    assert table["growth_mb"].tolist() == [0.0, 1.0, 1.5]
+    assert "rss_mb" in capsys.readouterr().out
+
+    rss = iter([500.0, 540.0])
+    with pytest.raises(SystemExit) as exit_info:
+        benchmark_module.main(
+            ["--mode", "soak", "--retrains", "2", "--max-growth-mb", "10"]
+        )
+    assert exit_info.value.code == 1
+
+
+class InProcessExecutor:
+    def __init__(self, max_workers=None, mp_context=None):
+        assert mp_context.get_start_method() == "spawn"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        result = fn(*args)
+        return type("Future", (), {"result": lambda self: result})()
+
+
+def test_main_compares_serving_runtimes(monkeypatch, capsys):
+    class FakeServingModel:
+        MODEL_FILE = "model.keras"
+        decision = "LONG"
+
+        def __init__(self, dataset=None) -> None:
+            self.content = b"1234"
+
+        def save(self, directory) -> None:
+            Path(directory).mkdir(parents=True)
+            Path(directory, self.MODEL_FILE).write_bytes(b"12345678")
+
+        @classmethod
+        def load(cls, directory):
+            return cls()
+
+        @classmethod
+        def export(cls, model, quantize):
+            assert quantize is True
+            return cls()
+
+        def predict(self, snapshot) -> str:
+            return self.decision
+
+    class FakeLiteModel(FakeServingModel):
+        decision = "SHORT"
+
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeServingModel)
+    monkeypatch.setattr(tflite_module, "TFLiteModel", FakeLiteModel)
+    monkeypatch.setattr(benchmark_module, "ProcessPoolExecutor", InProcessExecutor)
+    monkeypatch.setattr(benchmark_module.Logger, "log_info", lambda msg: None)
+
+    table = benchmark_module.main(
+        ["--mode", "runtime", "--rows", "40", "--iterations", "5", "--quantize"]
+    )
+
+    assert table["runtime"].tolist() == ["keras", "tflite"]
+    assert table["size_bytes"].tolist() == [8, 4]
+    assert table["agreement"].tolist() == [1.0, 0.0]
+    assert (table["rss_mb"] > 0).all() and (table["predict_ms"] >= 0).all()
+    assert "agreement" in capsys.readouterr().out
+
+
+def test_main_compares_ensemble_paths(monkeypatch, capsys):
+    monkeypatch.setattr(benchmark_module.Logger, "log_info", lambda msg: None)
+
+    table = benchmark_module.main(
+        ["--mode", "ensemble", "--rows", "200", "--members", "3", "--iterations", "2"]
+    )
+
+    assert table["path"].tolist() == ["single", "sequential", "ensemble"]
+    assert table["members"].tolist() == [1, 3, 3]
+    assert (table["predict_ms"] > 0).all() and (table["batch_ms"] > 0).all()
+    assert "batch_ms" in capsys.readouterr().out
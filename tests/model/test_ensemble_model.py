@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+import tensorflow as tf
+from data.market_snapshot import MarketSnapshot
+from model.ensemble_model import EnsembleModel
+from model.logistic_model import LogisticModel
+from model.online_model import OnlineModel
+from model.prediction_model import PredictionModel
+from tensorflow_model.tf_model import TFModel
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import BootstrapWindow, TrainingWindow
+from utils.running_stats import RunningStats
+
+
+def _dataset(rows: int = 200) -> TrainingDataset:
+    rng = np.random.default_rng(0)
+    features = rng.normal((100.0, 0.0, 0.0, 100.0, 50.0), 5.0, (rows, 5))
+    labels = (features[:, 4] + rng.normal(0.0, 3.0, rows) > 50.0).astype(np.float32)
+    dataset = TrainingDataset()
+    dataset.extend(features, labels)
+    return dataset
+
+
+def _members(dataset: TrainingDataset, count: int = 3):
+    window = TrainingWindow()
+    windows = [window] + [BootstrapWindow(window, seed) for seed in range(1, count)]
+    return [LogisticModel().fit(dataset, member) for member in windows]
+
+
+def _keras_model(dataset: TrainingDataset) -> TFModel:
+    model = TFModel.__new__(TFModel)
+    model.scaler = dataset.stats.copy()
+    model.X_train, model.y_train = dataset.X_train, dataset.y_train
+    model.model = tf.keras.Sequential(
+        [
+            tf.keras.Input((5,)),
+            tf.keras.layers.Dense(8, activation="relu"),
+            tf.keras.layers.Dense(1, activation="sigmoid"),
+        ]
+    )
+    return model
+
+
+def test_mean_vote_matches_the_members_in_one_pass():
+    dataset = _dataset()
+    members = _members(dataset)
+    ensemble = EnsembleModel()
+    for index, member in enumerate(members):
+        ensemble.add(f"logistic{index}", member)
+
+    features = dataset.X_test
+    expected = np.stack([member.predict_proba(features) for member in members])
+    np.testing.assert_allclose(ensemble.member_proba(features), expected)
+    np.testing.assert_allclose(ensemble.predict_proba(features), expected.mean(axis=0))
+    assert len(ensemble) == 3 and len(ensemble._groups) == 1
+    np.testing.assert_array_equal(ensemble.y_train, members[0].y_train)
+
+    row = features[0]
+    snapshot = MarketSnapshot("[2025-01-01 00:00:00]", *row)
+    assert ensemble.predict(snapshot) == (
+        "LONG" if expected[:, 0].mean() >= 0.5 else "SHORT"
+    )
+
+
+def test_members_with_different_architectures_are_grouped():
+    dataset = _dataset()
+    keras = _keras_model(dataset)
+    online = OnlineModel().fit(dataset)
+    ensemble = EnsembleModel()
+    ensemble.add("keras", keras)
+    ensemble.add("online", online)
+
+    features = dataset.X_test
+    assert len(ensemble._groups) == 2
+    np.testing.assert_allclose(
+        ensemble.member_proba(features),
+        np.stack([keras.predict_proba(features), online.predict_proba(features)]),
+        atol=1e-5,
+    )
+
+
+def test_majority_vote_counts_decisions_and_breaks_ties_with_the_mean():
+    class Constant(LogisticModel):
+        def __init__(self, logit: float) -> None:
+            super().__init__()
+            self.scaler = RunningStats(5)
+            self.weights, self.bias = np.zeros(5), logit
+            self.X_train, self.y_train = np.zeros((0, 5)), np.zeros(0)
+
+    features = np.ones((2, 5))
+    ensemble = EnsembleModel("majority")
+    for logit in (0.1, 0.2, -3.0):
+        ensemble.add(str(logit), Constant(logit))
+    np.testing.assert_allclose(ensemble.predict_proba(features), [2 / 3, 2 / 3])
+
+    ensemble = EnsembleModel("majority")
+    for logit in (0.1, -3.0):
+        ensemble.add(str(logit), Constant(logit))
+    assert ensemble.predict_batch(features).tolist() == [False, False]
+
+
+def test_agreement_statistics_cover_every_prediction():
+    dataset = _dataset()
+    ensemble = EnsembleModel()
+    members = _members(dataset)
+    for index, member in enumerate(members):
+        ensemble.add(f"logistic{index}", member)
+    assert ensemble.agreement() == {}
+
+    features = dataset.X_test
+    decisions = ensemble.predict_batch(features)
+    ensemble.predict_batch(features)
+    votes = np.stack([member.predict_batch(features) for member in members])
+
+    stats = ensemble.agreement()
+    assert ensemble.rows == 2 * len(features)
+    for index in range(3):
+        assert stats[f"logistic{index}"] == pytest.approx(
+            np.mean(votes[index] == decisions)
+        )
+    assert stats["unanimous"] == pytest.approx(
+        np.mean(votes.all(axis=0) | ~votes.any(axis=0))
+    )
+
+
+def test_invalid_ensembles_raise():
+    with pytest.raises(ValueError, match="Unknown ensemble vote"):
+        EnsembleModel("median")
+    with pytest.raises(ValueError, match="no members"):
+        EnsembleModel().predict_proba(np.zeros((1, 5)))
+
+    class Opaque(LogisticModel):
+        def layers(self):
+            return PredictionModel.layers(self)
+
+    with pytest.raises(NotImplementedError, match="Opaque has no dense layers"):
+        EnsembleModel().add("opaque", Opaque())
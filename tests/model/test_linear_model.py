@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+from model.linear_model import LinearModel
+from model.logistic_model import LogisticModel
+from model.online_model import OnlineModel
+from utils.running_stats import RunningStats
+
+
+class FixedModel(LinearModel):
+    def __init__(self, weights, bias):
+        self.weights = np.array(weights, dtype=np.float64)
+        self.bias = bias
+        self.scaler = RunningStats(len(weights))
+
+
+def test_predict_proba_is_the_sigmoid_of_the_scaled_logit():
+    model = FixedModel([2.0, -1.0], 0.5)
+    features = np.array([[1.0, 1.0], [0.0, 3.0]])
+
+    logits = model.scaler.transform(features) @ model.weights + model.bias
+    assert model.predict_proba(features) == pytest.approx(1.0 / (1.0 + np.exp(-logits)))
+    assert model.predict_batch(features).tolist() == (logits >= 0).tolist()
+
+
+def test_layers_export_a_single_sigmoid_unit():
+    ((kernel, bias),) = FixedModel([2.0, -1.0], 0.5).layers()
+
+    assert kernel.tolist() == [[2.0], [-1.0]]
+    assert bias.tolist() == [0.5]
+
+
+def test_sigmoid_is_stable_for_large_logits():
+    assert LinearModel._sigmoid(np.array([-1e4, 0.0, 1e4])).tolist() == [0.0, 0.5, 1.0]
+
+
+def test_logistic_regressions_share_the_linear_base():
+    assert issubclass(LogisticModel, LinearModel)
+    assert issubclass(OnlineModel, LinearModel)
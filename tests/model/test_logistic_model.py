@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from data.market_snapshot import MarketSnapshot
+from model.logistic_model import LogisticModel
+from model.online_model import OnlineModel
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import SlidingWindow
+
+
+def _separable_dataset(rows: int = 400) -> TrainingDataset:
+    rng = np.random.default_rng(1)
+    features = rng.normal(0.0, 1.0, size=(rows, 5)) * [10.0, 1.0, 1.0, 10.0, 20.0]
+    features[:, 4] += 50.0
+    dataset = TrainingDataset()
+    dataset.extend(features, (features[:, 4] > 50.0).astype(np.float32))
+    return dataset
+
+
+def _snapshot(rsi: float) -> MarketSnapshot:
+    return MarketSnapshot("[2025-01-01 00:00:00]", 0.0, 0.0, 0.0, 0.0, rsi)
+
+
+def test_fit_learns_a_separable_rule_in_few_iterations():
+    dataset = _separable_dataset()
+    model = LogisticModel().fit(dataset)
+
+    assert model.iterations < model.max_iter
+    assert model.get_accuracy_metric() > 0.95
+    assert model.predict(_snapshot(95.0)) == "LONG"
+    assert model.predict(_snapshot(5.0)) == "SHORT"
+    np.testing.assert_array_equal(model.scaler.mean, dataset.stats.mean)
+
+
+def test_fit_matches_the_regularized_optimum():
+    rng = np.random.default_rng(3)
+    features = rng.normal(0.0, 1.0, size=(500, 5))
+    logits = features @ [1.0, -0.5, 0.0, 0.25, 2.0]
+    labels = (rng.uniform(size=500) < 1.0 / (1.0 + np.exp(-logits))).astype(np.float32)
+    dataset = TrainingDataset()
+    dataset.extend(features, labels)
+
+    model = LogisticModel(l2=1e-3).fit(dataset)
+
+    X = model.scaler.transform(model.X_train)
+    probs = model.predict_proba(model.X_train)
+    gradient = X.T @ (probs - model.y_train) / len(X) + 1e-3 * model.weights
+    np.testing.assert_allclose(gradient, 0.0, atol=1e-8)
+    assert abs(np.mean(probs - model.y_train)) < 1e-8
+
+
+def test_window_limits_training_rows_and_batch_matches_single_predictions():
+    dataset = _separable_dataset()
+    model = LogisticModel().fit(dataset, SlidingWindow(50))
+    assert len(model.y_train) == 50
+
+    snapshots = [_snapshot(rsi) for rsi in (10.0, 45.0, 55.0, 90.0)]
+    batch = model.predict_batch(np.array([s.features() for s in snapshots]))
+    assert ["LONG" if long else "SHORT" for long in batch] == [
+        model.predict(s) for s in snapshots
+    ]
+    assert model.predict_batch(np.zeros((0, 5))).tolist() == []
+
+
+def test_one_class_data_converges():
+    dataset = TrainingDataset()
+    dataset.extend(np.random.default_rng(0).normal(size=(30, 5)), np.ones(30))
+    model = LogisticModel().fit(dataset)
+    assert np.isfinite(model.weights).all() and np.isfinite(model.bias)
+    assert model.predict(_snapshot(50.0)) == "LONG"
+
+
+def test_empty_dataset_raises_and_accuracy_without_test_rows():
+    with pytest.raises(ValueError, match="No data"):
+        LogisticModel().fit(TrainingDataset())
+    dataset = TrainingDataset()
+    dataset.extend(np.ones((1, 5)), np.ones(1))
+    assert LogisticModel().fit(dataset).get_accuracy_metric() == 0.0
+
+
+def test_agrees_with_the_online_model_on_separable_data():
+    dataset = _separable_dataset()
+    batch = LogisticModel().fit(dataset).predict_batch(dataset.X_test)
+    online = OnlineModel(learning_rate=0.1).fit(dataset).predict_batch(dataset.X_test)
+    assert np.mean(batch == online) > 0.9
+
+
+def test_models_read_the_columns_of_the_dataset_schema():
+    rng = np.random.default_rng(2)
+    features = rng.normal(0.0, 1.0, size=(300, 9))
+    labels = (features[:, 8] > 0.0).astype(np.float32)
+    dataset = TrainingDataset(schema_version=2)
+    dataset.extend(features, labels)
+
+    def snapshot(ratio: float) -> MarketSnapshot:
+        extras = dict(atr_14=0.0, bb_width_20=0.0, volume_z_20=0.0)
+        return MarketSnapshot(
+            "[2025-01-01 00:00:00]", *[0.0] * 5, taker_buy_ratio=ratio, **extras
+        )
+
+    for model in (
+        LogisticModel().fit(dataset),
+        OnlineModel(learning_rate=0.1, columns=dataset.columns).fit(dataset),
+    ):
+        assert tuple(model.columns) == MarketSnapshot.SCHEMAS[2]
+        assert model.predict(snapshot(2.0)) == "LONG"
+        assert model.predict(snapshot(-2.0)) == "SHORT"
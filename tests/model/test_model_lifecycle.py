@@ -0,0 +1,162 @@
+import copy
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import model.model_lifecycle as lifecycle_module
+import tensorflow_model.tf_model as tf_model_module
+from model.model_lifecycle import ModelLifecycle
+from tensorflow_model.model_profile import ModelProfile
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import ReservoirWindow
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    lifecycle_module.Metrics.reset()
+
+
+def _dataset(rows: int = 40) -> TrainingDataset:
+    rng = np.random.default_rng(0)
+    features = rng.normal(0.0, 1.0, (rows, 5))
+    dataset = TrainingDataset()
+    dataset.extend(features, (features[:, 4] > 0).astype(np.float32))
+    return dataset
+
+
+class FakeTFModel:
+    def __init__(self, dataset, window=None, profile=None, network=None) -> None:
+        self.network = network
+        self.X_train, self.y_train = window.select(dataset)
+        self.epochs_trained = 2
+
+    def save(self, directory) -> None:
+        FakeTFModel.saved_to = directory
+
+    @classmethod
+    def load(cls, directory):
+        return cls.__new__(cls)
+
+
+class FakeExecutor:
+    instances = []
+
+    def __init__(self, max_workers=None, mp_context=None):
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+        FakeExecutor.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        result = fn(*copy.deepcopy(args))
+        return SimpleNamespace(result=lambda: result)
+
+
+def test_network_is_reused_and_reset_while_the_architecture_is_unchanged():
+    lifecycle = ModelLifecycle()
+    profile = ModelProfile(hidden_units=(4,))
+    network = lifecycle.acquire(5, profile)
+    initial = [w.copy() for w in network.get_weights()]
+
+    X = np.random.default_rng(1).normal(size=(64, 5)).astype(np.float32)
+    network.fit(X, (X[:, 0] > 0).astype(np.float32), epochs=2, verbose=0)
+    assert network.optimizer.iterations.numpy() > 0
+    assert not np.allclose(network.get_weights()[0], initial[0])
+
+    assert lifecycle.acquire(5, profile.with_epochs(3)) is network
+    assert network.optimizer.iterations.numpy() == 0
+    for weights, expected in zip(network.get_weights(), initial):
+        np.testing.assert_array_equal(weights, expected)
+
+
+def test_architecture_change_releases_the_old_network(monkeypatch):
+    cleared = []
+    lifecycle = ModelLifecycle()
+    first = lifecycle.acquire(5, ModelProfile())
+    monkeypatch.setattr(
+        lifecycle_module.ModelLifecycle,
+        "release",
+        lambda self: cleared.append(self.network),
+    )
+
+    second = lifecycle.acquire(5, ModelProfile(learning_rate=0.001))
+    assert second is not first
+    assert cleared == [first]
+    assert lifecycle.architecture == (5, 0.001, ())
+
+
+def test_release_drops_the_network():
+    lifecycle = ModelLifecycle()
+    lifecycle.acquire(5, ModelProfile())
+    lifecycle.release()
+    assert lifecycle.network is None and lifecycle.architecture is None
+
+
+def test_release_keeps_the_session_of_other_models(monkeypatch):
+    import tensorflow as tf
+
+    monkeypatch.setattr(
+        tf.keras.backend, "clear_session", lambda: pytest.fail("session cleared")
+    )
+    lifecycle = ModelLifecycle(clear_session=False)
+    lifecycle.network, lifecycle.architecture = object(), (5, 0.001, ())
+    lifecycle.release()
+    assert lifecycle.network is None and lifecycle.architecture is None
+
+
+def test_train_passes_the_reusable_network_and_tracks_memory(monkeypatch):
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    monkeypatch.setattr(
+        lifecycle_module.ModelLifecycle,
+        "acquire",
+        lambda self, input_dim, profile: ("network", input_dim),
+    )
+    rss = iter([100.0, 103.5])
+    monkeypatch.setattr(lifecycle_module.MemoryUtils, "rss_mb", lambda: next(rss))
+    lifecycle = ModelLifecycle()
+    window = ReservoirWindow(10, seed=0)
+
+    model = lifecycle.train(_dataset(), window, ModelProfile())
+    lifecycle.train(_dataset(), window, ModelProfile())
+
+    assert model.network == ("network", 5)
+    assert lifecycle.retrains == 2
+    assert lifecycle_module.Metrics.get("model.retrains") == 2
+    assert lifecycle_module.Metrics.get("model.rss_mb") == 103.5
+    assert lifecycle_module.Metrics.get("model.rss_growth_mb") == 3.5
+
+    with pytest.raises(ValueError, match="No data"):
+        lifecycle.train(TrainingDataset(), window, ModelProfile())
+
+    shadow = ModelLifecycle(metric_prefix="shadow.keras.")
+    monkeypatch.setattr(lifecycle_module.MemoryUtils, "rss_mb", lambda: 90.0)
+    shadow.train(_dataset(), window, ModelProfile())
+    assert lifecycle_module.Metrics.get("shadow.keras.rss_mb") == 90.0
+    assert lifecycle_module.Metrics.get("model.rss_mb") == 103.5
+
+
+def test_isolated_training_runs_in_a_spawned_process(monkeypatch):
+    FakeExecutor.instances = []
+    released = []
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    monkeypatch.setattr(lifecycle_module, "ProcessPoolExecutor", FakeExecutor)
+    monkeypatch.setattr(
+        lifecycle_module.ModelLifecycle, "release", lambda self: released.append(1)
+    )
+    dataset = _dataset()
+    window = ReservoirWindow(10, seed=0)
+    expected, _ = ReservoirWindow(10, seed=0).select(dataset)
+
+    model = ModelLifecycle(isolate=True).train(dataset, window, ModelProfile())
+
+    (executor,) = FakeExecutor.instances
+    assert executor.max_workers == 1
+    assert executor.mp_context.get_start_method() == "spawn"
+    assert released == [1]
+    assert model.epochs_trained == 2
+    np.testing.assert_array_equal(model.X_train, expected)
+    np.testing.assert_array_equal(model.X_test, dataset.X_test)
@@ -0,0 +1,431 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import model.model_manager as manager_module
+from data.market_snapshot import MarketSnapshot
+from model.model_manager import ModelManager
+from model.online_model import OnlineModel
+from tensorflow_model.training_dataset import TrainingDataset
+import tensorflow_model.tf_model as tf_model_module
+import tensorflow_model.tflite_model as tflite_module
+from tensorflow_model.model_profile import ModelProfile
+from utils.running_stats import RunningStats
+
+
+@pytest.fixture(autouse=True)
+def patch_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        manager_module,
+        "SETTINGS",
+        SimpleNamespace(
+            MODEL_BACKEND="keras",
+            MODEL_LEARNING_RATE=0.1,
+            MODEL_WINDOW="sliding",
+            MODEL_WINDOW_SIZE=1,
+            MODEL_DECAY_HALF_LIFE=10.0,
+            MODEL_CHECKPOINT_DIR=tmp_path / "model_checkpoint",
+            MODEL_PROFILE_PATH=tmp_path / "model_profile.json",
+            MODEL_PREDICTION_CACHE_SIZE=16,
+            MODEL_PREDICTION_CACHE_DIGITS=4,
+            MODEL_ISOLATE_TRAINING=False,
+            MODEL_RUNTIME="keras",
+            MODEL_TFLITE_QUANTIZE=False,
+            MODEL_TFLITE_MIN_AGREEMENT=0.99,
+            MODEL_ENSEMBLE_MEMBERS=("logistic", "logistic"),
+            MODEL_ENSEMBLE_VOTE="mean",
+            INTERVAL="1m",
+        ),
+    )
+    monkeypatch.setattr(
+        manager_module.ModelLifecycle, "acquire", lambda self, input_dim, profile: None
+    )
+    monkeypatch.setattr(manager_module.ModelLifecycle, "release", lambda self: None)
+    monkeypatch.setattr(manager_module.Logger, "log_info", lambda msg: None)
+    monkeypatch.setattr(manager_module.Logger, "log_exception", lambda msg: None)
+    manager_module.Metrics.reset()
+
+
+def _snapshot(rsi: float) -> MarketSnapshot:
+    return MarketSnapshot("[2025-01-01 00:00:00]", 1.0, 2.0, 3.0, 4.0, rsi)
+
+
+class FakeTFModel:
+    SCALER_FILE = "scaler.npz"
+    instances = []
+    saved = []
+
+    def __init__(self, dataset, window=None, profile=None, network=None) -> None:
+        self.size = len(dataset)
+        self.profile = profile
+        self.scaler = dataset.stats.copy()
+        self.X_train, self.y_train = window.select(dataset)
+        FakeTFModel.instances.append(self)
+
+    def save(self, directory) -> None:
+        directory.mkdir(parents=True, exist_ok=True)
+        self.scaler.save(directory / self.SCALER_FILE)
+        self.profile.save(directory / "profile.json")
+        FakeTFModel.saved.append(self)
+
+    @classmethod
+    def load(cls, directory):
+        loaded = cls.__new__(cls)
+        loaded.scaler = RunningStats.load(directory / cls.SCALER_FILE)
+        loaded.profile = ModelProfile.load(directory / "profile.json")
+        return loaded
+
+    def predict(self, snapshot) -> str:
+        return "SHORT"
+
+
+def test_rejects_unknown_backend():
+    with pytest.raises(ValueError, match="Unknown model backend"):
+        ModelManager(TrainingDataset(), backend="xgboost")
+
+
+def test_shadow_managers_never_clear_the_keras_session():
+    assert ModelManager(TrainingDataset(), backend="online").lifecycle.clear_session
+    shadow = ModelManager(TrainingDataset(), backend="online", shadow=True)
+    assert not shadow.lifecycle.clear_session
+
+
+def test_shadow_metrics_do_not_overwrite_the_serving_model():
+    serving = ModelManager(_dataset(60.0, 40.0), backend="online")
+    shadow = ModelManager(
+        _dataset(60.0), backend="online", metric_prefix="shadow.online."
+    )
+    shadow.record_result("LONG", _snapshot(70.0))
+    shadow.predict(_snapshot(70.0))
+
+    assert manager_module.Metrics.get("model.training_rows") == len(serving.dataset)
+    assert manager_module.Metrics.get("shadow.online.training_rows") == 2
+    assert manager_module.Metrics.get("shadow.online.prediction_cache_misses") == 1
+    assert manager_module.Metrics.get("model.prediction_cache_misses") is None
+    assert shadow.lifecycle.metric_prefix == "shadow.online."
+
+
+def test_uses_keras(monkeypatch):
+    assert ModelManager.uses_keras("keras")
+    assert not ModelManager.uses_keras("logistic")
+    assert not ModelManager.uses_keras("ensemble")
+    monkeypatch.setattr(
+        manager_module,
+        "SETTINGS",
+        SimpleNamespace(
+            **{
+                **vars(manager_module.SETTINGS),
+                "MODEL_ENSEMBLE_MEMBERS": ("logistic", "keras"),
+            }
+        ),
+    )
+    assert ModelManager.uses_keras("ensemble")
+
+
+def test_predict_without_data_raises():
+    with pytest.raises(ValueError, match="No data"):
+        ModelManager(TrainingDataset(), backend="online").predict(_snapshot(50.0))
+
+
+def test_keras_backend_retrains_only_when_dataset_grows(monkeypatch):
+    FakeTFModel.instances = []
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    manager = ModelManager(TrainingDataset())
+    assert manager.backend == "keras"
+
+    manager.record_result("LONG", _snapshot(60.0))
+    assert manager.predict(_snapshot(60.0)) == "SHORT"
+    assert manager.predict(_snapshot(60.0)) == "SHORT"
+    assert len(FakeTFModel.instances) == 1
+
+    manager.record_result("SHORT", _snapshot(40.0))
+    manager.predict(_snapshot(40.0))
+    assert [model.size for model in FakeTFModel.instances] == [1, 2]
+    assert manager_module.Metrics.get("model.training_rows") == 1
+    assert manager_module.Metrics.get("model.train_seconds") >= 0.0
+
+
+def test_online_backend_fits_at_startup_and_updates_per_result():
+    dataset = TrainingDataset()
+    dataset.append_result("LONG", _snapshot(80.0))
+    manager = ModelManager(dataset, backend="online")
+
+    assert isinstance(manager.model, OnlineModel)
+    assert manager.model.scaler.count == 1
+    assert manager.model.learning_rate == 0.1
+
+    manager.record_result("SHORT", _snapshot(20.0))
+    assert len(dataset) == 2
+    assert manager_module.Metrics.get("model.training_rows") == 2
+    assert manager.model.scaler.count == 2
+    assert manager.predict(_snapshot(50.0)) in ("LONG", "SHORT")
+
+
+def _dataset(*rsi_values: float) -> TrainingDataset:
+    dataset = TrainingDataset()
+    for rsi in rsi_values:
+        dataset.append_result("LONG", _snapshot(rsi))
+    return dataset
+
+
+def test_keras_checkpoint_is_reused_when_dataset_is_unchanged(monkeypatch):
+    FakeTFModel.instances, FakeTFModel.saved = [], []
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    ModelManager(_dataset(60.0, 40.0)).predict(_snapshot(50.0))
+    assert len(FakeTFModel.saved) == 1
+
+    restarted = ModelManager(_dataset(60.0, 40.0))
+    assert restarted.predict(_snapshot(50.0)) == "SHORT"
+    assert len(FakeTFModel.instances) == 1
+    assert restarted.model.scaler.count == 2
+    assert manager_module.Metrics.get("model.training_rows") == 2
+
+
+def test_stale_keras_checkpoint_is_retrained(monkeypatch):
+    FakeTFModel.instances, FakeTFModel.saved = [], []
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    ModelManager(_dataset(60.0)).predict(_snapshot(50.0))
+
+    ModelManager(_dataset(60.0, 40.0)).predict(_snapshot(50.0))
+    assert [model.size for model in FakeTFModel.instances] == [1, 2]
+
+
+def test_unreadable_checkpoint_is_ignored(monkeypatch):
+    FakeTFModel.instances = []
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    directory = manager_module.SETTINGS.MODEL_CHECKPOINT_DIR
+    directory.mkdir()
+    (directory / FakeTFModel.SCALER_FILE).write_text("corrupt")
+
+    ModelManager(_dataset(60.0)).predict(_snapshot(50.0))
+    assert len(FakeTFModel.instances) == 1
+
+
+def test_failed_checkpoint_save_is_logged(monkeypatch):
+    class UnsavableModel(FakeTFModel):
+        def save(self, directory) -> None:
+            raise OSError("read-only")
+
+    errors = []
+    monkeypatch.setattr(tf_model_module, "TFModel", UnsavableModel)
+    monkeypatch.setattr(manager_module.Logger, "log_exception", errors.append)
+    assert ModelManager(_dataset(60.0)).predict(_snapshot(50.0)) == "SHORT"
+    assert errors == ["Failed to save model checkpoint: read-only"]
+
+
+def test_model_profile_is_loaded_and_used_for_training(monkeypatch):
+    FakeTFModel.instances = []
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    profile = ModelProfile(learning_rate=0.003, hidden_units=(8,))
+    profile.save(manager_module.SETTINGS.MODEL_PROFILE_PATH)
+
+    manager = ModelManager(_dataset(60.0))
+    manager.predict(_snapshot(50.0))
+    assert manager.profile == profile
+    assert FakeTFModel.instances[0].profile == profile
+
+
+def test_checkpoint_with_another_profile_is_retrained(monkeypatch):
+    FakeTFModel.instances = []
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    ModelManager(_dataset(60.0)).predict(_snapshot(50.0))
+    assert FakeTFModel.instances[0].profile == ModelProfile.default()
+
+    ModelProfile(hidden_units=(4,)).save(manager_module.SETTINGS.MODEL_PROFILE_PATH)
+    ModelManager(_dataset(60.0)).predict(_snapshot(50.0))
+    assert len(FakeTFModel.instances) == 2
+
+
+def test_predictions_are_cached_until_the_model_changes(monkeypatch):
+    calls = []
+
+    class CountingTFModel(FakeTFModel):
+        def predict(self, snapshot) -> str:
+            calls.append(snapshot.rsi_6)
+            return "SHORT"
+
+    monkeypatch.setattr(tf_model_module, "TFModel", CountingTFModel)
+    manager = ModelManager(_dataset(60.0))
+    tick = _snapshot(50.0)
+    same_candle = MarketSnapshot(
+        "[2025-01-01 00:00:30]", 1.0, 2.0, 3.0, 4.0, 50.00001
+    )
+
+    assert manager.predict(tick) == manager.predict(same_candle) == "SHORT"
+    assert calls == [50.0]
+    assert manager_module.Metrics.get("model.prediction_cache_hit_rate") == 0.5
+
+    manager.record_result("LONG", _snapshot(70.0))
+    manager.predict(tick)
+    assert calls == [50.0, 50.0]
+    assert manager.version == 2
+
+
+def test_online_updates_invalidate_cached_predictions():
+    manager = ModelManager(_dataset(80.0), backend="online")
+    manager.predict(_snapshot(50.0))
+    manager.predict(_snapshot(50.0))
+    assert manager.prediction_cache.hits == 1
+
+    manager.record_result("SHORT", _snapshot(20.0))
+    manager.predict(_snapshot(50.0))
+    assert manager.prediction_cache.hits == 1
+    assert manager.version == 1
+
+
+def test_predict_batch_matches_single_predictions():
+    manager = ModelManager(_dataset(80.0, 75.0), backend="online")
+    snapshots = [_snapshot(20.0), _snapshot(50.0), _snapshot(90.0)]
+    features = np.array([s.features() for s in snapshots])
+
+    batch = manager.predict_batch(features)
+    assert batch.dtype == bool
+    assert ["LONG" if long else "SHORT" for long in batch] == [
+        manager.predict(s) for s in snapshots
+    ]
+
+
+def test_rejects_unknown_runtime(monkeypatch):
+    monkeypatch.setattr(manager_module.SETTINGS, "MODEL_RUNTIME", "onnx")
+    with pytest.raises(ValueError, match="Unknown model runtime"):
+        ModelManager(TrainingDataset())
+
+
+class FakeTFLiteModel:
+    agreement_value = 1.0
+    exported = []
+
+    def __init__(self, model, quantize) -> None:
+        self.source = model
+        self.quantize = quantize
+        self.content = b"tflite"
+        FakeTFLiteModel.exported.append(self)
+
+    def agreement(self, model, features) -> float:
+        self.checked_rows = len(features)
+        return self.agreement_value
+
+    def predict(self, snapshot) -> str:
+        return "LONG"
+
+
+@pytest.mark.parametrize("agreement, served", [(1.0, "LONG"), (0.9, "SHORT")])
+def test_tflite_runtime_serves_the_export_when_decisions_agree(
+    monkeypatch, agreement, served
+):
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    monkeypatch.setattr(manager_module.SETTINGS, "MODEL_RUNTIME", "tflite")
+    monkeypatch.setattr(manager_module.SETTINGS, "MODEL_TFLITE_QUANTIZE", True)
+    monkeypatch.setattr(
+        tflite_module.TFLiteModel,
+        "export",
+        staticmethod(lambda model, quantize: FakeTFLiteModel(model, quantize)),
+    )
+    monkeypatch.setattr(FakeTFLiteModel, "agreement_value", agreement)
+    FakeTFLiteModel.exported = []
+
+    manager = ModelManager(_dataset(60.0, 40.0))
+    assert manager.predict(_snapshot(50.0)) == served
+    (exported,) = FakeTFLiteModel.exported
+    assert exported.quantize is True
+    assert isinstance(exported.source, FakeTFModel)
+    assert exported.checked_rows > 0
+    assert manager_module.Metrics.get("model.tflite_agreement") == agreement
+    assert FakeTFModel.saved[-1] is exported.source
+
+
+def test_checkpoint_is_exported_to_tflite_when_loaded(monkeypatch):
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    ModelManager(_dataset(60.0)).predict(_snapshot(50.0))
+    monkeypatch.setattr(manager_module.SETTINGS, "MODEL_RUNTIME", "tflite")
+    monkeypatch.setattr(
+        tflite_module.TFLiteModel,
+        "export",
+        staticmethod(lambda model, quantize: FakeTFLiteModel(model, quantize)),
+    )
+    FakeTFLiteModel.exported = []
+
+    manager = ModelManager(_dataset(60.0))
+    assert manager.predict(_snapshot(50.0)) == "LONG"
+    assert len(FakeTFLiteModel.exported) == 1
+
+
+def test_logistic_backend_refits_without_tensorflow(monkeypatch):
+    monkeypatch.setattr(
+        tf_model_module, "TFModel", lambda *args, **kwargs: pytest.fail("TFModel used")
+    )
+    manager = ModelManager(_dataset(80.0, 20.0), backend="logistic")
+
+    assert manager.predict(_snapshot(50.0)) in ("LONG", "SHORT")
+    first = manager.model
+    assert isinstance(first, manager_module.LogisticModel)
+    manager.predict(_snapshot(60.0))
+    assert manager.model is first and manager.version == 1
+
+    manager.record_result("SHORT", _snapshot(10.0))
+    manager.predict(_snapshot(50.0))
+    assert manager.model is not first and manager.version == 2
+    assert manager_module.Metrics.get("model.training_rows") == len(manager.model.y_train)
+    assert not (manager_module.SETTINGS.MODEL_CHECKPOINT_DIR).exists()
+
+
+def test_ensemble_backend_trains_members_on_bootstrap_windows(monkeypatch):
+    trained = []
+
+    def train(self, dataset, window, profile):
+        trained.append((window, profile))
+        return manager_module.LogisticModel().fit(dataset, window)
+
+    monkeypatch.setattr(manager_module.ModelLifecycle, "train", train)
+    settings = manager_module.SETTINGS
+    monkeypatch.setattr(settings, "MODEL_ENSEMBLE_MEMBERS", ("logistic", "keras:4x2"))
+    monkeypatch.setattr(settings, "MODEL_ENSEMBLE_VOTE", "majority")
+    monkeypatch.setattr(settings, "MODEL_WINDOW_SIZE", 10)
+    manager = ModelManager(_dataset(80.0, 20.0, 70.0), backend="ensemble")
+
+    assert manager.predict(_snapshot(50.0)) in ("LONG", "SHORT")
+    ensemble = manager.model
+    assert isinstance(ensemble, manager_module.EnsembleModel)
+    assert ensemble.names == ["0:logistic", "1:keras:4x2"]
+    assert ensemble.vote == "majority"
+    ((window, profile),) = trained
+    assert isinstance(window, manager_module.BootstrapWindow)
+    assert window.base is manager.window
+    assert profile.hidden_units == (4, 2)
+    assert manager_module.Metrics.get("model.ensemble_agreement.unanimous") == 1.0
+    assert manager_module.Metrics.get("model.ensemble_agreement.0:logistic") == 1.0
+
+    manager.predict(_snapshot(60.0))
+    assert manager.model is ensemble and manager.version == 1
+    manager.record_result("SHORT", _snapshot(10.0))
+    manager.predict(_snapshot(50.0))
+    assert manager.model is not ensemble and manager.version == 2
+
+
+@pytest.mark.parametrize("member", ["online", "logistic:4", "keras:wide"])
+def test_rejects_unknown_ensemble_member(monkeypatch, member):
+    monkeypatch.setattr(manager_module.SETTINGS, "MODEL_ENSEMBLE_MEMBERS", (member,))
+    with pytest.raises(ValueError, match="Unknown ensemble member"):
+        ModelManager(TrainingDataset(), backend="ensemble")
+
+
+def test_schema_2_manager_skips_trades_without_the_extra_features(monkeypatch):
+    FakeTFModel.instances, FakeTFModel.saved = [], []
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    ModelManager(_dataset(60.0, 40.0)).predict(_snapshot(50.0))
+
+    extended = MarketSnapshot(
+        "[2025-01-01 00:00:00]", 1.0, 2.0, 3.0, 4.0, 60.0, None, 1.0, 0.1, 0.0, 0.5
+    )
+    dataset = TrainingDataset(schema_version=2)
+    manager = ModelManager(dataset, backend="online")
+    manager.record_result("LONG", _snapshot(60.0))
+    assert len(dataset) == 0 and manager.version == 0
+    manager.record_result("LONG", extended)
+    assert len(dataset) == 1 and manager.model.scaler.count == 1
+    assert manager.prediction_cache.columns == MarketSnapshot.SCHEMAS[2]
+
+    # The schema 1 checkpoint has as many training rows but fewer columns.
+    dataset.append_result("SHORT", extended)
+    manager = ModelManager(dataset)
+    manager.predict(extended)
+    assert [model.size for model in FakeTFModel.instances] == [2, 2]
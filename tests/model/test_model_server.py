@@ -0,0 +1,288 @@
+import importlib.util
+import json
+import socket
+import socketserver
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import numpy as np
+import pytest
+import model.model_server as server_module
+from data.market_snapshot import MarketSnapshot
+from model.model_server import ModelClient, ModelServer
+
+
+@pytest.fixture(autouse=True)
+def quiet(monkeypatch):
+    monkeypatch.setattr(server_module.Logger, "log_info", lambda msg: None)
+    server_module.Metrics.reset()
+
+
+class FakeManager:
+    def __init__(self) -> None:
+        self.dataset = SimpleNamespace(columns=MarketSnapshot.FEATURES)
+        self.batches = []
+        self.recorded = []
+
+    def predict_batch(self, features: np.ndarray) -> np.ndarray:
+        self.batches.append(len(features))
+        return features[:, -1] > 50.0
+
+    def record_result(self, result: str, snapshot: MarketSnapshot) -> None:
+        self.recorded.append((result, snapshot.rsi_6))
+
+
+unix_only = pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not available"
+)
+
+
+def _snapshot(rsi: float) -> MarketSnapshot:
+    return MarketSnapshot("[2025-01-01 00:00:00]", 1.0, 2.0, 3.0, 4.0, rsi)
+
+
+def _free_address() -> str:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{probe.getsockname()[1]}"
+
+
+@pytest.fixture
+def server():
+    server = ModelServer(FakeManager(), _free_address(), max_batch=4, max_wait=1.0)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_concurrent_predictions_share_one_forward_pass(server):
+    results = {}
+
+    def ask(rsi: float) -> None:
+        client = ModelClient(server.socket_path)
+        results[rsi] = client.predict(_snapshot(rsi))
+        client.close()
+
+    threads = [threading.Thread(target=ask, args=(rsi,)) for rsi in (20, 40, 60, 80)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == {20: "SHORT", 40: "SHORT", 60: "LONG", 80: "LONG"}
+    assert server.manager.batches == [4]
+    assert server_module.Metrics.get("model_server.predictions") == 4
+    assert server_module.Metrics.get("model_server.batch_size") == 4
+    assert server_module.Metrics.get("model_server.queue_ms_max") >= 0.0
+
+
+def test_record_and_stats(server):
+    client = ModelClient(server.socket_path)
+    client.record_result("LONG", _snapshot(70.0))
+    assert server.manager.recorded == [("LONG", 70.0)]
+    assert "model_server.predictions" not in client.stats()
+
+    response = client.request({"op": "predict", "features": [1, 2, 3, 4, 90]})
+    assert response["prediction"] == "LONG" and response["queue_ms"] >= 0.0
+    # Features beyond the model's schema are ignored.
+    response = client.request({"op": "predict", "features": [1, 2, 3, 4, 20, 90]})
+    assert response["prediction"] == "SHORT"
+    assert client.stats()["model_server.predictions"] == 2
+    client.close()
+
+
+def test_errors_are_reported_to_the_client(server):
+    client = ModelClient(server.socket_path)
+    with pytest.raises(ValueError, match="Unknown op: train"):
+        client.request({"op": "train"})
+    with pytest.raises(ValueError, match="features"):
+        client.request({"op": "predict"})
+    with pytest.raises(ValueError, match="snapshot"):
+        client.request({"op": "record", "result": "LONG"})
+    assert client.predict(_snapshot(10.0)) == "SHORT"
+    client.close()
+
+    with socket.create_connection(server.tcp_address) as raw:
+        raw.sendall(b"not json\n")
+        reply = json.loads(raw.makefile("rb").readline())
+    assert reply["error"].startswith("Invalid request")
+
+
+def test_process_keeps_order_and_groups_consecutive_predictions():
+    manager = FakeManager()
+    server = ModelServer(manager, _free_address())
+    requests = [
+        server_module._Request({"op": "predict", "features": [0, 0, 0, 0, 60]}),
+        server_module._Request({"op": "predict", "features": [0, 0, 0, 0, 40]}),
+        server_module._Request({"op": "stats"}),
+        server_module._Request({"op": "predict", "features": [0, 0, 0, 0, 70]}),
+    ]
+    server.process(requests)
+
+    assert manager.batches == [2, 1]
+    assert [r.response.get("prediction") for r in requests] == [
+        "LONG",
+        "SHORT",
+        None,
+        "LONG",
+    ]
+    assert all(r.done.is_set() for r in requests)
+
+
+def test_model_failures_are_reported_without_stopping_the_server(
+    server, monkeypatch
+):
+    server.max_wait = 0.01
+    errors = []
+    monkeypatch.setattr(server_module.Logger, "log_exception", errors.append)
+    predict_batch = server.manager.predict_batch
+
+    def fail(*args):
+        raise RuntimeError("graph execution failed")
+
+    server.manager.predict_batch = fail
+    server.manager.record_result = lambda result, snapshot: 1 / 0
+
+    client = ModelClient(server.socket_path)
+    with pytest.raises(ValueError, match="Prediction failed: graph execution failed"):
+        client.predict(_snapshot(60.0))
+    with pytest.raises(ValueError, match="Record failed: division by zero"):
+        client.record_result("LONG", _snapshot(60.0))
+    server.manager.predict_batch = predict_batch
+    assert client.predict(_snapshot(60.0)) == "LONG"
+    client.close()
+    assert len(errors) == 2
+
+
+def test_resent_records_are_added_once(server):
+    server.max_wait = 0.01
+    client = ModelClient(server.socket_path)
+    record = {"op": "record", "result": "LONG", "snapshot": _snapshot(70.0).to_dict()}
+    client.request({**record, "id": "a"})
+    client.request({**record, "id": "a"})
+    client.request({**record, "id": "b"})
+    client.request(record)
+    client.request(record)
+    client.close()
+    assert len(server.manager.recorded) == 4
+
+
+def test_timed_out_requests_are_not_resent(monkeypatch):
+    client = ModelClient(_free_address())
+    sent = []
+
+    def exchange(message):
+        sent.append(message)
+        raise socket.timeout("timed out")
+
+    monkeypatch.setattr(client, "_exchange", exchange)
+    with pytest.raises(socket.timeout):
+        client.record_result("LONG", _snapshot(70.0))
+    assert len(sent) == 1
+
+
+def test_client_reconnects_after_server_restart():
+    path = _free_address()
+    first = ModelServer(FakeManager(), path)
+    first.start()
+    client = ModelClient(path)
+    assert client.predict(_snapshot(60.0)) == "LONG"
+    first.stop()
+
+    second = ModelServer(FakeManager(), path)
+    second.start()
+    try:
+        assert client.predict(_snapshot(30.0)) == "SHORT"
+        assert second.manager.batches == [1]
+    finally:
+        client.close()
+        second.stop()
+
+
+@unix_only
+def test_unix_socket_is_replaced_and_removed(tmp_path):
+    path = tmp_path / "m.sock"
+    path.touch()
+    server = ModelServer(FakeManager(), path)
+    assert server.tcp_address is None
+    server.start()
+    client = ModelClient(path)
+    try:
+        assert client.predict(_snapshot(60.0)) == "LONG"
+    finally:
+        client.close()
+        server.stop()
+    assert not path.exists()
+
+
+def test_main_serves_until_interrupted(monkeypatch):
+    manager = FakeManager()
+    monkeypatch.setattr(
+        server_module.TrainingDataset,
+        "from_journal",
+        lambda journal, **kwargs: "dataset",
+    )
+    journal = MagicMock()
+    monkeypatch.setattr(server_module, "TradeJournal", lambda path: journal)
+    monkeypatch.setattr(server_module, "ModelManager", lambda dataset: manager)
+    path = _free_address()
+
+    def interrupt(seconds):
+        client = ModelClient(path)
+        assert client.predict(_snapshot(90.0)) == "LONG"
+        client.close()
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(server_module, "sleep", interrupt)
+    server = server_module.main(
+        ["--socket", path, "--max-batch", "8", "--max-wait-ms", "5"]
+    )
+
+    assert (server.max_batch, server.max_wait) == (8, 0.005)
+    assert manager.batches == [1]
+    journal.__exit__.assert_called_once()
+    assert server._server is None
+
+
+def test_main_requires_a_socket(monkeypatch):
+    monkeypatch.setattr(
+        server_module, "SETTINGS", SimpleNamespace(MODEL_SERVER_SOCKET="")
+    )
+    with pytest.raises(SystemExit):
+        server_module.main([])
+
+
+def test_serves_over_tcp_where_unix_sockets_are_unavailable(monkeypatch):
+    monkeypatch.delattr(socket, "AF_UNIX", raising=False)
+    address = _free_address()
+    server = ModelServer(FakeManager(), address)
+    assert server.tcp_address == ("127.0.0.1", int(address.rpartition(":")[2]))
+    server.start()
+    client = ModelClient(address)
+    try:
+        assert client.predict(_snapshot(60.0)) == "LONG"
+    finally:
+        client.close()
+        server.stop()
+
+
+@unix_only
+def test_socket_paths_are_not_tcp_addresses():
+    assert server_module._tcp_address("/tmp/m.sock") is None
+    assert server_module._tcp_address("C:\\run\\m.sock") is None
+
+
+def test_addresses_without_unix_sockets(monkeypatch):
+    monkeypatch.delattr(socket, "AF_UNIX", raising=False)
+    assert server_module._tcp_address("localhost:9000") == ("localhost", 9000)
+    with pytest.raises(ValueError, match="use host:port instead of /tmp/m.sock"):
+        ModelClient("/tmp/m.sock")
+
+
+def test_module_imports_without_unix_sockets(monkeypatch):
+    monkeypatch.delattr(socket, "AF_UNIX", raising=False)
+    monkeypatch.delattr(socketserver, "UnixStreamServer", raising=False)
+    spec = importlib.util.spec_from_file_location("nt_server", server_module.__file__)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert not hasattr(module, "_UnixServer")
@@ -0,0 +1,43 @@
+import numpy as np
+from data.market_snapshot import MarketSnapshot
+from model.online_model import OnlineModel
+from tensorflow_model.training_dataset import TrainingDataset
+
+
+def _separable_dataset(rows: int = 400) -> TrainingDataset:
+    rng = np.random.default_rng(1)
+    features = rng.normal(0.0, 1.0, size=(rows, 5)) * [10.0, 1.0, 1.0, 10.0, 20.0]
+    features[:, 4] += 50.0
+    dataset = TrainingDataset()
+    dataset.extend(features, (features[:, 4] > 50.0).astype(np.float32))
+    return dataset
+
+
+def _snapshot(rsi: float) -> MarketSnapshot:
+    return MarketSnapshot("[2025-01-01 00:00:00]", 0.0, 0.0, 0.0, 0.0, rsi)
+
+
+def test_fit_learns_a_separable_rule():
+    dataset = _separable_dataset()
+    model = OnlineModel(learning_rate=0.1).fit(dataset)
+
+    accuracy = np.mean(model.predict_batch(dataset.X_test) == (dataset.y_test == 1.0))
+    assert accuracy > 0.9
+    assert model.predict(_snapshot(95.0)) == "LONG"
+    assert model.predict(_snapshot(5.0)) == "SHORT"
+
+
+def test_update_result_moves_prediction_towards_label():
+    model = OnlineModel(learning_rate=0.5)
+    snapshot = _snapshot(70.0)
+    before = float(model.predict_proba(np.asarray(snapshot.features())))
+    for _ in range(5):
+        model.update_result("SHORT", snapshot)
+    after = float(model.predict_proba(np.asarray(snapshot.features())))
+
+    assert model.scaler.count == 5
+    assert after < before
+
+
+def test_predict_batch_handles_empty_input():
+    assert OnlineModel().predict_batch(np.zeros((0, 5))).tolist() == []
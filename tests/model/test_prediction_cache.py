@@ -0,0 +1,85 @@
+import pytest
+from data.market_snapshot import MarketSnapshot
+from model.prediction_cache import PredictionCache
+from utils.metrics import Metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    Metrics.reset()
+
+
+def _snapshot(timestamp: float, price: float = 4123.456, rsi: float = 55.0):
+    return MarketSnapshot("", price, 0.0012345, -0.5, 4100.0, rsi, timestamp=timestamp)
+
+
+def test_key_uses_candle_open_time_and_rounded_features():
+    cache = PredictionCache(8, interval_seconds=60, digits=4)
+    first = cache.key(_snapshot(120.0))
+    assert first == (120.0, 4123.0, 0.001234, -0.5, 4100.0, 55.0)
+    assert cache.key(_snapshot(179.9, price=4123.4)) == first
+    assert cache.key(_snapshot(180.0)) != first
+    assert cache.key(_snapshot(120.0, rsi=55.01)) != first
+    assert cache.key(_snapshot(float("nan"))) is None
+
+
+def test_hits_misses_and_hit_rate_metric():
+    cache = PredictionCache(8, interval_seconds=60)
+    key = cache.key(_snapshot(60.0))
+    assert cache.get(1, key) is None
+    cache.put(key, "LONG")
+    assert cache.get(1, key) == "LONG"
+    assert cache.get(1, key) == "LONG"
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_rate == pytest.approx(2 / 3)
+    assert Metrics.get("model.prediction_cache_hits") == 2
+    assert Metrics.get("model.prediction_cache_misses") == 1
+    assert Metrics.get("model.prediction_cache_hit_rate") == pytest.approx(2 / 3)
+
+
+def test_metric_prefix_keeps_shadow_counts_apart():
+    cache = PredictionCache(8, interval_seconds=60, metric_prefix="shadow.online.")
+    cache.get(1, cache.key(_snapshot(60.0)))
+    assert Metrics.get("shadow.online.prediction_cache_misses") == 1
+    assert Metrics.get("model.prediction_cache_misses") is None
+
+
+def test_new_model_version_invalidates_entries():
+    cache = PredictionCache(8, interval_seconds=60)
+    key = cache.key(_snapshot(60.0))
+    cache.get(1, key)
+    cache.put(key, "LONG")
+    assert cache.get(2, key) is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(2, interval_seconds=60)
+    keys = [cache.key(_snapshot(60.0 * i)) for i in range(3)]
+    cache.get(1, keys[0])
+    cache.put(keys[0], "LONG")
+    cache.put(keys[1], "SHORT")
+    assert cache.get(1, keys[0]) == "LONG"
+    cache.put(keys[2], "LONG")
+    assert len(cache) == 2
+    assert cache.get(1, keys[1]) is None
+    assert cache.get(1, keys[0]) == "LONG"
+
+
+def test_disabled_cache_and_missing_keys_store_nothing():
+    disabled = PredictionCache(0, interval_seconds=60)
+    key = disabled.key(_snapshot(60.0))
+    disabled.put(key, "LONG")
+    assert disabled.get(1, key) is None
+
+    cache = PredictionCache(4, interval_seconds=60)
+    cache.put(None, "LONG")
+    assert cache.get(1, None) is None
+    assert len(cache) == 0
+    assert PredictionCache(4, 60).hit_rate == 0.0
+
+
+def test_key_covers_the_configured_columns():
+    cache = PredictionCache(8, 60, columns=MarketSnapshot.SCHEMAS[2])
+    snapshot = MarketSnapshot("", 1.0, 2.0, 3.0, 4.0, 5.0, 120.0, 6.0, 7.0, 8.0, 0.25)
+    assert cache.key(snapshot) == (120.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 0.25)
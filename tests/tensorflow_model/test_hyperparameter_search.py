@@ -0,0 +1,301 @@
+from types import SimpleNamespace
+import json
+import numpy as np
+import pandas as pd
+import pytest
+import tensorflow_model.hyperparameter_search as search_module
+import tensorflow_model.tf_model as tf_model_module
+from data.market_snapshot import MarketSnapshot
+from tensorflow_model.hyperparameter_search import HyperparameterSearch
+from tensorflow_model.model_profile import ModelProfile
+
+
+@pytest.fixture(autouse=True)
+def quiet(monkeypatch):
+    monkeypatch.setattr(search_module.Logger, "log_info", lambda msg: None)
+
+
+class FakeExecutor:
+    instances = []
+
+    def __init__(
+        self, max_workers=None, mp_context=None, initializer=None, initargs=()
+    ):
+        self.max_workers = max_workers
+        self.mp_context = mp_context
+        self.initargs = initargs
+        self.submitted = 0
+        FakeExecutor.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        result = fn(*args)
+        return SimpleNamespace(result=lambda: result)
+
+
+def _fake_trial(handle, profile, budget, schema_version):
+    return {
+        "profile": profile,
+        "score": profile["learning_rate"] * profile["epochs"],
+        "test_score": 0.5,
+        "epochs_trained": profile["epochs"],
+        "seconds": 0.0,
+        "timed_out": profile["learning_rate"] < 0.002,
+    }
+
+
+def _matrix(rows: int = 40) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    features = rng.normal(0.0, 1.0, (rows, len(MarketSnapshot.FEATURES)))
+    return np.column_stack([features, (features[:, 4] > 0).astype(float)])
+
+
+def _candidates():
+    return HyperparameterSearch.grid([0.001, 0.01, 0.003, 0.03], [[], [8]], [64])
+
+
+def test_grid_and_random_search():
+    grid = _candidates()
+    assert len(grid) == 8
+    assert ModelProfile(learning_rate=0.03, hidden_units=(8,), batch_size=64) in grid
+
+    sampled = HyperparameterSearch.random_search(
+        [0.001, 0.1], [[], [16, 8]], [32, 64], samples=20, seed=1
+    )
+    assert len(sampled) == 20
+    assert all(0.001 <= p.learning_rate <= 0.1 for p in sampled)
+    assert {p.hidden_units for p in sampled} <= {(), (16, 8)}
+    assert {p.batch_size for p in sampled} <= {32, 64}
+
+
+def test_rungs_grow_by_eta_up_to_max_epochs():
+    assert HyperparameterSearch([], min_epochs=2, max_epochs=32, eta=3).rungs() == [
+        2,
+        6,
+        18,
+        32,
+    ]
+    assert HyperparameterSearch([], min_epochs=8, max_epochs=8).rungs() == [8]
+
+
+def test_fingerprint_depends_on_contents():
+    matrix = _matrix()
+    changed = matrix.copy()
+    changed[0, 0] += 1.0
+    fingerprint = HyperparameterSearch.fingerprint(matrix)
+    assert fingerprint == HyperparameterSearch.fingerprint(matrix.copy())
+    assert fingerprint != HyperparameterSearch.fingerprint(changed)
+
+
+def test_successive_halving_prunes_and_caches(monkeypatch, tmp_path):
+    FakeExecutor.instances = []
+    monkeypatch.setattr(search_module, "ProcessPoolExecutor", FakeExecutor)
+    monkeypatch.setattr(search_module, "_run_trial", _fake_trial)
+    cache = tmp_path / "cache.json"
+
+    search = HyperparameterSearch(
+        _candidates() + _candidates()[:1],
+        cache_path=cache,
+        workers=2,
+        threads=3,
+        min_epochs=2,
+        max_epochs=8,
+        eta=2,
+    )
+    table = search.run(_matrix())
+
+    assert table.groupby("rung").size().tolist() == [8, 4, 2]
+    best = ModelProfile.from_dict(table.iloc[0]["profile"])
+    assert (best.learning_rate, best.epochs) == (0.03, 8)
+    assert not table["cached"].any()
+    assert [e.submitted for e in FakeExecutor.instances] == [8, 4, 2]
+    assert FakeExecutor.instances[0].initargs == (3,)
+    assert FakeExecutor.instances[0].mp_context.get_start_method() == "spawn"
+    assert len(json.loads(cache.read_text())["trials"]) == 14
+
+    FakeExecutor.instances = []
+    again = HyperparameterSearch(
+        _candidates(), cache_path=cache, min_epochs=2, max_epochs=8, eta=2
+    ).run(_matrix())
+    assert again["cached"].sum() == 12
+    assert [e.submitted for e in FakeExecutor.instances] == [2]
+
+
+def test_search_without_candidates_returns_empty_table():
+    assert HyperparameterSearch([], max_epochs=2).run(_matrix()).empty
+
+
+def test_run_trial_stops_at_the_time_budget(monkeypatch):
+    class FakeTFModel:
+        def __init__(self, dataset, profile=None, callbacks=()):
+            self.rows = len(dataset)
+            self.X_test = dataset.X_test
+            self.epochs_trained = 1
+            (stopper,) = callbacks
+            stopper.set_model(SimpleNamespace(stop_training=False))
+            stopper.on_train_batch_end(0)
+            self.stopped = stopper.model.stop_training
+
+        def get_accuracy_metric(self):
+            return 0.75 if self.stopped else 0.5
+
+        def predict_batch(self, features):
+            return features[:, 4] > 0
+
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    shared = search_module.SharedArray.create(_matrix(20))
+    try:
+        profile = ModelProfile(epochs=3).to_dict()
+        timed_out = search_module._run_trial(shared.handle, profile, -1.0, 1)
+        finished = search_module._run_trial(shared.handle, profile, 60.0, 1)
+    finally:
+        shared.close()
+
+    assert timed_out["timed_out"] is True and timed_out["score"] == 0.75
+    assert finished["timed_out"] is False and finished["score"] == 0.5
+    assert finished["profile"] == profile
+    assert finished["test_score"] == 1.0
+
+
+def test_run_trial_ranks_on_a_validation_split_of_the_train_rows(monkeypatch):
+    seen = {}
+
+    class FakeTFModel:
+        def __init__(self, dataset, profile=None, callbacks=()):
+            seen["train"], seen["validation"] = dataset.X_train, dataset.X_test
+
+        epochs_trained = 1
+
+        def get_accuracy_metric(self):
+            return 0.6
+
+        def predict_batch(self, features):
+            seen["test"] = features
+            return np.zeros(len(features), dtype=bool)
+
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    matrix = _matrix(100)
+    shared = search_module.SharedArray.create(matrix)
+    try:
+        result = search_module._run_trial(
+            shared.handle, ModelProfile().to_dict(), 60.0, 1
+        )
+    finally:
+        shared.close()
+
+    rows = {tuple(row) for row in matrix[:, :-1].astype(np.float32)}
+    train, validation, test = (
+        {tuple(row) for row in seen[name]} for name in ("train", "validation", "test")
+    )
+    assert (len(train), len(validation), len(test)) == (81, 9, 10)
+    assert train | validation | test == rows
+    assert not (train | validation) & test
+    assert result["score"] == 0.6
+    assert result["test_score"] == pytest.approx(1.0 - matrix[9::10, -1].mean())
+
+
+def test_trials_train_on_the_feature_schema(monkeypatch):
+    FakeExecutor.instances = []
+    monkeypatch.setattr(search_module, "ProcessPoolExecutor", FakeExecutor)
+    columns = []
+
+    class FakeTFModel:
+        epochs_trained = 1
+
+        def __init__(self, dataset, profile=None, callbacks=()):
+            columns.append(dataset.columns)
+
+        def get_accuracy_metric(self):
+            return 0.5
+
+        def predict_batch(self, features):
+            return np.zeros(len(features), dtype=bool)
+
+    monkeypatch.setattr(tf_model_module, "TFModel", FakeTFModel)
+    rng = np.random.default_rng(0)
+    features = rng.normal(0.0, 1.0, (40, len(MarketSnapshot.SCHEMAS[2])))
+    matrix = np.column_stack([features, features[:, 4] > 0])
+    search = HyperparameterSearch(_candidates()[:1], max_epochs=1, schema_version=2)
+
+    search.run(matrix)
+
+    assert columns == [MarketSnapshot.SCHEMAS[2]]
+    with pytest.raises(ValueError, match="schema 2 needs 10 matrix columns, got 6"):
+        search.run(_matrix())
+
+
+def test_init_worker_caps_threads(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        tf_model_module.TFModel,
+        "configure_threads",
+        staticmethod(lambda intra, inter: calls.append((intra, inter))),
+    )
+    monkeypatch.setenv("OMP_NUM_THREADS", "")
+    search_module._init_worker(2)
+    assert search_module.os.environ["OMP_NUM_THREADS"] == "2"
+    assert calls == [(2, 1)]
+
+
+def test_parse_layouts():
+    assert search_module._parse_layouts("none; 16 ;32x16") == [[], [16], [32, 16]]
+
+
+class FakeJournal:
+    def __init__(self, frame):
+        self.frame = frame
+        self.closed = False
+
+    def read_frame(self):
+        return self.frame
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.closed = True
+
+
+def test_main_writes_best_profile(monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(search_module, "ProcessPoolExecutor", FakeExecutor)
+    monkeypatch.setattr(search_module, "_run_trial", _fake_trial)
+    frame = pd.DataFrame(_matrix()[:, :-1], columns=list(MarketSnapshot.FEATURES))
+    frame.insert(0, "result", "LONG")
+    journal = FakeJournal(frame)
+    monkeypatch.setattr(search_module, "TradeJournal", lambda path: journal)
+    profile_path = tmp_path / "model_profile.json"
+
+    table = search_module.main(
+        [
+            "--search",
+            "random",
+            "--samples",
+            "4",
+            "--seed",
+            "3",
+            "--max-epochs",
+            "4",
+            "--cache",
+            str(tmp_path / "cache.json"),
+            "--profile",
+            str(profile_path),
+        ]
+    )
+
+    best = ModelProfile.load(profile_path)
+    assert best == ModelProfile.from_dict(table.iloc[0]["profile"])
+    assert best.epochs == 4
+    assert "score" in capsys.readouterr().out
+    assert journal.closed
+
+    journal.frame = frame.iloc[:0]
+    with pytest.raises(ValueError, match="No data"):
+        search_module.main(
+            ["--profile", str(profile_path), "--cache", str(tmp_path / "c.json")]
+        )
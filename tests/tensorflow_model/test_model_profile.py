@@ -0,0 +1,41 @@
+from dataclasses import replace
+import tensorflow_model.model_profile as profile_module
+from tensorflow_model.model_profile import ModelProfile
+
+
+def test_default_uses_settings(monkeypatch):
+    monkeypatch.setattr(
+        profile_module,
+        "SETTINGS",
+        replace(profile_module.SETTINGS, MODEL_EPOCHS=7, MODEL_BATCH_SIZE=64),
+    )
+    profile = ModelProfile.default()
+    assert (profile.epochs, profile.batch_size) == (7, 64)
+    assert profile.hidden_units == ()
+
+
+def test_dict_round_trip_and_with_epochs():
+    profile = ModelProfile(learning_rate=0.003, hidden_units=(16, 8), epochs=4)
+    data = profile.to_dict()
+    assert data["hidden_units"] == [16, 8]
+    assert ModelProfile.from_dict(data) == profile
+    assert profile.with_epochs(12) == replace(profile, epochs=12)
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "profiles" / "model_profile.json"
+    profile = ModelProfile(learning_rate=0.03, hidden_units=(4,), batch_size=32)
+    profile.save(path)
+    assert ModelProfile.load(path) == profile
+
+
+def test_load_missing_or_invalid_returns_none(monkeypatch, tmp_path):
+    errors = []
+    monkeypatch.setattr(profile_module.Logger, "log_exception", errors.append)
+    assert ModelProfile.load(tmp_path / "missing.json") is None
+    assert errors == []
+
+    path = tmp_path / "model_profile.json"
+    path.write_text('{"learning_rate": 0.01}')
+    assert ModelProfile.load(path) is None
+    assert len(errors) == 1 and "Ignoring unreadable model profile" in errors[0]
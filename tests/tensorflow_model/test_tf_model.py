@@ -2,10 +2,15 @@ import importlib
 import numpy as np
 import pandas as pd
 import pytest
+from types import SimpleNamespace
 from typing import Optional
 
 tf_model_module = importlib.import_module("tensorflow_model.tf_model")
 TFModel = tf_model_module.TFModel
+TrainingDataset = importlib.import_module(
+    "tensorflow_model.training_dataset"
+).TrainingDataset
+ModelProfile = importlib.import_module("tensorflow_model.model_profile").ModelProfile
 
 
 class _FakeKerasModel:
@@ -20,20 +25,28 @@ class _FakeKerasModel:
         self._compiled = True
         self.compile_args = {"optimizer": optimizer, "loss": loss, "metrics": metrics}
 
-    def fit(self, x, y, epochs, batch_size, validation_split, verbose):
+    def fit(self, dataset, validation_data=None, epochs=1, callbacks=None, verbose=0):
+        train_rows = sum(len(batch_y) for _, batch_y in dataset)
         self.fit_args = {
             "epochs": epochs,
-            "batch_size": batch_size,
-            "validation_split": validation_split,
+            "validation_data": validation_data,
+            "callbacks": callbacks,
             "verbose": verbose,
-            "x_shape": np.shape(x),
-            "y_shape": np.shape(y),
+            "x_shape": (train_rows, 5),
+            "batch_shapes": [tuple(batch_x.shape) for batch_x, _ in dataset],
+            "x": np.concatenate([batch_x for batch_x, _ in dataset]),
         }
+        return SimpleNamespace(epoch=list(range(min(epochs, 3))))
 
     def evaluate(self, x, y, verbose=0):
         return self._eval_return
 
+    def save(self, path):
+        path.write_text("fake")
+        self.saved_to = path
+
     def predict(self, x, verbose=0):
+        self.predict_input = x
         if self._predict_values is not None:
             return self._predict_values
         return np.array([[0.6]], dtype=np.float32)
@@ -68,6 +81,31 @@ def _make_df(n_rows: int = 20) -> pd.DataFrame:
     )
 
 
+class _FakeJournal:
+    def __init__(self, df: pd.DataFrame, path: str = "fake.db"):
+        self.df = df
+        self.path = path
+        self.calls = []
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.closed = True
+
+    def read_since(self, last_id):
+        self.calls.append(last_id)
+        new_rows = self.df.iloc[last_id:]
+        return new_rows.reset_index(drop=True), len(self.df)
+
+
+def _make_dataset(n_rows: int = 20) -> TrainingDataset:
+    dataset = TrainingDataset()
+    dataset.extend_frame(_make_df(n_rows))
+    return dataset
+
+
 def _apply_fakes(monkeypatch):
     monkeypatch.setattr(tf_model_module, "Dense", _fake_Dense, raising=False)
     monkeypatch.setattr(tf_model_module, "Sequential", _fake_Sequential, raising=False)
@@ -76,9 +114,7 @@ def _apply_fakes(monkeypatch):
 
 def test_init_trains_and_sets_fields(monkeypatch):
     _apply_fakes(monkeypatch)
-    df = _make_df(20)
-    monkeypatch.setattr(tf_model_module.pd, "read_csv", lambda path: df)
-    model = TFModel()
+    model = TFModel(_make_dataset(20))
     assert model.columns == ["price", "macd_12", "macd_26", "ema_100", "rsi_6"]
     assert model.X_train.shape[1] == 5
     assert model.y_train.ndim == 1
@@ -89,24 +125,108 @@ def test_init_trains_and_sets_fields(monkeypatch):
     assert model.model.compile_args["loss"] == "binary_crossentropy"
     assert model.model.compile_args["metrics"] == ["accuracy"]
     assert model.model.fit_args["epochs"] == 32
-    assert model.model.fit_args["batch_size"] == 1
-    assert model.model.fit_args["validation_split"] == 0.2
     assert model.model.fit_args["verbose"] == 0
+    assert model.epochs_trained == 3
+
+
+def test_training_holds_out_validation_and_stops_early(monkeypatch):
+    _apply_fakes(monkeypatch)
+    model = TFModel(_make_dataset(30))
+    fit_args = model.model.fit_args
+    assert fit_args["x_shape"] == (22, 5)
+    assert fit_args["validation_data"] is not None
+    assert sum(len(y) for _, y in fit_args["validation_data"]) == 5
+    (stopper,) = fit_args["callbacks"]
+    assert stopper.monitor == "val_loss"
+    assert stopper.restore_best_weights is True
+
+
+def test_training_without_validation_rows_has_no_early_stopping(monkeypatch):
+    _apply_fakes(monkeypatch)
+    model = TFModel(_make_dataset(2))
+    assert model.model.fit_args["validation_data"] is None
+    assert model.model.fit_args["callbacks"] == []
+
+
+def test_training_uses_profile(monkeypatch):
+    _apply_fakes(monkeypatch)
+    layers = []
+    monkeypatch.setattr(
+        tf_model_module,
+        "Sequential",
+        lambda built: layers.extend(built) or _FakeKerasModel(),
+    )
+    profile = ModelProfile(
+        learning_rate=0.003, hidden_units=(8, 4), epochs=2, batch_size=4
+    )
+    model = TFModel(_make_dataset(30), profile=profile)
+    assert model.profile is profile
+    assert model.model.fit_args["epochs"] == 2
+    assert model.model.fit_args["batch_shapes"] == [(4, 5)] * 5 + [(2, 5)]
+    assert model.model.compile_args["optimizer"].learning_rate == 0.003
+    assert [layer[1] for layer in layers] == [(8,), (4,), (1,)]
+    assert ("input_shape", (5,)) in layers[0][2]
+    assert all(("activation", "relu") in layer[2] for layer in layers[:2])
+
+
+def test_extra_callbacks_are_passed_to_fit(monkeypatch):
+    _apply_fakes(monkeypatch)
+    marker = object()
+    model = TFModel(_make_dataset(30), callbacks=[marker])
+    assert model.model.fit_args["callbacks"][0] is marker
+    assert len(model.model.fit_args["callbacks"]) == 2
+
+
+def test_make_pipeline_batches_and_shuffles():
+    X = np.arange(20, dtype=np.float32).reshape(10, 2)
+    y = np.arange(10, dtype=np.float32)
+    batches = list(TFModel.make_pipeline(X, y, batch_size=4))
+    assert [len(batch_y) for _, batch_y in batches] == [4, 4, 2]
+    assert np.concatenate([batch_y for _, batch_y in batches]).tolist() == y.tolist()
+
+    shuffled = TFModel.make_pipeline(X, y, batch_size=4, shuffle_buffer=100)
+    labels = np.concatenate([batch_y for _, batch_y in shuffled])
+    assert sorted(labels.tolist()) == y.tolist()
+
+
+def test_configure_threads(monkeypatch):
+    calls = []
+
+    class Threading:
+        @staticmethod
+        def set_intra_op_parallelism_threads(n):
+            calls.append(("intra", n))
+
+        @staticmethod
+        def set_inter_op_parallelism_threads(n):
+            calls.append(("inter", n))
+
+    fake_tf = SimpleNamespace(config=SimpleNamespace(threading=Threading))
+    monkeypatch.setattr(tf_model_module, "tf", fake_tf)
+    assert TFModel.configure_threads(0, 0) is True
+    assert calls == []
+    assert TFModel.configure_threads(2, 1) is True
+    assert calls == [("intra", 2), ("inter", 1)]
+
+    def started(n):
+        raise RuntimeError("already initialized")
+
+    Threading.set_intra_op_parallelism_threads = staticmethod(started)
+    assert TFModel.configure_threads(2, 0) is False
 
 
 def test_init_raises_on_empty_csv(monkeypatch):
     _apply_fakes(monkeypatch)
-    empty_df = pd.DataFrame()
-    monkeypatch.setattr(tf_model_module.pd, "read_csv", lambda path: empty_df)
-    with pytest.raises(ValueError, match="No data in csv file"):
+    monkeypatch.setattr(
+        tf_model_module, "TradeJournal", lambda path: _FakeJournal(pd.DataFrame())
+    )
+    with pytest.raises(ValueError, match="No data in trade journal"):
         TFModel()
 
 
 def test_build_model_compiles_with_expected_params(monkeypatch):
     _apply_fakes(monkeypatch)
-    df = _make_df(20)
-    monkeypatch.setattr(tf_model_module.pd, "read_csv", lambda path: df)
-    m = TFModel()
+    m = TFModel(_make_dataset(20))
     built = m._build_model(input_dim=5)
     assert isinstance(built, _FakeKerasModel)
     assert built._compiled is True
@@ -117,18 +237,14 @@ def test_build_model_compiles_with_expected_params(monkeypatch):
 
 def test_get_accuracy_metric(monkeypatch):
     _apply_fakes(monkeypatch)
-    df = _make_df(20)
-    monkeypatch.setattr(tf_model_module.pd, "read_csv", lambda path: df)
-    m = TFModel()
+    m = TFModel(_make_dataset(20))
     acc = m.get_accuracy_metric()
     assert 0.87 < acc < 0.89
 
 
 def test_predict_long_and_short(monkeypatch):
     _apply_fakes(monkeypatch)
-    df = _make_df(20)
-    monkeypatch.setattr(tf_model_module.pd, "read_csv", lambda path: df)
-    m = TFModel()
+    m = TFModel(_make_dataset(20))
 
     class Indicators:
         def __init__(self, price, macd_12, macd_26, ema_100, rsi_6):
@@ -149,3 +265,99 @@ def test_predict_long_and_short(monkeypatch):
     fake_short_model._predict_values = np.array([[0.25]], dtype=np.float32)
     m.model = fake_short_model
     assert m.predict(ind) == "SHORT"
+
+
+def test_predict_batch_thresholds_probabilities(monkeypatch):
+    _apply_fakes(monkeypatch)
+    m = TFModel(_make_dataset(20))
+
+    class BatchModel:
+        def predict(self, x, batch_size=None, verbose=0):
+            return np.array([[0.9], [0.1], [0.5]], dtype=np.float32)
+
+    m.model = BatchModel()
+    assert m.predict_batch(np.zeros((3, 5))).tolist() == [True, False, True]
+    assert m.predict_batch(np.zeros((0, 5))).tolist() == []
+
+
+def test_default_dataset_is_loaded_from_journal(monkeypatch):
+    _apply_fakes(monkeypatch)
+    journal = _FakeJournal(_make_df(20))
+    monkeypatch.setattr(tf_model_module, "TradeJournal", lambda path: journal)
+    m = TFModel()
+    assert journal.calls == [0]
+    assert journal.closed
+    assert len(m.X_train) + len(m.X_test) == 20
+
+
+def test_training_data_are_views_of_the_dataset(monkeypatch):
+    _apply_fakes(monkeypatch)
+    dataset = _make_dataset(30)
+    m = TFModel(dataset)
+    assert np.shares_memory(m.X_train, dataset.X_train)
+    assert np.shares_memory(m.y_test, dataset.y_test)
+    assert m.model.fit_args["x_shape"] == (22, 5)
+
+
+def test_window_limits_training_rows(monkeypatch):
+    _apply_fakes(monkeypatch)
+    from tensorflow_model.training_window import SlidingWindow
+
+    dataset = _make_dataset(30)
+    m = TFModel(dataset, window=SlidingWindow(5))
+    assert m.model.fit_args["x_shape"] == (4, 5)
+    assert len(m.X_test) == len(dataset.X_test)
+
+
+def test_features_are_normalized_for_training_and_prediction(monkeypatch):
+    _apply_fakes(monkeypatch)
+    dataset = _make_dataset(30)
+    m = TFModel(dataset)
+    mean, std = dataset.stats.mean, dataset.stats.std
+    expected = (dataset.X_train[:22] - mean) / std
+    trained = np.sort(m.model.fit_args["x"], axis=0)
+    np.testing.assert_allclose(trained, np.sort(expected, axis=0), rtol=1e-5)
+    assert np.abs(m.normalize(dataset.X_train).mean(axis=0)).max() < 1e-5
+
+    indicators = SimpleNamespace(
+        price=100.0, macd_12=0.1, macd_26=-0.1, ema_100=102.0, rsi_6=55.0
+    )
+    m.predict(indicators)
+    raw = np.array([[100.0, 0.1, -0.1, 102.0, 55.0]])
+    np.testing.assert_allclose(m.model.predict_input, (raw - mean) / std, rtol=1e-5)
+
+
+def test_normalization_statistics_are_frozen_at_training(monkeypatch):
+    _apply_fakes(monkeypatch)
+    dataset = _make_dataset(20)
+    m = TFModel(dataset)
+    count = m.scaler.count
+    dataset.append([1e6] * 5, 1.0)
+    assert dataset.stats.count == count + 1
+    assert m.scaler.count == count
+
+
+def test_save_and_load_keep_normalization(monkeypatch, tmp_path):
+    _apply_fakes(monkeypatch)
+    m = TFModel(_make_dataset(20), profile=ModelProfile(hidden_units=(3,)))
+    m.save(tmp_path / "checkpoint")
+    assert m.model.saved_to == tmp_path / "checkpoint" / TFModel.MODEL_FILE
+
+    loaded_paths = []
+    fake = _FakeKerasModel()
+    monkeypatch.setattr(
+        tf_model_module,
+        "load_model",
+        lambda path: loaded_paths.append(path) or fake,
+    )
+    loaded = TFModel.load(tmp_path / "checkpoint")
+    assert loaded_paths == [tmp_path / "checkpoint" / TFModel.MODEL_FILE]
+    assert loaded.model is fake
+    assert loaded.scaler.count == m.scaler.count
+    np.testing.assert_allclose(loaded.scaler.mean, m.scaler.mean)
+    assert loaded.columns == m.columns
+    assert loaded.profile == m.profile
+    assert len(loaded.y_train) == 0
+
+    (tmp_path / "checkpoint" / TFModel.PROFILE_FILE).unlink()
+    assert TFModel.load(tmp_path / "checkpoint").profile == ModelProfile.default()
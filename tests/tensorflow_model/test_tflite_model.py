@@ -0,0 +1,134 @@
+import sys
+import types
+import numpy as np
+import pytest
+import tensorflow as tf
+import tensorflow_model.tflite_model as tflite_module
+from data.market_snapshot import MarketSnapshot
+from tensorflow_model.tflite_model import TFLiteModel
+from utils.running_stats import RunningStats
+
+
+class KerasStub:
+    """Minimal trained `TFModel` stand-in with a real Keras network."""
+
+    def __init__(self) -> None:
+        rng = np.random.default_rng(0)
+        features = rng.normal((100.0, 0.0, 0.0, 100.0, 50.0), 5.0, (300, 5))
+        self.scaler = RunningStats(5)
+        self.scaler.update_batch(features)
+        self.model = tf.keras.Sequential(
+            [
+                tf.keras.Input((5,)),
+                tf.keras.layers.Dense(8, activation="relu"),
+                tf.keras.layers.Dense(1, activation="sigmoid"),
+            ]
+        )
+        self.model.compile(optimizer="adam", loss="binary_crossentropy")
+        X = self.normalize(features)
+        labels = (features[:, 4] > 50.0).astype(np.float32)
+        self.model.fit(X, labels, epochs=3, verbose=0)
+        self.features = features
+
+    def normalize(self, features):
+        return self.scaler.transform(features).astype(np.float32)
+
+    def predict_proba(self, features):
+        return self.model.predict(self.normalize(features), verbose=0).reshape(-1)
+
+    def predict_batch(self, features):
+        return self.predict_proba(features) >= 0.5
+
+
+@pytest.fixture(scope="module")
+def keras_model():
+    return KerasStub()
+
+
+def _snapshot(row) -> MarketSnapshot:
+    return MarketSnapshot("[2025-01-01 00:00:00]", *row.astype(np.float64))
+
+
+def test_export_matches_keras_probabilities_and_decisions(keras_model):
+    exported = TFLiteModel.export(keras_model)
+    features = keras_model.features[:50]
+
+    np.testing.assert_allclose(
+        exported.predict_proba(features), keras_model.predict_proba(features), atol=1e-5
+    )
+    assert exported.agreement(keras_model, features) == 1.0
+    expected = ["LONG" if p else "SHORT" for p in keras_model.predict_batch(features)]
+    assert [exported.predict(_snapshot(row)) for row in features] == expected
+
+
+def test_quantized_export_stays_within_tolerance(keras_model):
+    exported = TFLiteModel.export(keras_model, quantize=True)
+    features = keras_model.features
+    assert exported.agreement(keras_model, features) >= 0.95
+    np.testing.assert_allclose(
+        exported.predict_proba(features), keras_model.predict_proba(features), atol=0.05
+    )
+
+
+def test_input_tensor_is_resized_only_when_the_batch_size_changes(
+    keras_model, monkeypatch
+):
+    exported = TFLiteModel.export(keras_model)
+    allocations = []
+    allocate = exported.interpreter.allocate_tensors
+    monkeypatch.setattr(
+        exported.interpreter,
+        "allocate_tensors",
+        lambda: allocations.append(1) or allocate(),
+    )
+    row = keras_model.features[0]
+    exported.predict(_snapshot(row))
+    exported.predict(_snapshot(row))
+    assert allocations == []
+
+    exported.predict_batch(keras_model.features[:7])
+    exported.predict_batch(keras_model.features[7:14])
+    exported.predict(_snapshot(row))
+    assert len(allocations) == 2
+    assert exported.predict_batch(np.empty((0, 5))).shape == (0,)
+    assert exported.agreement(keras_model, np.empty((0, 5))) == 1.0
+
+
+def test_save_and_load_round_trip(keras_model, tmp_path):
+    exported = TFLiteModel.export(keras_model)
+    exported.save(tmp_path / "tflite")
+    loaded = TFLiteModel.load(tmp_path / "tflite")
+
+    assert loaded.content == exported.content
+    np.testing.assert_array_equal(loaded.scaler.mean, keras_model.scaler.mean)
+    np.testing.assert_array_equal(
+        loaded.predict_batch(keras_model.features),
+        exported.predict_batch(keras_model.features),
+    )
+
+
+def test_interpreter_prefers_litert(monkeypatch):
+    module = types.ModuleType("ai_edge_litert.interpreter")
+    module.Interpreter = "litert"
+    package = types.ModuleType("ai_edge_litert")
+    monkeypatch.setitem(sys.modules, "ai_edge_litert", package)
+    monkeypatch.setitem(sys.modules, "ai_edge_litert.interpreter", module)
+    assert tflite_module._interpreter_class() == "litert"
+
+
+def test_scaler_width_selects_the_feature_schema():
+    scaler = RunningStats(9)
+    scaler.update_batch(np.random.default_rng(0).normal(0.0, 1.0, (20, 9)))
+    network = tf.keras.Sequential(
+        [tf.keras.Input((9,)), tf.keras.layers.Dense(1, activation="sigmoid")]
+    )
+    stub = types.SimpleNamespace(model=network, scaler=scaler)
+    exported = TFLiteModel.export(stub)
+    assert exported.columns == list(MarketSnapshot.SCHEMAS[2])
+
+    values = np.arange(1.0, 10.0)
+    snapshot = MarketSnapshot(
+        "[2025-01-01 00:00:00]", *values[:5], None, *values[5:]
+    )
+    probability = exported.predict_proba(values[None])[0]
+    assert exported.predict(snapshot) == ("LONG" if probability >= 0.5 else "SHORT")
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data.market_snapshot import MarketSnapshot
+from tensorflow_model.training_dataset import TrainingDataset
+
+
+def _frame(n_rows: int, start: int = 0) -> pd.DataFrame:
+    values = np.arange(start, start + n_rows, dtype=np.float64)
+    frame = pd.DataFrame({name: values for name in MarketSnapshot.FEATURES})
+    frame.insert(0, "result", np.where(values % 2 == 0, "LONG", "SHORT"))
+    return frame
+
+
+class FakeJournal:
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame
+        self.calls = []
+
+    def read_since(self, last_id):
+        self.calls.append(last_id)
+        return self.frame.iloc[last_id:].reset_index(drop=True), len(self.frame)
+
+
+def test_from_journal_loads_rows_into_float32_splits():
+    dataset = TrainingDataset.from_journal(FakeJournal(_frame(25)))
+
+    assert len(dataset) == 25
+    assert dataset.X_train.dtype == np.float32
+    assert dataset.X_train.flags["C_CONTIGUOUS"]
+    assert dataset.X_train.shape == (23, len(MarketSnapshot.FEATURES))
+    assert dataset.X_test[:, 0].tolist() == [9.0, 19.0]
+    assert dataset.y_test.tolist() == [0.0, 0.0]
+    assert dataset.y_train[:3].tolist() == [1.0, 0.0, 1.0]
+
+
+def test_sync_reads_only_new_rows():
+    journal = FakeJournal(_frame(5))
+    dataset = TrainingDataset.from_journal(journal)
+    journal.frame = _frame(8)
+
+    assert dataset.sync(journal) == 3
+    assert dataset.sync(journal) == 0
+    assert journal.calls == [0, 5, 8]
+    assert len(dataset) == 8
+
+
+def test_append_routes_rows_like_bulk_extend():
+    bulk = TrainingDataset(test_interval=4)
+    bulk.extend_frame(_frame(10))
+    single = TrainingDataset(test_interval=4, capacity=1)
+    for _, row in _frame(10).iterrows():
+        single.append(row[list(MarketSnapshot.FEATURES)].to_numpy(), row["result"] == "LONG")
+
+    np.testing.assert_array_equal(single.X_train, bulk.X_train)
+    np.testing.assert_array_equal(single.X_test, bulk.X_test)
+    np.testing.assert_array_equal(single.y_train, bulk.y_train)
+    np.testing.assert_array_equal(single.y_test, bulk.y_test)
+
+
+def test_append_result_grows_in_place():
+    dataset = TrainingDataset(capacity=2)
+    snapshot = MarketSnapshot("[2025-01-01 00:00:00]", 1.0, 2.0, 3.0, 4.0, 5.0)
+    for _ in range(5):
+        dataset.append_result("SHORT", snapshot)
+    dataset.append_result("LONG", snapshot)
+
+    assert len(dataset) == 6
+    assert dataset.X_train[-1].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert dataset.y_train.tolist() == [0.0] * 5 + [1.0]
+
+
+def test_splits_are_views_and_empty_frame_is_ignored():
+    dataset = TrainingDataset()
+    assert dataset.extend_frame(pd.DataFrame()) == 0
+    dataset.extend_frame(_frame(3))
+
+    assert np.shares_memory(dataset.X_train, dataset._train.features)
+    assert len(dataset.X_test) == 0
+
+
+def test_statistics_track_training_rows_only():
+    dataset = TrainingDataset(test_interval=3)
+    dataset.extend_frame(_frame(5))
+    dataset.append(np.full(len(MarketSnapshot.FEATURES), 5.0), 1.0)
+    dataset.append(np.full(len(MarketSnapshot.FEATURES), 6.0), 0.0)
+
+    assert dataset.X_test[:, 0].tolist() == [2.0, 5.0]
+    assert dataset.stats.count == len(dataset.y_train) == 5
+    np.testing.assert_allclose(dataset.stats.mean, dataset.X_train.mean(axis=0))
+    np.testing.assert_allclose(dataset.stats.variance, dataset.X_train.var(axis=0))
+
+
+def test_schema_2_uses_the_extra_features_and_skips_rows_without_them():
+    frame = _frame(6)
+    for name in MarketSnapshot.EXTRA_FEATURES:
+        frame[name] = np.arange(6.0)
+    frame.loc[[1, 4], "atr_14"] = np.nan
+
+    dataset = TrainingDataset(schema_version=2)
+    assert dataset.columns == MarketSnapshot.SCHEMAS[2]
+    assert dataset.extend_frame(frame) == 4
+    assert dataset.X_train.shape[1] == 9
+    assert dataset.X_train[:, 5].tolist() == [0.0, 2.0, 3.0, 5.0]
+
+    legacy = MarketSnapshot("[2025-01-01 00:00:00]", 1.0, 2.0, 3.0, 4.0, 5.0)
+    assert not dataset.append_result("LONG", legacy)
+    assert len(dataset) == 4
+    extended = MarketSnapshot(
+        "[2025-01-01 00:00:00]", 1.0, 2.0, 3.0, 4.0, 5.0, None, 6.0, 7.0, 8.0, 9.0
+    )
+    assert dataset.append_result("LONG", extended)
+    assert dataset.X_train[-1].tolist() == list(range(1, 10))
+
+
+def test_unknown_schema_version_raises():
+    with pytest.raises(ValueError, match="Unknown feature schema version: 4"):
+        TrainingDataset(schema_version=4)
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from tensorflow_model.training_dataset import TrainingDataset
+from tensorflow_model.training_window import (
+    BootstrapWindow,
+    DecayWindow,
+    ReservoirWindow,
+    SlidingWindow,
+    TrainingWindow,
+)
+
+
+def _dataset(rows: int) -> TrainingDataset:
+    dataset = TrainingDataset(test_interval=10**9)
+    features = np.repeat(np.arange(rows, dtype=np.float32)[:, None], 5, axis=1)
+    dataset.extend(features, (np.arange(rows) % 2).astype(np.float32))
+    return dataset
+
+
+def test_create_builds_each_policy():
+    assert type(TrainingWindow.create("all", 10, 5.0)) is TrainingWindow
+    assert isinstance(TrainingWindow.create("sliding", 10, 5.0), SlidingWindow)
+    assert isinstance(TrainingWindow.create("decay", 10, 5.0), DecayWindow)
+    assert isinstance(TrainingWindow.create("reservoir", 10, 5.0), ReservoirWindow)
+    with pytest.raises(ValueError, match="Unknown training window policy"):
+        TrainingWindow.create("random", 10, 5.0)
+
+
+def test_all_returns_every_training_row():
+    dataset = _dataset(20)
+    X, y = TrainingWindow().select(dataset)
+    assert len(X) == len(y) == 20
+
+
+def test_sliding_returns_latest_rows_as_views():
+    dataset = _dataset(20)
+    X, y = SlidingWindow(5).select(dataset)
+
+    assert X[:, 0].tolist() == [15.0, 16.0, 17.0, 18.0, 19.0]
+    assert np.shares_memory(X, dataset.X_train)
+    assert len(SlidingWindow(50).select(dataset)[0]) == 20
+
+
+def test_decay_favours_recent_rows_and_caps_size():
+    dataset = _dataset(1000)
+    X, y = DecayWindow(100, half_life=50.0, seed=0).select(dataset)
+
+    rows = X[:, 0]
+    assert len(rows) == 100 and len(np.unique(rows)) == 100
+    assert np.all(np.diff(rows) > 0)
+    assert np.median(rows) > 850
+    assert len(DecayWindow(2000, 50.0).select(dataset)[0]) == 1000
+
+
+def test_reservoir_is_bounded_uniform_and_incremental():
+    window = ReservoirWindow(50, seed=0)
+    dataset = _dataset(30)
+    X, _ = window.select(dataset)
+    assert X[:, 0].tolist() == list(range(30))
+
+    dataset.extend(
+        np.repeat(np.arange(30, 5000, dtype=np.float32)[:, None], 5, axis=1),
+        np.zeros(4970, dtype=np.float32),
+    )
+    X, y = window.select(dataset)
+    rows = X[:, 0]
+    assert len(rows) == len(y) == 50
+    assert len(np.unique(rows)) == 50
+    assert rows.min() < 2500 < rows.max()
+
+    again, _ = window.select(dataset)
+    np.testing.assert_array_equal(again, X)
+
+
+def test_bootstrap_resamples_the_base_selection_in_arrival_order():
+    dataset = _dataset(100)
+    window = BootstrapWindow(SlidingWindow(20), seed=0)
+    X, y = window.select(dataset)
+    assert len(y) == 20
+    assert set(X[:, 0]) <= set(range(80, 100)) and len(set(X[:, 0])) < 20
+    assert np.all(np.diff(X[:, 0]) >= 0)
+    np.testing.assert_array_equal(y, X[:, 0] % 2)
+
+    repeated, _ = BootstrapWindow(SlidingWindow(20), seed=0).select(dataset)
+    np.testing.assert_array_equal(X, repeated)
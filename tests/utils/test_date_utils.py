@@ -1,4 +1,6 @@
 import types
+import numpy as np
+import pytest
 from datetime import datetime as RealDateTime
 from utils.date_utils import DateUtils
 import utils.date_utils as date_utils_module
@@ -19,3 +21,51 @@ def test_get_date_returns_expected_format(monkeypatch):
     result = DateUtils.get_date()
     assert isinstance(result, str)
     assert result == "[2023-01-02 03:04:05]"
+
+
+def test_parse_date_roundtrips_get_date_format():
+    expected = RealDateTime(2023, 1, 2, 3, 4, 5).timestamp()
+    assert DateUtils.parse_date("[2023-01-02 03:04:05]") == expected
+    assert DateUtils.parse_date("2023-01-02 03:04:05") == expected
+
+
+def test_parse_date_returns_none_for_other_formats():
+    assert DateUtils.parse_date("2025-08-29 00:00") is None
+
+
+def test_get_date_formats_given_timestamp():
+    timestamp = DateUtils.parse_date("[2025-09-05 22:23:32]")
+    assert DateUtils.get_date(timestamp) == "[2025-09-05 22:23:32]"
+
+
+def test_interval_to_seconds():
+    assert DateUtils.interval_to_seconds("1m") == 60
+    assert DateUtils.interval_to_seconds("15m") == 900
+    assert DateUtils.interval_to_seconds("4h") == 14400
+    assert DateUtils.interval_to_seconds("1d") == 86400
+    assert DateUtils.interval_to_seconds("1w") == 604800
+    assert DateUtils.interval_to_seconds("1M") == 30 * 86400
+
+
+def test_interval_to_seconds_rejects_invalid_intervals():
+    for interval in ("", "m", "15x", "1.5h", "h1"):
+        with pytest.raises(ValueError, match="Invalid kline interval"):
+            DateUtils.interval_to_seconds(interval)
+
+
+@pytest.mark.parametrize("zone", ["UTC", "America/New_York", "Australia/Lord_Howe"])
+def test_format_dates_matches_get_date_across_dst(monkeypatch, zone):
+    import time
+
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", zone)
+    time.tzset()
+    try:
+        start = DateUtils.parse_date("[2025-03-08 00:00:00]")
+        timestamps = np.append(np.arange(start, start + 86400 * 240, 1799.5), -1.5)
+        expected = [DateUtils.get_date(t) for t in np.floor(timestamps)]
+        assert DateUtils.format_dates(timestamps).tolist() == expected
+    finally:
+        monkeypatch.undo()
+        time.tzset()
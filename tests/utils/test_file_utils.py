@@ -15,22 +15,22 @@ def read_csv(path: Path):
 def test_ensure_parent_creates_directory(tmp_path: Path):
     target = tmp_path / "nested" / "deeper" / "out.csv"
     assert not target.parent.exists()
-    FileUtils._ensure_parent(target)
+    FileUtils.ensure_parent(target)
     assert target.parent.exists()
     assert target.parent.is_dir()
 
 
 def test_is_empty_file_missing_and_empty_and_nonempty(tmp_path: Path):
     missing = tmp_path / "missing.csv"
-    assert FileUtils._is_empty_file(missing) is True
+    assert FileUtils.is_empty_file(missing) is True
 
     empty = tmp_path / "empty.csv"
     empty.touch()
-    assert FileUtils._is_empty_file(empty) is True
+    assert FileUtils.is_empty_file(empty) is True
 
     nonempty = tmp_path / "nonempty.csv"
     nonempty.write_text("x", encoding="utf-8")
-    assert FileUtils._is_empty_file(nonempty) is False
+    assert FileUtils.is_empty_file(nonempty) is False
 
 
 def test_append_csv_writes_header_then_rows(tmp_path: Path):
@@ -43,7 +43,7 @@ def test_append_csv_writes_header_then_rows(tmp_path: Path):
     FileUtils._append_csv(out, row2)
 
     rows = read_csv(out)
-    assert rows[0] == FileUtils._HEADER
+    assert rows[0] == FileUtils.HEADER
     assert rows[1] == [
         "2025-08-29 00:00",
         "WIN",
@@ -91,7 +91,7 @@ def test_save_result_appends_snapshot_rows_and_header_once(tmp_path: Path):
     FileUtils.save_result(out, result="LOSS", position="SHORT", snapshot=s2)
 
     rows = read_csv(out)
-    assert rows[0] == FileUtils._HEADER
+    assert rows[0] == FileUtils.HEADER
     assert rows[1] == [
         "2025-08-29 00:00",
         "WIN",
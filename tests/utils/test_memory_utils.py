@@ -0,0 +1,39 @@
+import builtins
+import math
+import sys
+import types
+from utils.memory_utils import MemoryUtils
+import utils.memory_utils as memory_module
+
+
+def _no_proc(*args, **kwargs):
+    raise OSError("no /proc")
+
+
+def test_rss_mb_reads_proc():
+    assert 1.0 < MemoryUtils.rss_mb() < 1e6
+
+
+def test_rss_mb_falls_back_to_getrusage(monkeypatch):
+    usage = types.SimpleNamespace(ru_maxrss=2048)
+    resource = types.SimpleNamespace(RUSAGE_SELF=0, getrusage=lambda who: usage)
+    monkeypatch.setattr(builtins, "open", _no_proc)
+    monkeypatch.setitem(sys.modules, "resource", resource)
+    monkeypatch.setattr(memory_module.sys, "platform", "linux")
+    assert MemoryUtils.rss_mb() == 2.0
+    monkeypatch.setattr(memory_module.sys, "platform", "darwin")
+    assert MemoryUtils.rss_mb() == 2048 / 2**20
+
+
+def test_rss_mb_without_resource_module(monkeypatch):
+    # Windows has neither /proc nor the resource module.
+    monkeypatch.setattr(builtins, "open", _no_proc)
+    monkeypatch.setitem(sys.modules, "resource", None)
+    monkeypatch.setitem(sys.modules, "psutil", None)
+    assert math.isnan(MemoryUtils.rss_mb())
+
+    info = types.SimpleNamespace(rss=3 * 2**20)
+    process = types.SimpleNamespace(memory_info=lambda: info)
+    psutil = types.SimpleNamespace(Process=lambda: process)
+    monkeypatch.setitem(sys.modules, "psutil", psutil)
+    assert MemoryUtils.rss_mb() == 3.0
@@ -0,0 +1,30 @@
+import pytest
+from utils.metrics import Metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    Metrics.reset()
+    yield
+    Metrics.reset()
+
+
+def test_gauges_and_counters():
+    Metrics.set_gauge("rows", 10)
+    Metrics.increment("hits")
+    Metrics.increment("hits", 2)
+
+    assert Metrics.get("rows") == 10.0
+    assert Metrics.get("hits") == 3.0
+    assert Metrics.get("missing") is None
+    assert Metrics.get("missing", 0.0) == 0.0
+
+
+def test_snapshot_is_a_copy_and_reset_clears():
+    Metrics.set_gauge("rows", 1)
+    values = Metrics.snapshot()
+    values["rows"] = 99
+
+    assert Metrics.get("rows") == 1.0
+    Metrics.reset()
+    assert Metrics.snapshot() == {}
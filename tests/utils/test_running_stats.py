@@ -0,0 +1,52 @@
+import numpy as np
+from utils.running_stats import RunningStats
+
+
+def test_matches_numpy_mean_and_variance():
+    rows = np.random.default_rng(0).normal(5.0, 2.0, size=(200, 3))
+    stats = RunningStats(3)
+    for row in rows:
+        stats.update(row)
+
+    assert stats.count == 200
+    np.testing.assert_allclose(stats.mean, rows.mean(axis=0))
+    np.testing.assert_allclose(stats.variance, rows.var(axis=0))
+    np.testing.assert_allclose(stats.transform(rows).mean(axis=0), 0.0, atol=1e-12)
+
+
+def test_constant_columns_and_too_few_rows_are_safe():
+    stats = RunningStats(2)
+    stats.update([1.0, 3.0])
+
+    assert stats.variance.tolist() == [0.0, 0.0]
+    assert stats.std.tolist() == [1.0, 1.0]
+    assert stats.transform(np.array([2.0, 3.0])).tolist() == [1.0, 0.0]
+
+
+def test_update_batch_merges_with_existing_statistics():
+    rows = np.random.default_rng(1).normal(100.0, 10.0, size=(301, 4))
+    stats = RunningStats(4)
+    stats.update(rows[0])
+    stats.update_batch(rows[1:200])
+    stats.update_batch(rows[200:200])
+    stats.update_batch(rows[200:])
+
+    assert stats.count == 301
+    np.testing.assert_allclose(stats.mean, rows.mean(axis=0))
+    np.testing.assert_allclose(stats.variance, rows.var(axis=0))
+
+
+def test_copy_is_independent_and_save_load_round_trips(tmp_path):
+    stats = RunningStats(2)
+    stats.update_batch(np.array([[1.0, 2.0], [3.0, 6.0]]))
+    frozen = stats.copy()
+    stats.update([100.0, 100.0])
+    assert frozen.count == 2
+    assert frozen.mean.tolist() == [2.0, 4.0]
+
+    path = tmp_path / "scaler.npz"
+    frozen.save(path)
+    loaded = RunningStats.load(path)
+    assert loaded.count == 2
+    assert loaded.mean.tolist() == [2.0, 4.0]
+    assert loaded.variance.tolist() == [1.0, 4.0]
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from utils.shared_array import SharedArray, SharedArrayHandle
+
+
+def test_create_and_attach_share_memory():
+    source = np.arange(12, dtype=np.float64).reshape(4, 3)
+    with SharedArray.create(source) as owner:
+        assert isinstance(owner.handle, SharedArrayHandle)
+        assert owner.handle.shape == (4, 3)
+        attached = SharedArray.attach(owner.handle)
+        assert SharedArray.attach(owner.handle) is attached
+        np.testing.assert_array_equal(attached.array, source)
+
+        owner.array[0, 0] = 42.0
+        assert attached.array[0, 0] == 42.0
+
+        with pytest.raises(ValueError):
+            attached.array[0, 0] = 1.0
+
+        attached.close()
+        assert owner.handle.name not in SharedArray._attached